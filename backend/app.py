@@ -3,19 +3,46 @@ Sistema de Confirmación de Asistencia a Asambleas
 Backend Flask Application
 """
 
+import atexit
 import csv
+import gc
+import gzip
+import hashlib
+import heapq
 import json
 import math
+import mmap
 import os
+import pickle
+import queue
+import re
 import threading
 import secrets
+import shutil
+import sqlite3
+import struct
+import sys
+import time
+import unicodedata
+import zlib
+from array import array
+from collections.abc import Mapping
 from datetime import datetime, timedelta
-from typing import List, Dict, Optional, Tuple
+from typing import Callable, List, Dict, Optional, Tuple
 from flask import Flask, request, jsonify, send_from_directory
 from flask_cors import CORS
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
+from bisect import bisect_left, insort
+from contextlib import contextmanager
 from functools import wraps
+from itertools import islice
+from io import StringIO
+
+try:
+    import fcntl
+except ImportError:  # Windows: el bloqueo solo excluye threads del proceso
+    fcntl = None
 
 
 # ============================================================================
@@ -60,6 +87,18 @@ def parsear_csv(contenido_csv: str) -> List[Dict[str, str]]:
     Raises:
         ValueError: Si el formato CSV es inválido o faltan columnas requeridas
     """
+    return list(iterar_usuarios_csv(contenido_csv))
+
+
+def iterar_usuarios_csv(contenido_csv: str):
+    """
+    Como parsear_csv, pero entrega los usuarios uno a uno (la tabla columnar
+    los copia sin retener la lista de diccionarios).
+    
+    Raises:
+        ValueError: Si el formato CSV es inválido o faltan columnas requeridas
+            (al comenzar la iteración)
+    """
     if not contenido_csv or not contenido_csv.strip():
         raise ValueError("Contenido CSV vacío")
     
@@ -84,20 +123,17 @@ def parsear_csv(contenido_csv: str) -> List[Dict[str, str]]:
         )
     
     # Parsear filas
-    usuarios = []
     for numero_linea, fila in enumerate(lector, start=2):  # start=2 porque línea 1 es header
         # Validar que la fila tenga datos
         if not fila.get('userId') or not fila.get('documento') or not fila.get('nombre'):
             # Ignorar filas vacías o incompletas
             continue
         
-        usuarios.append({
+        yield {
             'userId': fila['userId'].strip(),
             'documento': fila['documento'].strip(),
             'nombre': fila['nombre'].strip()
-        })
-    
-    return usuarios
+        }
 
 
 
@@ -162,6 +198,46 @@ def calcular_distancia_haversine(
     return distancia
 
 
+def distancia_haversine_desde(lat_referencia: float, lon_referencia: float):
+    """
+    Prepara el cálculo de distancias hasta un punto fijo, con los términos del
+    punto precalculados. Da el mismo resultado que
+    calcular_distancia_haversine(lat, lon, lat_referencia, lon_referencia);
+    sirve para recorrer muchas coordenadas (p.ej. al exportar).
+    
+    Args:
+        lat_referencia: Latitud del punto fijo en grados decimales
+        lon_referencia: Longitud del punto fijo en grados decimales
+        
+    Returns:
+        Función (lat, lon) → distancia en metros, que lanza ValueError si
+        las coordenadas están fuera de rango
+        
+    Raises:
+        ValueError: Si las coordenadas del punto fijo están fuera de rango
+    """
+    if not (-90 <= lat_referencia <= 90):
+        raise ValueError("Latitud debe estar entre -90 y 90 grados")
+    if not (-180 <= lon_referencia <= 180):
+        raise ValueError("Longitud debe estar entre -180 y 180 grados")
+    
+    R = 6371000
+    cos_referencia = math.cos(math.radians(lat_referencia))
+    radians, sin, cos, atan2, sqrt = math.radians, math.sin, math.cos, math.atan2, math.sqrt
+    
+    def distancia(lat: float, lon: float) -> float:
+        if not (-90 <= lat <= 90):
+            raise ValueError("Latitud debe estar entre -90 y 90 grados")
+        if not (-180 <= lon <= 180):
+            raise ValueError("Longitud debe estar entre -180 y 180 grados")
+        a = (sin(radians(lat_referencia - lat) / 2) ** 2 +
+             cos(radians(lat)) * cos_referencia *
+             sin(radians(lon_referencia - lon) / 2) ** 2)
+        return R * 2 * atan2(sqrt(a), sqrt(1 - a))
+    
+    return distancia
+
+
 
 # ============================================================================
 # FUNCIONES DE CARGA DE CONFIGURACIÓN Y ASISTENCIAS (Sub-task 2.5)
@@ -188,32 +264,7 @@ def cargar_configuracion(ruta_archivo: str = 'data/configuracion.json') -> Dict:
         with open(ruta_archivo, 'r', encoding='utf-8') as archivo:
             configuracion = json.load(archivo)
         
-        # Validar estructura requerida
-        if 'ubicacionAsamblea' not in configuracion:
-            raise ValueError("Falta campo 'ubicacionAsamblea' en configuración")
-        
-        if 'latitud' not in configuracion['ubicacionAsamblea']:
-            raise ValueError("Falta campo 'latitud' en ubicacionAsamblea")
-        
-        if 'longitud' not in configuracion['ubicacionAsamblea']:
-            raise ValueError("Falta campo 'longitud' en ubicacionAsamblea")
-        
-        if 'radioPermitido' not in configuracion:
-            raise ValueError("Falta campo 'radioPermitido' en configuración")
-        
-        # Validar coordenadas usando función de validación (Requirement 4.6)
-        lat = configuracion['ubicacionAsamblea']['latitud']
-        lon = configuracion['ubicacionAsamblea']['longitud']
-        
-        es_valido, mensaje_error, _ = validar_coordenadas(lat, lon)
-        if not es_valido:
-            raise ValueError(f"Coordenadas de asamblea inválidas: {mensaje_error}")
-        
-        # Validar radio permitido usando función de validación (Requirement 4.6)
-        radio = configuracion['radioPermitido']
-        es_valido, mensaje_error, _ = validar_radio_positivo(radio)
-        if not es_valido:
-            raise ValueError(f"Radio permitido inválido: {mensaje_error}")
+        validar_estructura_configuracion(configuracion)
         
         return configuracion
         
@@ -225,12 +276,52 @@ def cargar_configuracion(ruta_archivo: str = 'data/configuracion.json') -> Dict:
         raise ValueError(f"Error al cargar configuración: {str(e)}")
 
 
+def validar_estructura_configuracion(configuracion: Dict) -> None:
+    """
+    Valida campos requeridos, coordenadas y radio de una configuración.
+    
+    Args:
+        configuracion: Diccionario de configuración de la asamblea
+        
+    Raises:
+        ValueError: Si faltan campos requeridos o los valores son inválidos
+    """
+    # Validar estructura requerida
+    if 'ubicacionAsamblea' not in configuracion:
+        raise ValueError("Falta campo 'ubicacionAsamblea' en configuración")
+    
+    if 'latitud' not in configuracion['ubicacionAsamblea']:
+        raise ValueError("Falta campo 'latitud' en ubicacionAsamblea")
+    
+    if 'longitud' not in configuracion['ubicacionAsamblea']:
+        raise ValueError("Falta campo 'longitud' en ubicacionAsamblea")
+    
+    if 'radioPermitido' not in configuracion:
+        raise ValueError("Falta campo 'radioPermitido' en configuración")
+    
+    # Validar coordenadas usando función de validación (Requirement 4.6)
+    lat = configuracion['ubicacionAsamblea']['latitud']
+    lon = configuracion['ubicacionAsamblea']['longitud']
+    
+    es_valido, mensaje_error, _ = validar_coordenadas(lat, lon)
+    if not es_valido:
+        raise ValueError(f"Coordenadas de asamblea inválidas: {mensaje_error}")
+    
+    # Validar radio permitido usando función de validación (Requirement 4.6)
+    radio = configuracion['radioPermitido']
+    es_valido, mensaje_error, _ = validar_radio_positivo(radio)
+    if not es_valido:
+        raise ValueError(f"Radio permitido inválido: {mensaje_error}")
+
+
 def cargar_asistencias(ruta_archivo: str = 'data/asistencias.json') -> List[Dict]:
     """
     Carga las asistencias confirmadas desde archivo JSON.
     
+    Si la ruta corresponde a un journal (.jsonl) se reproducen sus registros.
+    
     Args:
-        ruta_archivo: Ruta al archivo JSON de asistencias
+        ruta_archivo: Ruta al archivo JSON de asistencias o al journal .jsonl
         
     Returns:
         Lista de diccionarios con las asistencias confirmadas
@@ -242,6 +333,9 @@ def cargar_asistencias(ruta_archivo: str = 'data/asistencias.json') -> List[Dict
     if not os.path.exists(ruta_archivo):
         raise FileNotFoundError(f"Archivo no encontrado: {ruta_archivo}")
     
+    if ruta_archivo.endswith('.jsonl'):
+        return reproducir_journal_asistencias(ruta_archivo)
+    
     try:
         with open(ruta_archivo, 'r', encoding='utf-8') as archivo:
             asistencias = json.load(archivo)
@@ -275,13 +369,8 @@ def guardar_asistencias(
         ValueError: Si hay error al guardar el archivo
     """
     try:
-        # Crear directorio si no existe
-        directorio = os.path.dirname(ruta_archivo)
-        if directorio and not os.path.exists(directorio):
-            os.makedirs(directorio)
-        
-        with open(ruta_archivo, 'w', encoding='utf-8') as archivo:
-            json.dump(asistencias, archivo, indent=2, ensure_ascii=False)
+        contenido = json.dumps(asistencias, indent=2, ensure_ascii=False)
+        escribir_archivo_atomico(ruta_archivo, contenido)
             
     except Exception as e:
         raise ValueError(f"Error al guardar asistencias: {str(e)}")
@@ -302,297 +391,5265 @@ def guardar_usuarios_csv(
         ValueError: Si hay error al guardar el archivo
     """
     try:
-        # Crear directorio si no existe
-        directorio = os.path.dirname(ruta_archivo)
-        if directorio and not os.path.exists(directorio):
-            os.makedirs(directorio)
+        archivo = StringIO()
+        if usuarios:
+            # Escribir encabezados
+            fieldnames = ['userId', 'documento', 'nombre']
+            writer = csv.DictWriter(archivo, fieldnames=fieldnames)
+            writer.writeheader()
+            
+            # Escribir usuarios
+            for usuario in usuarios:
+                writer.writerow({
+                    'userId': usuario['userId'],
+                    'documento': usuario['documento'],
+                    'nombre': usuario['nombre']
+                })
+        else:
+            # Si no hay usuarios, escribir solo encabezados
+            archivo.write('userId,documento,nombre\n')
         
-        with open(ruta_archivo, 'w', encoding='utf-8', newline='') as archivo:
-            if usuarios:
-                # Escribir encabezados
-                fieldnames = ['userId', 'documento', 'nombre']
-                writer = csv.DictWriter(archivo, fieldnames=fieldnames)
-                writer.writeheader()
-                
-                # Escribir usuarios
-                for usuario in usuarios:
-                    writer.writerow({
-                        'userId': usuario['userId'],
-                        'documento': usuario['documento'],
-                        'nombre': usuario['nombre']
-                    })
-            else:
-                # Si no hay usuarios, escribir solo encabezados
-                archivo.write('userId,documento,nombre\n')
+        escribir_archivo_atomico(ruta_archivo, archivo.getvalue())
             
     except Exception as e:
         raise ValueError(f"Error al guardar usuarios CSV: {str(e)}")
 
 
+def agregar_usuarios_csv(
+    usuarios: List[Dict[str, str]],
+    ruta_archivo: str = 'data/usuarios.csv'
+) -> None:
+    """
+    Agrega usuarios al final del archivo CSV sin reescribir las filas existentes.
+    
+    Las columnas se escriben en el orden del encabezado actual. Si el archivo
+    no existe o está vacío se crea completo con guardar_usuarios_csv.
+    
+    Args:
+        usuarios: Lista de diccionarios con los usuarios nuevos
+        ruta_archivo: Ruta al archivo CSV de usuarios
+        
+    Raises:
+        ValueError: Si hay error al escribir el archivo
+    """
+    if not os.path.exists(ruta_archivo) or os.path.getsize(ruta_archivo) == 0:
+        guardar_usuarios_csv(usuarios, ruta_archivo)
+        return
+    
+    try:
+        with open(ruta_archivo, 'rb') as archivo:
+            encabezado = archivo.readline().decode('utf-8').strip()
+            archivo.seek(-1, os.SEEK_END)
+            termina_en_salto = archivo.read(1) == b'\n'
+        
+        salida = StringIO()
+        if not termina_en_salto:
+            salida.write('\r\n')
+        
+        # Columnas adicionales del encabezado quedan vacías
+        writer = csv.DictWriter(
+            salida,
+            fieldnames=next(csv.reader([encabezado])),
+            restval='',
+            extrasaction='ignore'
+        )
+        for usuario in usuarios:
+            writer.writerow({
+                'userId': usuario['userId'],
+                'documento': usuario['documento'],
+                'nombre': usuario['nombre']
+            })
+        
+        # Una sola escritura al final del archivo
+        with open(ruta_archivo, 'a', encoding='utf-8', newline='') as archivo:
+            archivo.write(salida.getvalue())
+            archivo.flush()
+            os.fsync(archivo.fileno())
+            
+    except Exception as e:
+        raise ValueError(f"Error al agregar usuarios CSV: {str(e)}")
+
+
+def aplicar_cambios_usuarios(
+    usuarios: List[Dict[str, str]],
+    cambios: List[tuple]
+) -> List[Dict[str, str]]:
+    """
+    Aplica cambios de usuarios, en orden, sobre una lista leída del CSV.
+    
+    Ediciones y bajas afectan al primer usuario con ese userId (el que
+    encuentra el padrón); si ya no existe, el cambio se omite.
+    
+    Args:
+        usuarios: Lista de usuarios (se modifica)
+        cambios: Lista de ('agregar', usuarios), ('editar', usuario),
+            ('quitar', user_id) o ('vaciar',)
+    
+    Returns:
+        La misma lista, con los cambios aplicados
+    """
+    # userId -> posiciones de sus usuarios vigentes, en orden; se arma una
+    # sola vez. Las bajas dejan None en su posición y se filtran al final,
+    # así ninguna edición o baja recorre la lista
+    posiciones = {}
+    for i, usuario in enumerate(usuarios):
+        posiciones.setdefault(usuario['userId'], []).append(i)
+    hay_bajas = False
+    
+    for cambio in cambios:
+        operacion = cambio[0]
+        if operacion == 'agregar':
+            for usuario in cambio[1]:
+                posiciones.setdefault(usuario['userId'], []).append(len(usuarios))
+                usuarios.append(usuario)
+        elif operacion == 'editar':
+            vigentes = posiciones.get(cambio[1]['userId'])
+            if vigentes:
+                usuarios[vigentes[0]] = cambio[1]
+        elif operacion == 'quitar':
+            vigentes = posiciones.get(cambio[1])
+            if vigentes:
+                usuarios[vigentes.pop(0)] = None
+                hay_bajas = True
+        elif operacion == 'vaciar':
+            usuarios.clear()
+            posiciones.clear()
+            hay_bajas = False
+    
+    if hay_bajas:
+        usuarios[:] = [usuario for usuario in usuarios if usuario is not None]
+    return usuarios
+
+
 
 # ============================================================================
-# FUNCIONES DE VALIDACIÓN (Sub-task 8.1)
+# SNAPSHOT BINARIO DEL PADRÓN DE USUARIOS
 # ============================================================================
+#
+# Junto a usuarios.csv se guarda usuarios.csv.pickle con la lista ya
+# parseada y la huella del CSV del que proviene (tamaño, mtime y hash del
+# contenido). Un arranque con el CSV sin cambios carga el pickle en lugar de
+# parsear; cualquier diferencia reconstruye el snapshot en silencio. Con
+# columnar=True el snapshot guarda la TablaUsuarios completa (arena, columnas
+# e índices), que se carga copiando buffers sin crear un objeto por usuario.
 
-def validar_coordenadas(latitud: any, longitud: any) -> Tuple[bool, Optional[str], Optional[Tuple[float, float]]]:
+VERSION_SNAPSHOT_USUARIOS = 1
+
+
+def cargar_usuarios_con_snapshot(
+    ruta_archivo: str = 'data/usuarios.csv',
+    ruta_snapshot: Optional[str] = None,
+    columnar: bool = False
+):
     """
-    Valida que las coordenadas sean números válidos dentro de rangos correctos.
+    Carga usuarios desde CSV reutilizando el snapshot binario si corresponde al archivo actual.
     
     Args:
-        latitud: Valor de latitud a validar
-        longitud: Valor de longitud a validar
+        ruta_archivo: Ruta al archivo CSV de usuarios
+        ruta_snapshot: Ruta del snapshot (por defecto <ruta_archivo>.pickle)
+        columnar: Retornar una TablaUsuarios en lugar de una lista
         
     Returns:
-        Tupla (es_valido, mensaje_error, (lat, lon))
-        - es_valido: True si las coordenadas son válidas
-        - mensaje_error: Mensaje de error si no son válidas, None si son válidas
-        - (lat, lon): Tupla con coordenadas convertidas a float, None si no son válidas
+        Lista de diccionarios con usuarios cargados, o TablaUsuarios
         
-    Requirement: 4.6
+    Raises:
+        FileNotFoundError: Si el archivo no existe
+        ValueError: Si el formato CSV es inválido
     """
-    # Validar que no sean None
-    if latitud is None or longitud is None:
-        return False, "latitud y longitud son requeridas", None
+    if not os.path.exists(ruta_archivo):
+        raise FileNotFoundError(f"Archivo no encontrado: {ruta_archivo}")
+    
+    ruta_snapshot = ruta_snapshot or ruta_archivo + '.pickle'
+    
+    with open(ruta_archivo, 'rb') as archivo:
+        estado = os.fstat(archivo.fileno())
+        contenido = archivo.read()
+    
+    huella = {
+        'version': VERSION_SNAPSHOT_USUARIOS,
+        'tamano': estado.st_size,
+        'mtime_ns': estado.st_mtime_ns,
+        'hash': hashlib.blake2b(contenido, digest_size=16).hexdigest(),
+        'formato': 'columnar' if columnar else 'lista'
+    }
+    
+    snapshot = _leer_snapshot_usuarios(ruta_snapshot)
+    if snapshot is not None and snapshot.get('huella') == huella:
+        return snapshot['usuarios']
     
-    # Validar tipos de datos - intentar convertir a float
     try:
-        lat = float(latitud)
-        lon = float(longitud)
-    except (ValueError, TypeError):
-        return False, "Coordenadas deben ser números válidos", None
+        if columnar:
+            usuarios = TablaUsuarios(iterar_usuarios_csv(contenido.decode('utf-8')))
+        else:
+            usuarios = parsear_csv(contenido.decode('utf-8'))
+    except Exception as e:
+        raise ValueError(f"Error al leer archivo CSV: {str(e)}")
     
-    # Validar rangos (latitud: -90 a 90, longitud: -180 a 180)
-    if not (-90 <= lat <= 90):
-        return False, "Latitud debe estar entre -90 y 90 grados", None
+    _escribir_snapshot_usuarios(ruta_snapshot, {'huella': huella, 'usuarios': usuarios})
+    return usuarios
+
+
+def _leer_snapshot_usuarios(ruta_snapshot: str) -> Optional[Dict]:
+    """Lee el snapshot; si falta o está dañado retorna None."""
+    try:
+        with open(ruta_snapshot, 'rb') as archivo:
+            snapshot = pickle.load(archivo)
+        return snapshot if isinstance(snapshot, dict) else None
+    except Exception:
+        return None
+
+
+def _escribir_snapshot_usuarios(ruta_snapshot: str, snapshot: Dict) -> None:
+    """
+    Escribe el snapshot con un rename atómico. Es solo un caché: los errores
+    se informan y se ignoran.
+    """
+    # Temporal por proceso: varios workers pueden reconstruirlo a la vez
+    ruta_temporal = f"{ruta_snapshot}.{os.getpid()}.tmp"
+    try:
+        with open(ruta_temporal, 'wb') as archivo:
+            pickle.dump(snapshot, archivo, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(ruta_temporal, ruta_snapshot)
+    except Exception as e:
+        print(f"⚠ No se pudo escribir el snapshot de usuarios: {e}")
+        if os.path.exists(ruta_temporal):
+            os.remove(ruta_temporal)
+
+
+
+# ============================================================================
+# ESCRITURA ATÓMICA Y RECUPERACIÓN DE ARCHIVOS DE DATOS
+# ============================================================================
+#
+# Los archivos completos se escriben en <ruta>.tmp, se sincronizan a disco
+# (fsync) y se renombran sobre el original. Antes de reemplazarlo, la
+# generación anterior queda en <ruta>.bak para poder recuperarla.
+
+_locks_archivos = {}  # Ruta absoluta → RLock de escritura de ese archivo
+
+
+def _lock_archivo(ruta_archivo: str) -> threading.RLock:
+    """
+    Lock que serializa las escrituras completas de un archivo dentro del
+    proceso. Es reentrante: quien arma el contenido a partir del caché lo
+    toma antes, para que una escritura con un estado más viejo no pise a otra.
+    """
+    # setdefault es atómico: dos threads obtienen siempre el mismo RLock
+    return _locks_archivos.setdefault(os.path.abspath(ruta_archivo), threading.RLock())
+
+
+def escribir_archivo_atomico(ruta_archivo: str, contenido: str) -> None:
+    """
+    Escribe un archivo completo de forma atómica y durable.
     
-    if not (-180 <= lon <= 180):
-        return False, "Longitud debe estar entre -180 y 180 grados", None
+    Un fallo a mitad de escritura nunca deja el archivo truncado: el destino
+    contiene la versión anterior o la nueva completa. Las escrituras
+    concurrentes del mismo archivo se serializan (comparten el .tmp).
     
-    return True, None, (lat, lon)
+    Args:
+        ruta_archivo: Ruta del archivo destino
+        contenido: Texto completo a escribir
+        
+    Raises:
+        OSError: Si hay error de escritura
+    """
+    directorio = os.path.dirname(ruta_archivo)
+    if directorio and not os.path.exists(directorio):
+        os.makedirs(directorio, exist_ok=True)
+    
+    with _lock_archivo(ruta_archivo):
+        ruta_temporal = ruta_archivo + '.tmp'
+        with open(ruta_temporal, 'w', encoding='utf-8', newline='') as archivo:
+            archivo.write(contenido)
+            archivo.flush()
+            os.fsync(archivo.fileno())
+        
+        # Conservar la generación anterior sin dejar un instante sin archivo
+        if os.path.exists(ruta_archivo):
+            ruta_respaldo_temporal = ruta_archivo + '.bak.tmp'
+            try:
+                if os.path.exists(ruta_respaldo_temporal):
+                    os.remove(ruta_respaldo_temporal)
+                os.link(ruta_archivo, ruta_respaldo_temporal)
+            except OSError:
+                # Sistemas de archivos sin enlaces duros
+                shutil.copy2(ruta_archivo, ruta_respaldo_temporal)
+            os.replace(ruta_respaldo_temporal, ruta_archivo + '.bak')
+        
+        os.replace(ruta_temporal, ruta_archivo)
+    _sincronizar_directorio(directorio)
 
 
-def validar_campo_requerido(valor: any, nombre_campo: str) -> Tuple[bool, Optional[str]]:
+def _sincronizar_directorio(directorio: str) -> None:
+    """Sincroniza la entrada de directorio tras un rename (solo POSIX)."""
+    if os.name != 'posix':
+        return
+    descriptor = os.open(directorio or '.', os.O_RDONLY)
+    try:
+        os.fsync(descriptor)
+    finally:
+        os.close(descriptor)
+
+
+def recuperar_archivo(ruta_archivo: str, validador) -> Optional[str]:
     """
-    Valida que un campo requerido esté presente y no esté vacío.
+    Verifica un archivo de datos y, si está dañado, recupera la última
+    generación válida (<ruta>.tmp completo o <ruta>.bak).
     
     Args:
-        valor: Valor del campo a validar
-        nombre_campo: Nombre del campo para el mensaje de error
+        ruta_archivo: Ruta del archivo a verificar
+        validador: Callable que recibe el contenido y lanza ValueError si es inválido
         
     Returns:
-        Tupla (es_valido, mensaje_error)
+        Descripción de lo recuperado, o None si no hubo que recuperar nada
+    """
+    def es_valido(ruta):
+        if not os.path.exists(ruta):
+            return False
+        try:
+            with open(ruta, 'r', encoding='utf-8') as archivo:
+                validador(archivo.read())
+            return True
+        except (ValueError, UnicodeDecodeError):
+            return False
+    
+    nombre = os.path.basename(ruta_archivo)
+    ruta_temporal = ruta_archivo + '.tmp'
+    ruta_respaldo = ruta_archivo + '.bak'
+    reporte = None
+    
+    if not es_valido(ruta_archivo):
+        ruta_danada = None
+        if os.path.exists(ruta_archivo):
+            ruta_danada = f"{ruta_archivo}.danado-{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+            os.replace(ruta_archivo, ruta_danada)
+        
+        if es_valido(ruta_temporal):
+            os.replace(ruta_temporal, ruta_archivo)
+            reporte = f"{nombre}: recuperada escritura completa pendiente ({nombre}.tmp)"
+        elif es_valido(ruta_respaldo):
+            shutil.copy2(ruta_respaldo, ruta_archivo)
+            reporte = f"{nombre}: restaurada generación anterior ({nombre}.bak)"
+        elif ruta_danada:
+            # Sin generación válida: se deja el archivo dañado en su lugar
+            os.replace(ruta_danada, ruta_archivo)
+            ruta_danada = None
+            reporte = f"{nombre}: dañado y sin generación anterior válida"
+        
+        if reporte and ruta_danada:
+            reporte += f"; archivo dañado conservado en {os.path.basename(ruta_danada)}"
+    
+    if os.path.exists(ruta_temporal):
+        # Escritura interrumpida de una versión que nunca llegó a publicarse
+        os.remove(ruta_temporal)
+    
+    return reporte
+
+
+def recuperar_datos(directorio: str = 'data') -> List[str]:
+    """
+    Paso de recuperación al arrancar: verifica todos los archivos de datos.
+    
+    Args:
+        directorio: Directorio de los archivos de datos
         
-    Requirement: 4.6
+    Returns:
+        Lista con la descripción de cada recuperación realizada
     """
-    if valor is None:
-        return False, f"{nombre_campo} es requerido"
+    def validar_json_lista(contenido):
+        try:
+            if not isinstance(json.loads(contenido), list):
+                raise ValueError("se esperaba una lista JSON")
+        except json.JSONDecodeError as e:
+            raise ValueError(str(e))
     
-    # Si es string, verificar que no esté vacío después de strip
-    if isinstance(valor, str):
-        if not valor.strip():
-            return False, f"{nombre_campo} no puede estar vacío"
+    def validar_json_configuracion(contenido):
+        try:
+            validar_estructura_configuracion(json.loads(contenido))
+        except (json.JSONDecodeError, TypeError) as e:
+            raise ValueError(str(e))
     
-    return True, None
+    def validar_json_objeto(contenido):
+        try:
+            if not isinstance(json.loads(contenido), dict):
+                raise ValueError("se esperaba un objeto JSON")
+        except json.JSONDecodeError as e:
+            raise ValueError(str(e))
+    
+    validadores = [
+        ('usuarios.csv', parsear_csv),
+        ('asistencias.json', validar_json_lista),
+        ('configuracion.json', validar_json_configuracion),
+        ('admin_credentials.json', validar_json_objeto)
+    ]
+    
+    reportes = []
+    for nombre, validador in validadores:
+        reporte = recuperar_archivo(os.path.join(directorio, nombre), validador)
+        if reporte:
+            reportes.append(reporte)
+    
+    journal = JournalAsistencias(os.path.join(directorio, 'asistencias.jsonl'))
+    
+    def validar_snapshot(contenido):
+        lineas = contenido.splitlines()
+        encabezado = journal.deserializar(lineas[0]) if lineas else {}
+        if encabezado.get('tipo') != 'snapshot' or encabezado.get('total') != len(lineas) - 1:
+            raise ValueError("snapshot incompleto")
+        for linea in lineas[1:]:
+            journal.deserializar(linea)
+    
+    reporte = recuperar_archivo(journal.ruta_snapshot, validar_snapshot)
+    if reporte:
+        reportes.append(reporte)
+    
+    reporte = journal.reparar()
+    if reporte:
+        reportes.append(reporte)
+    
+    return reportes
+
+
+
+# ============================================================================
+# BLOQUEO ENTRE PROCESOS
+# ============================================================================
+
+class BloqueoEntreProcesos:
+    """
+    Lock exclusivo entre threads y entre procesos (workers de gunicorn),
+    basado en flock sobre un archivo .lock. Es reentrante dentro del thread.
+    
+    El descriptor se abre en cada adquisición para no compartirlo con
+    procesos hijos creados por fork. En sistemas sin fcntl solo excluye a
+    los threads del proceso actual.
+    """
+    
+    def __init__(self, ruta_lock: str):
+        """
+        Args:
+            ruta_lock: Ruta del archivo de lock (se crea si no existe)
+        """
+        self.ruta_lock = ruta_lock
+        self._lock = threading.RLock()
+        self._descriptor = None
+        self._profundidad = 0
+    
+    def __enter__(self):
+        self._lock.acquire()
+        self._profundidad += 1
+        if self._profundidad == 1 and fcntl is not None:
+            try:
+                directorio = os.path.dirname(self.ruta_lock)
+                if directorio and not os.path.exists(directorio):
+                    os.makedirs(directorio, exist_ok=True)
+                self._descriptor = os.open(self.ruta_lock, os.O_RDWR | os.O_CREAT, 0o644)
+                fcntl.flock(self._descriptor, fcntl.LOCK_EX)
+            except BaseException:
+                if self._descriptor is not None:
+                    os.close(self._descriptor)
+                    self._descriptor = None
+                self._profundidad -= 1
+                self._lock.release()
+                raise
+        return self
+    
+    def __exit__(self, *excepcion):
+        self._profundidad -= 1
+        if self._profundidad == 0 and self._descriptor is not None:
+            fcntl.flock(self._descriptor, fcntl.LOCK_UN)
+            os.close(self._descriptor)
+            self._descriptor = None
+        self._lock.release()
+        return False
+
+
+# ============================================================================
+# JOURNAL APPEND-ONLY DE ASISTENCIAS
+# ============================================================================
+#
+# Cada confirmación agrega una línea JSON al journal en lugar de reescribir
+# todo asistencias.json. Formato de cada línea:
+#     {"seq": 1, "op": "agregar", "asistencia": {...}, "crc": 123}
+#     {"seq": 2, "op": "reiniciar", "crc": 456}
+# "seq" es un número de secuencia creciente y "crc" el CRC32 de la línea sin
+# el propio campo crc. El archivo asistencias.json se mantiene como formato de
+# importación (si no existe journal) y de exportación.
+#
+# Compactación: al superar el umbral de registros o bytes, el journal activo
+# se renombra a un segmento (asistencias.jsonl.<seq>) y en segundo plano se
+# escribe un snapshot (asistencias.snapshot.jsonl) con el estado vigente y la
+# secuencia que cubre; luego se eliminan los segmentos cubiertos. Al arrancar
+# se carga el snapshot y solo se reproducen los registros posteriores.
+#
+# Varios workers: toda escritura se hace bajo un flock (asistencias.jsonl.lock)
+# con lectura-fusión-escritura: antes de agregar, cada proceso lee los
+# registros que otros procesos agregaron desde su última lectura, rechaza los
+# userId ya confirmados y recién entonces escribe. Los registros ajenos quedan
+# disponibles en leer_cambios() para actualizar el caché del worker.
+
+class JournalAsistencias:
+    """
+    Journal JSON-lines de asistencias con secuencia y checksum por registro,
+    snapshot, compactación en segundo plano y escritura segura entre procesos.
+    
+    Cada escritura se sincroniza a disco (fsync) antes de retornar.
+    """
+    
+    SUFIJO_CRC = ',"crc":'
+    
+    def __init__(
+        self,
+        ruta_archivo: str = 'data/asistencias.jsonl',
+        umbral_registros: int = 0,
+        umbral_bytes: int = 0
+    ):
+        """
+        Args:
+            ruta_archivo: Ruta al journal JSON-lines de asistencias
+            umbral_registros: Registros en el journal que disparan la compactación (0 = nunca)
+            umbral_bytes: Tamaño del journal que dispara la compactación (0 = nunca)
+        """
+        self.ruta_archivo = ruta_archivo
+        self.ruta_snapshot = ruta_archivo[:-len('.jsonl')] + '.snapshot.jsonl' \
+            if ruta_archivo.endswith('.jsonl') else ruta_archivo + '.snapshot'
+        self.ruta_indice = self.ruta_snapshot + '.idx'
+        self.umbral_registros = umbral_registros
+        self.umbral_bytes = umbral_bytes
+        self.secuencia = None  # Última secuencia leída o escrita; None = sin sincronizar
+        self.registros = None  # Registros en el journal activo; None = desconocido
+        self.confirmados = None  # userId confirmados desde el último reinicio
+        self.secuencia_snapshot = 0
+        self.compactaciones = 0
+        self.recargas = 0
+        self._inodo = None  # Inodo del journal activo en la última lectura
+        self._offset = 0  # Bytes del journal activo ya leídos
+        self._pendientes = []  # Registros de otros procesos aún no entregados
+        self._lock = BloqueoEntreProcesos(ruta_archivo + '.lock')
+        self._lock_compactacion = BloqueoEntreProcesos(ruta_archivo + '.compactacion.lock')
+        self._thread_compactacion = None
+    
+    def existe(self) -> bool:
+        """Indica si hay historial: journal activo, segmentos o snapshot."""
+        return (
+            os.path.exists(self.ruta_archivo)
+            or os.path.exists(self.ruta_snapshot)
+            or bool(self.segmentos())
+        )
+    
+    def segmentos(self) -> List[str]:
+        """Segmentos rotados pendientes de compactar, en orden de secuencia."""
+        directorio = os.path.dirname(self.ruta_archivo) or '.'
+        prefijo = os.path.basename(self.ruta_archivo) + '.'
+        if not os.path.isdir(directorio):
+            return []
+        nombres = [
+            nombre for nombre in os.listdir(directorio)
+            if nombre.startswith(prefijo) and nombre[len(prefijo):].isdigit()
+        ]
+        return [os.path.join(directorio, nombre) for nombre in sorted(nombres)]
+    
+    # --- Formato ------------------------------------------------------------
+    
+    @classmethod
+    def serializar(cls, registro: Dict) -> str:
+        """Serializa un registro como línea JSON con su CRC al final."""
+        cuerpo = json.dumps(registro, ensure_ascii=False, separators=(',', ':'))
+        crc = zlib.crc32(cuerpo.encode('utf-8'))
+        return f"{cuerpo[:-1]}{cls.SUFIJO_CRC}{crc}}}\n"
+    
+    @classmethod
+    def deserializar(cls, linea: str) -> Dict:
+        """
+        Parsea y verifica una línea del journal.
+        
+        Raises:
+            ValueError: Si la línea no es JSON válido o su CRC no coincide
+        """
+        try:
+            registro = json.loads(linea)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"JSON inválido: {str(e)}")
+        
+        if 'crc' in registro:
+            # Registros sin crc provienen de versiones anteriores del journal
+            posicion = linea.rfind(cls.SUFIJO_CRC)
+            cuerpo = linea[:posicion] + '}'
+            if zlib.crc32(cuerpo.encode('utf-8')) != registro['crc']:
+                raise ValueError("CRC no coincide")
+        
+        return registro
+    
+    # --- Lectura ------------------------------------------------------------
+    
+    def reproducir(self) -> List[Dict]:
+        """
+        Reconstruye la lista de asistencias: carga el snapshot y aplica en
+        orden los registros posteriores de los segmentos y del journal activo.
+        
+        Una última línea incompleta (escritura interrumpida) se ignora.
+        
+        Returns:
+            Lista de diccionarios con las asistencias vigentes
+            
+        Raises:
+            FileNotFoundError: Si no existe journal, segmentos ni snapshot
+            ValueError: Si un registro intermedio es inválido
+        """
+        with self._lock:
+            if not self.existe():
+                raise FileNotFoundError(f"Archivo no encontrado: {self.ruta_archivo}")
+            asistencias = self._reproducir_estado()
+            self._pendientes = []
+            return asistencias
+    
+    def reproducir_indexado(self) -> 'AsistenciasIndexadas':
+        """
+        Como reproducir(), pero las asistencias del snapshot no se cargan: se
+        mapea el snapshot en memoria y solo se retiene el índice userId → offset.
+        
+        Returns:
+            AsistenciasIndexadas con el estado vigente
+            
+        Raises:
+            FileNotFoundError: Si no existe journal, segmentos ni snapshot
+            ValueError: Si un registro intermedio es inválido
+        """
+        with self._lock:
+            if not self.existe():
+                raise FileNotFoundError(f"Archivo no encontrado: {self.ruta_archivo}")
+            asistencias = self._reproducir_estado(indexado=True)
+            self._pendientes = []
+            return asistencias
+    
+    def _reproducir_estado(self, indexado: bool = False):
+        """Reproduce todo el historial y reinicia el seguimiento (con el lock tomado)."""
+        if indexado:
+            asistencias, secuencia = self._cargar_snapshot_indexado()
+        else:
+            asistencias, secuencia = self._cargar_snapshot()
+        for segmento in self.segmentos():
+            asistencias, secuencia, _, _ = self._aplicar_archivo(segmento, asistencias, secuencia)
+        
+        registros = 0
+        offset = 0
+        inodo = None
+        if os.path.exists(self.ruta_archivo):
+            inodo = os.stat(self.ruta_archivo).st_ino
+            asistencias, secuencia, registros, offset = self._aplicar_archivo(
+                self.ruta_archivo, asistencias, secuencia
+            )
+        
+        self.secuencia = secuencia
+        self.registros = registros
+        if indexado:
+            self.confirmados = set(asistencias.usuarios())
+        else:
+            self.confirmados = {asistencia['userId'] for asistencia in asistencias}
+        self._inodo = inodo
+        self._offset = offset
+        return asistencias
+    
+    def _leer_registros(self, ruta: str, desde_byte: int = 0, admitir_sin_salto: bool = True):
+        """
+        Genera (registro, byte final) para cada línea válida a partir de `desde_byte`.
+        
+        Una línea final sin salto de línea es una escritura interrumpida (o en
+        curso en otro proceso) y se ignora, salvo que sea válida y
+        `admitir_sin_salto` sea True.
+        
+        Raises:
+            ValueError: Si una línea completa es inválida
+        """
+        with open(ruta, 'rb') as archivo:
+            archivo.seek(desde_byte)
+            contenido = archivo.read()
+        
+        posicion = 0
+        numero_linea = 0
+        while posicion < len(contenido):
+            fin_linea = contenido.find(b'\n', posicion)
+            terminada = fin_linea != -1
+            fin = fin_linea + 1 if terminada else len(contenido)
+            linea = contenido[posicion:fin].decode('utf-8', errors='replace').strip()
+            posicion = fin
+            numero_linea += 1
+            if not linea:
+                continue
+            
+            try:
+                registro = self.deserializar(linea)
+            except ValueError as e:
+                if not terminada:
+                    # Escritura interrumpida al final del journal
+                    print(f"⚠ Ignorando registro incompleto al final de {ruta}")
+                    return
+                raise ValueError(f"Registro inválido en línea {numero_linea} de {ruta}: {str(e)}")
+            
+            if not terminada and not admitir_sin_salto:
+                return
+            yield registro, desde_byte + fin
+    
+    def _aplicar_archivo(self, ruta: str, asistencias: List[Dict], secuencia: int):
+        """
+        Aplica los registros de un archivo con secuencia mayor a la dada.
+        
+        Returns:
+            Tupla (asistencias, última secuencia, registros leídos, bytes leídos)
+        """
+        registros = 0
+        fin = 0
+        for registro, fin in self._leer_registros(ruta):
+            registros += 1
+            secuencia_registro = registro.get('seq', secuencia + 1)
+            if secuencia_registro <= secuencia:
+                continue  # Ya cubierto por el snapshot
+            secuencia = secuencia_registro
+            asistencias = self._aplicar_registro(registro, asistencias)
+        
+        return asistencias, secuencia, registros, fin
+    
+    @staticmethod
+    def _aplicar_registro(registro: Dict, asistencias: List[Dict]) -> List[Dict]:
+        operacion = registro.get('op')
+        if operacion == 'agregar':
+            asistencias.append(registro['asistencia'])
+            return asistencias
+        if operacion == 'reiniciar':
+            return type(asistencias)()
+        raise ValueError(f"Operación desconocida en el journal: {operacion}")
+    
+    def _cargar_snapshot(self):
+        """
+        Carga el snapshot si existe.
+        
+        Returns:
+            Tupla (asistencias, secuencia cubierta)
+            
+        Raises:
+            ValueError: Si el snapshot está dañado
+        """
+        if not os.path.exists(self.ruta_snapshot):
+            self.secuencia_snapshot = 0
+            return [], 0
+        
+        with open(self.ruta_snapshot, 'r', encoding='utf-8') as archivo:
+            lineas = archivo.read().splitlines()
+        
+        encabezado = self.deserializar(lineas[0]) if lineas else {}
+        if encabezado.get('tipo') != 'snapshot':
+            raise ValueError(f"Snapshot sin encabezado válido: {self.ruta_snapshot}")
+        
+        asistencias = [self.deserializar(linea)['asistencia'] for linea in lineas[1:] if linea]
+        if len(asistencias) != encabezado['total']:
+            raise ValueError(f"Snapshot incompleto: {self.ruta_snapshot}")
+        
+        self.secuencia_snapshot = encabezado['seq']
+        return self._sin_duplicados(asistencias), encabezado['seq']
+    
+    def _cargar_snapshot_indexado(self):
+        """
+        Mapea el snapshot en memoria y carga su índice de offsets. Si el índice
+        falta o no corresponde al snapshot, se reconstruye recorriéndolo.
+        
+        Returns:
+            Tupla (AsistenciasIndexadas, secuencia cubierta)
+            
+        Raises:
+            ValueError: Si el snapshot está dañado
+        """
+        if not os.path.exists(self.ruta_snapshot):
+            self.secuencia_snapshot = 0
+            return AsistenciasIndexadas(), 0
+        
+        with open(self.ruta_snapshot, 'rb') as archivo:
+            mapa = mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ)
+        
+        fin_encabezado = mapa.find(b'\n') + 1
+        encabezado = self.deserializar(mapa[:fin_encabezado].decode('utf-8')) if fin_encabezado else {}
+        if encabezado.get('tipo') != 'snapshot':
+            raise ValueError(f"Snapshot sin encabezado válido: {self.ruta_snapshot}")
+        
+        offsets = self._leer_indice(encabezado, len(mapa))
+        lineas = encabezado['total']  # El índice solo se acepta si coincide con el snapshot
+        if offsets is None:
+            # Snapshots de versiones anteriores pueden repetir un userId: vale
+            # la primera asistencia, como en _sin_duplicados()
+            offsets = {}
+            lineas = 0
+            posicion = fin_encabezado
+            while posicion < len(mapa):
+                fin = mapa.find(b'\n', posicion)
+                fin = len(mapa) if fin == -1 else fin + 1
+                linea = mapa[posicion:fin].decode('utf-8').strip()
+                if linea:
+                    offsets.setdefault(self.deserializar(linea)['asistencia']['userId'], posicion)
+                    lineas += 1
+                posicion = fin
+            if lineas == encabezado['total'] and len(offsets) == lineas:
+                self._escribir_indice(encabezado, len(mapa), offsets)
+        
+        if lineas != encabezado['total']:
+            raise ValueError(f"Snapshot incompleto: {self.ruta_snapshot}")
+        
+        self.secuencia_snapshot = encabezado['seq']
+        return AsistenciasIndexadas(mapa=mapa, offsets=offsets), encabezado['seq']
+    
+    def _leer_indice(self, encabezado_snapshot: Dict, tamano_snapshot: int) -> Optional[Dict[str, int]]:
+        """
+        Lee el índice del snapshot: encabezado JSON, offsets como enteros de 8
+        bytes y los userId separados por saltos de línea.
+        
+        Returns:
+            Diccionario ordenado userId → offset, o None si falta, está dañado
+            o corresponde a otro snapshot
+        """
+        try:
+            with open(self.ruta_indice, 'rb') as archivo:
+                with mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ) as indice:
+                    inicio = indice.find(b'\n') + 1
+                    encabezado = self.deserializar(indice[:inicio].decode('utf-8'))
+                    total = encabezado_snapshot['total']
+                    if (
+                        encabezado.get('tipo') != 'indice'
+                        or encabezado.get('seq') != encabezado_snapshot['seq']
+                        or encabezado.get('total') != total
+                        or encabezado.get('tamano') != tamano_snapshot
+                        or encabezado.get('orden') != sys.byteorder
+                    ):
+                        return None
+                    
+                    offsets = array('Q')
+                    offsets.frombytes(indice[inicio:inicio + total * offsets.itemsize])
+                    user_ids = indice[inicio + total * offsets.itemsize:].decode('utf-8').split('\n') if total else []
+        except (OSError, ValueError, UnicodeDecodeError):
+            return None
+        
+        if len(offsets) != total or len(user_ids) != total:
+            return None
+        return dict(zip(user_ids, offsets))
+    
+    def _escribir_indice(self, encabezado_snapshot: Dict, tamano_snapshot: int, offsets: Dict[str, int]) -> None:
+        """
+        Escribe el índice del snapshot con un rename atómico. Se puede
+        reconstruir desde el snapshot: los errores se informan y se ignoran.
+        """
+        if any('\n' in user_id for user_id in offsets):
+            return  # No representable en el formato; se reconstruye al cargar
+        
+        encabezado = self.serializar({
+            'tipo': 'indice',
+            'seq': encabezado_snapshot['seq'],
+            'total': len(offsets),
+            'tamano': tamano_snapshot,
+            'orden': sys.byteorder
+        })
+        # Temporal por proceso: varios workers pueden reconstruirlo a la vez
+        ruta_temporal = f"{self.ruta_indice}.{os.getpid()}.tmp"
+        try:
+            with open(ruta_temporal, 'wb') as archivo:
+                archivo.write(encabezado.encode('utf-8'))
+                archivo.write(array('Q', offsets.values()).tobytes())
+                archivo.write('\n'.join(offsets).encode('utf-8'))
+            os.replace(ruta_temporal, self.ruta_indice)
+        except Exception as e:
+            print(f"⚠ No se pudo escribir el índice del snapshot: {e}")
+            if os.path.exists(ruta_temporal):
+                os.remove(ruta_temporal)
+    
+    def _secuencia_snapshot_en_disco(self) -> int:
+        """Secuencia cubierta por el snapshot publicado (solo lee el encabezado)."""
+        try:
+            with open(self.ruta_snapshot, 'r', encoding='utf-8') as archivo:
+                return self.deserializar(archivo.readline()).get('seq', 0)
+        except FileNotFoundError:
+            return 0
+    
+    # --- Sincronización entre procesos --------------------------------------
+    
+    def _sin_cambios_externos(self) -> bool:
+        """Comprobación rápida (un stat, sin lock) de que nadie escribió desde la última lectura."""
+        if self.confirmados is None or self._pendientes:
+            return False
+        try:
+            estado = os.stat(self.ruta_archivo)
+        except FileNotFoundError:
+            return self._inodo is None
+        return estado.st_ino == self._inodo and estado.st_size == self._offset
+    
+    def _ponerse_al_dia(self) -> None:
+        """
+        Incorpora los registros que otros procesos agregaron desde la última
+        lectura (llamar con self._lock tomado). Si el journal fue rotado o
+        reemplazado, se reproduce completo y se entrega como reinicio.
+        """
+        if self.confirmados is None:
+            if self.existe():
+                self._recargar()
+            else:
+                self.secuencia = 0
+                self.registros = 0
+                self.confirmados = set()
+                self._inodo = None
+                self._offset = 0
+            return
+        
+        try:
+            estado = os.stat(self.ruta_archivo)
+        except FileNotFoundError:
+            if self._inodo is not None:
+                self._recargar()  # Rotado por la compactación de otro proceso
+            return
+        
+        if self._inodo is not None and estado.st_ino != self._inodo:
+            if not self._continuar_tras_rotacion():
+                self._recargar()
+            return
+        if self._inodo is None:
+            self._offset = 0  # Journal creado por otro proceso
+        if estado.st_size < self._offset:
+            self._recargar()
+            return
+        if estado.st_size == self._offset:
+            self._inodo = estado.st_ino
+            return
+        
+        nuevos = []
+        offset = self._offset
+        for registro, fin in self._leer_registros(self.ruta_archivo, self._offset, admitir_sin_salto=False):
+            secuencia_registro = registro.get('seq', self.secuencia + 1)
+            if not nuevos and secuencia_registro != self.secuencia + 1:
+                # Hueco en la secuencia: hubo una rotación que no vimos
+                self._recargar()
+                return
+            nuevos.append(registro)
+            self.secuencia = secuencia_registro
+            offset = fin
+        
+        self._incorporar(nuevos)
+        self.registros = (self.registros or 0) + len(nuevos)
+        self._inodo = estado.st_ino
+        self._offset = offset
+    
+    def _incorporar(self, nuevos: List[Dict]) -> None:
+        """Actualiza los confirmados y deja los registros de otros procesos pendientes de entrega."""
+        for registro in nuevos:
+            if registro['op'] == 'agregar':
+                self.confirmados.add(registro['asistencia']['userId'])
+                self._pendientes.append({'op': 'agregar', 'asistencia': registro['asistencia']})
+            elif registro['op'] == 'reiniciar':
+                self.confirmados = set()
+                self._pendientes.append({'op': 'reiniciar'})
+    
+    def _continuar_tras_rotacion(self) -> bool:
+        """
+        Tras la compactación de otro proceso, lee solo los registros
+        posteriores a la última secuencia vista: del journal anterior (ahora
+        un segmento), de los segmentos nuevos y del journal activo. Así el
+        caché no se reconstruye completo en cada compactación.
+        
+        Returns:
+            False si el historial no continúa el ya leído (archivado,
+            reescritura completa o registros ya plegados en el snapshot)
+        """
+        secuencia_snapshot = self._secuencia_snapshot_en_disco()
+        if secuencia_snapshot > self.secuencia:
+            return False
+        
+        continua = secuencia_snapshot == self.secuencia
+        secuencia = self.secuencia
+        nuevos = []
+        registros = 0
+        offset = 0
+        for ruta in self.segmentos() + [self.ruta_archivo]:
+            activo = ruta == self.ruta_archivo
+            desde = 0
+            if not activo and os.stat(ruta).st_ino == self._inodo:
+                desde = self._offset  # El journal que veníamos leyendo
+                continua = True
+            for registro, fin in self._leer_registros(ruta, desde, admitir_sin_salto=not activo):
+                if activo:
+                    registros += 1
+                    offset = fin
+                secuencia_registro = registro.get('seq')
+                if secuencia_registro is None or secuencia_registro > secuencia + 1:
+                    return False
+                if secuencia_registro == secuencia + 1:
+                    nuevos.append(registro)
+                    secuencia = secuencia_registro
+        
+        if not continua:
+            return False
+        
+        self._incorporar(nuevos)
+        self.secuencia = secuencia
+        self.registros = registros
+        self._inodo = os.stat(self.ruta_archivo).st_ino
+        self._offset = offset
+        return True
+    
+    def _recargar(self) -> None:
+        """Reproduce el historial completo y lo deja pendiente como reinicio + asistencias."""
+        asistencias = self._reproducir_estado()
+        self.recargas += 1
+        self._pendientes = [{'op': 'reiniciar'}] + [
+            {'op': 'agregar', 'asistencia': asistencia} for asistencia in asistencias
+        ]
+    
+    def leer_cambios(self) -> List[Dict]:
+        """
+        Retorna, en orden, los registros que otros procesos escribieron desde
+        la última lectura (reproducir, agregar o leer_cambios).
+        
+        Returns:
+            Lista de registros {'op': 'agregar', 'asistencia': {...}} o {'op': 'reiniciar'}
+        """
+        if self._sin_cambios_externos():
+            return []
+        with self._lock:
+            self._ponerse_al_dia()
+            pendientes, self._pendientes = self._pendientes, []
+        return pendientes
+    
+    # --- Escritura ----------------------------------------------------------
+    
+    def agregar(self, registros: List[Dict], estado_inicial=None) -> List[Optional[bool]]:
+        """
+        Agrega registros al final del journal con una sola escritura y un fsync.
+        
+        Antes de escribir se leen los registros de otros procesos; un
+        'agregar' cuyo userId ya está confirmado se descarta.
+        Si se supera un umbral, inicia la compactación en segundo plano.
+        
+        Args:
+            registros: Registros sin seq ni crc, p.ej. {'op': 'agregar', 'asistencia': {...}}
+            estado_inicial: Callable con las asistencias a volcar si el journal aún
+                no existe (debe incluir ya las asistencias de `registros`)
+            
+        Returns:
+            Por registro: True si se agregó, False si era duplicado, None si es un reinicio
+            
+        Raises:
+            ValueError: Si hay error al escribir el archivo
+        """
+        try:
+            directorio = os.path.dirname(self.ruta_archivo)
+            if directorio and not os.path.exists(directorio):
+                os.makedirs(directorio, exist_ok=True)
+            
+            with self._lock:
+                if estado_inicial is not None and not self.existe():
+                    # Primer registro: el journal se crea con el estado importado
+                    self._escribir_completo(list(estado_inicial()))
+                    return [None if registro['op'] == 'reiniciar' else True for registro in registros]
+                
+                self._ponerse_al_dia()
+                
+                lineas = []
+                resultados = []
+                for registro in registros:
+                    if registro['op'] == 'agregar':
+                        user_id = registro['asistencia']['userId']
+                        if user_id in self.confirmados:
+                            resultados.append(False)
+                            continue
+                        self.confirmados.add(user_id)
+                        resultados.append(True)
+                    else:
+                        self.confirmados = set()
+                        resultados.append(None)
+                    self.secuencia += 1
+                    lineas.append(self.serializar({'seq': self.secuencia, **registro}))
+                
+                if lineas:
+                    with open(self.ruta_archivo, 'a', encoding='utf-8') as archivo:
+                        archivo.write(''.join(lineas))
+                        archivo.flush()
+                        os.fsync(archivo.fileno())
+                        estado = os.fstat(archivo.fileno())
+                    self._inodo = estado.st_ino
+                    self._offset = estado.st_size
+                    self.registros += len(lineas)
+                    
+        except Exception as e:
+            raise ValueError(f"Error al escribir journal de asistencias: {str(e)}")
+        
+        if self._supera_umbral():
+            self.compactar_en_segundo_plano()
+        return resultados
+    
+    def escribir_completo(self, asistencias: List[Dict]) -> None:
+        """
+        Reemplaza atómicamente el journal por uno que contiene exactamente las asistencias dadas.
+        
+        Raises:
+            ValueError: Si hay error al escribir el archivo
+        """
+        try:
+            with self._lock_compactacion, self._lock:
+                self._escribir_completo(asistencias)
+        except Exception as e:
+            raise ValueError(f"Error al escribir journal de asistencias: {str(e)}")
+    
+    def _escribir_completo(self, asistencias: List[Dict]) -> None:
+        asistencias = self._sin_duplicados(asistencias)
+        lineas = [
+            self.serializar({'seq': secuencia, 'op': 'agregar', 'asistencia': asistencia})
+            for secuencia, asistencia in enumerate(asistencias, start=1)
+        ]
+        escribir_archivo_atomico(self.ruta_archivo, ''.join(lineas))
+        
+        # El journal nuevo reemplaza todo el historial anterior (también la
+        # generación .bak del snapshot, que la recuperación restauraría)
+        for ruta in self.segmentos() + [self.ruta_snapshot, self.ruta_snapshot + '.bak', self.ruta_indice]:
+            if os.path.exists(ruta):
+                os.remove(ruta)
+        self.secuencia_snapshot = 0
+        
+        estado = os.stat(self.ruta_archivo)
+        self.secuencia = len(asistencias)
+        self.registros = len(asistencias)
+        self.confirmados = {asistencia['userId'] for asistencia in asistencias}
+        self._inodo = estado.st_ino
+        self._offset = estado.st_size
+        self._pendientes = []
+    
+    def rotar(self, directorio_destino: str) -> None:
+        """
+        Mueve el historial completo (snapshot, segmentos y journal) a otro
+        directorio, solo con renames, y deja un journal vacío en su lugar.
+        
+        Args:
+            directorio_destino: Directorio donde queda el historial apartado
+        """
+        with self._lock_compactacion, self._lock:
+            os.makedirs(directorio_destino, exist_ok=True)
+            for ruta in [self.ruta_snapshot] + self.segmentos() + [self.ruta_archivo]:
+                if os.path.exists(ruta):
+                    os.replace(ruta, os.path.join(directorio_destino, os.path.basename(ruta)))
+            for ruta in [self.ruta_snapshot + '.bak', self.ruta_indice]:
+                if os.path.exists(ruta):
+                    os.remove(ruta)
+            
+            # Journal nuevo vacío: los demás procesos detectan el cambio de inodo
+            with open(self.ruta_archivo, 'a', encoding='utf-8') as archivo:
+                os.fsync(archivo.fileno())
+                self._inodo = os.fstat(archivo.fileno()).st_ino
+            _sincronizar_directorio(directorio_destino)
+            _sincronizar_directorio(os.path.dirname(self.ruta_archivo))
+            
+            self.secuencia = 0
+            self.registros = 0
+            self.confirmados = set()
+            self.secuencia_snapshot = 0
+            self._offset = 0
+            self._pendientes = []
+    
+    # --- Compactación -------------------------------------------------------
+    
+    def _bytes_journal(self) -> int:
+        try:
+            return os.path.getsize(self.ruta_archivo)
+        except OSError:
+            return 0
+    
+    def _supera_umbral(self) -> bool:
+        if self.umbral_registros and (self.registros or 0) >= self.umbral_registros:
+            return True
+        return bool(self.umbral_bytes) and self._bytes_journal() >= self.umbral_bytes
+    
+    def compactar_en_segundo_plano(self) -> None:
+        """Inicia la compactación en un thread si no hay otra en curso."""
+        if self._thread_compactacion is not None and self._thread_compactacion.is_alive():
+            return
+        self._thread_compactacion = threading.Thread(
+            target=self._compactar_registrando_errores, name='compactacion-journal', daemon=True
+        )
+        self._thread_compactacion.start()
+    
+    def _compactar_registrando_errores(self) -> None:
+        try:
+            self.compactar(solo_si_supera_umbral=True)
+        except Exception as e:
+            print(f"⚠ Error al compactar journal de asistencias: {e}")
+    
+    def compactar(self, solo_si_supera_umbral: bool = False) -> bool:
+        """
+        Rota el journal activo a un segmento (solo un rename bajo el lock de
+        escritura), escribe un snapshot nuevo y elimina los segmentos cubiertos.
+        
+        Args:
+            solo_si_supera_umbral: Omitir si otro proceso ya compactó mientras se esperaba el lock
+        
+        Returns:
+            True si se escribió un snapshot nuevo
+        """
+        with self._lock_compactacion:
+            with self._lock:
+                self._ponerse_al_dia()
+                if solo_si_supera_umbral and not self._supera_umbral():
+                    return False
+                
+                if self._bytes_journal() > 0:
+                    segmento = f"{self.ruta_archivo}.{self.secuencia:012d}"
+                    os.replace(self.ruta_archivo, segmento)
+                    # Journal nuevo vacío: los demás procesos detectan el cambio de inodo
+                    with open(self.ruta_archivo, 'a', encoding='utf-8') as archivo:
+                        os.fsync(archivo.fileno())
+                        self._inodo = os.fstat(archivo.fileno()).st_ino
+                    _sincronizar_directorio(os.path.dirname(self.ruta_archivo))
+                    self._offset = 0
+                    self.registros = 0
+            
+            segmentos = self.segmentos()
+            if not segmentos:
+                return False
+            
+            # Fuera del lock: las confirmaciones siguen escribiendo en el journal nuevo
+            asistencias, secuencia = self._cargar_snapshot()
+            for segmento in segmentos:
+                asistencias, secuencia, _, _ = self._aplicar_archivo(segmento, asistencias, secuencia)
+            
+            # La publicación sí toma el lock para que ninguna recarga vea un estado intermedio
+            with self._lock:
+                self._escribir_snapshot(asistencias, secuencia)
+                for segmento in segmentos:
+                    os.remove(segmento)
+            
+            self.compactaciones += 1
+            return True
+    
+    def _escribir_snapshot(self, asistencias: List[Dict], secuencia: int) -> None:
+        """
+        Escribe atómicamente el snapshot (encabezado + una asistencia por
+        línea) y su índice de offsets.
+        """
+        asistencias = self._sin_duplicados(asistencias)
+        encabezado = {
+            'tipo': 'snapshot',
+            'seq': secuencia,
+            'total': len(asistencias),
+            'creado': datetime.utcnow().isoformat() + 'Z'
+        }
+        lineas = [self.serializar(encabezado).encode('utf-8')]
+        offsets = {}
+        posicion = len(lineas[0])
+        for asistencia in asistencias:
+            linea = self.serializar({'asistencia': asistencia}).encode('utf-8')
+            offsets[asistencia['userId']] = posicion
+            posicion += len(linea)
+            lineas.append(linea)
+        escribir_archivo_atomico(self.ruta_snapshot, b''.join(lineas).decode('utf-8'))
+        self.secuencia_snapshot = secuencia
+        self._escribir_indice(encabezado, posicion, offsets)
+    
+    @staticmethod
+    def _sin_duplicados(asistencias: List[Dict]) -> List[Dict]:
+        """
+        Conserva la primera asistencia de cada userId. Historiales escritos
+        antes de que el registro fuera atómico pueden repetir un usuario.
+        """
+        vistos = set()
+        resultado = []
+        for asistencia in asistencias:
+            if asistencia['userId'] not in vistos:
+                vistos.add(asistencia['userId'])
+                resultado.append(asistencia)
+        return resultado
+    
+    def estadisticas(self) -> Dict:
+        """Estado de la compactación para /health."""
+        return {
+            'umbral_registros': self.umbral_registros,
+            'umbral_bytes': self.umbral_bytes,
+            'registros_journal': self.registros,
+            'bytes_journal': self._bytes_journal(),
+            'segmentos_pendientes': len(self.segmentos()),
+            'secuencia': self.secuencia,
+            'secuencia_snapshot': self.secuencia_snapshot,
+            'compactaciones': self.compactaciones,
+            'recargas': self.recargas
+        }
+    
+    # --- Recuperación -------------------------------------------------------
+    
+    def reparar(self) -> Optional[str]:
+        """
+        Recorta los registros finales incompletos o con CRC inválido (escritura
+        interrumpida). Un registro inválido seguido de registros válidos no es
+        una escritura interrumpida: se aparta a un archivo .danado-* y se
+        conservan los registros que lo siguen.
+        
+        Returns:
+            Descripción de lo reparado, o None si el journal estaba íntegro
+        """
+        with self._lock:
+            if not os.path.exists(self.ruta_archivo):
+                return None
+            
+            with open(self.ruta_archivo, 'rb') as archivo:
+                contenido = archivo.read()
+            
+            lineas = []  # (línea con su salto, es válida)
+            fin_valido = 0
+            posicion = 0
+            while posicion < len(contenido):
+                fin_linea = contenido.find(b'\n', posicion)
+                if fin_linea == -1:
+                    break  # Línea final sin salto: escritura interrumpida
+                linea = contenido[posicion:fin_linea + 1]
+                valida = True
+                if linea.strip():
+                    try:
+                        self.deserializar(linea.decode('utf-8'))
+                    except ValueError:
+                        valida = False
+                lineas.append((linea, valida))
+                posicion = fin_linea + 1
+                if valida:
+                    fin_valido = posicion
+            
+            descartados = len(contenido) - fin_valido
+            conservadas = []
+            danadas = []
+            posicion = 0
+            for linea, valida in lineas:
+                if posicion >= fin_valido:
+                    break
+                (conservadas if valida else danadas).append(linea)
+                posicion += len(linea)
+            
+            if descartados == 0 and not danadas:
+                return None
+            
+            nombre = os.path.basename(self.ruta_archivo)
+            if danadas:
+                ruta_danada = f"{self.ruta_archivo}.danado-{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+                with open(ruta_danada, 'ab') as archivo:
+                    archivo.write(b''.join(danadas))
+                    archivo.flush()
+                    os.fsync(archivo.fileno())
+                escribir_archivo_atomico(self.ruta_archivo, b''.join(conservadas).decode('utf-8'))
+                reporte = (
+                    f"{nombre}: {len(danadas)} registros dañados apartados en "
+                    f"{os.path.basename(ruta_danada)}"
+                )
+                if descartados:
+                    reporte += f"; descartados {descartados} bytes de registros incompletos al final"
+            else:
+                with open(self.ruta_archivo, 'r+b') as archivo:
+                    archivo.truncate(fin_valido)
+                    archivo.flush()
+                    os.fsync(archivo.fileno())
+                reporte = f"{nombre}: descartados {descartados} bytes de registros incompletos al final"
+            
+            self.secuencia = None
+            self.registros = None
+            self.confirmados = None
+            return reporte
+
+def reproducir_journal_asistencias(ruta_archivo: str = 'data/asistencias.jsonl') -> List[Dict]:
+    """
+    Reconstruye la lista de asistencias aplicando en orden los registros del journal.
+    
+    Args:
+        ruta_archivo: Ruta al journal JSON-lines de asistencias
+        
+    Returns:
+        Lista de diccionarios con las asistencias vigentes
+    """
+    return JournalAsistencias(ruta_archivo).reproducir()
+
+
+def agregar_asistencia_journal(
+    asistencia: Dict,
+    ruta_archivo: str = 'data/asistencias.jsonl'
+) -> None:
+    """
+    Agrega un registro de asistencia al final del journal.
+    
+    Args:
+        asistencia: Diccionario con la asistencia confirmada
+        ruta_archivo: Ruta al journal JSON-lines de asistencias
+    """
+    JournalAsistencias(ruta_archivo).agregar([{'op': 'agregar', 'asistencia': asistencia}])
+
+
+def registrar_reinicio_journal(ruta_archivo: str = 'data/asistencias.jsonl') -> None:
+    """
+    Agrega al journal un registro que descarta todas las asistencias previas.
+    
+    Args:
+        ruta_archivo: Ruta al journal JSON-lines de asistencias
+    """
+    JournalAsistencias(ruta_archivo).agregar([{'op': 'reiniciar'}])
+
+
+def escribir_journal_asistencias(
+    asistencias: List[Dict],
+    ruta_archivo: str = 'data/asistencias.jsonl'
+) -> None:
+    """
+    Escribe un journal nuevo que contiene exactamente las asistencias dadas.
+    
+    Se usa para importar asistencias.json la primera vez que se activa el journal.
+    
+    Args:
+        asistencias: Lista de asistencias a volcar
+        ruta_archivo: Ruta al journal JSON-lines de asistencias
+    """
+    JournalAsistencias(ruta_archivo).escribir_completo(asistencias)
+
+
+
+# ============================================================================
+# REGISTROS COMPACTOS DE USUARIOS Y ASISTENCIAS
+# ============================================================================
+#
+# Un diccionario por registro cuesta cientos de bytes de estructura (y la
+# asistencia lleva además un diccionario anidado y la fecha como texto).
+# Usuario y Asistencia guardan los campos en __slots__, las coordenadas como
+# float y la fecha como entero (microsegundos desde 1970). Se comportan como
+# el diccionario equivalente para lectura (Mapping) y se convierten al
+# formato JSON de siempre solo en los bordes (API, archivos, SQLite).
+
+class Usuario(Mapping):
+    """Usuario autorizado: {'userId', 'documento', 'nombre'} en slots."""
+    
+    __slots__ = ('userId', 'documento', 'nombre')
+    
+    def __init__(self, userId: str, documento: str, nombre: str):
+        self.userId = userId
+        self.documento = documento
+        self.nombre = nombre
+    
+    @classmethod
+    def desde_dict(cls, datos) -> 'Usuario':
+        if isinstance(datos, cls):
+            return datos
+        return cls(datos['userId'], datos['documento'], datos['nombre'])
+    
+    def a_dict(self) -> Dict[str, str]:
+        return {'userId': self.userId, 'documento': self.documento, 'nombre': self.nombre}
+    
+    def __getitem__(self, clave: str):
+        if clave in self.__slots__:
+            return getattr(self, clave)
+        raise KeyError(clave)
+    
+    def __setitem__(self, clave: str, valor: str) -> None:
+        if clave not in self.__slots__:
+            raise KeyError(clave)
+        setattr(self, clave, valor)
+    
+    def __iter__(self):
+        return iter(self.__slots__)
+    
+    def __len__(self) -> int:
+        return len(self.__slots__)
+    
+    def __repr__(self) -> str:
+        return f"Usuario({self.userId!r}, {self.documento!r}, {self.nombre!r})"
+    
+    def __reduce__(self):
+        return (Usuario, (self.userId, self.documento, self.nombre))
+    
+    __hash__ = None  # Mutable: se edita documento y nombre
+
+
+_EPOCA = datetime(1970, 1, 1)
+
+
+class Asistencia(Mapping):
+    """
+    Asistencia confirmada en slots. Equivale a
+    {'userId', 'nombre', 'fechaHora', 'ubicacion': {'latitud', 'longitud'}}.
+    """
+    
+    __slots__ = ('userId', 'nombre', 'fecha', 'latitud', 'longitud')
+    CLAVES = ('userId', 'nombre', 'fechaHora', 'ubicacion')
+    
+    def __init__(self, userId: str, nombre: str, fecha, latitud: float, longitud: float):
+        """
+        Args:
+            fecha: Microsegundos desde 1970 (UTC), o el texto original si no
+                tiene la forma ISO 8601 con 'Z' que genera el servidor
+        """
+        self.userId = userId
+        self.nombre = nombre
+        self.fecha = fecha
+        self.latitud = latitud
+        self.longitud = longitud
+    
+    @staticmethod
+    def fecha_a_entero(fecha_hora: str):
+        """Convierte 'YYYY-MM-DDTHH:MM:SS[.ffffff]Z' a microsegundos; otro texto se conserva."""
+        if isinstance(fecha_hora, str) and fecha_hora.endswith('Z'):
+            try:
+                microsegundos = (datetime.fromisoformat(fecha_hora[:-1]) - _EPOCA) // timedelta(microseconds=1)
+            except (TypeError, ValueError):
+                return fecha_hora
+            if Asistencia.fecha_a_texto(microsegundos) == fecha_hora:
+                return microsegundos
+        return fecha_hora
+    
+    @staticmethod
+    def fecha_a_texto(fecha) -> str:
+        if isinstance(fecha, int):
+            return (_EPOCA + timedelta(microseconds=fecha)).isoformat() + 'Z'
+        return fecha
+    
+    @classmethod
+    def desde_dict(cls, datos):
+        """
+        Convierte una asistencia en formato JSON. Si no tiene exactamente esa
+        forma (campos extra, coordenadas no float), se retorna sin convertir
+        para no alterar lo que se persiste o se exporta.
+        """
+        if isinstance(datos, cls):
+            return datos
+        ubicacion = datos.get('ubicacion')
+        if (
+            len(datos) != 4 or not isinstance(ubicacion, dict) or len(ubicacion) != 2
+            or type(ubicacion.get('latitud')) is not float or type(ubicacion.get('longitud')) is not float
+            or not isinstance(datos.get('userId'), str) or not isinstance(datos.get('nombre'), str)
+            or 'fechaHora' not in datos
+        ):
+            return datos
+        return cls(
+            datos['userId'], datos['nombre'], cls.fecha_a_entero(datos['fechaHora']),
+            ubicacion['latitud'], ubicacion['longitud']
+        )
+    
+    @property
+    def fechaHora(self) -> str:
+        return self.fecha_a_texto(self.fecha)
+    
+    def a_dict(self) -> Dict:
+        return {
+            'userId': self.userId,
+            'nombre': self.nombre,
+            'fechaHora': self.fecha_a_texto(self.fecha),
+            'ubicacion': {'latitud': self.latitud, 'longitud': self.longitud}
+        }
+    
+    def __getitem__(self, clave: str):
+        if clave == 'userId':
+            return self.userId
+        if clave == 'nombre':
+            return self.nombre
+        if clave == 'fechaHora':
+            return self.fechaHora
+        if clave == 'ubicacion':
+            return {'latitud': self.latitud, 'longitud': self.longitud}
+        raise KeyError(clave)
+    
+    def __iter__(self):
+        return iter(self.CLAVES)
+    
+    def __len__(self) -> int:
+        return len(self.CLAVES)
+    
+    def __repr__(self) -> str:
+        return f"Asistencia({self.a_dict()!r})"
+    
+    def __reduce__(self):
+        return (Asistencia, (self.userId, self.nombre, self.fecha, self.latitud, self.longitud))
+    
+    __hash__ = None
+
+
+def registro_a_dict(registro) -> Dict:
+    """Formato JSON de un registro compacto o vista (o el mismo diccionario)."""
+    return registro if isinstance(registro, dict) else registro.a_dict()
+
+
+# ============================================================================
+# TABLA COLUMNAR DE USUARIOS
+# ============================================================================
+#
+# Con padrones de un millón de usuarios, incluso los registros compactos
+# cuestan unos 240 B por usuario (tres objetos str cada uno). Con
+# USUARIOS_FORMATO=columnar el padrón se guarda en una TablaUsuarios: los
+# textos de todos los usuarios en un único bytearray (UTF-8, la "arena") y,
+# por fila, el inicio y el largo de cada campo en arrays de enteros. Los
+# índices por userId y documento son tablas hash de direccionamiento abierto
+# que guardan números de fila; la clave se compara contra la arena, sin un
+# objeto por entrada. Las búsquedas entregan vistas FilaUsuario que se leen y
+# editan como el diccionario del usuario.
+#
+# Las bajas marcan la fila como eliminada y una edición más larga que el
+# texto anterior se agrega al final de la arena: el espacio se recupera
+# cuando se reemplaza el padrón (recarga del CSV). La arena admite hasta
+# 4 GiB (offsets de 32 bits).
+
+class IndiceFilas:
+    """
+    Índice hash clave → número de fila de una TablaUsuarios.
+    
+    Admite claves repetidas: get() retorna la primera fila viva con la clave,
+    como la búsqueda lineal. Usa sondeo lineal con marcas de borrado.
+    """
+    
+    VACIO = -1
+    BORRADO = -2
+    
+    def __init__(self, tabla: 'TablaUsuarios', columna: int):
+        self._tabla = tabla
+        self._columna = columna
+        self.clear()
+    
+    def clear(self) -> None:
+        self._ranuras = array('i', [self.VACIO]) * 8
+        self._ocupadas = 0  # Ranuras con fila o con marca de borrado
+    
+    @staticmethod
+    def _hash(clave: bytes) -> int:
+        # Determinista entre procesos, a diferencia de hash(): el índice se
+        # guarda en el snapshot. La multiplicación reparte los bits bajos.
+        return (zlib.crc32(clave) * 0x9E3779B1) >> 16
+    
+    def reconstruir(self, filas) -> None:
+        """Indexa de una vez las filas dadas (carga masiva)."""
+        filas = array('i', filas)
+        self._reservar(len(filas))
+        for fila in filas:
+            self._insertar(fila, self._tabla._campo_bytes(fila, self._columna))
+    
+    def agregar(self, fila: int, clave: bytes) -> None:
+        if (self._ocupadas + 1) * 2 > len(self._ranuras):
+            anteriores = self._ranuras
+            vivas = len(anteriores) - anteriores.count(self.VACIO) - anteriores.count(self.BORRADO)
+            self._reservar(vivas + 1)
+            for otra in anteriores:
+                if otra >= 0:
+                    self._insertar(otra, self._tabla._campo_bytes(otra, self._columna))
+        self._insertar(fila, clave)
+    
+    def quitar(self, fila: int, clave: bytes) -> None:
+        mascara = len(self._ranuras) - 1
+        posicion = self._hash(clave) & mascara
+        while self._ranuras[posicion] != self.VACIO:
+            if self._ranuras[posicion] == fila:
+                self._ranuras[posicion] = self.BORRADO
+                return
+            posicion = (posicion + 1) & mascara
+    
+    def buscar(self, clave: bytes) -> int:
+        """Retorna la primera fila con la clave, o -1."""
+        mascara = len(self._ranuras) - 1
+        posicion = self._hash(clave) & mascara
+        encontrada = -1
+        while True:
+            fila = self._ranuras[posicion]
+            if fila == self.VACIO:
+                return encontrada
+            if fila >= 0 and (encontrada < 0 or fila < encontrada) \
+                    and self._tabla._campo_bytes(fila, self._columna) == clave:
+                encontrada = fila
+            posicion = (posicion + 1) & mascara
+    
+    def get(self, clave: str, defecto=None):
+        """Retorna la vista de la primera fila con la clave, o defecto."""
+        fila = self.buscar(clave.encode('utf-8'))
+        return FilaUsuario(self._tabla, fila) if fila >= 0 else defecto
+    
+    def copiar(self, tabla: 'TablaUsuarios') -> 'IndiceFilas':
+        """Copia del índice para una copia de su tabla."""
+        copia = IndiceFilas(tabla, self._columna)
+        copia._ranuras = array('i', self._ranuras)
+        copia._ocupadas = self._ocupadas
+        return copia
+    
+    def _reservar(self, cantidad: int) -> None:
+        tamano = 8
+        while tamano < cantidad * 4:
+            tamano *= 2
+        self._ranuras = array('i', [self.VACIO]) * tamano
+        self._ocupadas = 0
+    
+    def _insertar(self, fila: int, clave: bytes) -> None:
+        mascara = len(self._ranuras) - 1
+        posicion = self._hash(clave) & mascara
+        while self._ranuras[posicion] >= 0:
+            posicion = (posicion + 1) & mascara
+        if self._ranuras[posicion] == self.VACIO:
+            self._ocupadas += 1
+        self._ranuras[posicion] = fila
+
+
+class TablaUsuarios:
+    """
+    Padrón de usuarios en columnas sobre una arena de texto.
+    
+    Implementa la parte de la interfaz de list que usa la aplicación (len,
+    iteración, append, remove, clear) y mantiene sus índices por userId y
+    documento en cada alta, edición y baja.
+    """
+    
+    CAMPOS = ('userId', 'documento', 'nombre')
+    
+    def __init__(self, usuarios=()):
+        """
+        Args:
+            usuarios: Iterable de usuarios (diccionarios o registros)
+        """
+        self._arena = bytearray()
+        self._inicios = array('I')  # Tres por fila: inicio de cada campo en la arena
+        self._largos = array('I')
+        self._vivas = bytearray()  # 1 por fila no eliminada
+        self._total = 0
+        self._indices = {0: IndiceFilas(self, 0), 1: IndiceFilas(self, 1)}
+        
+        for usuario in usuarios:
+            self._agregar_fila(usuario)
+        filas = range(len(self._vivas))
+        for indice in self._indices.values():
+            indice.reconstruir(filas)
+    
+    def indice(self, campo: str) -> IndiceFilas:
+        """Índice por 'userId' o 'documento' (se mantiene al día con la tabla)."""
+        return self._indices[self.CAMPOS.index(campo)]
+    
+    def _agregar_fila(self, usuario) -> int:
+        fila = len(self._vivas)
+        for campo in self.CAMPOS:
+            valor = usuario[campo].encode('utf-8')
+            self._inicios.append(len(self._arena))
+            self._largos.append(len(valor))
+            self._arena += valor
+        self._vivas.append(1)
+        self._total += 1
+        return fila
+    
+    def _campo_bytes(self, fila: int, columna: int) -> bytearray:
+        posicion = fila * 3 + columna
+        inicio = self._inicios[posicion]
+        return self._arena[inicio:inicio + self._largos[posicion]]
+    
+    def campo(self, fila: int, campo: str) -> str:
+        return self._campo_bytes(fila, self.CAMPOS.index(campo)).decode('utf-8')
+    
+    def actualizar(self, fila: int, campo: str, valor: str) -> None:
+        """Cambia un campo de la fila y actualiza el índice correspondiente."""
+        columna = self.CAMPOS.index(campo)
+        anterior = self._campo_bytes(fila, columna)
+        nuevo = valor.encode('utf-8')
+        if anterior == nuevo:
+            return
+        
+        indice = self._indices.get(columna) if self._vivas[fila] else None
+        if indice is not None:
+            indice.quitar(fila, anterior)
+        
+        posicion = fila * 3 + columna
+        if len(nuevo) <= self._largos[posicion]:
+            inicio = self._inicios[posicion]
+            self._arena[inicio:inicio + len(nuevo)] = nuevo
+        else:
+            self._inicios[posicion] = len(self._arena)
+            self._arena += nuevo
+        self._largos[posicion] = len(nuevo)
+        
+        if indice is not None:
+            indice.agregar(fila, nuevo)
+    
+    def copiar(self) -> 'TablaUsuarios':
+        """Copia independiente de la tabla y sus índices (copia los buffers, sin recorrer filas)."""
+        copia = TablaUsuarios()
+        copia._arena = bytearray(self._arena)
+        copia._inicios = array('I', self._inicios)
+        copia._largos = array('I', self._largos)
+        copia._vivas = bytearray(self._vivas)
+        copia._total = self._total
+        copia._indices = {columna: indice.copiar(copia) for columna, indice in self._indices.items()}
+        return copia
+    
+    def __len__(self) -> int:
+        return self._total
+    
+    def __iter__(self):
+        vivas = self._vivas
+        for fila in range(len(vivas)):
+            if vivas[fila]:
+                yield FilaUsuario(self, fila)
+    
+    def __repr__(self) -> str:
+        return f"TablaUsuarios({self._total} usuarios, arena {len(self._arena)} B)"
+    
+    def append(self, usuario) -> 'FilaUsuario':
+        """Agrega el usuario al final y retorna la vista de su fila."""
+        fila = self._agregar_fila(usuario)
+        for columna, indice in self._indices.items():
+            indice.agregar(fila, self._campo_bytes(fila, columna))
+        return FilaUsuario(self, fila)
+    
+    def remove(self, usuario) -> None:
+        """
+        Raises:
+            ValueError: Si el usuario no está en la tabla
+        """
+        if isinstance(usuario, FilaUsuario) and usuario._tabla is self:
+            fila = usuario._fila if self._vivas[usuario._fila] else -1
+        else:
+            fila = self._indices[0].buscar(usuario['userId'].encode('utf-8'))
+            if fila >= 0 and FilaUsuario(self, fila) != usuario:
+                fila = -1
+        if fila < 0:
+            raise ValueError("El usuario no está en la tabla")
+        
+        for columna, indice in self._indices.items():
+            indice.quitar(fila, self._campo_bytes(fila, columna))
+        self._vivas[fila] = 0
+        self._total -= 1
+    
+    def clear(self) -> None:
+        self._arena = bytearray()
+        self._inicios = array('I')
+        self._largos = array('I')
+        self._vivas = bytearray()
+        self._total = 0
+        for indice in self._indices.values():
+            indice.clear()
+
+
+class FilaUsuario(Mapping):
+    """Vista de una fila de TablaUsuarios con la interfaz del diccionario del usuario."""
+    
+    __slots__ = ('_tabla', '_fila')
+    
+    def __init__(self, tabla: TablaUsuarios, fila: int):
+        self._tabla = tabla
+        self._fila = fila
+    
+    def __getitem__(self, clave: str) -> str:
+        if clave not in TablaUsuarios.CAMPOS:
+            raise KeyError(clave)
+        return self._tabla.campo(self._fila, clave)
+    
+    def __setitem__(self, clave: str, valor: str) -> None:
+        if clave not in TablaUsuarios.CAMPOS:
+            raise KeyError(clave)
+        self._tabla.actualizar(self._fila, clave, valor)
+    
+    def __iter__(self):
+        return iter(TablaUsuarios.CAMPOS)
+    
+    def __len__(self) -> int:
+        return len(TablaUsuarios.CAMPOS)
+    
+    def __eq__(self, otro) -> bool:
+        if isinstance(otro, FilaUsuario) and otro._tabla is self._tabla:
+            return otro._fila == self._fila
+        return super().__eq__(otro)
+    
+    __hash__ = None
+    
+    def a_dict(self) -> Dict[str, str]:
+        return {campo: self._tabla.campo(self._fila, campo) for campo in TablaUsuarios.CAMPOS}
+    
+    def __repr__(self) -> str:
+        return f"FilaUsuario({self._fila}, {self.a_dict()!r})"
+
+
+# ============================================================================
+# ASISTENCIAS INDEXADAS (CARGA DIFERIDA)
+# ============================================================================
+#
+# Con historiales grandes, tener cada asistencia como diccionario en memoria
+# domina el consumo del worker. AsistenciasIndexadas retiene del snapshot solo
+# el índice userId → offset y lo mapea con mmap: cada registro se lee y se
+# verifica (CRC) al recorrer la lista, p.ej. al listar o exportar. Las
+# asistencias posteriores al snapshot (acotadas por la compactación) se
+# guardan como registros Asistencia.
+
+class AsistenciasIndexadas:
+    """
+    Lista de asistencias respaldada por un snapshot mapeado en memoria.
+    
+    Implementa la parte de la interfaz de list que usa la aplicación (len,
+    iteración, in, append, remove) y la consulta por userId sin materializar
+    registros. La iteración entrega diccionarios en el formato JSON.
+    """
+    
+    def __init__(self, asistencias=(), mapa=None, offsets: Optional[Dict[str, int]] = None):
+        """
+        Args:
+            asistencias: Asistencias completas, en orden, posteriores al snapshot
+            mapa: mmap del snapshot (None si no hay snapshot)
+            offsets: userId → offset de su línea en el snapshot, en orden
+        """
+        self._mapa = mapa
+        self._offsets = offsets if offsets is not None else {}
+        self._recientes = []
+        self._usuarios_recientes = {}  # userId → cantidad en _recientes
+        for asistencia in asistencias:
+            self.append(asistencia)
+    
+    TAMANO_LOTE = 1000  # Registros que se parsean juntos al recorrer la lista
+    
+    def _leer(self, offset: int) -> Dict:
+        fin = self._mapa.find(b'\n', offset)
+        linea = self._mapa[offset:fin if fin != -1 else len(self._mapa)].decode('utf-8')
+        return JournalAsistencias.deserializar(linea)['asistencia']
+    
+    def _leer_lote(self, offsets: List[int]) -> List[Dict]:
+        """
+        Lee varios registros con un solo json.loads. El CRC de cada línea se
+        verifica sobre los bytes, igual que en JournalAsistencias.deserializar.
+        
+        Raises:
+            ValueError: Si el CRC de una línea no coincide
+        """
+        mapa = self._mapa
+        sufijo = JournalAsistencias.SUFIJO_CRC.encode('utf-8')
+        lineas = []
+        for offset in offsets:
+            fin = mapa.find(b'\n', offset)
+            linea = mapa[offset:fin if fin != -1 else len(mapa)].rstrip()
+            posicion = linea.rfind(sufijo)
+            if posicion == -1 or zlib.crc32(linea[:posicion] + b'}') != int(linea[posicion + len(sufijo):-1]):
+                raise ValueError(f"CRC no coincide en el registro del offset {offset}")
+            lineas.append(linea)
+        return [registro['asistencia'] for registro in json.loads(b'[' + b','.join(lineas) + b']')]
+    
+    def __len__(self) -> int:
+        return len(self._offsets) + len(self._recientes)
+    
+    def __iter__(self):
+        offsets = list(self._offsets.values())
+        for inicio in range(0, len(offsets), self.TAMANO_LOTE):
+            yield from self._leer_lote(offsets[inicio:inicio + self.TAMANO_LOTE])
+        for asistencia in list(self._recientes):
+            yield registro_a_dict(asistencia)
+    
+    def __contains__(self, asistencia) -> bool:
+        user_id = asistencia.get('userId') if isinstance(asistencia, dict) else None
+        if user_id in self._usuarios_recientes and asistencia in self._recientes:
+            return True
+        return user_id in self._offsets and self._leer(self._offsets[user_id]) == asistencia
+    
+    def __repr__(self) -> str:
+        return f"AsistenciasIndexadas(indexadas={len(self._offsets)}, recientes={len(self._recientes)})"
+    
+    def append(self, asistencia: Dict) -> None:
+        asistencia = Asistencia.desde_dict(asistencia)
+        self._recientes.append(asistencia)
+        user_id = asistencia['userId']
+        self._usuarios_recientes[user_id] = self._usuarios_recientes.get(user_id, 0) + 1
+    
+    def remove(self, asistencia: Dict) -> None:
+        """
+        Raises:
+            ValueError: Si la asistencia no está en la lista
+        """
+        user_id = asistencia.get('userId')
+        if user_id in self._usuarios_recientes and asistencia in self._recientes:
+            self._recientes.remove(asistencia)
+            self._usuarios_recientes[user_id] -= 1
+            if not self._usuarios_recientes[user_id]:
+                del self._usuarios_recientes[user_id]
+        elif user_id in self._offsets and self._leer(self._offsets[user_id]) == asistencia:
+            del self._offsets[user_id]
+        else:
+            raise ValueError("La asistencia no está en la lista")
+    
+    def clear(self) -> None:
+        self._mapa = None
+        self._offsets = {}
+        self._recientes = []
+        self._usuarios_recientes = {}
+    
+    def contiene_usuario(self, user_id: str) -> bool:
+        """Indica si hay una asistencia del userId, sin leer registros."""
+        return user_id in self._offsets or user_id in self._usuarios_recientes
+    
+    def usuarios(self):
+        """Genera los userId en orden, sin leer registros."""
+        yield from self._offsets
+        for asistencia in self._recientes:
+            yield asistencia['userId']
+
+
+
+# ============================================================================
+# FUNCIONES DE VALIDACIÓN (Sub-task 8.1)
+# ============================================================================
+
+def validar_coordenadas(latitud: any, longitud: any) -> Tuple[bool, Optional[str], Optional[Tuple[float, float]]]:
+    """
+    Valida que las coordenadas sean números válidos dentro de rangos correctos.
+    
+    Args:
+        latitud: Valor de latitud a validar
+        longitud: Valor de longitud a validar
+        
+    Returns:
+        Tupla (es_valido, mensaje_error, (lat, lon))
+        - es_valido: True si las coordenadas son válidas
+        - mensaje_error: Mensaje de error si no son válidas, None si son válidas
+        - (lat, lon): Tupla con coordenadas convertidas a float, None si no son válidas
+        
+    Requirement: 4.6
+    """
+    # Validar que no sean None
+    if latitud is None or longitud is None:
+        return False, "latitud y longitud son requeridas", None
+    
+    # Validar tipos de datos - intentar convertir a float
+    try:
+        lat = float(latitud)
+        lon = float(longitud)
+    except (ValueError, TypeError):
+        return False, "Coordenadas deben ser números válidos", None
+    
+    # Validar rangos (latitud: -90 a 90, longitud: -180 a 180)
+    if not (-90 <= lat <= 90):
+        return False, "Latitud debe estar entre -90 y 90 grados", None
+    
+    if not (-180 <= lon <= 180):
+        return False, "Longitud debe estar entre -180 y 180 grados", None
+    
+    return True, None, (lat, lon)
+
+
+def validar_campo_requerido(valor: any, nombre_campo: str) -> Tuple[bool, Optional[str]]:
+    """
+    Valida que un campo requerido esté presente y no esté vacío.
+    
+    Args:
+        valor: Valor del campo a validar
+        nombre_campo: Nombre del campo para el mensaje de error
+        
+    Returns:
+        Tupla (es_valido, mensaje_error)
+        
+    Requirement: 4.6
+    """
+    if valor is None:
+        return False, f"{nombre_campo} es requerido"
+    
+    # Si es string, verificar que no esté vacío después de strip
+    if isinstance(valor, str):
+        if not valor.strip():
+            return False, f"{nombre_campo} no puede estar vacío"
+    
+    return True, None
+
+
+def validar_radio_positivo(radio: any) -> Tuple[bool, Optional[str], Optional[float]]:
+    """
+    Valida que el radio permitido sea un número positivo.
+    
+    Args:
+        radio: Valor del radio a validar
+        
+    Returns:
+        Tupla (es_valido, mensaje_error, radio_float)
+        
+    Requirement: 4.6
+    """
+    if radio is None:
+        return False, "Radio permitido es requerido", None
+    
+    # Validar tipo de dato
+    try:
+        radio_float = float(radio)
+    except (ValueError, TypeError):
+        return False, "Radio permitido debe ser un número válido", None
+    
+    # Validar que sea positivo
+    if radio_float <= 0:
+        return False, "Radio permitido debe ser un número positivo", None
+    
+    return True, None, radio_float
+
+
+# ============================================================================
+# FILE WATCHER PARA USUARIOS.CSV (Sub-task 9.1)
+# ============================================================================
+
+class UsuariosCSVHandler(FileSystemEventHandler):
+    """
+    Handler para detectar cambios en el archivo usuarios.csv.
+    
+    Cuando el archivo cambia, recarga automáticamente la lista de usuarios.
+    
+    Requirements: 4.3, 4.6
+    """
+    
+    def __init__(self, ruta_archivo: str):
+        """
+        Inicializa el handler con la ruta del archivo a observar.
+        
+        Args:
+            ruta_archivo: Ruta completa al archivo usuarios.csv
+        """
+        super().__init__()
+        self.ruta_archivo = os.path.abspath(ruta_archivo)
+        self.last_modified = 0
+    
+    def on_modified(self, event):
+        """
+        Callback cuando el archivo es modificado.
+        
+        Args:
+            event: Evento del sistema de archivos
+        """
+        # Verificar que sea el archivo que estamos observando
+        if event.is_directory:
+            return
+        
+        event_path = os.path.abspath(event.src_path)
+        if event_path != self.ruta_archivo:
+            return
+        
+        # Evitar múltiples recargas por el mismo cambio
+        # (algunos editores generan múltiples eventos)
+        import time
+        current_time = time.time()
+        if current_time - self.last_modified < 1:  # Ignorar si fue hace menos de 1 segundo
+            return
+        
+        self.last_modified = current_time
+        
+        # Recargar usuarios
+        print(f"\n📝 Detectado cambio en {os.path.basename(self.ruta_archivo)}")
+        recargar_y_publicar_usuarios()
+    
+    def on_moved(self, event):
+        """
+        Callback cuando un archivo es renombrado sobre usuarios.csv.
+        
+        Las escrituras atómicas (propias o de editores) reemplazan el archivo
+        con un rename en lugar de modificarlo.
+        
+        Args:
+            event: Evento del sistema de archivos
+        """
+        if event.is_directory:
+            return
+        
+        if os.path.abspath(event.dest_path) != self.ruta_archivo:
+            return
+        
+        print(f"\n📝 Detectado reemplazo de {os.path.basename(self.ruta_archivo)}")
+        recargar_y_publicar_usuarios()
+
+
+def recargar_usuarios(forzar: bool = False) -> bool:
+    """
+    Recarga la lista de usuarios desde el almacenamiento (usuarios.csv en el
+    backend de archivos).
+    
+    Valida el formato al recargar y actualiza el caché global.
+    
+    Args:
+        forzar: Recargar aunque el archivo sea el último que escribió este
+            proceso (otro worker pudo agregarle filas bajo el mismo flock)
+    
+    Returns:
+        True si el padrón quedó al día con el almacenamiento; False si la
+        recarga se omitió o falló
+    
+    Requirements: 4.3, 4.6
+    """
+    # El caché tiene cambios propios aún no escritos: recargar el archivo
+    # los descartaría hasta la reescritura pendiente
+    if almacenamiento.tiene_cambios_pendientes():
+        print("ℹ Recarga de usuarios omitida: hay una reescritura pendiente")
+        return False
+    
+    # El archivo es exactamente el que escribió este proceso
+    if not forzar and not almacenamiento.usuarios_modificados_externamente():
+        return True
+    
+    try:
+        # Cargar usuarios con validación
+        nuevos_usuarios = almacenamiento.cargar_usuarios()
+        
+        # Actualizar caché e índices
+        reemplazar_usuarios(nuevos_usuarios)
+        
+        print(f"✓ Usuarios recargados exitosamente: {len(padron_usuarios.usuarios)} usuarios")
+        return True
+        
+    except FileNotFoundError as e:
+        print(f"⚠ Error: Archivo usuarios.csv no encontrado - {e}")
+    except ValueError as e:
+        print(f"⚠ Error de formato en CSV: {e}")
+    except Exception as e:
+        print(f"⚠ Error al recargar usuarios: {e}")
+    return False
+
+
+def recargar_y_publicar_usuarios():
+    """
+    Recarga el padrón si usuarios.csv cambió y, si su contenido difiere del
+    que ya tenía este proceso (una edición manual del archivo, no la
+    reescritura de un cambio hecho desde el panel y ya replicado), avisa a
+    los demás workers para que lo relean.
+    """
+    anterior = padron_usuarios
+    recargar_usuarios()
+    if padron_usuarios is not anterior and not anterior.mismos_usuarios(padron_usuarios):
+        publicar_cambio('usuarios')
+
+
+def iniciar_file_watcher():
+    """
+    Inicia el observador de archivos para usuarios.csv.
+    
+    El observador corre en un thread separado y detecta cambios automáticamente.
+    
+    Requirements: 4.3, 4.6
+    """
+    ruta_csv = 'data/usuarios.csv'
+    
+    # Verificar que el archivo existe
+    if not os.path.exists(ruta_csv):
+        print(f"⚠ Advertencia: {ruta_csv} no existe, file watcher no iniciado")
+        return None
+    
+    try:
+        # Crear handler y observer
+        event_handler = UsuariosCSVHandler(ruta_csv)
+        observer = Observer()
+        
+        # Observar el directorio que contiene el archivo
+        directorio = os.path.dirname(os.path.abspath(ruta_csv))
+        observer.schedule(event_handler, directorio, recursive=False)
+        
+        # Iniciar observer en thread separado
+        observer.start()
+        
+        print(f"✓ File watcher iniciado para {ruta_csv}")
+        
+        return observer
+    except Exception as e:
+        # Si hay error con watchdog (ej: Python 3.13 threading issues),
+        # usar polling como fallback
+        print(f"⚠ File watcher no disponible: {e}")
+        print("ℹ Usar endpoint POST /api/reload-usuarios para recarga manual")
+        print("ℹ O editar usuarios desde la interfaz administrativa")
+        return None
+
+
+# ============================================================================
+# ARCHIVO DE ASISTENCIAS POR EVENTO
+# ============================================================================
+#
+# Reiniciar las asistencias ya no las descarta: el almacenamiento aparta el
+# conjunto vigente con renames (archivos) o renombrando la tabla (SQLite) y
+# deja uno vacío. En segundo plano se escribe data/archivo/<nombre>.jsonl.gz,
+# inmutable, cuya primera línea es un encabezado índice:
+#     {"tipo": "archivo_asistencias", "nombre": ..., "evento": ...,
+#      "archivado": ..., "total": n, "primera": ..., "ultima": ...}
+# seguido de una asistencia por línea. Mientras se comprime, el conjunto
+# apartado vive en data/archivo/<nombre>.pendiente/ con su metadata.json.
+
+class ArchivoEventos:
+    """
+    Archivos comprimidos e inmutables de asistencias, uno por evento archivado.
+    """
+    
+    EXTENSION = '.jsonl.gz'
+    SUFIJO_PENDIENTE = '.pendiente'
+    CARACTERES_NOMBRE = set('abcdefghijklmnopqrstuvwxyz0123456789-_')
+    
+    def __init__(self, directorio: str = 'data/archivo'):
+        """
+        Args:
+            directorio: Directorio de los archivos de eventos
+        """
+        self.directorio = directorio
+        self._threads = []
+    
+    @classmethod
+    def es_nombre_valido(cls, nombre: str) -> bool:
+        """Los nombres solo tienen minúsculas, dígitos, '-' y '_' (nunca rutas)."""
+        return bool(nombre) and set(nombre) <= cls.CARACTERES_NOMBRE
+    
+    def nuevo_nombre(self, evento: str) -> str:
+        """
+        Genera el nombre del archivo a partir del evento y la fecha actual,
+        p.ej. 'asamblea-ordinaria_20260314_181500'.
+        """
+        normalizado = ''.join(
+            c if c.isascii() and c.isalnum() else '-'
+            for c in (evento or 'asamblea').lower()
+        )
+        slug = '-'.join(parte for parte in normalizado.split('-') if parte)[:60] or 'asamblea'
+        base = f"{slug}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}"
+        
+        nombre = base
+        contador = 2
+        while os.path.exists(self.ruta(nombre)) or os.path.exists(self.ruta_pendiente(nombre)):
+            nombre = f"{base}-{contador}"
+            contador += 1
+        return nombre
+    
+    def ruta(self, nombre: str) -> str:
+        return os.path.join(self.directorio, nombre + self.EXTENSION)
+    
+    def ruta_pendiente(self, nombre: str) -> str:
+        return os.path.join(self.directorio, nombre + self.SUFIJO_PENDIENTE)
+    
+    def preparar(self, nombre: str, evento: str, **datos) -> str:
+        """
+        Crea el directorio pendiente con su metadata.
+        
+        Args:
+            nombre: Nombre generado con nuevo_nombre
+            evento: Nombre del evento indicado por el administrador
+            datos: Datos adicionales que necesita el almacenamiento para leerlo
+            
+        Returns:
+            Ruta del directorio pendiente
+        """
+        ruta_pendiente = self.ruta_pendiente(nombre)
+        os.makedirs(ruta_pendiente, exist_ok=True)
+        metadata = {
+            'nombre': nombre,
+            'evento': evento or 'asamblea',
+            'archivado': datetime.utcnow().isoformat() + 'Z',
+            **datos
+        }
+        escribir_archivo_atomico(
+            os.path.join(ruta_pendiente, 'metadata.json'),
+            json.dumps(metadata, ensure_ascii=False)
+        )
+        return ruta_pendiente
+    
+    def metadata_pendiente(self, nombre: str) -> Dict:
+        with open(os.path.join(self.ruta_pendiente(nombre), 'metadata.json'), 'r', encoding='utf-8') as archivo:
+            return json.load(archivo)
+    
+    def pendientes(self) -> List[str]:
+        """Nombres de los archivos apartados que aún no se comprimieron."""
+        if not os.path.isdir(self.directorio):
+            return []
+        return sorted(
+            entrada[:-len(self.SUFIJO_PENDIENTE)]
+            for entrada in os.listdir(self.directorio)
+            if entrada.endswith(self.SUFIJO_PENDIENTE)
+            and os.path.exists(os.path.join(self.directorio, entrada, 'metadata.json'))
+        )
+    
+    def comprimir(self, nombre: str, leer, descartar) -> bool:
+        """
+        Escribe el archivo comprimido de un conjunto apartado y lo descarta.
+        
+        Args:
+            nombre: Nombre del archivo pendiente
+            leer: Callable(metadata) que retorna la lista de asistencias apartadas
+            descartar: Callable(metadata) que elimina el conjunto apartado
+            
+        Returns:
+            True si se escribió el archivo (False si otro proceso ya lo hizo)
+        """
+        with BloqueoEntreProcesos(self.ruta_pendiente(nombre) + '.lock'):
+            if not os.path.exists(os.path.join(self.ruta_pendiente(nombre), 'metadata.json')):
+                return False
+            
+            metadata = self.metadata_pendiente(nombre)
+            asistencias = leer(metadata)
+            fechas = sorted(a.get('fechaHora', '') for a in asistencias)
+            encabezado = {
+                'tipo': 'archivo_asistencias',
+                'nombre': nombre,
+                'evento': metadata['evento'],
+                'archivado': metadata['archivado'],
+                'total': len(asistencias),
+                'primera': fechas[0] if fechas else None,
+                'ultima': fechas[-1] if fechas else None
+            }
+            
+            ruta_temporal = self.ruta(nombre) + '.tmp'
+            with open(ruta_temporal, 'wb') as salida:
+                with gzip.GzipFile(fileobj=salida, mode='wb', mtime=0) as comprimido:
+                    comprimido.write((json.dumps(encabezado, ensure_ascii=False) + '\n').encode('utf-8'))
+                    for asistencia in asistencias:
+                        comprimido.write((json.dumps(asistencia, ensure_ascii=False) + '\n').encode('utf-8'))
+                salida.flush()
+                os.fsync(salida.fileno())
+            os.chmod(ruta_temporal, 0o444)  # Inmutable
+            os.replace(ruta_temporal, self.ruta(nombre))
+            _sincronizar_directorio(self.directorio)
+            
+            descartar(metadata)
+            shutil.rmtree(self.ruta_pendiente(nombre))
+        
+        if os.path.exists(self.ruta_pendiente(nombre) + '.lock'):
+            os.remove(self.ruta_pendiente(nombre) + '.lock')
+        return True
+    
+    def comprimir_en_segundo_plano(self, nombre: str, leer, descartar) -> None:
+        """Lanza comprimir() en un thread; los errores se informan y el pendiente se conserva."""
+        def ejecutar():
+            try:
+                self.comprimir(nombre, leer, descartar)
+                print(f"✓ Asistencias archivadas en {os.path.basename(self.ruta(nombre))}")
+            except Exception as e:
+                print(f"⚠ Error al comprimir archivo {nombre}: {e}")
+        
+        thread = threading.Thread(target=ejecutar, name=f'archivo-{nombre}', daemon=True)
+        self._threads = [t for t in self._threads if t.is_alive()] + [thread]
+        thread.start()
+    
+    def esperar(self, timeout: Optional[float] = None) -> bool:
+        """
+        Espera a que terminen las compresiones en curso.
+        
+        Returns:
+            True si no quedó ninguna compresión en curso
+        """
+        for thread in list(self._threads):
+            thread.join(timeout)
+        return not any(thread.is_alive() for thread in self._threads)
+    
+    def leer_encabezado(self, nombre: str) -> Dict:
+        with gzip.open(self.ruta(nombre), 'rt', encoding='utf-8') as archivo:
+            return json.loads(archivo.readline())
+    
+    def listar(self) -> List[Dict]:
+        """
+        Lista archivos listos y pendientes, del más reciente al más antiguo.
+        
+        Returns:
+            Lista de encabezados con 'estado' ('listo' o 'comprimiendo') y 'tamano' en bytes
+        """
+        if not os.path.isdir(self.directorio):
+            return []
+        
+        archivos = []
+        for entrada in os.listdir(self.directorio):
+            if not entrada.endswith(self.EXTENSION):
+                continue
+            nombre = entrada[:-len(self.EXTENSION)]
+            try:
+                encabezado = self.leer_encabezado(nombre)
+            except (OSError, ValueError, EOFError) as e:
+                print(f"⚠ Archivo de asistencias ilegible {entrada}: {e}")
+                continue
+            encabezado.pop('tipo', None)
+            encabezado['estado'] = 'listo'
+            encabezado['tamano'] = os.path.getsize(self.ruta(nombre))
+            archivos.append(encabezado)
+        
+        for nombre in self.pendientes():
+            if os.path.exists(self.ruta(nombre)):
+                continue
+            metadata = self.metadata_pendiente(nombre)
+            archivos.append({
+                'nombre': nombre,
+                'evento': metadata['evento'],
+                'archivado': metadata['archivado'],
+                'total': metadata.get('total'),
+                'estado': 'comprimiendo'
+            })
+        
+        archivos.sort(key=lambda archivo: archivo['archivado'], reverse=True)
+        return archivos
+
+
+# ============================================================================
+# CAPA DE ALMACENAMIENTO (REPOSITORIOS)
+# ============================================================================
+#
+# Todos los endpoints persisten a través de `almacenamiento`. Los cachés en
+# memoria siguen siendo la fuente de lectura; el almacenamiento solo recibe
+# los cambios. Backends disponibles (variable de entorno ALMACENAMIENTO):
+#     archivos: usuarios.csv + asistencias (journal o json) + archivos JSON
+#     sqlite:   base de datos SQLite en modo WAL (data/asistencia.db)
+
+class Almacenamiento:
+    """
+    Interfaz común de persistencia para usuarios, asistencias y configuración.
+    
+    Los métodos de modificación se invocan después de aplicar el cambio en
+    padron_usuarios / asistencias_cache, de modo que un backend puede persistir
+    el estado vigente completo en lugar de cada cambio por separado.
+    """
+    
+    tipo = 'base'
+    
+    def aplicar_lote(self, operaciones: List[Tuple[str, tuple]]) -> List:
+        """
+        Aplica varias operaciones de modificación como una sola escritura.
+        
+        Args:
+            operaciones: Lista de (nombre_metodo, argumentos)
+            
+        Returns:
+            Lista con el resultado de cada operación, en el mismo orden
+        """
+        return [getattr(self, nombre)(*argumentos) for nombre, argumentos in operaciones]
+    
+    def vaciar_pendientes(self) -> None:
+        """Persiste los cambios diferidos (al terminar o reinicializar)."""
+        pass
+    
+    def cerrar(self) -> None:
+        """Libera los recursos abiertos por el thread actual."""
+        pass
+    
+    def tiene_cambios_pendientes(self) -> bool:
+        """Indica si hay cambios de usuarios aún no escritos."""
+        return False
+    
+    def usuarios_modificados_externamente(self) -> bool:
+        """Indica si los usuarios persistidos difieren de lo que este proceso escribió."""
+        return True
+    
+    def cargar_usuarios(self) -> List[Dict[str, str]]:
+        raise NotImplementedError
+    
+    def agregar_usuarios(self, usuarios: List[Dict[str, str]]) -> None:
+        raise NotImplementedError
+    
+    def actualizar_usuario(self, usuario: Dict[str, str]) -> None:
+        raise NotImplementedError
+    
+    def eliminar_usuario(self, user_id: str) -> None:
+        raise NotImplementedError
+    
+    def eliminar_todos_usuarios(self) -> None:
+        raise NotImplementedError
+    
+    def cargar_asistencias(self) -> List[Dict]:
+        raise NotImplementedError
+    
+    def cargar_asistencias_indexadas(self) -> AsistenciasIndexadas:
+        """
+        Carga las asistencias para el caché del worker. Los backends que
+        pueden leer registros bajo demanda retienen solo un índice.
+        """
+        return AsistenciasIndexadas(self.cargar_asistencias())
+    
+    def registrar_asistencia(self, asistencia: Dict) -> bool:
+        """
+        Persiste una asistencia ya agregada al caché.
+        
+        Retorna False si el userId ya estaba registrado (el llamador debe
+        retirarla del caché).
+        """
+        raise NotImplementedError
+    
+    def reiniciar_asistencias(self) -> None:
+        raise NotImplementedError
+    
+    def archivar_asistencias(self, nombre: str, evento: str, total: Optional[int] = None) -> None:
+        """
+        Aparta el conjunto vigente de asistencias (operación O(1)) dejando uno
+        vacío, y lo comprime en segundo plano en el archivo `nombre`.
+        
+        Args:
+            nombre: Nombre generado con ArchivoEventos.nuevo_nombre
+            evento: Nombre del evento
+            total: Asistencias apartadas, para listarlas mientras se comprimen
+        """
+        raise NotImplementedError
+    
+    def reanudar_archivado(self) -> None:
+        """Comprime los conjuntos apartados que quedaron pendientes (p.ej. tras una caída)."""
+        for nombre in self.archivo.pendientes():
+            self.archivo.comprimir_en_segundo_plano(
+                nombre, self._leer_asistencias_apartadas, self._descartar_asistencias_apartadas
+            )
+    
+    def _leer_asistencias_apartadas(self, metadata: Dict) -> List[Dict]:
+        raise NotImplementedError
+    
+    def _descartar_asistencias_apartadas(self, metadata: Dict) -> None:
+        raise NotImplementedError
+    
+    def leer_cambios_asistencias(self) -> List[Dict]:
+        """
+        Cambios de asistencias hechos por otros procesos desde la última lectura.
+        
+        Returns:
+            Lista de {'op': 'agregar', 'asistencia': {...}} o {'op': 'reiniciar'}
+        """
+        return []
+    
+    def version_configuracion(self):
+        """Valor que cambia cuando otro proceso modifica la configuración."""
+        return None
+    
+    def cargar_configuracion(self) -> Dict:
+        raise NotImplementedError
+    
+    def guardar_configuracion(self, configuracion: Dict) -> None:
+        raise NotImplementedError
+    
+    def cargar_credenciales(self) -> Dict:
+        raise NotImplementedError
+    
+    def guardar_credenciales(self, credenciales: Dict) -> None:
+        raise NotImplementedError
+
+
+class AlmacenamientoArchivos(Almacenamiento):
+    """
+    Backend basado en los archivos originales de data/ (CSV y JSON).
+    
+    Las altas de usuarios se agregan al final de usuarios.csv. Ediciones y
+    bajas se acumulan y programan una reescritura completa en segundo plano,
+    que agrupa todos los cambios hechos dentro de la demora.
+    
+    Varios workers: toda escritura de usuarios.csv se hace bajo un flock
+    (usuarios.csv.lock). La reescritura vuelve a leer el archivo y le aplica
+    solo los cambios pendientes de este proceso, para no pisar las altas
+    que otro worker agregó mientras tanto.
+    """
+    
+    tipo = 'archivos'
+    
+    # Operación del almacenamiento -> cambio pendiente sobre usuarios.csv
+    OPERACIONES_USUARIOS = {
+        'agregar_usuarios': 'agregar',
+        'actualizar_usuario': 'editar',
+        'eliminar_usuario': 'quitar',
+        'eliminar_todos_usuarios': 'vaciar',
+    }
+    
+    def __init__(
+        self,
+        directorio: str = 'data',
+        modo_asistencias: str = 'journal',
+        fuente_usuarios=None,
+        fuente_asistencias=None,
+        compactacion_registros: int = 0,
+        compactacion_bytes: int = 0,
+        demora_reescritura_usuarios: float = 0
+    ):
+        """
+        Args:
+            directorio: Directorio de los archivos de datos
+            modo_asistencias: 'journal' (append-only) o 'json' (reescritura completa)
+            fuente_usuarios: Callable que retorna la lista vigente de usuarios
+            fuente_asistencias: Callable que retorna la lista vigente de asistencias
+            compactacion_registros: Umbral de registros para compactar el journal (0 = nunca)
+            compactacion_bytes: Umbral de bytes para compactar el journal (0 = nunca)
+            demora_reescritura_usuarios: Segundos que se agrupan ediciones y bajas
+                antes de reescribir usuarios.csv (0 = reescritura inmediata)
+        """
+        self.directorio = directorio
+        self.modo_asistencias = modo_asistencias
+        self.fuente_usuarios = fuente_usuarios or (lambda: [])
+        self.fuente_asistencias = fuente_asistencias or (lambda: [])
+        self.ruta_usuarios = os.path.join(directorio, 'usuarios.csv')
+        self.ruta_asistencias = os.path.join(directorio, 'asistencias.json')
+        self.ruta_journal = os.path.join(directorio, 'asistencias.jsonl')
+        self.journal = JournalAsistencias(
+            self.ruta_journal,
+            umbral_registros=compactacion_registros,
+            umbral_bytes=compactacion_bytes
+        )
+        self.ruta_configuracion = os.path.join(directorio, 'configuracion.json')
+        self.ruta_credenciales = os.path.join(directorio, 'admin_credentials.json')
+        self.archivo = ArchivoEventos(os.path.join(directorio, 'archivo'))
+        self.demora_reescritura_usuarios = demora_reescritura_usuarios
+        self.reescrituras_usuarios = 0
+        self._lock_usuarios = threading.RLock()
+        self._bloqueo_usuarios = BloqueoEntreProcesos(self.ruta_usuarios + '.lock')
+        self._reescritura_usuarios = None  # threading.Timer de la reescritura pendiente
+        self._cambios_usuarios = []  # Cambios aún no escritos, en orden
+        self._firma_usuarios = None  # (inodo, tamaño, mtime) tras la última escritura propia
+    
+    # --- Usuarios -----------------------------------------------------------
+    
+    def cargar_usuarios(self) -> List[Dict[str, str]]:
+        with self._lock_usuarios, self._bloqueo_usuarios:
+            usuarios = cargar_usuarios_con_snapshot(
+                self.ruta_usuarios, columnar=FORMATO_USUARIOS == 'columnar'
+            )
+            self._firma_usuarios = self._leer_firma_usuarios()
+            return usuarios
+    
+    def agregar_usuarios(self, usuarios: List[Dict[str, str]]) -> None:
+        self._escribir_usuarios([('agregar', usuarios)])
+    
+    def actualizar_usuario(self, usuario: Dict[str, str]) -> None:
+        self._escribir_usuarios([('editar', usuario)])
+    
+    def eliminar_usuario(self, user_id: str) -> None:
+        self._escribir_usuarios([('quitar', user_id)])
+    
+    def eliminar_todos_usuarios(self) -> None:
+        self._escribir_usuarios([('vaciar',)])
+    
+    def _escribir_usuarios(self, cambios: List[tuple]) -> None:
+        """
+        Persiste cambios de usuarios: las altas se agregan al final del CSV y
+        las ediciones o bajas programan una reescritura completa.
+        
+        Si hay cambios pendientes, una alta se incorpora aplicándolos todos y
+        reescribiendo en el momento.
+        
+        Args:
+            cambios: Lista de ('agregar', usuarios), ('editar', usuario),
+                ('quitar', user_id) o ('vaciar',), en orden
+        """
+        with self._lock_usuarios:
+            if not self._cambios_usuarios and all(cambio[0] == 'agregar' for cambio in cambios):
+                with self._bloqueo_usuarios:
+                    agregar_usuarios_csv(
+                        [usuario for _, usuarios in cambios for usuario in usuarios], self.ruta_usuarios
+                    )
+                    self._firma_usuarios = self._leer_firma_usuarios()
+                return
+            
+            for cambio in cambios:
+                if cambio[0] == 'editar':
+                    # Copia: el cambio puede escribirse después de la demora
+                    usuario = cambio[1]
+                    cambio = ('editar', {campo: usuario[campo] for campo in ('userId', 'documento', 'nombre')})
+                self._cambios_usuarios.append(cambio)
+            if any(cambio[0] == 'agregar' for cambio in cambios):
+                self._reescribir_usuarios()
+            elif cambios:
+                self._programar_reescritura_usuarios()
+    
+    def _programar_reescritura_usuarios(self) -> None:
+        if self.demora_reescritura_usuarios <= 0:
+            self._reescribir_usuarios()
+            return
+        if self._reescritura_usuarios is None:
+            self._reescritura_usuarios = threading.Timer(
+                self.demora_reescritura_usuarios, self.vaciar_pendientes
+            )
+            self._reescritura_usuarios.daemon = True
+            self._reescritura_usuarios.start()
+    
+    def _reescribir_usuarios(self) -> None:
+        """
+        Reescribe usuarios.csv con los cambios pendientes aplicados (con el
+        lock tomado).
+        
+        Bajo el flock se vuelve a leer el archivo: las altas que otro worker
+        agregó desde la última escritura propia se conservan. Si el archivo no
+        existe o no se puede leer, se escribe el caché vigente (`fuente_usuarios`).
+        """
+        if self._reescritura_usuarios is not None:
+            self._reescritura_usuarios.cancel()
+            self._reescritura_usuarios = None
+        with self._bloqueo_usuarios:
+            try:
+                usuarios = aplicar_cambios_usuarios(cargar_usuarios_csv(self.ruta_usuarios), self._cambios_usuarios)
+            except (FileNotFoundError, ValueError):
+                usuarios = list(self.fuente_usuarios())
+            guardar_usuarios_csv(usuarios, self.ruta_usuarios)
+            self._firma_usuarios = self._leer_firma_usuarios()
+        self._cambios_usuarios = []
+        self.reescrituras_usuarios += 1
+    
+    def vaciar_pendientes(self) -> None:
+        with self._lock_usuarios:
+            if self._cambios_usuarios:
+                self._reescribir_usuarios()
+    
+    def tiene_cambios_pendientes(self) -> bool:
+        return bool(self._cambios_usuarios)
+    
+    def _leer_firma_usuarios(self):
+        try:
+            estado = os.stat(self.ruta_usuarios)
+        except FileNotFoundError:
+            return None
+        return (estado.st_ino, estado.st_size, estado.st_mtime_ns)
+    
+    def usuarios_modificados_externamente(self) -> bool:
+        # El lock espera a que una escritura propia en curso registre su firma
+        with self._lock_usuarios:
+            return self._firma_usuarios is None or self._leer_firma_usuarios() != self._firma_usuarios
+    
+    # --- Asistencias --------------------------------------------------------
+    
+    def cargar_asistencias(self) -> List[Dict]:
+        if self.modo_asistencias == 'journal' and self.journal.existe():
+            return self.journal.reproducir()
+        # Sin journal previo, asistencias.json se importa como estado inicial
+        return cargar_asistencias(self.ruta_asistencias)
+    
+    def cargar_asistencias_indexadas(self) -> AsistenciasIndexadas:
+        if self.modo_asistencias == 'journal' and self.journal.existe():
+            return self.journal.reproducir_indexado()
+        return AsistenciasIndexadas(self.cargar_asistencias())
+    
+    def registrar_asistencia(self, asistencia: Dict) -> bool:
+        return self._escribir_registros_asistencias([{'op': 'agregar', 'asistencia': asistencia}])[0]
+    
+    def reiniciar_asistencias(self) -> None:
+        self._escribir_registros_asistencias([{'op': 'reiniciar'}])
+    
+    def leer_cambios_asistencias(self) -> List[Dict]:
+        if self.modo_asistencias != 'journal':
+            return []
+        return self.journal.leer_cambios()
+    
+    def archivar_asistencias(self, nombre: str, evento: str, total: Optional[int] = None) -> None:
+        """Mueve los archivos de asistencias al directorio pendiente y deja un conjunto vacío."""
+        ruta_pendiente = self.archivo.preparar(
+            nombre, evento, modo=self.modo_asistencias, total=total
+        )
+        
+        if self.modo_asistencias == 'journal':
+            if not self.journal.existe():
+                # Estado importado de asistencias.json que nunca pasó al journal
+                self.journal.escribir_completo(
+                    cargar_asistencias(self.ruta_asistencias)
+                    if os.path.exists(self.ruta_asistencias) else []
+                )
+            self.journal.rotar(ruta_pendiente)
+        else:
+            if os.path.exists(self.ruta_asistencias):
+                os.replace(self.ruta_asistencias, os.path.join(ruta_pendiente, 'asistencias.json'))
+            guardar_asistencias([], self.ruta_asistencias)
+        
+        self.archivo.comprimir_en_segundo_plano(
+            nombre, self._leer_asistencias_apartadas, self._descartar_asistencias_apartadas
+        )
+    
+    def _leer_asistencias_apartadas(self, metadata: Dict) -> List[Dict]:
+        ruta_pendiente = self.archivo.ruta_pendiente(metadata['nombre'])
+        if metadata.get('modo') == 'json':
+            ruta = os.path.join(ruta_pendiente, 'asistencias.json')
+            return cargar_asistencias(ruta) if os.path.exists(ruta) else []
+        
+        journal = JournalAsistencias(os.path.join(ruta_pendiente, os.path.basename(self.ruta_journal)))
+        return journal.reproducir() if journal.existe() else []
+    
+    def _descartar_asistencias_apartadas(self, metadata: Dict) -> None:
+        pass  # Los archivos apartados se eliminan junto con el directorio pendiente
+    
+    def _escribir_registros_asistencias(self, registros: List[Dict]) -> List[Optional[bool]]:
+        """
+        Persiste registros de asistencias con una sola escritura.
+        
+        Returns:
+            Resultado por registro (ver JournalAsistencias.agregar)
+        """
+        if self.modo_asistencias != 'journal':
+            with _lock_archivo(self.ruta_asistencias):
+                guardar_asistencias(list(self.fuente_asistencias()), self.ruta_asistencias)
+            return [None if registro['op'] == 'reiniciar' else True for registro in registros]
+        # Si el journal no existe, se crea con el contenido importado
+        return self.journal.agregar(registros, estado_inicial=self.fuente_asistencias)
+    
+    def aplicar_lote(self, operaciones: List[Tuple[str, tuple]]) -> List:
+        """
+        Agrupa el lote en una escritura del journal y, si hubo cambios de
+        usuarios, en un solo agregado o una sola reescritura de usuarios.csv.
+        """
+        registros = []
+        posiciones = []  # Índice en resultados de cada registro del journal
+        cambios_usuarios = []
+        resultados = []
+        
+        def escribir_registros_pendientes():
+            if registros:
+                for posicion, resultado in zip(posiciones, self._escribir_registros_asistencias(registros)):
+                    resultados[posicion] = resultado
+                registros.clear()
+                posiciones.clear()
+        
+        for nombre, argumentos in operaciones:
+            if nombre == 'registrar_asistencia':
+                registros.append({'op': 'agregar', 'asistencia': argumentos[0]})
+                posiciones.append(len(resultados))
+                resultados.append(True)
+            elif nombre == 'reiniciar_asistencias':
+                registros.append({'op': 'reiniciar'})
+                posiciones.append(len(resultados))
+                resultados.append(None)
+            elif nombre in self.OPERACIONES_USUARIOS:
+                cambios_usuarios.append((self.OPERACIONES_USUARIOS[nombre], *argumentos))
+                resultados.append(None)
+            else:
+                # Otras operaciones (p.ej. archivar) respetan el orden del journal
+                escribir_registros_pendientes()
+                resultados.append(getattr(self, nombre)(*argumentos))
+        
+        escribir_registros_pendientes()
+        if cambios_usuarios:
+            self._escribir_usuarios(cambios_usuarios)
+        
+        return resultados
+    
+    # --- Configuración y credenciales --------------------------------------
+    
+    def cargar_configuracion(self) -> Dict:
+        return cargar_configuracion(self.ruta_configuracion)
+    
+    def version_configuracion(self):
+        try:
+            estado = os.stat(self.ruta_configuracion)
+        except FileNotFoundError:
+            return None
+        return (estado.st_ino, estado.st_mtime_ns, estado.st_size)
+    
+    def guardar_configuracion(self, configuracion: Dict) -> None:
+        escribir_archivo_atomico(
+            self.ruta_configuracion,
+            json.dumps(configuracion, indent=2, ensure_ascii=False)
+        )
+    
+    def cargar_credenciales(self) -> Dict:
+        return cargar_credenciales_admin(self.ruta_credenciales)
+    
+    def guardar_credenciales(self, credenciales: Dict) -> None:
+        escribir_archivo_atomico(
+            self.ruta_credenciales,
+            json.dumps(credenciales, indent=2, ensure_ascii=False)
+        )
+
+
+class AlmacenamientoSQLite(Almacenamiento):
+    """
+    Backend SQLite en modo WAL con una conexión por thread.
+    
+    Las actualizaciones puntuales de usuarios modifican una sola fila y la
+    restricción UNIQUE sobre asistencias.userId impide duplicados.
+    """
+    
+    tipo = 'sqlite'
+    
+    TABLA_ASISTENCIAS = """
+        CREATE TABLE IF NOT EXISTS asistencias (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            userId TEXT NOT NULL UNIQUE,
+            nombre TEXT NOT NULL,
+            fechaHora TEXT NOT NULL,
+            latitud REAL NOT NULL,
+            longitud REAL NOT NULL
+        )
+    """
+    
+    ESQUEMA = """
+        CREATE TABLE IF NOT EXISTS usuarios (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            userId TEXT NOT NULL UNIQUE,
+            documento TEXT NOT NULL,
+            nombre TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_usuarios_documento ON usuarios (documento);
+        
+        CREATE TABLE IF NOT EXISTS ajustes (
+            clave TEXT PRIMARY KEY,
+            valor TEXT NOT NULL
+        );
+    """
+    
+    def __init__(self, ruta_bd: str = 'data/asistencia.db'):
+        """
+        Args:
+            ruta_bd: Ruta al archivo de base de datos SQLite
+        """
+        self.ruta_bd = ruta_bd
+        self._local = threading.local()
+        # (COUNT, MAX(id)) de asistencias en la última lectura; None = desconocido
+        self._huella = None
+        # id insertados por este proceso después de esa lectura (ya en su caché)
+        self._ids_propios = set()
+        self._lock_huella = threading.RLock()
+        
+        directorio = os.path.dirname(ruta_bd)
+        if directorio and not os.path.exists(directorio):
+            os.makedirs(directorio)
+        
+        self.archivo = ArchivoEventos(os.path.join(directorio, 'archivo'))
+        
+        conexion = self._conexion()
+        conexion.executescript(self.ESQUEMA + ';' + self.TABLA_ASISTENCIAS)
+        conexion.commit()
+    
+    def _conexion(self):
+        """Retorna la conexión del thread actual, creándola si no existe."""
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is None:
+            conexion = sqlite3.connect(self.ruta_bd, timeout=30)
+            conexion.execute('PRAGMA journal_mode=WAL')
+            conexion.execute('PRAGMA synchronous=NORMAL')
+            self._local.conexion = conexion
+        return conexion
+    
+    @contextmanager
+    def _transaccion(self):
+        """
+        Transacción sobre la conexión del thread. Dentro de aplicar_lote todas
+        las operaciones comparten una única transacción.
+        """
+        conexion = self._conexion()
+        if getattr(self._local, 'en_lote', False):
+            yield conexion
+        else:
+            with conexion:
+                yield conexion
+    
+    def aplicar_lote(self, operaciones: List[Tuple[str, tuple]]) -> List:
+        """Aplica el lote completo en una sola transacción."""
+        conexion = self._conexion()
+        self._local.en_lote = True
+        try:
+            with self._lock_huella, conexion:
+                return [getattr(self, nombre)(*argumentos) for nombre, argumentos in operaciones]
+        finally:
+            self._local.en_lote = False
+    
+    def cerrar(self) -> None:
+        """Cierra la conexión del thread actual."""
+        conexion = getattr(self._local, 'conexion', None)
+        if conexion is not None:
+            conexion.close()
+            self._local.conexion = None
+    
+    def esta_vacio(self) -> bool:
+        """Indica si la base de datos no tiene usuarios, asistencias ni ajustes."""
+        conexion = self._conexion()
+        for tabla in ('usuarios', 'asistencias', 'ajustes'):
+            if conexion.execute(f'SELECT 1 FROM {tabla} LIMIT 1').fetchone():
+                return False
+        return True
+    
+    def importar_desde(self, origen: Almacenamiento) -> None:
+        """
+        Copia usuarios, asistencias, configuración y credenciales de otro backend.
+        
+        Los datos que no se puedan cargar del origen se omiten.
+        """
+        try:
+            self.agregar_usuarios(origen.cargar_usuarios())
+        except (FileNotFoundError, ValueError) as e:
+            print(f"⚠ Importación SQLite: usuarios omitidos - {e}")
+        
+        try:
+            for asistencia in origen.cargar_asistencias():
+                self.registrar_asistencia(asistencia)
+        except (FileNotFoundError, ValueError) as e:
+            print(f"⚠ Importación SQLite: asistencias omitidas - {e}")
+        
+        try:
+            self.guardar_configuracion(origen.cargar_configuracion())
+        except (FileNotFoundError, ValueError) as e:
+            print(f"⚠ Importación SQLite: configuración omitida - {e}")
+        
+        self.guardar_credenciales(origen.cargar_credenciales())
+    
+    # --- Usuarios -----------------------------------------------------------
+    
+    def cargar_usuarios(self) -> List[Dict[str, str]]:
+        filas = self._conexion().execute(
+            'SELECT userId, documento, nombre FROM usuarios ORDER BY id'
+        ).fetchall()
+        return [
+            {'userId': user_id, 'documento': documento, 'nombre': nombre}
+            for user_id, documento, nombre in filas
+        ]
+    
+    def agregar_usuarios(self, usuarios: List[Dict[str, str]]) -> None:
+        with self._transaccion() as conexion:
+            conexion.executemany(
+                'INSERT OR IGNORE INTO usuarios (userId, documento, nombre) VALUES (?, ?, ?)',
+                [(u['userId'], u['documento'], u['nombre']) for u in usuarios]
+            )
+    
+    def actualizar_usuario(self, usuario: Dict[str, str]) -> None:
+        with self._transaccion() as conexion:
+            conexion.execute(
+                'UPDATE usuarios SET documento = ?, nombre = ? WHERE userId = ?',
+                (usuario['documento'], usuario['nombre'], usuario['userId'])
+            )
+    
+    def eliminar_usuario(self, user_id: str) -> None:
+        with self._transaccion() as conexion:
+            conexion.execute('DELETE FROM usuarios WHERE userId = ?', (user_id,))
+    
+    def eliminar_todos_usuarios(self) -> None:
+        with self._transaccion() as conexion:
+            conexion.execute('DELETE FROM usuarios')
+    
+    # --- Asistencias --------------------------------------------------------
+    
+    def cargar_asistencias(self) -> List[Dict]:
+        with self._lock_huella:
+            conexion = self._conexion()
+            self._huella = self._leer_huella(conexion)
+            self._ids_propios = set()
+            filas = conexion.execute(
+                'SELECT userId, nombre, fechaHora, latitud, longitud FROM asistencias ORDER BY id'
+            ).fetchall()
+        return [self._fila_a_asistencia(fila) for fila in filas]
+    
+    @staticmethod
+    def _fila_a_asistencia(fila) -> Dict:
+        user_id, nombre, fecha_hora, latitud, longitud = fila
+        return {
+            'userId': user_id,
+            'nombre': nombre,
+            'fechaHora': fecha_hora,
+            'ubicacion': {'latitud': latitud, 'longitud': longitud}
+        }
+    
+    @staticmethod
+    def _leer_huella(conexion) -> Tuple[int, int]:
+        return tuple(conexion.execute(
+            'SELECT COUNT(*), COALESCE(MAX(id), 0) FROM asistencias'
+        ).fetchone())
+    
+    def leer_cambios_asistencias(self) -> List[Dict]:
+        """
+        Si otro proceso modificó la tabla (la huella COUNT/MAX(id) no coincide
+        con la esperada), lee solo las filas con id posterior a la última
+        lectura. Los id crecen siempre (AUTOINCREMENT, también tras reiniciar
+        o archivar): si las filas nuevas más las ya conocidas no suman el
+        COUNT actual, o falta alguna insertada por este proceso, hubo un
+        reinicio y se entrega el estado completo como reinicio + asistencias.
+        """
+        with self._lock_huella:
+            conexion = self._conexion()
+            huella = self._leer_huella(conexion)
+            if self._huella is not None:
+                total, ultimo_id = self._huella
+                esperada = (total + len(self._ids_propios), max([ultimo_id, *self._ids_propios]))
+                if huella == esperada:
+                    return []
+                
+                filas = conexion.execute(
+                    'SELECT id, userId, nombre, fechaHora, latitud, longitud FROM asistencias '
+                    'WHERE id > ? ORDER BY id', (ultimo_id,)
+                ).fetchall()
+                ids = {fila[0] for fila in filas}
+                if total + len(filas) == huella[0] and self._ids_propios <= ids:
+                    self._huella = (huella[0], max(ids, default=ultimo_id))
+                    cambios = [
+                        {'op': 'agregar', 'asistencia': self._fila_a_asistencia(fila[1:])}
+                        for fila in filas if fila[0] not in self._ids_propios
+                    ]
+                    self._ids_propios = set()
+                    return cambios
+            
+            asistencias = self.cargar_asistencias()
+        return [{'op': 'reiniciar'}] + [
+            {'op': 'agregar', 'asistencia': asistencia} for asistencia in asistencias
+        ]
+    
+    def registrar_asistencia(self, asistencia: Dict) -> bool:
+        try:
+            with self._lock_huella, self._transaccion() as conexion:
+                cursor = conexion.execute(
+                    'INSERT INTO asistencias (userId, nombre, fechaHora, latitud, longitud) '
+                    'VALUES (?, ?, ?, ?, ?)',
+                    (
+                        asistencia['userId'],
+                        asistencia['nombre'],
+                        asistencia['fechaHora'],
+                        asistencia['ubicacion']['latitud'],
+                        asistencia['ubicacion']['longitud']
+                    )
+                )
+                # Ya está en el caché de este proceso: leer_cambios_asistencias() la omite
+                self._ids_propios.add(cursor.lastrowid)
+            return True
+        except sqlite3.IntegrityError:
+            return False
+    
+    def reiniciar_asistencias(self) -> None:
+        with self._lock_huella, self._transaccion() as conexion:
+            conexion.execute('DELETE FROM asistencias')
+            self._huella = (0, 0)
+            self._ids_propios = set()
+    
+    def archivar_asistencias(self, nombre: str, evento: str, total: Optional[int] = None) -> None:
+        """Renombra la tabla de asistencias y crea una vacía en su lugar."""
+        tabla = 'asistencias_archivo_' + nombre.replace('-', '_')
+        self.archivo.preparar(nombre, evento, tabla=tabla, total=total)
+        
+        with self._lock_huella, self._transaccion() as conexion:
+            secuencia = conexion.execute(
+                "SELECT seq FROM sqlite_sequence WHERE name = 'asistencias'"
+            ).fetchone()
+            conexion.execute(f'ALTER TABLE asistencias RENAME TO "{tabla}"')
+            conexion.execute(self.TABLA_ASISTENCIAS)
+            if secuencia:
+                # Los id siguen creciendo: la huella de otros workers no se confunde
+                conexion.execute(
+                    "INSERT INTO sqlite_sequence (name, seq) VALUES ('asistencias', ?)", secuencia
+                )
+            self._huella = (0, 0)
+            self._ids_propios = set()
+        
+        self.archivo.comprimir_en_segundo_plano(
+            nombre, self._leer_asistencias_apartadas, self._descartar_asistencias_apartadas
+        )
+    
+    def _leer_asistencias_apartadas(self, metadata: Dict) -> List[Dict]:
+        filas = self._conexion().execute(
+            f'SELECT userId, nombre, fechaHora, latitud, longitud FROM "{metadata["tabla"]}" ORDER BY id'
+        ).fetchall()
+        return [
+            {
+                'userId': user_id,
+                'nombre': nombre,
+                'fechaHora': fecha_hora,
+                'ubicacion': {'latitud': latitud, 'longitud': longitud}
+            }
+            for user_id, nombre, fecha_hora, latitud, longitud in filas
+        ]
+    
+    def _descartar_asistencias_apartadas(self, metadata: Dict) -> None:
+        with self._transaccion() as conexion:
+            conexion.execute(f'DROP TABLE IF EXISTS "{metadata["tabla"]}"')
+    
+    # --- Configuración y credenciales --------------------------------------
+    
+    def _leer_ajuste(self, clave: str) -> Optional[Dict]:
+        fila = self._conexion().execute(
+            'SELECT valor FROM ajustes WHERE clave = ?', (clave,)
+        ).fetchone()
+        return json.loads(fila[0]) if fila else None
+    
+    def _escribir_ajuste(self, clave: str, valor: Dict) -> None:
+        with self._transaccion() as conexion:
+            conexion.execute(
+                'INSERT OR REPLACE INTO ajustes (clave, valor) VALUES (?, ?)',
+                (clave, json.dumps(valor, ensure_ascii=False))
+            )
+    
+    def cargar_configuracion(self) -> Dict:
+        configuracion = self._leer_ajuste('configuracion')
+        if configuracion is None:
+            raise FileNotFoundError(f"Configuración no encontrada en {self.ruta_bd}")
+        validar_estructura_configuracion(configuracion)
+        return configuracion
+    
+    def guardar_configuracion(self, configuracion: Dict) -> None:
+        self._escribir_ajuste('configuracion', configuracion)
+    
+    def version_configuracion(self):
+        fila = self._conexion().execute(
+            "SELECT valor FROM ajustes WHERE clave = 'configuracion'"
+        ).fetchone()
+        return fila[0] if fila else None
+    
+    def cargar_credenciales(self) -> Dict:
+        credenciales = self._leer_ajuste('credenciales')
+        if credenciales is None:
+            # Credenciales por defecto, igual que el backend de archivos
+            return {'username': 'admin', 'password': 'admin123'}
+        return credenciales
+    
+    def guardar_credenciales(self, credenciales: Dict) -> None:
+        self._escribir_ajuste('credenciales', credenciales)
+
+
+def crear_almacenamiento(tipo: str = 'archivos', directorio: str = 'data') -> Almacenamiento:
+    """
+    Crea el backend de almacenamiento indicado.
+    
+    Al crear una base SQLite vacía se importan los archivos existentes de data/.
+    
+    Args:
+        tipo: 'archivos' o 'sqlite'
+        directorio: Directorio de datos
+        
+    Returns:
+        Instancia de Almacenamiento
+        
+    Raises:
+        ValueError: Si el tipo de almacenamiento no existe
+    """
+    archivos = AlmacenamientoArchivos(
+        directorio,
+        modo_asistencias=MODO_ASISTENCIAS,
+        fuente_usuarios=lambda: padron_usuarios.usuarios,
+        fuente_asistencias=lambda: asistencias_cache,
+        compactacion_registros=COMPACTACION_REGISTROS,
+        compactacion_bytes=COMPACTACION_BYTES,
+        demora_reescritura_usuarios=REESCRITURA_USUARIOS_MS / 1000
+    )
+    
+    if tipo == 'archivos':
+        return archivos
+    
+    if tipo == 'sqlite':
+        sqlite_bd = AlmacenamientoSQLite(os.path.join(directorio, 'asistencia.db'))
+        if sqlite_bd.esta_vacio():
+            print("ℹ Base SQLite vacía: importando datos desde archivos")
+            sqlite_bd.importar_desde(archivos)
+        return sqlite_bd
+    
+    raise ValueError(f"Tipo de almacenamiento desconocido: {tipo}")
+
+
+# ============================================================================
+# PERSISTENCIA DIFERIDA CON COMMIT AGRUPADO (WRITE-BEHIND)
+# ============================================================================
+#
+# Las modificaciones de asistencias y usuarios se encolan y un thread
+# dedicado las aplica en lotes: todo lo que llega dentro de la ventana
+# configurada se persiste con una sola escritura (un fsync). Modos:
+#     durable:  la petición espera a que su lote esté en disco
+#     encolado: la petición continúa apenas la operación está en cola
+#     sincrono: sin thread, cada operación se persiste en la petición
+
+class OperacionPendiente:
+    """Operación encolada en el persistidor y su resultado."""
+    
+    __slots__ = ('nombre', 'argumentos', 'al_completar', 'resultado', 'error', '_listo')
+    
+    def __init__(self, nombre: str, argumentos: tuple, al_completar=None):
+        self.nombre = nombre
+        self.argumentos = argumentos
+        self.al_completar = al_completar
+        self.resultado = None
+        self.error = None
+        self._listo = threading.Event()
+    
+    def completar(self, resultado=None, error: Optional[Exception] = None) -> None:
+        self.resultado = resultado
+        self.error = error
+        self._listo.set()
+    
+    def notificar(self) -> None:
+        """Llama a al_completar(resultado, error), si hay, con la operación ya completada."""
+        if self.al_completar is None:
+            return
+        try:
+            self.al_completar(self.resultado, self.error)
+        except Exception as e:
+            print(f"⚠ Error al notificar el resultado de {self.nombre}: {e}")
+    
+    def esperar(self, timeout: Optional[float] = None):
+        """
+        Espera a que la operación sea durable y retorna su resultado.
+        
+        Raises:
+            ValueError: Si la escritura falló o se agotó el tiempo de espera
+        """
+        if not self._listo.wait(timeout):
+            raise ValueError("Tiempo de espera agotado al persistir")
+        if self.error is not None:
+            raise ValueError(f"Error al persistir: {self.error}")
+        return self.resultado
+
+
+class PersistidorDiferido:
+    """
+    Thread de persistencia con cola acotada y commit agrupado.
+    """
+    
+    def __init__(
+        self,
+        almacenamiento: Almacenamiento,
+        modo: str = 'durable',
+        ventana_ms: float = 10,
+        capacidad: int = 10000
+    ):
+        """
+        Args:
+            almacenamiento: Backend que aplica los lotes (aplicar_lote)
+            modo: 'durable' (responder tras escribir) o 'encolado' (responder al encolar)
+            ventana_ms: Tiempo durante el cual se agrupan operaciones en un lote
+            capacidad: Máximo de operaciones en cola antes de bloquear a los productores
+        """
+        if modo not in ('durable', 'encolado'):
+            raise ValueError(f"Modo de persistencia desconocido: {modo}")
+        
+        self.almacenamiento = almacenamiento
+        self.modo = modo
+        self.ventana = ventana_ms / 1000.0
+        self.cola = queue.Queue(maxsize=capacidad)
+        self.lotes = 0
+        self.operaciones = 0
+        self.errores = 0
+        self._activo = True
+        self._thread = threading.Thread(
+            target=self._ejecutar, name='persistidor-diferido', daemon=True
+        )
+        self._thread.start()
+    
+    def enviar(self, nombre: str, *argumentos, al_completar=None):
+        """
+        Encola una operación del almacenamiento.
+        
+        En modo durable espera a que el lote esté en disco y retorna el
+        resultado de la operación; en modo encolado retorna True de inmediato
+        y el resultado real (p.ej. False por UNIQUE, o un error) solo llega
+        a al_completar.
+        
+        Args:
+            nombre: Método de Almacenamiento a invocar
+            argumentos: Argumentos del método
+            al_completar: Solo en modo encolado: función (resultado, error)
+                que el thread del persistidor llama al terminar el lote
+        
+        Raises:
+            ValueError: Si el persistidor está detenido, la cola está llena
+                        o la escritura falló (modo durable)
+        """
+        if not self._activo:
+            raise ValueError("El persistidor está detenido")
+        
+        operacion = OperacionPendiente(
+            nombre, argumentos, al_completar if self.modo == 'encolado' else None
+        )
+        try:
+            self.cola.put(operacion, timeout=30)
+        except queue.Full:
+            raise ValueError("Cola de persistencia llena")
+        
+        if self.modo == 'encolado':
+            return True
+        return operacion.esperar(timeout=60)
+    
+    def _ejecutar(self) -> None:
+        """Bucle del thread: toma un lote por ventana y lo persiste."""
+        while True:
+            operacion = self.cola.get()
+            if operacion is None:
+                break
+            
+            lote = [operacion]
+            limite = time.monotonic() + self.ventana
+            detener = False
+            while True:
+                restante = limite - time.monotonic()
+                try:
+                    siguiente = self.cola.get(timeout=restante) if restante > 0 else self.cola.get_nowait()
+                except queue.Empty:
+                    break
+                if siguiente is None:
+                    detener = True
+                    break
+                lote.append(siguiente)
+            
+            self._aplicar(lote)
+            if detener:
+                break
+    
+    def _aplicar(self, lote: List[OperacionPendiente]) -> None:
+        """Persiste un lote y notifica a las peticiones que esperan."""
+        try:
+            resultados = self.almacenamiento.aplicar_lote(
+                [(operacion.nombre, operacion.argumentos) for operacion in lote]
+            )
+            for operacion, resultado in zip(lote, resultados):
+                operacion.completar(resultado)
+        except Exception as e:
+            self.errores += 1
+            print(f"⚠ Error al persistir lote de {len(lote)} operación(es): {e}")
+            for operacion in lote:
+                operacion.completar(error=e)
+        
+        # Después de completar todo el lote: un aviso que toma un lock no
+        # demora a quien espera otra operación del mismo lote con ese lock tomado
+        for operacion in lote:
+            operacion.notificar()
+        
+        self.lotes += 1
+        self.operaciones += len(lote)
+    
+    def detener(self, timeout: float = 30) -> None:
+        """Persiste lo pendiente y detiene el thread."""
+        if not self._activo:
+            return
+        self._activo = False
+        self.cola.put(None)
+        self._thread.join(timeout)
+    
+    def estadisticas(self) -> Dict:
+        return {
+            'modo': self.modo,
+            'ventana_ms': self.ventana * 1000,
+            'lotes': self.lotes,
+            'operaciones': self.operaciones,
+            'errores': self.errores,
+            'pendientes': self.cola.qsize()
+        }
+
+
+# ============================================================================
+# FLASK APPLICATION SETUP (Sub-task 4.1)
+# ============================================================================
+
+# Crear aplicación Flask
+app = Flask(__name__, static_folder='../frontend', static_url_path='')
+
+# Configurar CORS para permitir peticiones desde el frontend
+CORS(app)
+
+# Variables globales para caché de datos
+# padron_usuarios (PadronUsuarios vigente, con sus índices) y usuarios_cache
+# (sus usuarios, solo lectura) se crean en la sección PADRÓN DE USUARIOS
+lock_padron = threading.Lock()  # Serializa la publicación de versiones del padrón
+indice_sugerencias = None  # IndiceSugerencias si SUGERENCIAS_DISTANCIA > 0
+indice_busqueda = None  # IndiceBusqueda del padrón, creado en la primera búsqueda
+lock_busqueda = threading.Lock()
+configuracion_cache = {}
+asistencias_cache = AsistenciasIndexadas()
+file_observer = None  # Observer para file watcher
+admin_tokens = {}  # Tokens de sesión administrativa: {token: expiration_time}
+
+# Estado compartido entre threads (waitress, gunicorn gthread). Cada
+# estructura tiene un único lock de escritura y solo se modifica a través
+# de las funciones indicadas; las lecturas no toman locks y leen la
+# variable global una sola vez por petición:
+# - padron_usuarios: versiones inmutables (lock_padron, ver PADRÓN DE USUARIOS)
+# - asistencias_cache: registrar_asistencia_cache (verificar duplicado y
+#   agregar es atómico), retirar_asistencia_cache, sincronizar_asistencias
+#   y el reinicio (lock_asistencias)
+# - configuracion_cache: se reemplaza completa, nunca se modifica en el
+#   lugar (lock_configuracion)
+# - admin_tokens y credenciales: registrar_token, revocar_token,
+#   limpiar_tokens_expirados y el cambio de contraseña (lock_tokens)
+# - archivos de datos: escribir_archivo_atomico serializa por ruta
+lock_asistencias = threading.Lock()
+lock_configuracion = threading.Lock()
+lock_tokens = threading.Lock()
+
+# Persistencia de asistencias: 'journal' (append-only) o 'json' (reescritura completa)
+MODO_ASISTENCIAS = os.environ.get('ASISTENCIAS_MODO', 'journal').lower()
+
+# Compactación del journal: umbrales de registros y bytes (0 = desactivado)
+COMPACTACION_REGISTROS = int(os.environ.get('COMPACTACION_REGISTROS', '5000'))
+COMPACTACION_BYTES = int(os.environ.get('COMPACTACION_BYTES', str(4 * 1024 * 1024)))
+
+# Demora con que se agrupan ediciones y bajas antes de reescribir usuarios.csv
+REESCRITURA_USUARIOS_MS = float(os.environ.get('USUARIOS_REESCRITURA_MS', '500'))
+
+# Sugerencias "¿quiso decir?" en validar-identidad: distancia de edición
+# máxima (1 o 2; 0 = desactivadas) y cantidad de nombres sugeridos
+DISTANCIA_SUGERENCIAS = min(int(os.environ.get('SUGERENCIAS_DISTANCIA', '0')), 2)
+MAX_SUGERENCIAS = int(os.environ.get('SUGERENCIAS_MAXIMO', '3'))
+
+# Precarga (gunicorn.conf.py con preload_app): el maestro carga los datos y
+# los workers los heredan por fork; los threads se inician en cada worker
+PRECARGA_WORKERS = os.environ.get('PRECARGA_WORKERS', 'false').lower() == 'true'
+
+# Padrón en memoria: 'registros' (lista de Usuario) o 'columnar' (TablaUsuarios).
+# Con precarga y varios workers conviene columnar: sus buffers no tienen
+# contadores de referencias que las lecturas de los workers modifiquen
+FORMATO_USUARIOS = os.environ.get('USUARIOS_FORMATO', 'registros').lower()
+
+# Backend de almacenamiento: 'archivos' (CSV/JSON) o 'sqlite'
+TIPO_ALMACENAMIENTO = os.environ.get('ALMACENAMIENTO', 'archivos').lower()
+almacenamiento = None  # Instancia de Almacenamiento creada en inicializar_datos
+reporte_recuperacion = []  # Archivos recuperados al arrancar
+
+# Persistencia diferida: 'durable', 'encolado' o 'sincrono' (sin thread)
+MODO_PERSISTENCIA = os.environ.get('PERSISTENCIA_MODO', 'durable').lower()
+VENTANA_PERSISTENCIA_MS = float(os.environ.get('PERSISTENCIA_VENTANA_MS', '10'))
+CAPACIDAD_COLA_PERSISTENCIA = int(os.environ.get('PERSISTENCIA_COLA', '10000'))
+persistidor = None  # PersistidorDiferido activo, o None en modo sincrono
+version_configuracion = None  # Versión de la configuración cargada en configuracion_cache
+generaciones = None  # GeneracionesCompartidas creada en inicializar_datos
+generaciones_vistas = {}  # Generación de cada conjunto ya incorporada por este worker
+lock_sincronizacion_usuarios = threading.Lock()
+
+# Servicios en segundo plano del proceso líder (un solo worker): intervalo
+# entre intentos de tomar el liderazgo y entre tareas de mantenimiento
+INTERVALO_MANTENIMIENTO_S = float(os.environ.get('MANTENIMIENTO_INTERVALO_S', '5'))
+servicios_lider = None  # ServiciosLider del proceso, creado en iniciar_servicios
+
+
+# ============================================================================
+# PADRÓN DE USUARIOS (VERSIONES INMUTABLES)
+# ============================================================================
+#
+# El padrón vigente es el PadronUsuarios publicado en padron_usuarios: los
+# usuarios junto con sus índices. Una versión publicada no se modifica nunca.
+# Cada alta, edición, baja o recarga arma una versión nueva (copia la
+# vigente, le aplica el cambio y, en una edición, reemplaza el registro por
+# uno nuevo) y la publica asignando padron_usuarios; quienes publican se
+# serializan con lock_padron. Cada petición lee padron_usuarios una sola vez
+# y trabaja con esa versión hasta responder, sin locks: una recarga del CSV
+# o una baja a mitad de petición no cambia lo que esa petición ve. Copiar
+# cuesta O(n) por cambio hecho desde el panel, que son pocos frente a las
+# lecturas.
+#
+# por_documento resuelve /api/validar-identidad y por_id las búsquedas por
+# userId (confirmación, altas, ediciones, bajas) en O(1). Con claves
+# repetidas apuntan al primer usuario de la lista, como la búsqueda lineal
+# que reemplazan. Con el padrón columnar (TablaUsuarios) los índices son los
+# de la propia tabla, y cada versión tiene su copia de la tabla.
+#
+# Con la lista de registros, una edición o una baja no recorre el padrón:
+# cada versión guarda el lugar de cada registro (su posición al reindexar,
+# las altas a continuación) y los lugares dados de baja desde entonces; la
+# posición actual es el lugar menos las bajas anteriores (bisect). Tras
+# muchas bajas los lugares se recalculan, en O(n) amortizado. Los usuarios
+# que repiten un documento o userId ya indexado se guardan aparte, en orden,
+# para que la baja del indexado pase la entrada al siguiente sin buscarlo.
+#
+# /api/validar-identidad tolera documentos escritos con separadores,
+# espacios, ceros a la izquierda o minúsculas ('1.234.567', '01234567'):
+# documentos_normalizados lleva la forma normalizada al documento exacto
+# registrado, y luego se busca en por_documento. Solo guarda los documentos
+# que cambian al normalizar (en el padrón habitual, ninguno). Si dos
+# documentos distintos del padrón se normalizan igual, la forma normalizada
+# es ambigua: se informa al cargar y solo se acepta el exacto.
+#
+# El índice de sugerencias (indice_sugerencias) es lo único compartido entre
+# versiones: lo actualizan quienes publican, con lock_padron tomado, y cada
+# documento que sugiere se verifica contra la versión de la petición.
+#
+# El conjunto de confirmados es el propio asistencias_cache
+# (AsistenciasIndexadas.contiene_usuario), que se reemplaza en cada reinicio.
+
+def indexar_por_campo(usuarios: List[Dict[str, str]], campo: str) -> Dict[str, Dict[str, str]]:
+    """
+    Construye un índice valor del campo → usuario.
+    
+    Args:
+        usuarios: Lista de usuarios en el orden del padrón
+        campo: 'documento' o 'userId'
+    
+    Returns:
+        Diccionario valor → usuario (el primero si hay repetidos)
+    """
+    indice = {}
+    for usuario in usuarios:
+        indice.setdefault(usuario[campo], usuario)
+    return indice
+
+
+_NO_ALFANUMERICO = re.compile(r'[\W_]+')
+
+
+def normalizar_documento(documento: str) -> str:
+    """
+    Forma normalizada de un documento: sin separadores ni espacios, sin ceros
+    a la izquierda y en mayúsculas. '01.234.567-k' → '1234567K'.
+    """
+    if documento.isdigit() and documento[0] != '0':
+        return documento  # Caso habitual: ya está normalizado
+    return _NO_ALFANUMERICO.sub('', documento).upper().lstrip('0')
+
+
+def indexar_documentos_normalizados(usuarios, por_documento) -> Tuple[Dict[str, str], Dict[str, List[str]]]:
+    """
+    Construye el índice de documentos normalizados de un padrón.
+    
+    Args:
+        usuarios: Usuarios del padrón
+        por_documento: Índice exacto documento → usuario del mismo padrón
+    
+    Returns:
+        Tupla (normalizado → documento exacto, normalizado → documentos ambiguos)
+    """
+    grupos = {}
+    for usuario in usuarios:
+        documento = usuario['documento']
+        normalizado = normalizar_documento(documento)
+        if normalizado and normalizado != documento:
+            grupos.setdefault(normalizado, set()).add(documento)
+    
+    normalizados, ambiguos = {}, {}
+    for normalizado, documentos in grupos.items():
+        if por_documento.get(normalizado) is not None:
+            documentos.add(normalizado)
+        if len(documentos) > 1:
+            ambiguos[normalizado] = sorted(documentos)
+        else:
+            normalizados[normalizado] = documentos.pop()
+    return normalizados, ambiguos
+
+
+def reportar_documentos_ambiguos(ambiguos: Dict[str, List[str]]) -> None:
+    if not ambiguos:
+        return
+    ejemplos = '; '.join(
+        f"{normalizado}: {', '.join(documentos)}" for normalizado, documentos in list(ambiguos.items())[:5]
+    )
+    print(f"⚠ {len(ambiguos)} documentos ambiguos al normalizar (se exigirá el documento exacto): {ejemplos}")
+
+
+class PadronUsuarios:
+    """
+    Una versión del padrón: los usuarios y sus índices.
+    
+    Una vez publicada en padron_usuarios no se modifica. Los métodos que
+    empiezan con _ solo se aplican a la copia (copiar()) que se está armando
+    para publicar la versión siguiente.
+    """
+    
+    __slots__ = ('version', 'origen', 'usuarios', 'por_documento', 'por_id',
+                 'documentos_normalizados', 'documentos_ambiguos',
+                 '_lugares', '_bajas', '_repetidos')
+    
+    CAMPOS_INDEXADOS = ('documento', 'userId')
+    
+    def __init__(self, usuarios=()):
+        """
+        Args:
+            usuarios: Usuarios (diccionarios o registros) o una TablaUsuarios,
+                que pasa a pertenecer a esta versión. Se guardan como
+                registros Usuario, o en una TablaUsuarios si se recibe una o
+                el formato configurado es 'columnar'.
+        """
+        if isinstance(usuarios, TablaUsuarios) or FORMATO_USUARIOS == 'columnar':
+            if not isinstance(usuarios, TablaUsuarios):
+                usuarios = TablaUsuarios(usuarios)
+            por_documento = usuarios.indice('documento')
+            por_id = usuarios.indice('userId')
+            self._lugares = self._bajas = self._repetidos = None
+        else:
+            usuarios = [Usuario.desde_dict(usuario) for usuario in usuarios]
+            if len({id(registro) for registro in usuarios}) < len(usuarios):
+                # Un mismo registro repetido: cada lugar necesita el suyo
+                usuarios = [Usuario(u.userId, u.documento, u.nombre) for u in usuarios]
+            por_documento = indexar_por_campo(usuarios, 'documento')
+            por_id = indexar_por_campo(usuarios, 'userId')
+            self._repetidos = {campo: {} for campo in self.CAMPOS_INDEXADOS}
+            if len(por_documento) < len(usuarios) or len(por_id) < len(usuarios):
+                for campo, indice in zip(self.CAMPOS_INDEXADOS, (por_documento, por_id)):
+                    for usuario in usuarios:
+                        if indice[usuario[campo]] is not usuario:
+                            self._repetidos[campo].setdefault(usuario[campo], []).append(usuario)
+        
+        self.version = 0  # Crece en cada publicación
+        self.origen = 0  # Versión del último reemplazo completo del que desciende
+        self.usuarios = usuarios
+        self.por_documento = por_documento
+        self.por_id = por_id
+        if self._repetidos is not None:
+            self._reindexar_lugares()
+        self.documentos_normalizados, self.documentos_ambiguos = \
+            indexar_documentos_normalizados(usuarios, por_documento)
+    
+    def __repr__(self) -> str:
+        return f"PadronUsuarios(version={self.version}, {len(self.usuarios)} usuarios)"
+    
+    def buscar_por_documento(self, documento: str) -> Optional[Dict[str, str]]:
+        """Retorna el usuario con ese documento, o None."""
+        return self.por_documento.get(documento)
+    
+    def buscar_por_id(self, user_id: str) -> Optional[Dict[str, str]]:
+        """Retorna el usuario con ese userId, o None."""
+        return self.por_id.get(user_id)
+    
+    def buscar_por_documento_normalizado(self, documento: str) -> Optional[Dict[str, str]]:
+        """
+        Retorna el usuario con ese documento tal como se escribió o, si no hay,
+        el único cuyo documento normalizado coincide. None si no hay o es ambiguo.
+        """
+        usuario = self.por_documento.get(documento)
+        if usuario is not None:
+            return usuario
+        
+        normalizado = normalizar_documento(documento)
+        if not normalizado or normalizado in self.documentos_ambiguos:
+            return None
+        return self.por_documento.get(self.documentos_normalizados.get(normalizado, normalizado))
+    
+    def mismos_usuarios(self, otro: 'PadronUsuarios') -> bool:
+        """Indica si ambas versiones tienen los mismos usuarios, en el mismo orden."""
+        if len(self.usuarios) != len(otro.usuarios):
+            return False
+        campos = lambda usuario: (usuario['userId'], usuario['documento'], usuario['nombre'])
+        return all(campos(a) == campos(b) for a, b in zip(self.usuarios, otro.usuarios))
+    
+    def copiar(self) -> 'PadronUsuarios':
+        """
+        Copia para armar la versión siguiente: contenedores propios con los
+        mismos registros (una edición los reemplaza en la copia).
+        """
+        copia = object.__new__(PadronUsuarios)
+        copia.version = self.version + 1
+        copia.origen = self.origen
+        if isinstance(self.usuarios, TablaUsuarios):
+            copia.usuarios = self.usuarios.copiar()
+            copia.por_documento = copia.usuarios.indice('documento')
+            copia.por_id = copia.usuarios.indice('userId')
+            copia._lugares = copia._bajas = copia._repetidos = None
+        else:
+            copia.usuarios = list(self.usuarios)
+            copia.por_documento = dict(self.por_documento)
+            copia.por_id = dict(self.por_id)
+            copia._lugares = dict(self._lugares)
+            copia._bajas = list(self._bajas)
+            # Las listas de repetidos no se modifican en el lugar: se reemplazan
+            copia._repetidos = {campo: dict(claves) for campo, claves in self._repetidos.items()}
+        copia.documentos_normalizados = dict(self.documentos_normalizados)
+        copia.documentos_ambiguos = dict(self.documentos_ambiguos)
+        return copia
+    
+    def _reindexar_lugares(self) -> None:
+        """Toma como lugar de cada registro su posición actual (sin bajas pendientes)."""
+        self._lugares = {id(registro): lugar for lugar, registro in enumerate(self.usuarios)}
+        self._bajas = []
+    
+    def _posicion(self, usuario: Dict[str, str]) -> int:
+        lugar = self._lugares[id(usuario)]
+        return lugar - bisect_left(self._bajas, lugar)
+    
+    def _agregar_a_indice(self, indice: Dict[str, Dict[str, str]], campo: str,
+                          usuario: Dict[str, str]) -> None:
+        """Indexa un registro ya ubicado; si otro tiene la clave, queda en repetidos en su orden."""
+        clave = usuario[campo]
+        if indice.setdefault(clave, usuario) is usuario:
+            return
+        
+        otros = self._repetidos[campo].get(clave, [])
+        lugar = self._lugares[id(usuario)]
+        antes = sum(1 for otro in otros if self._lugares[id(otro)] < lugar)
+        self._repetidos[campo][clave] = otros[:antes] + [usuario] + otros[antes:]
+    
+    def _quitar_de_indice(self, indice: Dict[str, Dict[str, str]], campo: str, clave: str,
+                          usuario: Dict[str, str]) -> None:
+        """Si el registro era el indexado, la entrada pasa al siguiente que repite la clave."""
+        repetidos = self._repetidos[campo]
+        otros = repetidos.get(clave, [])
+        if indice.get(clave) is usuario:
+            if not otros:
+                del indice[clave]
+                return
+            indice[clave], restantes = otros[0], otros[1:]
+        else:
+            restantes = [otro for otro in otros if otro is not usuario]
+        
+        if restantes:
+            repetidos[clave] = restantes
+        else:
+            repetidos.pop(clave, None)
+    
+    def _reemplazar_en_indice(self, indice: Dict[str, Dict[str, str]], campo: str,
+                              usuario: Dict[str, str], nuevo: Dict[str, str]) -> None:
+        """El registro nuevo ocupa la entrada del anterior, con la misma clave."""
+        clave = usuario[campo]
+        if indice.get(clave) is usuario:
+            indice[clave] = nuevo
+        elif clave in self._repetidos[campo]:
+            self._repetidos[campo][clave] = [
+                nuevo if otro is usuario else otro for otro in self._repetidos[campo][clave]
+            ]
+    
+    def _agregar(self, usuario: Dict[str, str]) -> Dict[str, str]:
+        """Agrega un usuario al final y retorna su registro."""
+        if isinstance(self.usuarios, TablaUsuarios):
+            registro = self.usuarios.append(usuario)  # La tabla lo indexa
+        else:
+            registro = Usuario.desde_dict(usuario)
+            self._lugares[id(registro)] = len(self.usuarios) + len(self._bajas)
+            self.usuarios.append(registro)
+            self._agregar_a_indice(self.por_documento, 'documento', registro)
+            self._agregar_a_indice(self.por_id, 'userId', registro)
+        self._indexar_normalizado(registro['documento'])
+        return registro
+    
+    def _quitar(self, usuario: Dict[str, str]) -> None:
+        """Quita un registro de esta versión. Si otro comparte su clave, pasa a ocupar la entrada."""
+        if isinstance(self.usuarios, TablaUsuarios):
+            self.usuarios.remove(usuario)  # La tabla lo desindexa
+        else:
+            posicion = self._posicion(usuario)
+            del self.usuarios[posicion]
+            insort(self._bajas, self._lugares.pop(id(usuario)))
+            self._quitar_de_indice(self.por_documento, 'documento', usuario['documento'], usuario)
+            self._quitar_de_indice(self.por_id, 'userId', usuario['userId'], usuario)
+            if len(self._bajas) > 64 + len(self.usuarios) // 8:
+                self._reindexar_lugares()
+        self._desindexar_normalizado(usuario['documento'])
+    
+    def _editar(self, usuario: Dict[str, str], documento: str, nombre: str) -> Dict[str, str]:
+        """Cambia documento y nombre de un registro de esta versión; retorna el que lo reemplaza."""
+        anterior = usuario['documento']
+        if isinstance(self.usuarios, TablaUsuarios):
+            usuario['documento'] = documento  # Fila de la copia: la tabla la reindexa
+            usuario['nombre'] = nombre
+            nuevo = usuario
+        else:
+            nuevo = Usuario(usuario['userId'], documento, nombre)
+            self.usuarios[self._posicion(usuario)] = nuevo
+            self._lugares[id(nuevo)] = self._lugares.pop(id(usuario))
+            self._reemplazar_en_indice(self.por_id, 'userId', usuario, nuevo)
+            if anterior == documento:
+                self._reemplazar_en_indice(self.por_documento, 'documento', usuario, nuevo)
+            else:
+                self._quitar_de_indice(self.por_documento, 'documento', anterior, usuario)
+                self._agregar_a_indice(self.por_documento, 'documento', nuevo)
+        if anterior != documento:
+            self._desindexar_normalizado(anterior)
+            self._indexar_normalizado(documento)
+        return nuevo
+    
+    def _documentos_con_normalizado(self, normalizado: str) -> set:
+        """Documentos exactos de esta versión cuya forma normalizada es esta."""
+        documentos = set(self.documentos_ambiguos.get(normalizado, ()))
+        if normalizado in self.documentos_normalizados:
+            documentos.add(self.documentos_normalizados[normalizado])
+        if self.por_documento.get(normalizado) is not None:
+            documentos.add(normalizado)
+        return documentos
+    
+    def _publicar_normalizado(self, normalizado: str, documentos: set) -> None:
+        era_ambiguo = normalizado in self.documentos_ambiguos
+        self.documentos_normalizados.pop(normalizado, None)
+        self.documentos_ambiguos.pop(normalizado, None)
+        if len(documentos) > 1:
+            self.documentos_ambiguos[normalizado] = sorted(documentos)
+            if not era_ambiguo:
+                reportar_documentos_ambiguos({normalizado: self.documentos_ambiguos[normalizado]})
+        elif documentos and normalizado not in documentos:
+            self.documentos_normalizados[normalizado] = documentos.pop()
+    
+    def _indexar_normalizado(self, documento: str) -> None:
+        normalizado = normalizar_documento(documento)
+        if indice_sugerencias is not None:
+            indice_sugerencias.agregar(normalizado)
+        if not normalizado or (
+            normalizado == documento
+            and normalizado not in self.documentos_normalizados
+            and normalizado not in self.documentos_ambiguos
+        ):
+            return
+        documentos = self._documentos_con_normalizado(normalizado)
+        documentos.add(documento)
+        self._publicar_normalizado(normalizado, documentos)
+    
+    def _desindexar_normalizado(self, documento: str) -> None:
+        """Se llama con el índice exacto ya actualizado (sin el usuario quitado)."""
+        normalizado = normalizar_documento(documento)
+        if not normalizado:
+            return
+        documentos = self._documentos_con_normalizado(normalizado)
+        if self.por_documento.get(documento) is None:
+            documentos.discard(documento)
+        if indice_sugerencias is not None and not documentos:
+            indice_sugerencias.quitar(normalizado)
+        self._publicar_normalizado(normalizado, documentos)
+
+
+padron_usuarios = PadronUsuarios()
+usuarios_cache = padron_usuarios.usuarios
+
+
+def _publicar_padron(padron: PadronUsuarios) -> None:
+    """Publica una versión del padrón. Se llama con lock_padron tomado."""
+    global padron_usuarios, usuarios_cache
+    
+    padron_usuarios = padron
+    usuarios_cache = padron.usuarios
+
+
+def reemplazar_usuarios(usuarios) -> None:
+    """
+    Publica un padrón nuevo (carga inicial o recarga del CSV). La versión y
+    sus índices se construyen antes de publicar: ninguna petición ve uno a
+    medio armar.
+    
+    Args:
+        usuarios: Usuarios (diccionarios o registros) o una TablaUsuarios
+    """
+    global indice_sugerencias
+    
+    padron = PadronUsuarios(usuarios)
+    sugerencias = None
+    if DISTANCIA_SUGERENCIAS > 0:
+        sugerencias = IndiceSugerencias(
+            DISTANCIA_SUGERENCIAS, (normalizar_documento(usuario['documento']) for usuario in padron.usuarios)
+        )
+    with lock_padron:
+        padron.version = padron.origen = padron_usuarios.version + 1
+        indice_sugerencias = sugerencias
+        _publicar_padron(padron)
+        asistentes_pendientes.reconstruir(padron.usuarios, asistencias_cache)
+    reportar_documentos_ambiguos(padron.documentos_ambiguos)
+
+
+def vaciar_padron() -> int:
+    """
+    Publica un padrón vacío.
+    
+    Returns:
+        Cantidad de usuarios que tenía el padrón reemplazado
+    """
+    with lock_padron:
+        total = len(padron_usuarios.usuarios)
+        _publicar_padron_vacio()
+    return total
+
+
+def _publicar_padron_vacio() -> None:
+    """Publica un padrón vacío. Se llama con lock_padron tomado."""
+    global indice_sugerencias
+    
+    padron = PadronUsuarios()
+    padron.version = padron.origen = padron_usuarios.version + 1
+    if indice_sugerencias is not None:
+        indice_sugerencias = IndiceSugerencias(DISTANCIA_SUGERENCIAS)
+    _publicar_padron(padron)
+    asistentes_pendientes.reconstruir((), asistencias_cache)
+
+
+def agregar_al_padron(usuarios) -> List[Dict[str, str]]:
+    """
+    Publica una versión con los usuarios agregados al final del padrón.
+    
+    Args:
+        usuarios: Usuarios nuevos; se omiten los que repiten un userId del
+            padrón o de un usuario anterior de la misma lista
+    
+    Returns:
+        Registros agregados, en orden
+    """
+    with lock_padron:
+        padron = padron_usuarios.copiar()
+        agregados = []
+        for usuario in usuarios:
+            if padron.buscar_por_id(usuario['userId']) is None:
+                agregados.append(padron._agregar(usuario))
+        if not agregados:
+            return []
+        _publicar_padron(padron)
+        for registro in agregados:
+            _actualizar_busqueda(padron.origen, None, registro)
+            asistentes_pendientes.agregar(registro['userId'], asistencias_cache)
+    return agregados
+
+
+def editar_en_padron(user_id: str, documento: str, nombre: str) -> Optional[Dict[str, str]]:
+    """
+    Publica una versión con el documento y el nombre del usuario cambiados.
+    El registro de la versión anterior no se modifica: se reemplaza.
+    
+    Returns:
+        Registro nuevo del usuario, o None si el userId no existe
+    """
+    with lock_padron:
+        if padron_usuarios.buscar_por_id(user_id) is None:
+            return None
+        padron = padron_usuarios.copiar()
+        usuario = padron.buscar_por_id(user_id)
+        anterior = registro_a_dict(usuario) if isinstance(usuario, FilaUsuario) else usuario
+        nuevo = padron._editar(usuario, documento, nombre)
+        _publicar_padron(padron)
+        _actualizar_busqueda(padron.origen, anterior, nuevo)
+    return nuevo
+
+
+def quitar_del_padron(user_id: str) -> Optional[Dict[str, str]]:
+    """
+    Publica una versión sin el usuario con ese userId.
+    
+    Returns:
+        Registro quitado, o None si el userId no existe
+    """
+    with lock_padron:
+        usuario = padron_usuarios.buscar_por_id(user_id)
+        if usuario is None:
+            return None
+        padron = padron_usuarios.copiar()
+        padron._quitar(padron.buscar_por_id(user_id))
+        _publicar_padron(padron)
+        _actualizar_busqueda(padron.origen, usuario, None)
+        if padron.buscar_por_id(user_id) is None:  # Sin otro usuario con el mismo userId
+            asistentes_pendientes.quitar(user_id)
+    return usuario
+
+
+def buscar_usuario_por_documento(documento: str) -> Optional[Dict[str, str]]:
+    """Retorna el usuario con ese documento en el padrón vigente, o None."""
+    return padron_usuarios.buscar_por_documento(documento)
+
+
+def buscar_usuario_por_id(user_id: str) -> Optional[Dict[str, str]]:
+    """Retorna el usuario con ese userId en el padrón vigente, o None."""
+    return padron_usuarios.buscar_por_id(user_id)
+
+
+def buscar_usuario_por_documento_normalizado(documento: str) -> Optional[Dict[str, str]]:
+    """Como PadronUsuarios.buscar_por_documento_normalizado, en el padrón vigente."""
+    return padron_usuarios.buscar_por_documento_normalizado(documento)
+
+
+# ============================================================================
+# ASISTENTES PENDIENTES
+# ============================================================================
+#
+# Durante el llamado a quórum la mesa necesita saber quién del padrón aún no
+# confirmó. asistentes_pendientes guarda esos userId y se mantiene en O(1)
+# por cada confirmación (propia o sincronizada de otro worker), alta y baja;
+# solo se recalcula completo al reemplazar el padrón o reiniciar las
+# asistencias. GET /api/asistencias/pendientes lo pagina sin recorrer el
+# padrón ni las asistencias.
+#
+# Las altas, bajas y recálculos se aplican con lock_padron tomado, así que
+# siguen el orden en que se publican las versiones del padrón. Una
+# confirmación se agrega a asistencias_cache antes de quitarse de los
+# pendientes, y las altas consultan asistencias_cache con el lock interno
+# tomado: ningún orden entre ambas deja a un confirmado como pendiente.
+
+LIMITE_PENDIENTES = 100
+LIMITE_PENDIENTES_MAXIMO = 1000
+
+
+class AsistentesPendientes:
+    """
+    userId del padrón que todavía no confirmaron asistencia, en el orden del
+    padrón (las altas, al final).
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pendientes = {}  # userId → None: conjunto que conserva el orden
+    
+    def __len__(self) -> int:
+        return len(self._pendientes)
+    
+    def reconstruir(self, usuarios, asistencias: 'AsistenciasIndexadas') -> None:
+        """Recalcula los pendientes de un padrón completo (O(n))."""
+        with self._lock:
+            self._pendientes = {
+                usuario['userId']: None for usuario in usuarios
+                if not asistencias.contiene_usuario(usuario['userId'])
+            }
+    
+    def agregar(self, user_id: str, asistencias: 'AsistenciasIndexadas') -> None:
+        """Alta en el padrón (o confirmación retirada): pendiente si no confirmó."""
+        with self._lock:
+            if not asistencias.contiene_usuario(user_id):
+                self._pendientes[user_id] = None
+    
+    def quitar(self, user_id: str) -> None:
+        """Confirmación, o baja del último usuario del padrón con ese userId."""
+        with self._lock:
+            self._pendientes.pop(user_id, None)
+    
+    def pagina(self, desde: int, limite: int) -> Tuple[List[str], int]:
+        """
+        Returns:
+            Tupla (userId de las posiciones desde..desde+limite, total de pendientes)
+        """
+        with self._lock:
+            return list(islice(self._pendientes, desde, desde + limite)), len(self._pendientes)
+
+
+asistentes_pendientes = AsistentesPendientes()
+
+
+def reconstruir_pendientes() -> None:
+    """Recalcula los pendientes del padrón vigente contra asistencias_cache."""
+    with lock_padron:
+        asistentes_pendientes.reconstruir(padron_usuarios.usuarios, asistencias_cache)
+
+
+def confirmar_pendiente(user_id: str) -> None:
+    """Se llama después de agregar la asistencia del usuario a asistencias_cache."""
+    asistentes_pendientes.quitar(user_id)
+
+
+def restaurar_pendiente(user_id: str) -> None:
+    """Se llama después de retirar una asistencia de asistencias_cache."""
+    with lock_padron:
+        if padron_usuarios.buscar_por_id(user_id) is not None:
+            asistentes_pendientes.agregar(user_id, asistencias_cache)
+
+
+def listar_pendientes(desde: int, limite: int) -> Tuple[List[Dict[str, str]], int]:
+    """
+    Página de usuarios pendientes de confirmar, con sus datos del padrón vigente.
+    
+    Returns:
+        Tupla (usuarios de la página, total de pendientes)
+    """
+    padron = padron_usuarios
+    user_ids, total = asistentes_pendientes.pagina(desde, limite)
+    usuarios = []
+    for user_id in user_ids:
+        usuario = padron.buscar_por_id(user_id)
+        if usuario is not None:
+            usuarios.append(registro_a_dict(usuario))
+    return usuarios, total
+
+
+# ============================================================================
+# SUGERENCIAS DE DOCUMENTO (BORRADO SIMÉTRICO)
+# ============================================================================
+#
+# Cuando validar-identidad no encuentra el documento, sugiere los usuarios
+# cuyo documento está a distancia de edición 1 o 2 del escrito (un dígito de
+# más, de menos, cambiado o dos dígitos invertidos). El índice de borrado
+# simétrico (SymSpell) guarda, para cada documento normalizado, todas las
+# variantes que resultan de borrarle hasta N caracteres; una consulta genera
+# las variantes del documento escrito y las busca en el diccionario, sin
+# recorrer el padrón. Los candidatos se verifican con la distancia real.
+#
+# Costo: un documento de 8 dígitos genera 9 variantes con N=1 y 37 con N=2,
+# por eso las sugerencias son opcionales (SUGERENCIAS_DISTANCIA). Solo se
+# responden nombres enmascarados, nunca documentos ni userId.
+
+def a_distancia_de_edicion(a: str, b: str, maximo: int) -> bool:
+    """
+    Indica si a y b están a distancia de edición <= maximo, contando como una
+    edición insertar, borrar o cambiar un carácter o invertir dos adyacentes.
+    Explora solo las ediciones posibles en el primer carácter distinto, lo
+    que para maximo <= 2 es mucho más rápido que la tabla completa.
+    """
+    if abs(len(a) - len(b)) > maximo:
+        return False
+    # Quitar prefijo y sufijo comunes
+    inicio = 0
+    limite = min(len(a), len(b))
+    while inicio < limite and a[inicio] == b[inicio]:
+        inicio += 1
+    fin_a, fin_b = len(a), len(b)
+    while fin_a > inicio and fin_b > inicio and a[fin_a - 1] == b[fin_b - 1]:
+        fin_a -= 1
+        fin_b -= 1
+    a, b = a[inicio:fin_a], b[inicio:fin_b]
+    
+    if not a or not b:
+        return len(a) + len(b) <= maximo
+    if maximo == 0:
+        return False
+    return (
+        a_distancia_de_edicion(a[1:], b[1:], maximo - 1)
+        or a_distancia_de_edicion(a[1:], b, maximo - 1)
+        or a_distancia_de_edicion(a, b[1:], maximo - 1)
+        or (len(a) > 1 and len(b) > 1 and a[0] == b[1] and a[1] == b[0]
+            and a_distancia_de_edicion(a[2:], b[2:], maximo - 1))
+    )
+
+
+def distancia_edicion(a: str, b: str, maximo: int) -> int:
+    """
+    Distancia de edición (con transposiciones adyacentes) entre a y b.
+    
+    Returns:
+        La distancia, o maximo + 1 si la supera
+    """
+    for distancia in range(maximo + 1):
+        if a_distancia_de_edicion(a, b, distancia):
+            return distancia
+    return maximo + 1
+
+
+class IndiceSugerencias:
+    """Índice de borrado simétrico sobre documentos normalizados."""
+    
+    def __init__(self, distancia_maxima: int, documentos=()):
+        """
+        Args:
+            distancia_maxima: Distancia de edición máxima de las sugerencias
+            documentos: Documentos normalizados iniciales ('' se ignora)
+        """
+        self.distancia_maxima = distancia_maxima
+        self._variantes_de = {}  # Variante → documento, o set si la comparten varios
+        for documento in documentos:
+            self.agregar(documento)
+    
+    def _variantes(self, documento: str) -> set:
+        return set().union(*self._variantes_por_nivel(documento))
+    
+    def _variantes_por_nivel(self, documento: str) -> List[set]:
+        """[{documento}, variantes con 1 borrado, con 2 borrados, ...]"""
+        niveles = [{documento}]
+        for _ in range(self.distancia_maxima):
+            niveles.append({v[:i] + v[i + 1:] for v in niveles[-1] for i in range(len(v))})
+        return niveles
+    
+    def agregar(self, documento: str) -> None:
+        if not documento:
+            return
+        for variante in self._variantes(documento):
+            actual = self._variantes_de.get(variante)
+            if actual is None:
+                self._variantes_de[variante] = documento
+            elif isinstance(actual, set):
+                actual.add(documento)
+            elif actual != documento:
+                self._variantes_de[variante] = {actual, documento}
+    
+    def quitar(self, documento: str) -> None:
+        if not documento:
+            return
+        for variante in self._variantes(documento):
+            actual = self._variantes_de.get(variante)
+            if actual == documento:
+                del self._variantes_de[variante]
+            elif isinstance(actual, set):
+                actual.discard(documento)
+                if len(actual) == 1:
+                    self._variantes_de[variante] = next(iter(actual))
+    
+    def clear(self) -> None:
+        self._variantes_de = {}
+    
+    def sugerir(self, documento: str, maximo: int) -> List[str]:
+        """
+        Documentos del índice a la menor distancia (1..distancia_maxima) a
+        la que haya alguno, como SymSpell en modo "closest".
+        """
+        niveles = self._variantes_por_nivel(documento)
+        candidatos = set()
+        for distancia in range(1, self.distancia_maxima + 1):
+            # Un documento a distancia d comparte con el consultado alguna
+            # variante de hasta d borrados del consultado
+            nuevas = niveles[distancia] if distancia > 1 else niveles[0] | niveles[1]
+            for variante in nuevas:
+                actual = self._variantes_de.get(variante)
+                if isinstance(actual, set):
+                    candidatos |= actual
+                elif actual is not None:
+                    candidatos.add(actual)
+            candidatos.discard(documento)
+            
+            encontrados = [c for c in candidatos if a_distancia_de_edicion(documento, c, distancia)]
+            if encontrados:
+                return sorted(encontrados)[:maximo]
+        return []
+
+
+def enmascarar_nombre(nombre: str) -> str:
+    """'Juan Pérez' → 'J*** P****'"""
+    return ' '.join(palabra[0] + '*' * (len(palabra) - 1) for palabra in nombre.split())
+
+
+def sugerir_nombres_por_documento(documento: str, padron: Optional[PadronUsuarios] = None) -> List[str]:
+    """
+    Nombres enmascarados de los usuarios con un documento parecido al dado
+    (vacío si las sugerencias están desactivadas).
+    
+    Args:
+        documento: Documento escrito, no encontrado en el padrón
+        padron: Versión del padrón de la petición (por defecto, la vigente)
+    """
+    sugerencias = indice_sugerencias
+    if sugerencias is None:
+        return []
+    normalizado = normalizar_documento(documento)
+    if not normalizado:
+        return []
+    if padron is None:
+        padron = padron_usuarios
+    
+    nombres = []
+    for candidato in sugerencias.sugerir(normalizado, MAX_SUGERENCIAS):
+        usuario = padron.buscar_por_documento_normalizado(candidato)
+        if usuario is not None:  # Los documentos ambiguos no se sugieren
+            nombres.append(enmascarar_nombre(usuario['nombre']))
+    return nombres
+
+
+# ============================================================================
+# BÚSQUEDA DE USUARIOS (ÍNDICE DE TRIGRAMAS)
+# ============================================================================
+#
+# GET /api/usuarios/buscar filtra el padrón en el servidor para que el panel
+# no descargue la lista completa. El índice lleva cada trigrama (y cada
+# prefijo de 1 y 2 caracteres de palabra, marcado con '^') de userId,
+# documento y nombre, sin tildes ni mayúsculas, al conjunto de userId que lo
+# contienen, y los textos ya normalizados de cada usuario. Una consulta
+# intersecta los conjuntos de sus términos y solo verifica y ordena esos
+# candidatos, sin volver a normalizar sus textos.
+#
+# Se construye en la primera búsqueda (los workers que no atienden el panel
+# no lo pagan) y, una vez creado, quienes publican versiones del padrón le
+# aplican sus altas, ediciones y bajas. Si el padrón se reemplaza (recarga
+# del CSV, vaciado), su origen cambia y el índice se reconstruye en la
+# siguiente búsqueda. A diferencia del padrón, se modifica en el lugar: las
+# búsquedas lo recorren con lock_busqueda tomado.
+
+LIMITE_BUSQUEDA = 50
+LIMITE_BUSQUEDA_MAXIMO = 200
+
+
+def normalizar_texto_busqueda(texto: str) -> str:
+    """'  José   PÉREZ ' → 'jose perez'"""
+    if not texto.isascii():
+        texto = ''.join(c for c in unicodedata.normalize('NFD', texto) if not unicodedata.combining(c))
+    return ' '.join(texto.casefold().split())
+
+
+def textos_busqueda_usuario(usuario: Dict[str, str]) -> Tuple[str, str, str, str]:
+    """(userId, documento, documento normalizado, nombre) en forma de búsqueda."""
+    documento = usuario['documento']
+    return (
+        normalizar_texto_busqueda(usuario['userId']),
+        normalizar_texto_busqueda(documento),
+        normalizar_documento(documento).casefold(),
+        normalizar_texto_busqueda(usuario['nombre'])
+    )
+
+
+def gramas_termino(termino: str) -> set:
+    """Claves del índice que debe contener un usuario que coincida con el término."""
+    if len(termino) < 3:
+        return {'^' + termino}
+    return {termino[i:i + 3] for i in range(len(termino) - 2)}
+
+
+class IndiceBusqueda:
+    """
+    Índice de trigramas y prefijos sobre un padrón. Cada usuario recibe un
+    número; las listas de cada grama son arrays de esos números (4 bytes por
+    entrada) y los textos normalizados se guardan unidos en un solo str.
+    """
+    
+    SEPARADOR = '\x1f'
+    
+    def __init__(self, usuarios, origen: int = 0):
+        """
+        Args:
+            usuarios: Usuarios a indexar
+            origen: PadronUsuarios.origen de la versión indexada, para
+                detectar que el padrón fue reemplazado
+        """
+        self.origen = origen
+        self.clear()
+        for usuario in usuarios:
+            self.agregar(usuario)
+    
+    def clear(self) -> None:
+        self._gramas = {}  # Trigrama o prefijo → array('i') de números
+        self._numeros = {}  # userId → número
+        self._ids = []  # Número → userId (None si se quitó)
+        self._textos = []  # Número → textos_busqueda_usuario() unidos
+    
+    @staticmethod
+    def _gramas_textos(textos: Tuple[str, ...]) -> set:
+        gramas = set()
+        for texto in textos:
+            for palabra in texto.split():
+                gramas.add('^' + palabra[:1])
+                gramas.add('^' + palabra[:2])
+            gramas.update(texto[i:i + 3] for i in range(len(texto) - 2))
+        return gramas
+    
+    def user_id(self, numero: int) -> str:
+        return self._ids[numero]
+    
+    def textos(self, numero: int) -> List[str]:
+        """(userId, documento, documento normalizado, nombre) normalizados."""
+        return self._textos[numero].split(self.SEPARADOR)
+    
+    def agregar(self, usuario: Dict[str, str]) -> None:
+        user_id = usuario['userId']
+        if user_id in self._numeros:
+            return  # userId repetido: las búsquedas por userId llevan al primero
+        
+        numero = len(self._ids)
+        textos = textos_busqueda_usuario(usuario)
+        self._numeros[user_id] = numero
+        self._ids.append(user_id)
+        self._textos.append(self.SEPARADOR.join(textos))
+        for grama in self._gramas_textos(textos):
+            numeros = self._gramas.get(grama)
+            if numeros is None:
+                self._gramas[grama] = array('i', (numero,))
+            else:
+                numeros.append(numero)
+    
+    def quitar(self, usuario: Dict[str, str]) -> None:
+        numero = self._numeros.pop(usuario['userId'], None)
+        if numero is None:
+            return
+        for grama in self._gramas_textos(self.textos(numero)):
+            numeros = self._gramas[grama]
+            numeros.remove(numero)
+            if not numeros:
+                del self._gramas[grama]
+        self._ids[numero] = None
+        self._textos[numero] = None
+    
+    def candidatos(self, terminos: List[str]) -> set:
+        """Números de los usuarios que contienen todas las claves de todos los términos."""
+        listas = []
+        for termino in terminos:
+            for grama in gramas_termino(termino):
+                numeros = self._gramas.get(grama)
+                if numeros is None:
+                    return set()
+                listas.append(numeros)
+        listas.sort(key=len)
+        resultado = set(listas[0])
+        for numeros in listas[1:]:
+            resultado.intersection_update(numeros)
+            if not resultado:
+                break
+        return resultado
+
+
+def _actualizar_busqueda(origen: int, anterior: Optional[Dict[str, str]], nuevo: Optional[Dict[str, str]]) -> None:
+    """
+    Refleja en el índice de búsqueda (si ya existe y es del mismo origen) un
+    alta (anterior None), una baja (nuevo None) o una edición. Se llama con
+    lock_padron tomado, tras publicar la versión con el cambio.
+    """
+    with lock_busqueda:
+        if indice_busqueda is None or indice_busqueda.origen != origen:
+            return
+        if anterior is not None:
+            indice_busqueda.quitar(anterior)
+        if nuevo is not None:
+            indice_busqueda.agregar(nuevo)
+
+
+def obtener_indice_busqueda() -> IndiceBusqueda:
+    """
+    Índice de búsqueda del padrón vigente; lo construye si falta o quedó viejo.
+    Se llama con lock_busqueda tomado.
+    """
+    global indice_busqueda
+    
+    # Se lee el padrón con el lock tomado: un cambio publicado antes se
+    # incluye al construir y, si además se aplica después, no tiene efecto
+    padron = padron_usuarios
+    if indice_busqueda is None or indice_busqueda.origen != padron.origen:
+        indice_busqueda = IndiceBusqueda(padron.usuarios, padron.origen)
+    return indice_busqueda
+
+
+def _puntaje_busqueda(terminos: List[str], textos: List[str]) -> Optional[int]:
+    """
+    0: userId o documento exactos; 1: un campo empieza con la consulta;
+    2: cada término empieza una palabra del nombre; 3: otra coincidencia.
+    None si algún término no aparece (los trigramas no garantizan el orden).
+    """
+    for termino in terminos:
+        if len(termino) >= 3 and not any(termino in texto for texto in textos):
+            return None
+    
+    consulta = ' '.join(terminos)
+    if consulta in textos[:3]:
+        return 0
+    if any(texto.startswith(consulta) for texto in textos):
+        return 1
+    palabras_nombre = textos[3].split()
+    if all(any(palabra.startswith(termino) for palabra in palabras_nombre) for termino in terminos):
+        return 2
+    return 3
+
+
+def buscar_usuarios(consulta: str, limite: int = LIMITE_BUSQUEDA) -> Tuple[List[Dict[str, str]], int]:
+    """
+    Busca usuarios por nombre, documento o userId.
+    
+    Args:
+        consulta: Texto buscado; cada palabra debe aparecer en algún campo
+            (las de 1 o 2 caracteres, como inicio de palabra)
+        limite: Cantidad máxima de resultados
+        
+    Returns:
+        Tupla (usuarios ordenados por relevancia y nombre, total de coincidencias)
+    """
+    terminos = normalizar_texto_busqueda(consulta).split()
+    if not terminos:
+        return [], 0
+    
+    padron = padron_usuarios
+    coincidencias = []
+    with lock_busqueda:
+        indice = obtener_indice_busqueda()
+        for numero in indice.candidatos(terminos):
+            textos = indice.textos(numero)
+            puntaje = _puntaje_busqueda(terminos, textos)
+            if puntaje is not None:
+                coincidencias.append((puntaje, textos[3], textos[0], indice.user_id(numero)))
+    
+    usuarios = []
+    for *_, user_id in heapq.nsmallest(limite, coincidencias):
+        usuario = padron.buscar_por_id(user_id)
+        if usuario is not None:
+            usuarios.append(registro_a_dict(usuario))
+    return usuarios, len(coincidencias)
+
+
+def listar_usuarios(desde: int, limite: int) -> Tuple[List[Dict[str, str]], int]:
+    """
+    Página del padrón vigente, en su orden, para la vista sin búsqueda.
+    
+    Returns:
+        Tupla (usuarios de las posiciones desde..desde+limite, total de usuarios)
+    """
+    padron = padron_usuarios
+    usuarios = [registro_a_dict(usuario) for usuario in islice(padron.usuarios, desde, desde + limite)]
+    return usuarios, len(padron.usuarios)
+
+
+def inicializar_datos(servicios: bool = True):
+    """
+    Carga inicial de datos al arrancar el servidor.
+    
+    Args:
+        servicios: Iniciar también los threads del proceso (iniciar_servicios).
+            Con precarga el maestro solo carga los datos y cada worker inicia
+            los suyos tras el fork.
+    """
+    global configuracion_cache, asistencias_cache, almacenamiento
+    global reporte_recuperacion, persistidor, version_configuracion
+    
+    # Persistir lo pendiente de una inicialización anterior
+    if persistidor is not None:
+        persistidor.detener()
+        persistidor = None
+    if almacenamiento is not None:
+        almacenamiento.vaciar_pendientes()
+    
+    # Recuperar archivos dañados por escrituras interrumpidas
+    try:
+        reporte_recuperacion = recuperar_datos()
+        for reporte in reporte_recuperacion:
+            print(f"⚠ Recuperación: {reporte}")
+    except Exception as e:
+        print(f"⚠ Error en recuperación de archivos: {e}")
+        reporte_recuperacion = [f"Error en recuperación: {e}"]
+    
+    almacenamiento = crear_almacenamiento(TIPO_ALMACENAMIENTO)
+    print(f"✓ Almacenamiento: {almacenamiento.tipo}")
+    iniciar_generaciones()
+    
+    try:
+        reemplazar_usuarios(almacenamiento.cargar_usuarios())
+        print(f"✓ Cargados {len(padron_usuarios.usuarios)} usuarios")
+    except Exception as e:
+        print(f"⚠ Error al cargar usuarios: {e}")
+        reemplazar_usuarios([])
+    
+    try:
+        version_configuracion = almacenamiento.version_configuracion()
+        configuracion_cache = almacenamiento.cargar_configuracion()
+        print(f"✓ Configuración cargada: Radio {configuracion_cache['radioPermitido']}m")
+    except Exception as e:
+        print(f"⚠ Error al cargar configuración: {e}")
+        configuracion_cache = {}
+    
+    try:
+        asistencias_cache = almacenamiento.cargar_asistencias_indexadas()
+        print(f"✓ Cargadas {len(asistencias_cache)} asistencias")
+    except Exception as e:
+        print(f"⚠ Error al cargar asistencias: {e}")
+        asistencias_cache = AsistenciasIndexadas()
+    reconstruir_pendientes()
+    
+    if servicios:
+        iniciar_servicios()
+
+
+def iniciar_servicios():
+    """
+    Inicia el trabajo en segundo plano del proceso: la persistencia diferida
+    y la elección del líder (ServiciosLider), que en un único worker
+    comprime los archivos de asistencias pendientes, observa usuarios.csv y
+    ejecuta el mantenimiento periódico.
+    """
+    global persistidor, servicios_lider
+    
+    if MODO_PERSISTENCIA != 'sincrono':
+        persistidor = PersistidorDiferido(
+            almacenamiento,
+            modo=MODO_PERSISTENCIA,
+            ventana_ms=VENTANA_PERSISTENCIA_MS,
+            capacidad=CAPACIDAD_COLA_PERSISTENCIA
+        )
+        print(f"✓ Persistencia diferida: modo {MODO_PERSISTENCIA}, ventana {VENTANA_PERSISTENCIA_MS}ms")
+    
+    # Una nueva inicialización en el mismo proceso conserva el líder vigente
+    if servicios_lider is None or not servicios_lider.esta_activo():
+        servicios_lider = ServiciosLider(
+            'data/lider.lock', asumir_liderazgo, mantenimiento_periodico, INTERVALO_MANTENIMIENTO_S
+        )
+        servicios_lider.iniciar()
+
+
+# ============================================================================
+# SERVICIOS EN SEGUNDO PLANO (PROCESO LÍDER)
+# ============================================================================
+#
+# Con N workers, cada uno observaba usuarios.csv y lo volvía a parsear en
+# cada cambio, y cada uno reanudaba la compresión de los mismos archivos de
+# asistencias. Ahora esas tareas las ejecuta un único worker, el líder: el
+# que tiene tomado un flock no bloqueante sobre data/lider.lock. Cada worker
+# intenta tomarlo cada INTERVALO_MANTENIMIENTO_S segundos; si el líder
+# termina o gunicorn lo reinicia, el sistema operativo libera el lock y otro
+# worker asume en el intervalo siguiente.
+#
+# El líder recarga el padrón cuando cambia usuarios.csv y, si el contenido
+# difiere del que tenían los workers, publica una nueva generación del padrón
+# (GeneracionesCompartidas): los demás lo releen desde el snapshot binario
+# que acaba de escribir el líder, sin volver a parsear el CSV. Los cambios
+# hechos desde el panel ya se replicaron por el registro de cambios, así que
+# la reescritura del archivo que los persiste no se vuelve a publicar.
+
+class ServiciosLider:
+    """
+    Elección de un proceso líder entre los workers por flock no bloqueante.
+    
+    Un thread por proceso intenta tomar el lock cada `intervalo` segundos. El
+    que lo obtiene lo conserva mientras vive, ejecuta al_asumir() una vez y
+    mantenimiento() en cada intervalo. En sistemas sin fcntl el proceso es
+    siempre el líder.
+    """
+    
+    def __init__(self, ruta_lock: str, al_asumir, mantenimiento, intervalo: float = 5.0):
+        """
+        Args:
+            ruta_lock: Archivo de lock (se crea si no existe; guarda el pid del líder)
+            al_asumir: Función a ejecutar al tomar el liderazgo
+            mantenimiento: Función a ejecutar en cada intervalo mientras se es líder
+            intervalo: Segundos entre intentos y entre mantenimientos
+        """
+        self.ruta_lock = ruta_lock
+        self.al_asumir = al_asumir
+        self.mantenimiento = mantenimiento
+        self.intervalo = intervalo
+        self.es_lider = False
+        self._descriptor = None
+        self._detener = threading.Event()
+        self._thread = threading.Thread(target=self._ejecutar, name='servicios-lider', daemon=True)
+    
+    def iniciar(self) -> None:
+        self._thread.start()
+    
+    def esta_activo(self) -> bool:
+        return self._thread.is_alive()
+    
+    def detener(self, timeout: Optional[float] = None) -> None:
+        """Detiene el thread y, si era líder, libera el lock para otro worker."""
+        self._detener.set()
+        if self._thread.is_alive():
+            self._thread.join(timeout)
+    
+    def _tomar_lock(self) -> bool:
+        if fcntl is None:
+            return True
+        directorio = os.path.dirname(self.ruta_lock)
+        if directorio:
+            os.makedirs(directorio, exist_ok=True)
+        descriptor = os.open(self.ruta_lock, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(descriptor, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(descriptor)
+            return False
+        os.ftruncate(descriptor, 0)
+        os.write(descriptor, f"{os.getpid()}\n".encode('ascii'))
+        self._descriptor = descriptor
+        return True
+    
+    def _soltar_lock(self) -> None:
+        if self._descriptor is not None:
+            fcntl.flock(self._descriptor, fcntl.LOCK_UN)
+            os.close(self._descriptor)
+            self._descriptor = None
+    
+    def _ejecutar(self) -> None:
+        while True:
+            try:
+                if self.es_lider:
+                    self.mantenimiento()
+                elif self._tomar_lock():
+                    self.es_lider = True
+                    self.al_asumir()
+            except Exception as e:
+                print(f"⚠ Error en servicios en segundo plano: {e}")
+            if self._detener.wait(self.intervalo):
+                break
+        self.es_lider = False
+        self._soltar_lock()
+
+
+def asumir_liderazgo():
+    """Al ser elegido líder: reanuda la compresión de archivos pendientes e inicia el file watcher."""
+    global file_observer
+    
+    print(f"✓ Worker {os.getpid()} a cargo de los servicios en segundo plano")
+    
+    # Archivos de eventos que quedaron sin comprimir
+    try:
+        almacenamiento.reanudar_archivado()
+    except Exception as e:
+        print(f"⚠ Error al reanudar archivos de asistencias: {e}")
+    
+    # Iniciar file watcher para usuarios.csv (Sub-task 9.1)
+    # Con SQLite el CSV no se mantiene, por lo que no se observa
+    if almacenamiento.tipo != 'archivos':
+        return
+    
+    try:
+        file_observer = iniciar_file_watcher()
+    except Exception as e:
+        print(f"⚠ Error al iniciar file watcher: {e}")
+        file_observer = None
+    
+    # Cambios del archivo anteriores a este líder
+    if os.path.exists(almacenamiento.ruta_usuarios):
+        recargar_y_publicar_usuarios()
+
+
+def mantenimiento_periodico():
+    """
+    Tareas del líder en cada intervalo: reinicia el file watcher si se
+    detuvo y, si no hay watcher (watchdog no disponible o el archivo no
+    existía al iniciar), revisa la firma de usuarios.csv.
+    """
+    global file_observer
+    
+    if almacenamiento is None or almacenamiento.tipo != 'archivos':
+        return
+    
+    if file_observer is not None and not file_observer.is_alive():
+        print("⚠ El file watcher se detuvo, reiniciando")
+        file_observer = iniciar_file_watcher()
+    
+    # El mismo archivo que observa iniciar_file_watcher
+    if file_observer is None and os.path.exists('data/usuarios.csv'):
+        recargar_y_publicar_usuarios()
+
+
+# ============================================================================
+# PRECARGA EN WORKERS (GUNICORN --preload)
+# ============================================================================
+#
+# Sin precarga cada worker importa este módulo y arma su propio padrón: la
+# memoria crece con la cantidad de workers. Con PRECARGA_WORKERS el maestro
+# de gunicorn importa el módulo una vez (preload_app en gunicorn.conf.py),
+# carga padrón, índices, configuración y asistencias sin iniciar threads, y
+# preparar_fork() deja esos objetos listos para compartir:
+#
+# - gc.freeze() los pasa a la generación permanente: el recolector de los
+#   workers no los recorre y no escribe en sus encabezados.
+# - El padrón columnar (USUARIOS_FORMATO=columnar, recomendado con
+#   precarga) guarda los textos y los índices en unos pocos buffers
+#   (bytearray/array): una búsqueda toca el contador de referencias de esos
+#   pocos objetos, no las páginas de los datos.
+#
+# Los workers heredan las páginas por copy-on-write y solo copian las que
+# modifican (altas y ediciones del padrón, asistencias nuevas). Cada worker
+# inicia sus threads en iniciar_worker() (hook post_fork), porque los
+# threads del maestro no sobreviven al fork. Un worker que gunicorn crea más
+# tarde para reemplazar a otro hereda los datos del arranque: antes de
+# atender incorpora lo que los demás persistieron desde entonces.
+
+def preparar_fork():
+    """
+    Deja el maestro listo para crear workers por fork, después de cargar los
+    datos: cierra la conexión SQLite del thread principal (una conexión no
+    debe usarse en dos procesos) y congela los objetos cargados.
+    """
+    if almacenamiento is not None:
+        almacenamiento.cerrar()
+    gc.freeze()
+    gc.enable()
+
+
+def iniciar_worker():
+    """
+    Prepara un worker recién creado por fork desde el maestro con precarga:
+    incorpora los cambios persistidos desde que el maestro cargó los datos e
+    inicia los threads del worker.
+    """
+    sincronizar_asistencias()
+    sincronizar_configuracion()
+    # usuarios.csv reescrito desde el arranque (lo publicado desde el panel
+    # llega además por las generaciones en la primera petición)
+    if almacenamiento is not None and almacenamiento.tipo == 'archivos':
+        recargar_usuarios()
+    iniciar_servicios()
+    print(f"✓ Worker {os.getpid()} listo con los datos precargados")
+
+
+def persistir(nombre: str, *argumentos, al_completar=None):
+    """
+    Persiste una modificación a través del persistidor diferido, o
+    directamente en el almacenamiento si la persistencia es síncrona.
+    
+    Args:
+        nombre: Método de Almacenamiento a invocar
+        argumentos: Argumentos del método
+        al_completar: En modo encolado, función (resultado, error) llamada
+            desde el thread del persistidor con el resultado real
+        
+    Returns:
+        Resultado de la operación (en modo encolado, siempre True)
+    """
+    if persistidor is None:
+        return getattr(almacenamiento, nombre)(*argumentos)
+    return persistidor.enviar(nombre, *argumentos, al_completar=al_completar)
+
+
+def detener_persistidor():
+    """Persiste las operaciones pendientes al terminar el proceso."""
+    if persistidor is not None:
+        persistidor.detener()
+    if almacenamiento is not None:
+        almacenamiento.vaciar_pendientes()
+
+
+atexit.register(detener_persistidor)
+
+
+def sincronizar_asistencias():
+    """
+    Incorpora al caché las asistencias que otros workers escribieron en el
+    almacenamiento compartido. Sin cambios externos solo cuesta un stat
+    (journal) o una consulta (SQLite).
+    """
+    global asistencias_cache
+    
+    if almacenamiento is None:
+        return
+    
+    # Leer y aplicar con el lock tomado: dos threads no aplican lotes
+    # consecutivos en desorden (p.ej. un reinicio después de lo que le sigue)
+    with lock_asistencias:
+        reiniciadas = False
+        for registro in almacenamiento.leer_cambios_asistencias():
+            if registro['op'] == 'reiniciar':
+                asistencias_cache = AsistenciasIndexadas()
+                reiniciadas = True
+            elif not asistencias_cache.contiene_usuario(registro['asistencia']['userId']):
+                asistencias_cache.append(registro['asistencia'])
+                confirmar_pendiente(registro['asistencia']['userId'])
+        if reiniciadas:
+            reconstruir_pendientes()
+
+
+def registrar_asistencia_cache(asistencia: Dict) -> bool:
+    """
+    Agrega una asistencia al caché si el usuario no tiene otra. La
+    verificación y el agregado son atómicos respecto de otros threads.
+    
+    Returns:
+        False si el usuario ya había confirmado
+    """
+    with lock_asistencias:
+        if asistencias_cache.contiene_usuario(asistencia['userId']):
+            return False
+        asistencias_cache.append(asistencia)
+    confirmar_pendiente(asistencia['userId'])
+    return True
 
 
-def validar_radio_positivo(radio: any) -> Tuple[bool, Optional[str], Optional[float]]:
+def retirar_asistencia_cache(asistencia: Dict):
     """
-    Valida que el radio permitido sea un número positivo.
-    
-    Args:
-        radio: Valor del radio a validar
-        
-    Returns:
-        Tupla (es_valido, mensaje_error, radio_float)
-        
-    Requirement: 4.6
+    Deshace el agregado optimista de una asistencia que no se pudo persistir.
+    Una sincronización concurrente pudo haber reemplazado el caché.
     """
-    if radio is None:
-        return False, "Radio permitido es requerido", None
+    with lock_asistencias:
+        if asistencia not in asistencias_cache:
+            return
+        asistencias_cache.remove(asistencia)
+    restaurar_pendiente(asistencia['userId'])
+
+
+def sincronizar_configuracion():
+    """Recarga la configuración si otro worker la modificó."""
+    global configuracion_cache, version_configuracion
     
-    # Validar tipo de dato
-    try:
-        radio_float = float(radio)
-    except (ValueError, TypeError):
-        return False, "Radio permitido debe ser un número válido", None
+    if almacenamiento is None:
+        return
     
-    # Validar que sea positivo
-    if radio_float <= 0:
-        return False, "Radio permitido debe ser un número positivo", None
+    version = almacenamiento.version_configuracion()
+    if version == version_configuracion:
+        return
     
-    return True, None, radio_float
+    with lock_configuracion:
+        if version == version_configuracion:
+            return  # Otro thread ya la recargó
+        try:
+            configuracion_cache = almacenamiento.cargar_configuracion()
+            version_configuracion = version
+        except (FileNotFoundError, ValueError) as e:
+            print(f"⚠ Error al recargar configuración: {e}")
 
 
 # ============================================================================
-# FILE WATCHER PARA USUARIOS.CSV (Sub-task 9.1)
+# INVALIDACIÓN ENTRE WORKERS (GENERACIONES COMPARTIDAS)
 # ============================================================================
+#
+# Cada worker tiene su propio padrón, configuración y asistencias en memoria.
+# Cuando un administrador cambia alguno, el worker que atendió la petición
+# lo persiste y luego incrementa la generación del conjunto en
+# data/generaciones.bin, un archivo pequeño que todos los workers mapean en
+# memoria (mmap): las páginas son las mismas para todos los procesos.
+#
+# Antes de cada petición, sincronizar_entre_workers() compara las
+# generaciones del archivo con las que el worker ya incorporó: es una lectura
+# de memoria, sin syscalls. Solo si alguna cambió se actualiza ese conjunto:
+#
+# - usuarios: el archivo guarda además los últimos cambios del padrón
+#   (altas de una petición, edición, baja o vaciado, con los datos de los
+#   usuarios) en un registro circular. El worker aplica todos los que le
+#   faltan a una sola copia de su padrón, sin leer el almacenamiento, y la
+#   publica una vez; si se atrasó más que la capacidad del registro, o el
+#   cambio fue una importación grande o una recarga, relee el padrón completo.
+# - configuracion: se relee (sincronizar_configuracion).
+# - asistencias: se incorporan los registros nuevos (sincronizar_asistencias).
+#
+# Las confirmaciones no incrementan la generación: los endpoints que leen
+# asistencias ya incorporan las de otros workers con sincronizar_asistencias.
+# Quien publica también aplica su propio cambio al incorporar el registro:
+# las operaciones son idempotentes y así todos los workers terminan con los
+# cambios en el mismo orden.
 
-class UsuariosCSVHandler(FileSystemEventHandler):
+class GeneracionesCompartidas:
     """
-    Handler para detectar cambios en el archivo usuarios.csv.
-    
-    Cuando el archivo cambia, recarga automáticamente la lista de usuarios.
+    Generación de cada conjunto de datos y últimos cambios del padrón, en un
+    archivo mapeado en memoria que comparten los workers.
     
-    Requirements: 4.3, 4.6
+    Formato: MAGIA, un contador uint64 por conjunto y CAPACIDAD_CAMBIOS
+    ranuras de TAMANO_CAMBIO bytes (generación uint64, largo uint16 y el
+    cambio en JSON). El cambio de la generación g ocupa la ranura g % CAPACIDAD_CAMBIOS.
+    Las ranuras alcanzan para las altas de una petición del panel; el
+    archivo se crea disperso y solo ocupan disco las ranuras escritas.
     """
     
-    def __init__(self, ruta_archivo: str):
+    CONJUNTOS = ('usuarios', 'configuracion', 'asistencias')
+    MAGIA = b'GENW0002'
+    CAPACIDAD_CAMBIOS = 256
+    TAMANO_CAMBIO = 8192
+    _RANURA = struct.Struct('<QH')
+    
+    def __init__(self, ruta_archivo: str = 'data/generaciones.bin'):
         """
-        Inicializa el handler con la ruta del archivo a observar.
-        
         Args:
-            ruta_archivo: Ruta completa al archivo usuarios.csv
+            ruta_archivo: Archivo compartido (se crea si no existe o si su
+                formato no corresponde)
         """
-        super().__init__()
-        self.ruta_archivo = os.path.abspath(ruta_archivo)
-        self.last_modified = 0
+        self.ruta_archivo = ruta_archivo
+        self._bloqueo = BloqueoEntreProcesos(ruta_archivo + '.lock')
+        self._contadores = struct.Struct(f'<{len(self.CONJUNTOS)}Q')
+        self._inicio_cambios = len(self.MAGIA) + self._contadores.size
+        tamano = self._inicio_cambios + self.CAPACIDAD_CAMBIOS * self.TAMANO_CAMBIO
+        
+        with self._bloqueo:
+            descriptor = os.open(ruta_archivo, os.O_RDWR | os.O_CREAT, 0o644)
+            with os.fdopen(descriptor, 'r+b') as archivo:
+                if archivo.read(len(self.MAGIA)) != self.MAGIA or os.fstat(descriptor).st_size != tamano:
+                    archivo.seek(0)
+                    archivo.truncate()
+                    archivo.write(self.MAGIA)
+                    archivo.truncate(tamano)
+                    archivo.flush()
+                self._mapa = mmap.mmap(descriptor, tamano)
     
-    def on_modified(self, event):
+    def leer(self) -> Tuple[int, ...]:
+        """Generaciones actuales, en el orden de CONJUNTOS (sin locks)."""
+        return self._contadores.unpack_from(self._mapa, len(self.MAGIA))
+    
+    def publicar(self, conjunto: str, cambio: Optional[Dict] = None) -> int:
         """
-        Callback cuando el archivo es modificado.
+        Incrementa la generación del conjunto.
         
         Args:
-            event: Evento del sistema de archivos
+            conjunto: Uno de CONJUNTOS
+            cambio: Para 'usuarios', el cambio que los demás deben aplicar;
+                None (o uno que no entra en la ranura) pide releer el padrón
+            
+        Returns:
+            La nueva generación
         """
-        # Verificar que sea el archivo que estamos observando
-        if event.is_directory:
-            return
-        
-        event_path = os.path.abspath(event.src_path)
-        if event_path != self.ruta_archivo:
-            return
-        
-        # Evitar múltiples recargas por el mismo cambio
-        # (algunos editores generan múltiples eventos)
-        import time
-        current_time = time.time()
-        if current_time - self.last_modified < 1:  # Ignorar si fue hace menos de 1 segundo
-            return
-        
-        self.last_modified = current_time
+        posicion = len(self.MAGIA) + 8 * self.CONJUNTOS.index(conjunto)
+        with self._bloqueo:
+            generacion = struct.unpack_from('<Q', self._mapa, posicion)[0] + 1
+            if conjunto == 'usuarios':
+                self._escribir_cambio(generacion, cambio)
+            struct.pack_into('<Q', self._mapa, posicion, generacion)
+        return generacion
+    
+    def cambios_usuarios(self, desde: int, hasta: int) -> Optional[List[Dict]]:
+        """
+        Cambios del padrón de las generaciones desde+1 .. hasta.
         
-        # Recargar usuarios
-        print(f"\n📝 Detectado cambio en {os.path.basename(self.ruta_archivo)}")
-        recargar_usuarios()
+        Returns:
+            Lista de cambios en orden, o None si alguno ya no está en el
+            registro o pide releer el padrón completo
+        """
+        if not 0 <= hasta - desde <= self.CAPACIDAD_CAMBIOS:
+            return None
+        cambios = []
+        for generacion in range(desde + 1, hasta + 1):
+            cambio = self._leer_cambio(generacion)
+            if cambio is None:
+                return None
+            cambios.append(cambio)
+        return cambios
+    
+    def _posicion_cambio(self, generacion: int) -> int:
+        return self._inicio_cambios + (generacion % self.CAPACIDAD_CAMBIOS) * self.TAMANO_CAMBIO
+    
+    def _escribir_cambio(self, generacion: int, cambio: Optional[Dict]) -> None:
+        datos = json.dumps(cambio, ensure_ascii=False).encode('utf-8') if cambio else b''
+        if len(datos) > self.TAMANO_CAMBIO - self._RANURA.size:
+            datos = b''
+        posicion = self._posicion_cambio(generacion)
+        # La ranura queda marcada como inválida mientras se escribe
+        self._RANURA.pack_into(self._mapa, posicion, 0, 0)
+        inicio = posicion + self._RANURA.size
+        self._mapa[inicio:inicio + len(datos)] = datos
+        self._RANURA.pack_into(self._mapa, posicion, generacion, len(datos))
+    
+    def _leer_cambio(self, generacion: int) -> Optional[Dict]:
+        posicion = self._posicion_cambio(generacion)
+        guardada, largo = self._RANURA.unpack_from(self._mapa, posicion)
+        inicio = posicion + self._RANURA.size
+        datos = self._mapa[inicio:inicio + largo]
+        # Si la ranura se reescribió mientras se leía, la generación ya no coincide
+        if guardada != generacion or self._RANURA.unpack_from(self._mapa, posicion)[0] != generacion:
+            return None
+        return json.loads(datos) if datos else None
 
 
-def recargar_usuarios():
+def iniciar_generaciones() -> None:
     """
-    Recarga la lista de usuarios desde el archivo CSV.
-    
-    Valida el formato al recargar y actualiza el caché global.
-    
-    Requirements: 4.3, 4.6
+    Abre el archivo de generaciones y toma las actuales como ya incorporadas.
+    Se llama antes de cargar los datos: lo que cambie durante la carga se
+    vuelve a aplicar en la primera petición.
     """
-    global usuarios_cache
+    global generaciones, generaciones_vistas
     
     try:
-        # Cargar usuarios desde CSV con validación
-        nuevos_usuarios = cargar_usuarios_csv()
-        
-        # Actualizar caché
-        usuarios_cache = nuevos_usuarios
-        
-        print(f"✓ Usuarios recargados exitosamente: {len(usuarios_cache)} usuarios")
-        
-    except FileNotFoundError as e:
-        print(f"⚠ Error: Archivo usuarios.csv no encontrado - {e}")
-    except ValueError as e:
-        print(f"⚠ Error de formato en CSV: {e}")
+        generaciones = GeneracionesCompartidas()
+        generaciones_vistas = dict(zip(GeneracionesCompartidas.CONJUNTOS, generaciones.leer()))
     except Exception as e:
-        print(f"⚠ Error al recargar usuarios: {e}")
+        print(f"⚠ Invalidación entre workers no disponible: {e}")
+        generaciones = None
+        generaciones_vistas = {}
 
 
-def iniciar_file_watcher():
+def publicar_cambio(conjunto: str, cambio: Optional[Dict] = None) -> None:
     """
-    Inicia el observador de archivos para usuarios.csv.
+    Avisa a los demás workers que cambió un conjunto de datos. Se llama
+    después de persistir el cambio; un error no hace fallar la petición.
     
-    El observador corre en un thread separado y detecta cambios automáticamente.
-    
-    Requirements: 4.3, 4.6
+    Args:
+        conjunto: 'usuarios', 'configuracion' o 'asistencias'
+        cambio: Para 'usuarios', {'op': 'agregar', 'usuarios': [{...}, ...]},
+            {'op': 'editar', 'usuario': {...}}, {'op': 'quitar', 'userId': ...}
+            o {'op': 'vaciar'}; None para que los demás relean el padrón completo
     """
-    ruta_csv = 'data/usuarios.csv'
-    
-    # Verificar que el archivo existe
-    if not os.path.exists(ruta_csv):
-        print(f"⚠ Advertencia: {ruta_csv} no existe, file watcher no iniciado")
-        return None
-    
+    if generaciones is None:
+        return
     try:
-        # Crear handler y observer
-        event_handler = UsuariosCSVHandler(ruta_csv)
-        observer = Observer()
-        
-        # Observar el directorio que contiene el archivo
-        directorio = os.path.dirname(os.path.abspath(ruta_csv))
-        observer.schedule(event_handler, directorio, recursive=False)
-        
-        # Iniciar observer en thread separado
-        observer.start()
-        
-        print(f"✓ File watcher iniciado para {ruta_csv}")
-        
-        return observer
+        generaciones.publicar(conjunto, cambio)
     except Exception as e:
-        # Si hay error con watchdog (ej: Python 3.13 threading issues),
-        # usar polling como fallback
-        print(f"⚠ File watcher no disponible: {e}")
-        print("ℹ Usar endpoint POST /api/reload-usuarios para recarga manual")
-        print("ℹ O editar usuarios desde la interfaz administrativa")
-        return None
+        print(f"⚠ Error al publicar cambio de {conjunto}: {e}")
 
 
-# ============================================================================
-# FLASK APPLICATION SETUP (Sub-task 4.1)
-# ============================================================================
+def publicar_altas(usuarios: List[Dict[str, str]]) -> None:
+    """
+    Publica las altas de una petición como un solo cambio. Si no entran en
+    una ranura del registro, los demás workers releen el padrón.
+    """
+    publicar_cambio('usuarios', {'op': 'agregar', 'usuarios': [registro_a_dict(usuario) for usuario in usuarios]})
 
-# Crear aplicación Flask
-app = Flask(__name__, static_folder='../frontend', static_url_path='')
 
-# Configurar CORS para permitir peticiones desde el frontend
-CORS(app)
+def aplicar_cambios_al_padron(cambios: List[Dict]) -> None:
+    """
+    Aplica al padrón cambios publicados por los workers (también los propios:
+    los que el padrón ya refleja no tienen efecto).
+    
+    Todos se aplican sobre una sola copia del padrón, que se publica una
+    vez; un vaciado publica en ese punto lo acumulado y el padrón vacío.
+    
+    Args:
+        cambios: Cambios del registro circular, en orden
+    """
+    with lock_padron:
+        padron = None  # Copia en armado, desde el primer cambio con efecto
+        efectos = []  # (anterior, nuevo, quitar de pendientes) de cada cambio aplicado
+        
+        def copia():
+            nonlocal padron
+            if padron is None:
+                padron = padron_usuarios.copiar()
+            return padron
+        
+        for cambio in cambios:
+            operacion = cambio['op']
+            vigente = padron_usuarios if padron is None else padron
+            if operacion == 'agregar':
+                for usuario in cambio['usuarios']:
+                    if vigente.buscar_por_id(usuario['userId']) is None:
+                        vigente = copia()
+                        efectos.append((None, padron._agregar(usuario), False))
+            elif operacion == 'editar':
+                usuario = cambio['usuario']
+                actual = vigente.buscar_por_id(usuario['userId'])
+                if actual is not None and (actual['documento'], actual['nombre']) != (usuario['documento'], usuario['nombre']):
+                    actual = copia().buscar_por_id(usuario['userId'])
+                    anterior = registro_a_dict(actual) if isinstance(actual, FilaUsuario) else actual
+                    efectos.append((anterior, padron._editar(actual, usuario['documento'], usuario['nombre']), False))
+            elif operacion == 'quitar':
+                if vigente.buscar_por_id(cambio['userId']) is not None:
+                    actual = copia().buscar_por_id(cambio['userId'])
+                    anterior = registro_a_dict(actual) if isinstance(actual, FilaUsuario) else actual
+                    padron._quitar(actual)
+                    # Sin otro usuario con el mismo userId
+                    efectos.append((anterior, None, padron.buscar_por_id(cambio['userId']) is None))
+            elif operacion == 'vaciar':
+                _publicar_cambios_padron(padron, efectos)
+                padron, efectos = None, []
+                if len(padron_usuarios.usuarios) > 0:
+                    _publicar_padron_vacio()
+        _publicar_cambios_padron(padron, efectos)
 
-# Variables globales para caché de datos
-usuarios_cache = []
-configuracion_cache = {}
-asistencias_cache = []
-file_observer = None  # Observer para file watcher
-admin_tokens = {}  # Tokens de sesión administrativa: {token: expiration_time}
+
+def _publicar_cambios_padron(padron: Optional[PadronUsuarios], efectos: List[tuple]) -> None:
+    """Publica la copia armada por aplicar_cambios_al_padron y refleja sus cambios (con lock_padron tomado)."""
+    if padron is None:
+        return
+    _publicar_padron(padron)
+    for anterior, nuevo, quitar_pendiente in efectos:
+        _actualizar_busqueda(padron.origen, anterior, nuevo)
+        if anterior is None:
+            asistentes_pendientes.agregar(nuevo['userId'], asistencias_cache)
+        elif quitar_pendiente:
+            asistentes_pendientes.quitar(anterior['userId'])
+
+
+def sincronizar_usuarios(generacion: int) -> None:
+    """Incorpora los cambios del padrón publicados hasta la generación dada."""
+    with lock_sincronizacion_usuarios:
+        vista = generaciones_vistas['usuarios']
+        if generacion == vista:
+            return  # Otro thread ya los incorporó
+        cambios = generaciones.cambios_usuarios(vista, generacion)
+        if cambios is None:
+            # Escribir antes los cambios propios diferidos: la recarga los
+            # incluye. Si no se pudo recargar, se reintenta en la próxima petición
+            try:
+                almacenamiento.vaciar_pendientes()
+            except Exception as e:
+                print(f"⚠ Error al escribir los cambios de usuarios pendientes: {e}")
+                return
+            if not recargar_usuarios(forzar=True):
+                return
+        else:
+            aplicar_cambios_al_padron(cambios)
+        generaciones_vistas['usuarios'] = generacion
 
 
-def inicializar_datos():
+def hay_cambios_entre_workers() -> bool:
     """
-    Carga inicial de datos al arrancar el servidor.
+    Indica si otro worker publicó cambios que este aún no incorporó. Solo
+    lee memoria (sin locks ni syscalls): el punto de entrada ASGI la usa
+    en el event loop para decidir si sincronizar en el pool de threads.
     """
-    global usuarios_cache, configuracion_cache, asistencias_cache, file_observer
-    
-    try:
-        usuarios_cache = cargar_usuarios_csv()
-        print(f"✓ Cargados {len(usuarios_cache)} usuarios desde CSV")
-    except Exception as e:
-        print(f"⚠ Error al cargar usuarios: {e}")
-        usuarios_cache = []
-    
-    try:
-        configuracion_cache = cargar_configuracion()
-        print(f"✓ Configuración cargada: Radio {configuracion_cache['radioPermitido']}m")
-    except Exception as e:
-        print(f"⚠ Error al cargar configuración: {e}")
-        configuracion_cache = {}
-    
-    try:
-        asistencias_cache = cargar_asistencias()
-        print(f"✓ Cargadas {len(asistencias_cache)} asistencias")
-    except Exception as e:
-        print(f"⚠ Error al cargar asistencias: {e}")
-        asistencias_cache = []
+    if generaciones is None:
+        return False
+    return generaciones.leer() != tuple(generaciones_vistas[conjunto] for conjunto in GeneracionesCompartidas.CONJUNTOS)
+
+
+@app.before_request
+def sincronizar_entre_workers():
+    """Incorpora lo que otros workers cambiaron, si cambió alguna generación."""
+    if generaciones is None:
+        return
     
-    # Iniciar file watcher para usuarios.csv (Sub-task 9.1)
-    try:
-        file_observer = iniciar_file_watcher()
-    except Exception as e:
-        print(f"⚠ Error al iniciar file watcher: {e}")
-        file_observer = None
+    usuarios, configuracion, asistencias = generaciones.leer()
+    if usuarios != generaciones_vistas['usuarios']:
+        sincronizar_usuarios(usuarios)
+    if configuracion != generaciones_vistas['configuracion']:
+        sincronizar_configuracion()
+        generaciones_vistas['configuracion'] = configuracion
+    if asistencias != generaciones_vistas['asistencias']:
+        sincronizar_asistencias()
+        generaciones_vistas['asistencias'] = asistencias
 
 
 @app.route('/')
@@ -608,11 +5665,17 @@ def health_check():
     """
     Health check endpoint para Railway y otros servicios de monitoreo.
     """
+    padron = padron_usuarios
     return jsonify({
         'status': 'healthy',
         'service': 'Sistema de Asistencia a Asambleas',
-        'usuarios_cargados': len(usuarios_cache),
-        'asistencias_registradas': len(asistencias_cache)
+        'usuarios_cargados': len(padron.usuarios),
+        'documentos_ambiguos': len(padron.documentos_ambiguos),
+        'asistencias_registradas': len(asistencias_cache),
+        'recuperacion': reporte_recuperacion,
+        'persistencia': persistidor.estadisticas() if persistidor else {'modo': 'sincrono'},
+        'compactacion': almacenamiento.journal.estadisticas()
+            if isinstance(almacenamiento, AlmacenamientoArchivos) else None
     }), 200
 
 
@@ -671,29 +5734,36 @@ def validar_token(token: str) -> bool:
     Returns:
         True si el token es válido, False en caso contrario
     """
-    if token not in admin_tokens:
+    expiracion = admin_tokens.get(token)
+    if expiracion is None:
         return False
     
     # Verificar si el token ha expirado
-    if datetime.now() > admin_tokens[token]:
+    if datetime.now() > expiracion:
         # Token expirado, eliminarlo
-        del admin_tokens[token]
+        revocar_token(token)
         return False
     
     return True
 
 
+def registrar_token(token: str, expiracion: datetime) -> None:
+    with lock_tokens:
+        admin_tokens[token] = expiracion
+
+
+def revocar_token(token: str) -> None:
+    with lock_tokens:
+        admin_tokens.pop(token, None)
+
+
 def limpiar_tokens_expirados():
     """Elimina tokens expirados del diccionario."""
-    tokens_a_eliminar = []
     ahora = datetime.now()
-    
-    for token, expiracion in admin_tokens.items():
-        if ahora > expiracion:
-            tokens_a_eliminar.append(token)
-    
-    for token in tokens_a_eliminar:
-        del admin_tokens[token]
+    with lock_tokens:
+        tokens_a_eliminar = [token for token, expiracion in admin_tokens.items() if ahora > expiracion]
+        for token in tokens_a_eliminar:
+            del admin_tokens[token]
 
 
 def requiere_autenticacion(f):
@@ -780,7 +5850,7 @@ def admin_login():
             }), 400
         
         # Cargar credenciales
-        credenciales = cargar_credenciales_admin()
+        credenciales = almacenamiento.cargar_credenciales()
         
         # Validar credenciales
         if username == credenciales['username'] and password == credenciales['password']:
@@ -789,7 +5859,7 @@ def admin_login():
             
             # Token válido por 8 horas
             expiracion = datetime.now() + timedelta(hours=8)
-            admin_tokens[token] = expiracion
+            registrar_token(token, expiracion)
             
             return jsonify({
                 'success': True,
@@ -829,8 +5899,7 @@ def admin_logout():
         token = auth_header.split(' ')[1]
         
         # Eliminar token
-        if token in admin_tokens:
-            del admin_tokens[token]
+        revocar_token(token)
         
         return jsonify({
             'success': True,
@@ -910,25 +5979,27 @@ def cambiar_password():
                 'mensaje': 'La nueva contraseña debe tener al menos 6 caracteres'
             }), 400
         
-        # Cargar credenciales actuales
-        credenciales = cargar_credenciales_admin()
-        
-        # Verificar contraseña actual
-        if password_actual != credenciales['password']:
-            return jsonify({
-                'success': False,
-                'mensaje': 'La contraseña actual es incorrecta'
-            }), 401
-        
-        # Actualizar contraseña
-        credenciales['password'] = password_nueva
-        
-        # Guardar en archivo
-        with open('data/admin_credentials.json', 'w', encoding='utf-8') as archivo:
-            json.dump(credenciales, archivo, indent=2, ensure_ascii=False)
-        
-        # Invalidar todos los tokens existentes (forzar re-login)
-        admin_tokens.clear()
+        # Con lock_tokens tomado: dos cambios simultáneos no pueden partir
+        # ambos de la contraseña anterior
+        with lock_tokens:
+            # Cargar credenciales actuales
+            credenciales = almacenamiento.cargar_credenciales()
+            
+            # Verificar contraseña actual
+            if password_actual != credenciales['password']:
+                return jsonify({
+                    'success': False,
+                    'mensaje': 'La contraseña actual es incorrecta'
+                }), 401
+            
+            # Actualizar contraseña
+            credenciales['password'] = password_nueva
+            
+            # Guardar credenciales
+            almacenamiento.guardar_credenciales(credenciales)
+            
+            # Invalidar todos los tokens existentes (forzar re-login)
+            admin_tokens.clear()
         
         return jsonify({
             'success': True,
@@ -943,121 +6014,127 @@ def cambiar_password():
 
 
 # ============================================================================
-# API ENDPOINTS
+# LÓGICA DE LOS ENDPOINTS PÚBLICOS
 # ============================================================================
+#
+# Validar identidad, confirmar asistencia y consultar la configuración son
+# las peticiones que hace cada asistente desde su teléfono. Las atienden
+# tanto las vistas de Flask como el punto de entrada ASGI (backend/asgi.py),
+# y ambos deben responder exactamente el mismo JSON: por eso la lógica vive
+# en funciones que retornan (respuesta, código HTTP) sin depender de cómo
+# llegó la petición. Reciben leer_datos, que retorna el cuerpo ya
+# decodificado, para que un JSON inválido produzca el mismo error 500 en los
+# dos servidores.
+#
+# Confirmar asistencia se separa en dos pasos: evaluar_confirmacion() decide
+# y reserva la asistencia en memoria, y persistir_confirmacion() la escribe
+# en disco. Flask los ejecuta seguidos en el thread de la petición; ASGI
+# ejecuta el segundo en un pool de threads para no detener el event loop
+# mientras espera al disco.
 
-@app.route('/api/validar-identidad', methods=['POST'])
-def validar_identidad():
+
+def procesar_validacion_identidad(leer_datos: Callable[[], Optional[Dict]]) -> Tuple[Dict, int]:
     """
-    Endpoint POST /api/validar-identidad
-    
-    Valida las credenciales de un usuario contra la base de datos usando solo el documento.
+    Valida las credenciales de un usuario usando solo el documento.
     
-    Request Body:
-        {
-            "documento": "string"
-        }
-    
-    Response:
-        {
-            "valido": boolean,
-            "nombre": "string" (solo si válido),
-            "userId": "string" (solo si válido)
-        }
+    Args:
+        leer_datos: Función sin argumentos que retorna el cuerpo de la petición
     
-    Requirements: 1.1, 1.2, 1.3, 1.4, 4.6
+    Returns:
+        Tuple[Dict, int]: (respuesta, código HTTP) de POST /api/validar-identidad
     """
     try:
         # Obtener datos del request
-        datos = request.get_json()
+        datos = leer_datos()
         
         if not datos:
-            return jsonify({
+            return {
                 'valido': False,
                 'error': 'No se recibieron datos'
-            }), 400
+            }, 400
         
         # Validar que documento esté presente (Requirements 1.4, 4.6)
         documento = datos.get('documento')
         es_valido, mensaje_error = validar_campo_requerido(documento, 'documento')
         
         if not es_valido:
-            return jsonify({
+            return {
                 'valido': False,
                 'error': mensaje_error
-            }), 400
+            }, 400
         
         documento = documento.strip()
         
-        # Buscar usuario en lista cargada desde CSV (Requirement 1.1)
-        usuario_encontrado = None
-        for usuario in usuarios_cache:
-            if usuario['documento'] == documento:
-                usuario_encontrado = usuario
-                break
+        # Buscar usuario en lista cargada desde CSV (Requirement 1.1),
+        # tolerando separadores, ceros a la izquierda y minúsculas. Toda la
+        # petición usa la misma versión del padrón.
+        padron = padron_usuarios
+        usuario_encontrado = padron.buscar_por_documento_normalizado(documento)
         
         # Retornar resultado (Requirements 1.2, 1.3)
         if usuario_encontrado:
-            return jsonify({
+            return {
                 'valido': True,
                 'nombre': usuario_encontrado['nombre'],
                 'userId': usuario_encontrado['userId']
-            }), 200
+            }, 200
         else:
-            return jsonify({
-                'valido': False
-            }), 200
+            respuesta = {'valido': False}
+            
+            # "¿Quiso decir?": nombres enmascarados de documentos parecidos
+            sugerencias = sugerir_nombres_por_documento(documento, padron)
+            if sugerencias:
+                respuesta['sugerencias'] = sugerencias
+            return respuesta, 200
             
     except Exception as e:
-        return jsonify({
+        return {
             'valido': False,
             'error': f'Error del servidor: {str(e)}'
-        }), 500
+        }, 500
 
 
-@app.route('/api/confirmar-asistencia', methods=['POST'])
-def confirmar_asistencia():
+def _error_confirmacion(e: Exception) -> Tuple[Dict, int]:
+    """Respuesta de POST /api/confirmar-asistencia ante un error inesperado."""
+    return {
+        'confirmado': False,
+        'mensaje': f'Error del servidor: {str(e)}',
+        'distancia': None
+    }, 500
+
+
+def evaluar_confirmacion(leer_datos: Callable[[], Optional[Dict]]) -> Tuple[Dict, int, Optional[Dict]]:
     """
-    Endpoint POST /api/confirmar-asistencia
-    
-    Confirma la asistencia de un usuario validando su ubicación.
-    
-    Request Body:
-        {
-            "userId": "string",
-            "latitud": number,
-            "longitud": number
-        }
+    Valida una confirmación de asistencia y, si procede, la registra en memoria.
     
-    Response:
-        {
-            "confirmado": boolean,
-            "mensaje": "string",
-            "distancia": number
-        }
+    Args:
+        leer_datos: Función sin argumentos que retorna el cuerpo de la petición
     
-    Requirements: 2.2, 2.3, 2.4, 3.1, 3.3, 3.4, 4.6
+    Returns:
+        Tuple[Dict, int, Optional[Dict]]: (respuesta, código HTTP, asistencia).
+            Si asistencia no es None quedó registrada en el caché y falta
+            persistirla con persistir_confirmacion(), que da la respuesta final.
     """
     try:
         # Obtener datos del request
-        datos = request.get_json()
+        datos = leer_datos()
         
         if not datos:
-            return jsonify({
+            return {
                 'confirmado': False,
                 'mensaje': 'No se recibieron datos',
                 'distancia': None
-            }), 400
+            }, 400, None
         
         # Validar campo userId requerido (Requirement 4.6)
         user_id = datos.get('userId')
         es_valido, mensaje_error = validar_campo_requerido(user_id, 'userId')
         if not es_valido:
-            return jsonify({
+            return {
                 'confirmado': False,
                 'mensaje': mensaje_error,
                 'distancia': None
-            }), 400
+            }, 400, None
         
         user_id = user_id.strip()
         
@@ -1067,33 +6144,39 @@ def confirmar_asistencia():
         
         es_valido, mensaje_error, coordenadas = validar_coordenadas(latitud, longitud)
         if not es_valido:
-            return jsonify({
+            return {
                 'confirmado': False,
                 'mensaje': mensaje_error,
                 'distancia': None
-            }), 400
+            }, 400, None
         
         latitud, longitud = coordenadas
         
-        # Verificar que no exista registro duplicado (Requirement 3.3)
-        for asistencia in asistencias_cache:
-            if asistencia['userId'] == user_id:
-                return jsonify({
-                    'confirmado': False,
-                    'mensaje': 'Ya has confirmado tu asistencia anteriormente',
-                    'distancia': None
-                }), 200
+        # Incorporar lo registrado por otros workers
+        sincronizar_asistencias()
+        sincronizar_configuracion()
+        
+        # Verificar que no exista registro duplicado (Requirement 3.3). Es
+        # una verificación temprana: la definitiva es atómica al registrar.
+        if asistencias_cache.contiene_usuario(user_id):
+            return {
+                'confirmado': False,
+                'mensaje': 'Ya has confirmado tu asistencia anteriormente',
+                'distancia': None
+            }, 200, None
         
-        # Obtener configuración de la asamblea
-        if not configuracion_cache:
-            return jsonify({
+        # Obtener configuración de la asamblea (una sola lectura: otro
+        # thread puede reemplazarla mientras tanto)
+        configuracion = configuracion_cache
+        if not configuracion:
+            return {
                 'confirmado': False,
                 'mensaje': 'Error: Configuración de asamblea no disponible',
                 'distancia': None
-            }), 500
+            }, 500, None
         
-        ubicacion_asamblea = configuracion_cache['ubicacionAsamblea']
-        radio_permitido = configuracion_cache['radioPermitido']
+        ubicacion_asamblea = configuracion['ubicacionAsamblea']
+        radio_permitido = configuracion['radioPermitido']
         
         # Calcular distancia a ubicación de asamblea (Requirement 2.2)
         distancia = calcular_distancia_haversine(
@@ -1106,11 +6189,8 @@ def confirmar_asistencia():
         # Verificar si está dentro del radio permitido (Requirements 2.3, 2.4)
         if distancia <= radio_permitido:
             # Buscar nombre del usuario
-            nombre_usuario = None
-            for usuario in usuarios_cache:
-                if usuario['userId'] == user_id:
-                    nombre_usuario = usuario['nombre']
-                    break
+            usuario = buscar_usuario_por_id(user_id)
+            nombre_usuario = usuario['nombre'] if usuario else None
             
             if not nombre_usuario:
                 nombre_usuario = user_id  # Fallback si no se encuentra el nombre
@@ -1126,28 +6206,149 @@ def confirmar_asistencia():
                 }
             }
             
-            asistencias_cache.append(nueva_asistencia)
-            guardar_asistencias(asistencias_cache)
+            # Otra petición del mismo usuario pudo registrarla mientras tanto
+            if not registrar_asistencia_cache(nueva_asistencia):
+                return {
+                    'confirmado': False,
+                    'mensaje': 'Ya has confirmado tu asistencia anteriormente',
+                    'distancia': None
+                }, 200, None
             
-            return jsonify({
+            return {
                 'confirmado': True,
                 'mensaje': 'Asistencia confirmada exitosamente',
                 'distancia': round(distancia, 2)
-            }), 200
+            }, 200, nueva_asistencia
         else:
             # Fuera de rango (Requirement 2.4)
-            return jsonify({
+            return {
                 'confirmado': False,
                 'mensaje': f'No te encuentras en la ubicación de la asamblea. Por favor dirígete al lugar del evento. Distancia actual: {round(distancia, 2)} metros.',
                 'distancia': round(distancia, 2)
-            }), 200
+            }, 200, None
             
     except Exception as e:
-        return jsonify({
+        return (*_error_confirmacion(e), None)
+
+
+def persistir_confirmacion(nueva_asistencia: Dict, respuesta: Dict) -> Tuple[Dict, int]:
+    """
+    Persiste una asistencia registrada por evaluar_confirmacion().
+    
+    Si falla, o si el almacenamiento ya tenía una asistencia del usuario
+    (UNIQUE: otro worker la registró antes), la retira del caché. En modo
+    encolado la respuesta sale antes de escribir: el retiro se hace al
+    completarse la escritura, y la respuesta ya enviada fue de éxito.
+    
+    Args:
+        nueva_asistencia: Asistencia retornada por evaluar_confirmacion()
+        respuesta: Respuesta de confirmación exitosa que la acompaña
+    
+    Returns:
+        Tuple[Dict, int]: (respuesta, código HTTP) de POST /api/confirmar-asistencia
+    """
+    def al_completar(registrada, error):
+        if error is not None or registrada is False:
+            retirar_asistencia_cache(nueva_asistencia)
+    
+    try:
+        registrada = persistir('registrar_asistencia', nueva_asistencia, al_completar=al_completar)
+    except Exception as e:
+        retirar_asistencia_cache(nueva_asistencia)
+        return _error_confirmacion(e)
+    
+    # UNIQUE en el almacenamiento: otro worker pudo registrarla antes
+    if not registrada:
+        retirar_asistencia_cache(nueva_asistencia)
+        return {
             'confirmado': False,
-            'mensaje': f'Error del servidor: {str(e)}',
+            'mensaje': 'Ya has confirmado tu asistencia anteriormente',
             'distancia': None
-        }), 500
+        }, 200
+    
+    return respuesta, 200
+
+
+def procesar_obtener_configuracion() -> Tuple[Dict, int]:
+    """
+    Retorna la configuración actual de la asamblea.
+    
+    Returns:
+        Tuple[Dict, int]: (respuesta, código HTTP) de GET /api/configuracion
+    """
+    try:
+        sincronizar_configuracion()
+        
+        configuracion = configuracion_cache
+        if not configuracion:
+            return {
+                'error': 'Configuración no disponible'
+            }, 500
+        
+        return configuracion, 200
+        
+    except Exception as e:
+        return {
+            'error': f'Error del servidor: {str(e)}'
+        }, 500
+
+
+# ============================================================================
+# API ENDPOINTS
+# ============================================================================
+
+@app.route('/api/validar-identidad', methods=['POST'])
+def validar_identidad():
+    """
+    Endpoint POST /api/validar-identidad
+    
+    Valida las credenciales de un usuario contra la base de datos usando solo el documento.
+    
+    Request Body:
+        {
+            "documento": "string"
+        }
+    
+    Response:
+        {
+            "valido": boolean,
+            "nombre": "string" (solo si válido),
+            "userId": "string" (solo si válido)
+        }
+    
+    Requirements: 1.1, 1.2, 1.3, 1.4, 4.6
+    """
+    respuesta, codigo = procesar_validacion_identidad(request.get_json)
+    return jsonify(respuesta), codigo
+
+
+@app.route('/api/confirmar-asistencia', methods=['POST'])
+def confirmar_asistencia():
+    """
+    Endpoint POST /api/confirmar-asistencia
+    
+    Confirma la asistencia de un usuario validando su ubicación.
+    
+    Request Body:
+        {
+            "userId": "string",
+            "latitud": number,
+            "longitud": number
+        }
+    
+    Response:
+        {
+            "confirmado": boolean,
+            "mensaje": "string",
+            "distancia": number
+        }
+    
+    Requirements: 2.2, 2.3, 2.4, 3.1, 3.3, 3.4, 4.6
+    """
+    respuesta, codigo, nueva_asistencia = evaluar_confirmacion(request.get_json)
+    if nueva_asistencia is not None:
+        respuesta, codigo = persistir_confirmacion(nueva_asistencia, respuesta)
+    return jsonify(respuesta), codigo
 
 
 @app.route('/api/configuracion', methods=['GET'])
@@ -1168,18 +6369,8 @@ def obtener_configuracion():
     
     Requirements: 4.1, 4.2
     """
-    try:
-        if not configuracion_cache:
-            return jsonify({
-                'error': 'Configuración no disponible'
-            }), 500
-        
-        return jsonify(configuracion_cache), 200
-        
-    except Exception as e:
-        return jsonify({
-            'error': f'Error del servidor: {str(e)}'
-        }), 500
+    respuesta, codigo = procesar_obtener_configuracion()
+    return jsonify(respuesta), codigo
 
 
 @app.route('/api/admin/configuracion', methods=['PUT'])
@@ -1204,7 +6395,7 @@ def actualizar_configuracion():
             "configuracion": {...}
         }
     """
-    global configuracion_cache
+    global configuracion_cache, version_configuracion
     
     try:
         datos = request.get_json()
@@ -1239,12 +6430,13 @@ def actualizar_configuracion():
             'radioPermitido': radio_permitido
         }
         
-        # Guardar en archivo
-        with open('data/configuracion.json', 'w', encoding='utf-8') as archivo:
-            json.dump(nueva_configuracion, archivo, indent=2, ensure_ascii=False)
-        
-        # Actualizar caché
-        configuracion_cache = nueva_configuracion
+        # Guardar configuración y actualizar caché (la caché y su versión
+        # cambian juntas respecto de sincronizar_configuracion)
+        with lock_configuracion:
+            almacenamiento.guardar_configuracion(nueva_configuracion)
+            configuracion_cache = nueva_configuracion
+            version_configuracion = almacenamiento.version_configuracion()
+        publicar_cambio('configuracion')
         
         return jsonify({
             'mensaje': 'Configuración actualizada exitosamente',
@@ -1280,7 +6472,52 @@ def obtener_asistencias():
     Requirements: 4.7
     """
     try:
-        return jsonify(asistencias_cache), 200
+        sincronizar_asistencias()
+        return jsonify(list(asistencias_cache)), 200
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Error del servidor: {str(e)}'
+        }), 500
+
+
+@app.route('/api/asistencias/pendientes', methods=['GET'])
+@requiere_autenticacion
+def obtener_asistentes_pendientes():
+    """
+    Endpoint GET /api/asistencias/pendientes?desde=0&limite=100
+    
+    Retorna una página de los usuarios del padrón que todavía no confirmaron
+    asistencia, en el orden del padrón, y el total de pendientes. Con
+    limite=0 solo retorna el total.
+    
+    Response:
+        {
+            "pendientes": [{"userId", "documento", "nombre"}],
+            "total": int (pendientes en total),
+            "totalUsuarios": int,
+            "desde": int,
+            "limite": int
+        }
+    """
+    try:
+        try:
+            desde = int(request.args.get('desde', 0))
+            limite = int(request.args.get('limite', LIMITE_PENDIENTES))
+        except ValueError:
+            return jsonify({'error': 'Los parámetros desde y limite deben ser números enteros'}), 400
+        desde = max(0, desde)
+        limite = max(0, min(limite, LIMITE_PENDIENTES_MAXIMO))
+        
+        sincronizar_asistencias()
+        pendientes, total = listar_pendientes(desde, limite)
+        return jsonify({
+            'pendientes': pendientes,
+            'total': total,
+            'totalUsuarios': len(padron_usuarios.usuarios),
+            'desde': desde,
+            'limite': limite
+        }), 200
         
     except Exception as e:
         return jsonify({
@@ -1294,14 +6531,21 @@ def reiniciar_asistencias():
     """
     Endpoint POST /api/asistencias/reiniciar
     
-    Elimina todas las asistencias confirmadas.
-    Útil para reutilizar el sistema en múltiples eventos.
+    Archiva las asistencias confirmadas y deja la lista vacía.
+    Útil para reutilizar el sistema en múltiples eventos: el conjunto anterior
+    queda disponible en GET /api/asistencias/archivos.
+    
+    Request Body (opcional):
+        {
+            "evento": "string"
+        }
     
     Response:
         {
             "success": boolean,
             "mensaje": "string",
-            "asistencias_eliminadas": number
+            "asistencias_eliminadas": number,
+            "archivo": "string" | null
         }
     
     Requirements: 4.7
@@ -1309,33 +6553,60 @@ def reiniciar_asistencias():
     try:
         global asistencias_cache
         
-        # Contar asistencias antes de eliminar
-        total_eliminadas = len(asistencias_cache)
+        sincronizar_asistencias()
         
-        # Limpiar caché
-        asistencias_cache = []
+        datos = request.get_json(silent=True) or {}
+        evento = str(datos.get('evento') or 'asamblea').strip()
         
-        # Guardar archivo vacío
-        try:
-            guardar_asistencias(asistencias_cache)
-        except Exception as e:
-            return jsonify({
-                'success': False,
-                'mensaje': f'Error al guardar cambios: {str(e)}',
-                'asistencias_eliminadas': 0
-            }), 500
+        # Contar, limpiar y archivar con lock_asistencias tomado: ninguna
+        # confirmación entra entre el conteo y el archivado
+        with lock_asistencias:
+            # Contar asistencias antes de archivar
+            total_eliminadas = len(asistencias_cache)
+            
+            # Limpiar caché: todo el padrón vuelve a estar pendiente. Se
+            # limpia antes de persistir porque el modo json escribe el caché
+            anteriores = asistencias_cache
+            asistencias_cache = AsistenciasIndexadas()
+            reconstruir_pendientes()
+            
+            # Apartar el conjunto vigente (la compresión sigue en segundo plano)
+            nombre_archivo = None
+            try:
+                if total_eliminadas > 0:
+                    nombre_archivo = almacenamiento.archivo.nuevo_nombre(evento)
+                    persistir('archivar_asistencias', nombre_archivo, evento, total_eliminadas)
+                else:
+                    persistir('reiniciar_asistencias')
+            except Exception as e:
+                # El almacenamiento conserva las asistencias: el caché también
+                asistencias_cache = anteriores
+                reconstruir_pendientes()
+                return jsonify({
+                    'success': False,
+                    'mensaje': f'Error al guardar cambios: {str(e)}',
+                    'asistencias_eliminadas': 0,
+                    'archivo': None
+                }), 500
+        publicar_cambio('asistencias')
+        
+        mensaje = f'Se eliminaron {total_eliminadas} asistencia(s) exitosamente'
+        if nombre_archivo:
+            mensaje += f' (archivadas en {nombre_archivo})'
         
         return jsonify({
             'success': True,
-            'mensaje': f'Se eliminaron {total_eliminadas} asistencia(s) exitosamente',
-            'asistencias_eliminadas': total_eliminadas
+            'mensaje': mensaje,
+            'asistencias_eliminadas': total_eliminadas,
+            'archivo': nombre_archivo
         }), 200
         
     except Exception as e:
         return jsonify({
             'success': False,
             'mensaje': f'Error del servidor: {str(e)}',
-            'asistencias_eliminadas': 0
+            'asistencias_eliminadas': 0,
+            'archivo': None
         }), 500
 
 
@@ -1359,7 +6630,86 @@ def obtener_usuarios():
     Requirements: 4.3
     """
     try:
-        return jsonify(usuarios_cache), 200
+        return jsonify([registro_a_dict(usuario) for usuario in padron_usuarios.usuarios]), 200
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Error del servidor: {str(e)}'
+        }), 500
+
+
+@app.route('/api/usuarios/pagina', methods=['GET'])
+@requiere_autenticacion
+def obtener_pagina_usuarios():
+    """
+    Endpoint GET /api/usuarios/pagina?desde=0&limite=50
+    
+    Retorna una página del padrón en su orden y el total de usuarios, para
+    mostrar la lista sin descargar el padrón completo (GET /api/usuarios).
+    
+    Response:
+        {
+            "usuarios": [{"userId", "documento", "nombre"}],
+            "total": int (usuarios en el padrón),
+            "desde": int,
+            "limite": int
+        }
+    """
+    try:
+        try:
+            desde = int(request.args.get('desde', 0))
+            limite = int(request.args.get('limite', LIMITE_BUSQUEDA))
+        except ValueError:
+            return jsonify({'error': 'Los parámetros desde y limite deben ser números enteros'}), 400
+        desde = max(0, desde)
+        limite = max(1, min(limite, LIMITE_BUSQUEDA_MAXIMO))
+        
+        usuarios, total = listar_usuarios(desde, limite)
+        return jsonify({
+            'usuarios': usuarios,
+            'total': total,
+            'desde': desde,
+            'limite': limite
+        }), 200
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Error del servidor: {str(e)}'
+        }), 500
+
+
+@app.route('/api/usuarios/buscar', methods=['GET'])
+@requiere_autenticacion
+def buscar_usuarios_endpoint():
+    """
+    Endpoint GET /api/usuarios/buscar?q=texto&limite=50
+    
+    Busca usuarios por nombre, documento o userId (sin distinguir tildes ni
+    mayúsculas). Los resultados vienen ordenados por relevancia: userId o
+    documento exactos, luego campos que empiezan con el texto, luego nombres
+    con palabras que empiezan con cada término, y el resto; a igual
+    relevancia, por nombre.
+    
+    Response:
+        {
+            "usuarios": [{"userId", "documento", "nombre"}],
+            "total": int (coincidencias, aunque superen el límite)
+        }
+    """
+    try:
+        consulta = request.args.get('q', '')
+        es_valido, mensaje_error = validar_campo_requerido(consulta, 'q')
+        if not es_valido:
+            return jsonify({'error': mensaje_error}), 400
+        
+        try:
+            limite = int(request.args.get('limite', LIMITE_BUSQUEDA))
+        except ValueError:
+            return jsonify({'error': 'El parámetro limite debe ser un número entero'}), 400
+        limite = max(1, min(limite, LIMITE_BUSQUEDA_MAXIMO))
+        
+        usuarios, total = buscar_usuarios(consulta, limite)
+        return jsonify({'usuarios': usuarios, 'total': total}), 200
         
     except Exception as e:
         return jsonify({
@@ -1429,25 +6779,18 @@ def agregar_usuario():
         documento = documento.strip()
         nombre = nombre.strip()
         
-        # Verificar que no exista un usuario con el mismo userId
-        for usuario in usuarios_cache:
-            if usuario['userId'] == user_id:
-                return jsonify({
-                    'success': False,
-                    'mensaje': f'Ya existe un usuario con userId: {user_id}'
-                }), 400
-        
-        # Agregar nuevo usuario
-        nuevo_usuario = {
-            'userId': user_id,
-            'documento': documento,
-            'nombre': nombre
-        }
-        
-        usuarios_cache.append(nuevo_usuario)
+        # Agregar nuevo usuario, salvo que ya exista uno con el mismo userId
+        # (se verifica al publicar, contra la versión vigente del padrón)
+        agregados = agregar_al_padron([Usuario(user_id, documento, nombre)])
+        if not agregados:
+            return jsonify({
+                'success': False,
+                'mensaje': f'Ya existe un usuario con userId: {user_id}'
+            }), 400
         
-        # Guardar en archivo CSV
-        guardar_usuarios_csv(usuarios_cache)
+        # Persistir usuario
+        persistir('agregar_usuarios', agregados)
+        publicar_altas(agregados)
         
         return jsonify({
             'success': True,
@@ -1526,7 +6869,10 @@ def importar_usuarios_csv():
                 'mensaje': 'No se encontraron usuarios válidos en el CSV'
             }), 400
         
-        # Procesar usuarios
+        # Procesar usuarios contra una misma versión del padrón
+        padron = padron_usuarios
+        nuevos_usuarios = []
+        ids_nuevos = set()
         agregados = 0
         omitidos = 0
         errores = 0
@@ -1549,13 +6895,7 @@ def importar_usuarios_csv():
                 continue
             
             # Verificar si ya existe
-            existe = False
-            for u in usuarios_cache:
-                if u['userId'] == user_id:
-                    existe = True
-                    break
-            
-            if existe:
+            if padron.buscar_por_id(user_id) is not None or user_id in ids_nuevos:
                 omitidos += 1
                 detalles.append({
                     'linea': idx,
@@ -1567,11 +6907,8 @@ def importar_usuarios_csv():
             
             # Agregar usuario
             try:
-                usuarios_cache.append({
-                    'userId': user_id,
-                    'documento': documento,
-                    'nombre': nombre
-                })
+                nuevos_usuarios.append(Usuario(user_id, documento, nombre))
+                ids_nuevos.add(user_id)
                 agregados += 1
                 detalles.append({
                     'linea': idx,
@@ -1588,10 +6925,14 @@ def importar_usuarios_csv():
                     'razon': str(e)
                 })
         
-        # Guardar en archivo CSV si se agregó al menos uno
+        # Publicar los nuevos en una sola versión del padrón (omite los que
+        # otra petición haya agregado mientras tanto) y persistirlos
+        if nuevos_usuarios:
+            nuevos_usuarios = agregar_al_padron(nuevos_usuarios)
+            agregados = len(nuevos_usuarios)
         if agregados > 0:
             try:
-                guardar_usuarios_csv(usuarios_cache)
+                persistir('agregar_usuarios', nuevos_usuarios)
             except Exception as e:
                 return jsonify({
                     'success': False,
@@ -1601,6 +6942,7 @@ def importar_usuarios_csv():
                     'errores': errores,
                     'detalles': detalles
                 }), 500
+            publicar_altas(nuevos_usuarios)
         
         # Preparar mensaje de respuesta
         mensaje_partes = []
@@ -1681,23 +7023,18 @@ def actualizar_usuario(user_id):
         documento = documento.strip()
         nombre = nombre.strip()
         
-        # Buscar usuario
-        usuario_encontrado = False
-        for i, usuario in enumerate(usuarios_cache):
-            if usuario['userId'] == user_id:
-                usuarios_cache[i]['documento'] = documento
-                usuarios_cache[i]['nombre'] = nombre
-                usuario_encontrado = True
-                break
+        # Publicar el usuario editado (un registro nuevo en una versión nueva)
+        usuario_editado = editar_en_padron(user_id, documento, nombre)
         
-        if not usuario_encontrado:
+        if not usuario_editado:
             return jsonify({
                 'success': False,
                 'mensaje': f'Usuario con userId {user_id} no encontrado'
             }), 404
         
-        # Guardar en archivo CSV
-        guardar_usuarios_csv(usuarios_cache)
+        # Persistir cambio
+        persistir('actualizar_usuario', usuario_editado)
+        publicar_cambio('usuarios', {'op': 'editar', 'usuario': registro_a_dict(usuario_editado)})
         
         return jsonify({
             'success': True,
@@ -1729,21 +7066,17 @@ def eliminar_usuario(user_id):
     """
     try:
         # Buscar y eliminar usuario
-        usuario_encontrado = False
-        for i, usuario in enumerate(usuarios_cache):
-            if usuario['userId'] == user_id:
-                usuarios_cache.pop(i)
-                usuario_encontrado = True
-                break
+        usuario_eliminado = quitar_del_padron(user_id)
         
-        if not usuario_encontrado:
+        if not usuario_eliminado:
             return jsonify({
                 'success': False,
                 'mensaje': f'Usuario con userId {user_id} no encontrado'
             }), 404
         
-        # Guardar en archivo CSV
-        guardar_usuarios_csv(usuarios_cache)
+        # Persistir eliminación
+        persistir('eliminar_usuario', user_id)
+        publicar_cambio('usuarios', {'op': 'quitar', 'userId': user_id})
         
         return jsonify({
             'success': True,
@@ -1773,14 +7106,12 @@ def eliminar_todos_usuarios():
         }
     """
     try:
-        # Contar usuarios antes de eliminar
-        total_usuarios = len(usuarios_cache)
-        
-        # Limpiar lista de usuarios
-        usuarios_cache.clear()
+        # Publicar un padrón vacío, contando los usuarios del anterior
+        total_usuarios = vaciar_padron()
         
-        # Guardar archivo CSV vacío (solo con headers)
-        guardar_usuarios_csv(usuarios_cache)
+        # Persistir lista vacía (en CSV queda solo el encabezado)
+        persistir('eliminar_todos_usuarios')
+        publicar_cambio('usuarios', {'op': 'vaciar'})
         
         return jsonify({
             'success': True,
@@ -1816,20 +7147,20 @@ def endpoint_reload_usuarios():
     Sub-task: 9.2
     """
     try:
-        # Recargar usuarios usando la función existente
-        recargar_usuarios()
+        # Recargar usuarios; si el archivo cambió, los demás workers también
+        recargar_y_publicar_usuarios()
         
         return jsonify({
             'success': True,
             'mensaje': 'Usuarios recargados exitosamente',
-            'totalUsuarios': len(usuarios_cache)
+            'totalUsuarios': len(padron_usuarios.usuarios)
         }), 200
         
     except Exception as e:
         return jsonify({
             'success': False,
             'mensaje': f'Error al recargar usuarios: {str(e)}',
-            'totalUsuarios': len(usuarios_cache)
+            'totalUsuarios': len(padron_usuarios.usuarios)
         }), 500
 
 
@@ -1872,46 +7203,48 @@ def exportar_asistencias_csv():
             'distancia_metros'
         ])
         
+        sincronizar_asistencias()
+        sincronizar_configuracion()
+        
         # Obtener ubicación de asamblea para calcular distancias
         ubicacion_asamblea = configuracion_cache.get('ubicacionAsamblea', {})
         lat_asamblea = ubicacion_asamblea.get('latitud', 0)
         lon_asamblea = ubicacion_asamblea.get('longitud', 0)
+        try:
+            distancia_a_asamblea = distancia_haversine_desde(lat_asamblea, lon_asamblea)
+        except (TypeError, ValueError):
+            distancia_a_asamblea = None
         
-        # Escribir datos de asistencias
+        # Join con usuarios a través del índice por userId (una búsqueda por fila)
+        usuarios = padron_usuarios.por_id
+        filas = []
         for asistencia in asistencias_cache:
-            # Buscar documento del usuario
-            documento = ''
-            for usuario in usuarios_cache:
-                if usuario['userId'] == asistencia['userId']:
-                    documento = usuario['documento']
-                    break
+            usuario = usuarios.get(asistencia['userId'])
+            documento = usuario['documento'] if usuario else ''
             
             # Calcular distancia
             lat_usuario = asistencia['ubicacion']['latitud']
             lon_usuario = asistencia['ubicacion']['longitud']
             
             try:
-                distancia = calcular_distancia_haversine(
-                    lat_usuario,
-                    lon_usuario,
-                    lat_asamblea,
-                    lon_asamblea
-                )
-                distancia_str = f"{distancia:.2f}"
-            except:
+                distancia_str = f"{distancia_a_asamblea(lat_usuario, lon_usuario):.2f}" \
+                    if distancia_a_asamblea else "N/A"
+            except (TypeError, ValueError):
                 distancia_str = "N/A"
             
-            # Escribir fila
-            writer.writerow([
+            filas.append([
                 asistencia['userId'],
                 asistencia['nombre'],
                 documento,
                 asistencia['fechaHora'],
-                asistencia['ubicacion']['latitud'],
-                asistencia['ubicacion']['longitud'],
+                lat_usuario,
+                lon_usuario,
                 distancia_str
             ])
         
+        # Escribir datos de asistencias
+        writer.writerows(filas)
+        
         # Obtener contenido CSV
         csv_content = output.getvalue()
         output.close()
@@ -1929,6 +7262,102 @@ def exportar_asistencias_csv():
         }), 500
 
 
+@app.route('/api/asistencias/exportar-json', methods=['GET'])
+@requiere_autenticacion
+def exportar_asistencias_json():
+    """
+    Endpoint GET /api/asistencias/exportar-json
+
+    Descarga las asistencias confirmadas en el formato de asistencias.json,
+    independiente del modo de persistencia (journal o json).
+
+    Response:
+        Archivo JSON con la lista de asistencias
+    """
+    try:
+        from flask import make_response
+
+        sincronizar_asistencias()
+        contenido = json.dumps(list(asistencias_cache), indent=2, ensure_ascii=False)
+
+        response = make_response(contenido)
+        response.headers['Content-Type'] = 'application/json; charset=utf-8'
+        response.headers['Content-Disposition'] = f'attachment; filename=asistencias_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json'
+
+        return response
+
+    except Exception as e:
+        return jsonify({
+            'error': f'Error al generar JSON: {str(e)}'
+        }), 500
+
+
+@app.route('/api/asistencias/archivos', methods=['GET'])
+@requiere_autenticacion
+def listar_archivos_asistencias():
+    """
+    Endpoint GET /api/asistencias/archivos
+    
+    Lista los conjuntos de asistencias archivados al reiniciar.
+    
+    Response:
+        [
+            {
+                "nombre": "string",
+                "evento": "string",
+                "archivado": "ISO8601 string",
+                "total": number,
+                "primera": "ISO8601 string",
+                "ultima": "ISO8601 string",
+                "estado": "listo" | "comprimiendo",
+                "tamano": number
+            }
+        ]
+    """
+    try:
+        return jsonify(almacenamiento.archivo.listar()), 200
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Error del servidor: {str(e)}'
+        }), 500
+
+
+@app.route('/api/asistencias/archivos/<nombre>', methods=['GET'])
+@requiere_autenticacion
+def descargar_archivo_asistencias(nombre):
+    """
+    Endpoint GET /api/asistencias/archivos/<nombre>
+    
+    Descarga un archivo de asistencias (JSON lines comprimido con gzip; la
+    primera línea es el encabezado).
+    
+    Response:
+        Archivo <nombre>.jsonl.gz, 404 si no existe o 409 si aún se comprime
+    """
+    try:
+        archivo = almacenamiento.archivo
+        if not archivo.es_nombre_valido(nombre):
+            return jsonify({'error': 'Archivo no encontrado'}), 404
+        
+        if not os.path.exists(archivo.ruta(nombre)):
+            if nombre in archivo.pendientes():
+                return jsonify({'error': 'El archivo aún se está comprimiendo'}), 409
+            return jsonify({'error': 'Archivo no encontrado'}), 404
+        
+        return send_from_directory(
+            os.path.abspath(archivo.directorio),
+            nombre + archivo.EXTENSION,
+            as_attachment=True,
+            mimetype='application/gzip'
+        )
+        
+    except Exception as e:
+        return jsonify({
+            'error': f'Error del servidor: {str(e)}'
+        }), 500
+
+
 # Inicializar datos al importar el módulo (necesario para Gunicorn)
 print("\n" + "="*60)
 print("Sistema de Confirmación de Asistencia a Asambleas")
@@ -1941,7 +7370,11 @@ print(f"PORT env var: {os.environ.get('PORT', 'NOT SET')}")
 print(f"Files in current dir: {os.listdir('.')[:10]}")
 print("")
 
-inicializar_datos()
+if PRECARGA_WORKERS:
+    gc.disable()  # Sin recolecciones mientras se arma lo que heredarán los workers
+inicializar_datos(servicios=not PRECARGA_WORKERS)
+if PRECARGA_WORKERS:
+    preparar_fork()
 
 print("\n" + "="*60)
 print("✓ Aplicación Flask inicializada correctamente")
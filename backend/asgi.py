@@ -0,0 +1,292 @@
+"""
+Punto de entrada ASGI
+Sistema de Confirmación de Asistencia a Asambleas
+
+Alternativa opcional a servir la aplicación Flask con gunicorn/waitress.
+Los endpoints públicos que usa cada asistente desde su teléfono se atienden
+con handlers asíncronos:
+
+    POST /api/validar-identidad
+    POST /api/confirmar-asistencia
+    GET  /api/configuracion
+
+Responden el mismo JSON que las vistas de Flask porque usan las mismas
+funciones (procesar_validacion_identidad, evaluar_confirmacion, ...). En el
+event loop solo se ejecuta lo que lee memoria: la validación de identidad y
+la comparación de generaciones entre workers. Lo que toma locks o toca el
+disco (la sincronización entre workers, la evaluación y escritura de cada
+confirmación, la relectura de la configuración) se ejecuta en un pool de
+threads: el event loop sigue atendiendo a los demás clientes mientras
+espera. Las demás rutas (panel administrativo, frontend, preflight CORS) se
+delegan a la aplicación Flask, también en el pool de threads.
+
+No depende de ningún framework ASGI; solo necesita un servidor ASGI, que no
+forma parte de requirements.txt:
+
+    pip install uvicorn
+    uvicorn backend.asgi:app --host 0.0.0.0 --port $PORT --workers 4
+
+Variables de entorno:
+    ASGI_THREADS  Threads del pool para disco y rutas de Flask (64)
+"""
+
+import asyncio
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from flask import Request
+
+# Importado como backend.asgi (servidor ASGI) o como asgi (pruebas, con
+# backend/ en sys.path): en ambos casos usar el mismo módulo de la aplicación
+try:
+    from . import app as aplicacion
+except ImportError:
+    import app as aplicacion
+
+THREADS = int(os.environ.get('ASGI_THREADS', '64'))
+
+# Con miles de clientes esperando su escritura en disco, los threads del pool
+# son los que quedan bloqueados; el persistidor agrupa sus escrituras
+ejecutor = ThreadPoolExecutor(max_workers=THREADS, thread_name_prefix='asgi')
+
+
+# ============================================================================
+# TRADUCCIÓN ENTRE ASGI Y WSGI
+# ============================================================================
+
+def crear_environ(scope: dict, cuerpo: bytes) -> dict:
+    """
+    Construye el environ WSGI (PEP 3333) equivalente a una petición ASGI.
+
+    Args:
+        scope: Scope HTTP de la petición ASGI
+        cuerpo: Cuerpo completo de la petición
+
+    Returns:
+        dict: environ para la aplicación Flask o para flask.Request
+    """
+    servidor = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+        'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': servidor[0],
+        'SERVER_PORT': str(servidor[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'CONTENT_LENGTH': str(len(cuerpo)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': BytesIO(cuerpo),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'], environ['REMOTE_PORT'] = scope['client'][0], str(scope['client'][1])
+
+    for nombre, valor in scope.get('headers', []):
+        nombre = nombre.decode('latin-1').upper().replace('-', '_')
+        valor = valor.decode('latin-1')
+        if nombre == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = valor
+        elif nombre != 'CONTENT_LENGTH':
+            clave = f'HTTP_{nombre}'
+            environ[clave] = f'{environ[clave]},{valor}' if clave in environ else valor
+    return environ
+
+
+def ejecutar_wsgi(scope: dict, cuerpo: bytes) -> tuple:
+    """
+    Atiende una petición con la aplicación Flask. Se ejecuta en el pool de threads.
+
+    Args:
+        scope: Scope HTTP de la petición ASGI
+        cuerpo: Cuerpo completo de la petición
+
+    Returns:
+        tuple: (código HTTP, encabezados como lista de pares de bytes, cuerpo)
+    """
+    estado = {}
+    partes = []
+
+    def start_response(status, headers, exc_info=None):
+        estado['status'] = status
+        estado['headers'] = headers
+        return partes.append
+
+    resultado = aplicacion.app(crear_environ(scope, cuerpo), start_response)
+    try:
+        partes.extend(resultado)
+    finally:
+        if hasattr(resultado, 'close'):
+            resultado.close()
+
+    encabezados = [
+        (nombre.lower().encode('latin-1'), valor.encode('latin-1'))
+        for nombre, valor in estado['headers']
+    ]
+    return int(estado['status'].split(' ', 1)[0]), encabezados, b''.join(partes)
+
+
+def leer_json(scope: dict, cuerpo: bytes):
+    """
+    Retorna una función que decodifica el cuerpo como lo hace request.get_json().
+
+    El caso habitual (JSON válido) se decodifica directamente; cualquier otro
+    (tipo de contenido distinto, cuerpo vacío o inválido) se delega a
+    flask.Request para que la excepción, y con ella el error 500 que
+    responde el endpoint, sea la misma que con Flask.
+    """
+    def leer():
+        tipo = ''
+        for nombre, valor in scope.get('headers', []):
+            if nombre == b'content-type':
+                tipo = valor.decode('latin-1').split(';', 1)[0].strip().lower()
+        if tipo == 'application/json':
+            try:
+                return json.loads(cuerpo)
+            except ValueError:
+                pass
+        return Request(crear_environ(scope, cuerpo)).get_json()
+    return leer
+
+
+# ============================================================================
+# HANDLERS ASÍNCRONOS DE LOS ENDPOINTS PÚBLICOS
+# ============================================================================
+
+def confirmar(leer_datos) -> tuple:
+    """
+    Evalúa y persiste una confirmación. Se ejecuta en el pool de threads:
+    evaluar_confirmacion incorpora las asistencias de otros workers con el
+    lock del journal tomado.
+    """
+    respuesta, codigo, nueva_asistencia = aplicacion.evaluar_confirmacion(leer_datos)
+    if nueva_asistencia is not None:
+        respuesta, codigo = aplicacion.persistir_confirmacion(nueva_asistencia, respuesta)
+    return respuesta, codigo
+
+
+async def validar_identidad(scope: dict, cuerpo: bytes) -> tuple:
+    """POST /api/validar-identidad: búsqueda en el padrón en memoria, en el event loop."""
+    return aplicacion.procesar_validacion_identidad(leer_json(scope, cuerpo))
+
+
+async def confirmar_asistencia(scope: dict, cuerpo: bytes) -> tuple:
+    """POST /api/confirmar-asistencia: evalúa y persiste en el pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(ejecutor, confirmar, leer_json(scope, cuerpo))
+
+
+async def obtener_configuracion(scope: dict, cuerpo: bytes) -> tuple:
+    """GET /api/configuracion: en el pool (revisa si configuracion.json cambió)."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(ejecutor, aplicacion.procesar_obtener_configuracion)
+
+
+RUTAS = {
+    ('POST', '/api/validar-identidad'): validar_identidad,
+    ('POST', '/api/confirmar-asistencia'): confirmar_asistencia,
+    ('GET', '/api/configuracion'): obtener_configuracion,
+}
+
+
+def codificar_respuesta(scope: dict, respuesta: dict) -> tuple:
+    """
+    Serializa la respuesta como jsonify() y agrega los encabezados CORS que
+    agregaría flask-cors: el origen de la petición si la trae, si no '*'.
+
+    Returns:
+        tuple: (encabezados como lista de pares de bytes, cuerpo)
+    """
+    cuerpo = (aplicacion.app.json.dumps(respuesta, separators=(',', ':')) + '\n').encode('utf-8')
+    encabezados = [
+        (b'content-type', b'application/json'),
+        (b'content-length', str(len(cuerpo)).encode('latin-1')),
+    ]
+    origen = next((valor for nombre, valor in scope.get('headers', []) if nombre == b'origin'), None)
+    if origen is None:
+        encabezados.append((b'access-control-allow-origin', b'*'))
+    else:
+        encabezados.append((b'access-control-allow-origin', origen))
+        encabezados.append((b'vary', b'Origin'))
+    return encabezados, cuerpo
+
+
+# ============================================================================
+# APLICACIÓN ASGI
+# ============================================================================
+
+async def recibir_cuerpo(receive) -> bytes:
+    """Lee el cuerpo completo de la petición."""
+    partes = []
+    while True:
+        mensaje = await receive()
+        if mensaje['type'] == 'http.disconnect':
+            break
+        partes.append(mensaje.get('body', b''))
+        if not mensaje.get('more_body', False):
+            break
+    return b''.join(partes)
+
+
+async def atender_lifespan(receive, send):
+    """Eventos de arranque y apagado del servidor ASGI."""
+    while True:
+        mensaje = await receive()
+        if mensaje['type'] == 'lifespan.startup':
+            await send({'type': 'lifespan.startup.complete'})
+        elif mensaje['type'] == 'lifespan.shutdown':
+            # Esperar las escrituras en curso; el persistidor se detiene con atexit
+            await asyncio.get_running_loop().run_in_executor(None, ejecutor.shutdown)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def rechazar_websocket(receive, send):
+    """
+    Rechaza una conexión websocket (la aplicación no tiene ninguna): cerrar
+    antes de aceptar hace que el servidor responda 403 al handshake.
+    """
+    mensaje = await receive()
+    if mensaje['type'] == 'websocket.connect':
+        await send({'type': 'websocket.close', 'code': 1000})
+
+
+async def app(scope, receive, send):
+    """
+    Aplicación ASGI 3.
+
+    Las rutas de RUTAS se atienden con sus handlers asíncronos; el resto,
+    con la aplicación Flask en el pool de threads.
+    """
+    if scope['type'] == 'lifespan':
+        await atender_lifespan(receive, send)
+        return
+    if scope['type'] == 'websocket':
+        await rechazar_websocket(receive, send)
+        return
+    if scope['type'] != 'http':
+        return  # Otro protocolo: no hay nada que responder
+
+    cuerpo = await recibir_cuerpo(receive)
+    handler = RUTAS.get((scope['method'], scope['path']))
+    loop = asyncio.get_running_loop()
+
+    if handler is None:
+        codigo, encabezados, contenido = await loop.run_in_executor(ejecutor, ejecutar_wsgi, scope, cuerpo)
+    else:
+        # Lo mismo que hace @app.before_request en cada petición de Flask;
+        # la comparación es en memoria, la sincronización toma locks
+        if aplicacion.hay_cambios_entre_workers():
+            await loop.run_in_executor(ejecutor, aplicacion.sincronizar_entre_workers)
+        respuesta, codigo = await handler(scope, cuerpo)
+        encabezados, contenido = codificar_respuesta(scope, respuesta)
+
+    await send({'type': 'http.response.start', 'status': codigo, 'headers': encabezados})
+    await send({'type': 'http.response.body', 'body': contenido})
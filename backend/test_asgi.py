@@ -0,0 +1,251 @@
+"""
+Pruebas del punto de entrada ASGI
+Sistema de Confirmación de Asistencia a Asambleas
+
+Llaman a la aplicación ASGI directamente (sin servidor) y comparan sus
+respuestas con las de la aplicación Flask.
+"""
+
+import sys
+import os
+import asyncio
+import json
+import threading
+import time
+from collections import Counter
+
+# Agregar el directorio backend al path
+sys.path.insert(0, os.path.dirname(__file__))
+
+import app as aplicacion
+from app import app, reemplazar_usuarios
+from asgi import app as app_asgi
+from test_concurrencia import EstadoTemporal, UBICACION
+
+USUARIOS = [
+    {'userId': str(i), 'documento': f'{10_000_000 + i}', 'nombre': f'Usuario {i}'}
+    for i in range(40)
+]
+LEJOS = {'latitud': 4.4, 'longitud': -74.3}
+
+
+async def _llamar(metodo, ruta, cuerpo=b'', encabezados=()):
+    """Ejecuta una petición contra la aplicación ASGI. Retorna (código, encabezados, cuerpo)."""
+    ruta, _, consulta = ruta.partition('?')
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': metodo, 'scheme': 'http', 'path': ruta, 'root_path': '',
+        'query_string': consulta.encode(), 'server': ('testserver', 80), 'client': ('127.0.0.1', 50000),
+        'headers': [(nombre.lower().encode(), valor.encode()) for nombre, valor in encabezados],
+    }
+    # El cuerpo llega partido en dos mensajes, como puede enviarlo el servidor
+    mensajes = [
+        {'type': 'http.request', 'body': cuerpo[:5], 'more_body': True},
+        {'type': 'http.request', 'body': cuerpo[5:], 'more_body': False},
+    ]
+    enviados = []
+
+    async def receive():
+        return mensajes.pop(0)
+
+    async def send(mensaje):
+        enviados.append(mensaje)
+
+    await app_asgi(scope, receive, send)
+    inicio, contenido = enviados
+    assert inicio['type'] == 'http.response.start' and contenido['type'] == 'http.response.body'
+    return inicio['status'], {n.decode(): v.decode() for n, v in inicio['headers']}, contenido['body']
+
+
+def llamar(metodo, ruta, datos=None, encabezados=()):
+    """Petición ASGI con cuerpo JSON opcional."""
+    cuerpo = b''
+    if datos is not None:
+        cuerpo = json.dumps(datos).encode()
+        encabezados = (('Content-Type', 'application/json'),) + tuple(encabezados)
+    return asyncio.run(_llamar(metodo, ruta, cuerpo, encabezados))
+
+
+def test_mismo_contrato_que_flask():
+    """Test: Los endpoints asíncronos responden los mismos códigos, JSON y encabezados que Flask"""
+    print("✓ Test: Contrato de los endpoints ASGI...")
+    origen = (('Origin', 'https://asamblea.example'),)
+    casos = [
+        ('GET', '/api/configuracion', None, b'', ()),
+        ('GET', '/api/configuracion', None, b'', origen),
+        ('POST', '/api/validar-identidad', 'application/json', b'{"documento": " 10000003 "}', origen),
+        ('POST', '/api/validar-identidad', 'application/json', b'{"documento": "10000099"}', ()),
+        ('POST', '/api/validar-identidad', 'application/json', b'{}', ()),
+        ('POST', '/api/validar-identidad', 'application/json', b'{"documento": "   "}', ()),
+        ('POST', '/api/validar-identidad', 'application/json', b'{malo', ()),
+        ('POST', '/api/validar-identidad', 'text/plain', b'{"documento": "10000003"}', ()),
+        ('POST', '/api/confirmar-asistencia', 'application/json', b'{"latitud": 4.3, "longitud": -74.3}', ()),
+        ('POST', '/api/confirmar-asistencia', 'application/json', b'{"userId": "1", "latitud": 200, "longitud": 0}', ()),
+        ('POST', '/api/confirmar-asistencia', 'application/json', json.dumps({'userId': '1', **LEJOS}).encode(), ()),
+        ('POST', '/api/confirmar-asistencia', 'application/json', b'', ()),
+    ]
+    with EstadoTemporal():
+        reemplazar_usuarios(USUARIOS)
+        with app.test_client() as client:
+            for metodo, ruta, tipo, cuerpo, encabezados in casos:
+                encabezados_asgi = encabezados + ((('Content-Type', tipo),) if tipo else ())
+                codigo, recibidos, contenido = asyncio.run(_llamar(metodo, ruta, cuerpo, encabezados_asgi))
+                esperada = client.open(ruta, method=metodo, data=cuerpo, content_type=tipo, headers=dict(encabezados))
+
+                assert (codigo, contenido) == (esperada.status_code, esperada.data), (ruta, cuerpo, contenido, esperada.data)
+                for nombre in ('Content-Type', 'Access-Control-Allow-Origin', 'Vary'):
+                    assert recibidos.get(nombre.lower()) == esperada.headers.get(nombre), (ruta, nombre)
+
+            # Confirmaciones dentro del radio: una por servidor, y el duplicado
+            codigo, _, contenido = llamar('POST', '/api/confirmar-asistencia', {'userId': '1', **UBICACION})
+            esperada = client.post('/api/confirmar-asistencia', json={'userId': '2', **UBICACION})
+            assert (codigo, contenido) == (esperada.status_code, esperada.data)
+            assert json.loads(contenido)['confirmado'] is True
+
+            codigo, _, contenido = llamar('POST', '/api/confirmar-asistencia', {'userId': '2', **UBICACION})
+            esperada = client.post('/api/confirmar-asistencia', json={'userId': '1', **UBICACION})
+            assert (codigo, contenido) == (esperada.status_code, esperada.data)
+            assert json.loads(contenido)['confirmado'] is False
+    print(f"  ✓ {len(casos) + 2} peticiones con la misma respuesta que Flask")
+
+
+def test_confirmaciones_concurrentes_asgi():
+    """Test: Confirmaciones simultáneas en la aplicación ASGI se persisten una sola vez"""
+    print("✓ Test: Confirmaciones concurrentes ASGI...")
+
+    async def confirmar_todos():
+        peticiones = [
+            _llamar('POST', '/api/confirmar-asistencia',
+                    json.dumps({'userId': usuario['userId'], **UBICACION}).encode(),
+                    (('Content-Type', 'application/json'),))
+            for _ in range(5) for usuario in USUARIOS
+        ]
+        return await asyncio.gather(*peticiones)
+
+    with EstadoTemporal():
+        reemplazar_usuarios(USUARIOS)
+        respuestas = asyncio.run(confirmar_todos())
+
+        assert {codigo for codigo, _, _ in respuestas} == {200}
+        confirmadas = Counter(
+            json.loads(contenido)['mensaje'] for _, _, contenido in respuestas
+        )
+        assert confirmadas['Asistencia confirmada exitosamente'] == len(USUARIOS), confirmadas
+        with open(aplicacion.almacenamiento.ruta_asistencias, encoding='utf-8') as archivo:
+            guardadas = [a['userId'] for a in json.load(archivo)]
+        assert sorted(guardadas) == sorted(usuario['userId'] for usuario in USUARIOS)
+    print(f"  ✓ {len(respuestas)} peticiones concurrentes: {len(USUARIOS)} asistencias persistidas, 0 duplicadas")
+
+
+def test_locks_fuera_del_event_loop():
+    """Test: Una confirmación que espera un lock no detiene a las demás peticiones"""
+    print("✓ Test: Locks fuera del event loop...")
+
+    async def confirmar_y_validar():
+        inicio = time.perf_counter()
+        confirmacion = asyncio.ensure_future(_llamar(
+            'POST', '/api/confirmar-asistencia', json.dumps({'userId': '3', **UBICACION}).encode(),
+            (('Content-Type', 'application/json'),)
+        ))
+        await asyncio.sleep(0.05)  # La confirmación ya espera el lock en el pool
+        validacion = await _llamar('POST', '/api/validar-identidad', b'{"documento": "10000004"}',
+                                   (('Content-Type', 'application/json'),))
+        return time.perf_counter() - inicio, validacion, await confirmacion
+
+    with EstadoTemporal():
+        reemplazar_usuarios(USUARIOS)
+        # Otro thread retiene el lock que toma la sincronización de asistencias
+        aplicacion.lock_asistencias.acquire()
+        threading.Timer(0.5, aplicacion.lock_asistencias.release).start()
+        demora, validacion, confirmacion = asyncio.run(confirmar_y_validar())
+
+        assert demora < 0.4, demora
+        assert validacion[0] == 200 and json.loads(validacion[2])['userId'] == '4'
+        assert confirmacion[0] == 200 and json.loads(confirmacion[2])['confirmado'] is True
+    print(f"  ✓ Validación respondida en {demora * 1000:.0f} ms con la confirmación esperando el lock")
+
+
+def test_rutas_delegadas_a_flask():
+    """Test: Las demás rutas (panel administrativo, preflight CORS, errores) las atiende Flask"""
+    print("✓ Test: Rutas delegadas a Flask...")
+    with EstadoTemporal() as estado:
+        reemplazar_usuarios(USUARIOS)
+        llamar('POST', '/api/confirmar-asistencia', {'userId': '7', **UBICACION})
+
+        codigo, _, contenido = llamar('GET', '/api/asistencias')
+        assert codigo == 200, contenido
+        assert [a['userId'] for a in json.loads(contenido)] == ['7']
+
+        codigo, _, contenido = llamar('GET', '/api/asistencias/pendientes?limite=5',
+                                      encabezados=estado.encabezados.items())
+        assert codigo == 200, contenido
+        codigo, _, _ = llamar('GET', '/api/asistencias/pendientes')
+        assert codigo == 401
+
+        codigo, encabezados, _ = llamar('OPTIONS', '/api/confirmar-asistencia', encabezados=(
+            ('Origin', 'https://asamblea.example'), ('Access-Control-Request-Method', 'POST')
+        ))
+        assert codigo == 200
+        assert encabezados['access-control-allow-origin'] == 'https://asamblea.example'
+        assert 'POST' in encabezados['access-control-allow-methods']
+
+        with app.test_client() as client:
+            for ruta in ('/api/no-existe', '/api/validar-identidad', '/health'):
+                codigo, _, _ = llamar('GET', ruta)
+                assert codigo == client.get(ruta).status_code, ruta
+    print("  ✓ Panel administrativo, CORS y errores de ruta iguales a Flask")
+
+
+def test_websocket_rechazado():
+    """Test: Una conexión websocket se rechaza con websocket.close, sin excepción"""
+    print("✓ Test: Websocket rechazado...")
+
+    async def conectar():
+        enviados = []
+
+        async def receive():
+            return {'type': 'websocket.connect'}
+
+        async def send(mensaje):
+            enviados.append(mensaje)
+
+        await app_asgi({'type': 'websocket', 'asgi': {'version': '3.0'}, 'path': '/ws', 'headers': []}, receive, send)
+        return enviados
+
+    enviados = asyncio.run(conectar())
+    assert [mensaje['type'] for mensaje in enviados] == ['websocket.close']
+    print("  ✓ Handshake cerrado antes de aceptar (403 del servidor)")
+
+
+def run_all_tests():
+    """Ejecutar todos los tests"""
+    print("\n" + "="*60)
+    print("PRUEBAS DEL PUNTO DE ENTRADA ASGI")
+    print("="*60 + "\n")
+
+    tests = [
+        test_mismo_contrato_que_flask,
+        test_confirmaciones_concurrentes_asgi,
+        test_locks_fuera_del_event_loop,
+        test_rutas_delegadas_a_flask,
+        test_websocket_rechazado
+    ]
+
+    fallidos = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            fallidos += 1
+            print(f"  ✗ Falló: {e}")
+        print()
+
+    print("="*60)
+    print(f"Resultados: {len(tests) - fallidos}/{len(tests)} tests pasaron")
+    print("="*60 + "\n")
+    return fallidos == 0
+
+
+if __name__ == '__main__':
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
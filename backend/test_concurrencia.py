@@ -0,0 +1,575 @@
+"""
+Pruebas de concurrencia del estado en memoria
+Sistema de Confirmación de Asistencia a Asambleas
+"""
+
+import sys
+import os
+import gc
+import json
+import multiprocessing
+import random
+import shutil
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+# Agregar el directorio backend al path
+sys.path.insert(0, os.path.dirname(__file__))
+
+import app as aplicacion
+from app import (
+    app,
+    reemplazar_usuarios,
+    listar_pendientes,
+    registrar_token,
+    revocar_token,
+    validar_token,
+    limpiar_tokens_expirados,
+    escribir_archivo_atomico,
+    guardar_usuarios_csv,
+    AlmacenamientoArchivos,
+    AsistenciasIndexadas,
+    GeneracionesCompartidas,
+    ServiciosLider,
+    recargar_y_publicar_usuarios
+)
+
+THREADS = 8
+UBICACION = {'latitud': 4.3229422, 'longitud': -74.3693629}
+
+
+class EstadoTemporal:
+    """Almacenamiento en un directorio temporal y persistencia síncrona; restaura el estado al salir."""
+
+    def __init__(self, modo_asistencias='json'):
+        # Con 'json' el almacenamiento no tiene UNIQUE: solo cuenta el caché
+        self.modo_asistencias = modo_asistencias
+
+    def __enter__(self):
+        self.directorio = tempfile.mkdtemp()
+        self.anterior = (
+            aplicacion.almacenamiento, aplicacion.persistidor, aplicacion.usuarios_cache,
+            aplicacion.asistencias_cache, aplicacion.configuracion_cache, aplicacion.version_configuracion,
+            aplicacion.generaciones, aplicacion.generaciones_vistas
+        )
+        self.intervalo = sys.getswitchinterval()
+        sys.setswitchinterval(1e-5)  # Más cambios de thread: más intercalados posibles
+
+        almacenamiento = AlmacenamientoArchivos(
+            self.directorio,
+            modo_asistencias=self.modo_asistencias,
+            fuente_usuarios=lambda: aplicacion.padron_usuarios.usuarios,
+            fuente_asistencias=lambda: aplicacion.asistencias_cache
+        )
+        configuracion = {'ubicacionAsamblea': dict(UBICACION), 'radioPermitido': 100}
+        almacenamiento.guardar_configuracion(configuracion)
+        aplicacion.almacenamiento = almacenamiento
+        aplicacion.persistidor = None
+        aplicacion.asistencias_cache = AsistenciasIndexadas()
+        aplicacion.configuracion_cache = configuracion
+        aplicacion.version_configuracion = almacenamiento.version_configuracion()
+        aplicacion.generaciones = GeneracionesCompartidas(os.path.join(self.directorio, 'generaciones.bin'))
+        aplicacion.generaciones_vistas = dict(zip(GeneracionesCompartidas.CONJUNTOS, aplicacion.generaciones.leer()))
+
+        self.token = aplicacion.generar_token()
+        registrar_token(self.token, datetime.now() + timedelta(hours=1))
+        self.encabezados = {'Authorization': f'Bearer {self.token}'}
+        return self
+
+    def __exit__(self, *_):
+        sys.setswitchinterval(self.intervalo)
+        revocar_token(self.token)
+        (aplicacion.almacenamiento, aplicacion.persistidor, usuarios, aplicacion.asistencias_cache,
+         aplicacion.configuracion_cache, aplicacion.version_configuracion,
+         aplicacion.generaciones, aplicacion.generaciones_vistas) = self.anterior
+        reemplazar_usuarios(usuarios)
+        shutil.rmtree(self.directorio, ignore_errors=True)
+
+
+def _en_paralelo(funcion, cantidad=THREADS):
+    """Ejecuta funcion(numero) en varios threads a la vez y propaga el primer error."""
+    errores = []
+    barrera = threading.Barrier(cantidad)
+
+    def ejecutar(numero):
+        try:
+            barrera.wait()
+            funcion(numero)
+        except BaseException as e:
+            errores.append(e)
+
+    threads = [threading.Thread(target=ejecutar, args=(numero,)) for numero in range(cantidad)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if errores:
+        raise errores[0]
+
+
+def test_confirmaciones_concurrentes_sin_duplicados():
+    """Test: Confirmaciones simultáneas del mismo usuario registran una sola asistencia"""
+    print("✓ Test: Confirmaciones concurrentes...")
+    usuarios = [
+        {'userId': str(i), 'documento': f'{10_000_000 + i}', 'nombre': f'Usuario {i}'}
+        for i in range(60)
+    ]
+    with EstadoTemporal() as estado:
+        reemplazar_usuarios(usuarios)
+        confirmadas = Counter()
+        respuestas_con_error = []
+
+        def confirmar(numero):
+            orden = [usuario['userId'] for usuario in usuarios]
+            random.Random(numero).shuffle(orden)
+            with app.test_client() as client:
+                for user_id in orden:
+                    respuesta = client.post('/api/confirmar-asistencia', json={'userId': user_id, **UBICACION})
+                    if respuesta.status_code != 200:
+                        respuestas_con_error.append(respuesta.get_json())
+                    elif respuesta.get_json()['confirmado']:
+                        confirmadas[user_id] += 1
+
+        _en_paralelo(confirmar)
+
+        assert not respuestas_con_error, respuestas_con_error[:3]
+        assert confirmadas == Counter({usuario['userId']: 1 for usuario in usuarios})
+        assert sorted(a['userId'] for a in aplicacion.asistencias_cache) == sorted(confirmadas)
+        with open(aplicacion.almacenamiento.ruta_asistencias, encoding='utf-8') as archivo:
+            guardadas = [a['userId'] for a in json.load(archivo)]
+        assert sorted(guardadas) == sorted(confirmadas)
+        assert listar_pendientes(0, 10) == ([], 0)
+        print(f"  ✓ {THREADS} threads × {len(usuarios)} usuarios: {sum(confirmadas.values())} asistencias, 0 duplicadas")
+
+
+def test_configuracion_concurrente_consistente():
+    """Test: Lecturas de la configuración mientras otros threads la reemplazan nunca ven una mezcla"""
+    print("✓ Test: Configuración concurrente...")
+    with EstadoTemporal() as estado:
+        inconsistentes = []
+
+        def usar(numero):
+            with app.test_client() as client:
+                for i in range(40):
+                    if numero % 2 == 0:
+                        latitud = numero + i / 100
+                        respuesta = client.put('/api/admin/configuracion', headers=estado.encabezados, json={
+                            'latitud': latitud, 'longitud': latitud, 'radioPermitido': latitud + 1
+                        })
+                        assert respuesta.status_code == 200, respuesta.get_json()
+                    else:
+                        configuracion = client.get('/api/configuracion').get_json()
+                        ubicacion = configuracion['ubicacionAsamblea']
+                        inicial = configuracion == {'ubicacionAsamblea': UBICACION, 'radioPermitido': 100}
+                        actualizada = (ubicacion['latitud'] == ubicacion['longitud'] and
+                                       configuracion['radioPermitido'] == ubicacion['latitud'] + 1)
+                        if not (inicial or actualizada):
+                            inconsistentes.append(configuracion)
+
+        _en_paralelo(usar)
+
+        assert not inconsistentes, inconsistentes[:3]
+        with open(aplicacion.almacenamiento.ruta_configuracion, encoding='utf-8') as archivo:
+            assert json.load(archivo) == aplicacion.configuracion_cache
+        print("  ✓ Cada lectura ve una configuración completa y el archivo coincide con la caché")
+
+
+def test_tokens_concurrentes():
+    """Test: Altas, bajas, validaciones y limpieza de tokens en paralelo no fallan"""
+    print("✓ Test: Tokens concurrentes...")
+    tokens_anteriores = dict(aplicacion.admin_tokens)
+    try:
+        vencido = datetime.now() - timedelta(seconds=1)
+        vigente = datetime.now() + timedelta(hours=1)
+
+        def usar(numero):
+            for i in range(300):
+                token = f'token-{numero}-{i}'
+                registrar_token(token, vencido if i % 2 else vigente)
+                validar_token(token)
+                limpiar_tokens_expirados()
+                if i % 3 == 0:
+                    revocar_token(token)
+
+        _en_paralelo(usar)
+
+        limpiar_tokens_expirados()
+        esperados = {f'token-{n}-{i}' for n in range(THREADS) for i in range(300) if i % 2 == 0 and i % 3}
+        assert set(aplicacion.admin_tokens) - set(tokens_anteriores) == esperados
+        print("  ✓ Solo quedan los tokens vigentes no revocados")
+    finally:
+        aplicacion.admin_tokens.clear()
+        aplicacion.admin_tokens.update(tokens_anteriores)
+
+
+def test_escrituras_atomicas_concurrentes():
+    """Test: Escrituras completas simultáneas del mismo archivo no se pisan el temporal"""
+    print("✓ Test: Escrituras atómicas concurrentes...")
+    directorio = tempfile.mkdtemp()
+    try:
+        ruta = os.path.join(directorio, 'datos.json')
+
+        def escribir(numero):
+            for i in range(20):
+                escribir_archivo_atomico(ruta, json.dumps({'thread': numero, 'i': i}))
+
+        _en_paralelo(escribir)
+
+        with open(ruta, encoding='utf-8') as archivo:
+            assert json.load(archivo)['i'] == 19
+        assert not os.path.exists(ruta + '.tmp')
+        print("  ✓ El archivo final es una escritura completa")
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+def _worker_precargado(resultados):
+    """Proceso de prueba: worker creado por fork desde un maestro con los datos precargados."""
+    aplicacion.iniciar_worker()
+    resultados.put((
+        sorted(a['userId'] for a in aplicacion.asistencias_cache),
+        sorted(u['userId'] for u in aplicacion.padron_usuarios.usuarios),
+        aplicacion.persistidor is not None and aplicacion.persistidor._thread.is_alive()
+    ))
+
+
+def test_worker_precargado_incorpora_cambios():
+    """Test: Un worker creado por fork después de cambios de otros workers los incorpora al iniciar"""
+    print("✓ Test: Worker precargado...")
+    usuarios = [
+        {'userId': str(i), 'documento': f'{10_000_000 + i}', 'nombre': f'Usuario {i}'}
+        for i in range(3)
+    ]
+    with EstadoTemporal(modo_asistencias='journal') as estado:
+        almacenamiento = aplicacion.almacenamiento
+        guardar_usuarios_csv(usuarios[:2], almacenamiento.ruta_usuarios)
+        almacenamiento.journal.escribir_completo([])
+        almacenamiento.registrar_asistencia({
+            'userId': '0', 'nombre': 'Usuario 0', 'fechaHora': '2026-01-14T10:00:00Z', 'ubicacion': UBICACION
+        })
+
+        # Maestro: carga los datos una vez, sin threads
+        reemplazar_usuarios(almacenamiento.cargar_usuarios())
+        aplicacion.asistencias_cache = almacenamiento.cargar_asistencias_indexadas()
+        aplicacion.preparar_fork()
+        try:
+            # Otros workers confirman y editan el padrón antes del fork
+            otro = AlmacenamientoArchivos(estado.directorio)
+            otro.registrar_asistencia({
+                'userId': '1', 'nombre': 'Usuario 1', 'fechaHora': '2026-01-14T10:01:00Z', 'ubicacion': UBICACION
+            })
+            guardar_usuarios_csv(usuarios, almacenamiento.ruta_usuarios)
+
+            contexto = multiprocessing.get_context('fork')
+            resultados = contexto.Queue()
+            proceso = contexto.Process(target=_worker_precargado, args=(resultados,))
+            proceso.start()
+            asistencias, padron, persistidor_activo = resultados.get(timeout=60)
+            proceso.join()
+        finally:
+            gc.unfreeze()
+
+        assert asistencias == ['0', '1']
+        assert padron == ['0', '1', '2']
+        assert persistidor_activo
+        # El maestro conserva lo que cargó
+        assert len(aplicacion.padron_usuarios.usuarios) == 2
+        print("  ✓ El worker incorpora asistencias y padrón nuevos e inicia su persistidor")
+
+
+def _worker_administrador(directorio):
+    """Proceso de prueba: otro worker edita el padrón y la configuración y lo publica."""
+    generaciones = GeneracionesCompartidas(os.path.join(directorio, 'generaciones.bin'))
+    AlmacenamientoArchivos(directorio).guardar_configuracion(
+        {'ubicacionAsamblea': {'latitud': 1.0, 'longitud': 2.0}, 'radioPermitido': 300}
+    )
+    generaciones.publicar('configuracion')
+    generaciones.publicar('usuarios', {'op': 'editar', 'usuario': {'userId': '1', 'documento': '777', 'nombre': 'Editado'}})
+    generaciones.publicar('usuarios', {'op': 'quitar', 'userId': '2'})
+    generaciones.publicar('usuarios', {'op': 'agregar', 'usuarios': [{'userId': '9', 'documento': '999', 'nombre': 'Nuevo'}]})
+
+
+def test_invalidacion_entre_workers():
+    """Test: Los cambios que otro worker publica se incorporan en la siguiente petición"""
+    print("✓ Test: Invalidación entre workers...")
+    usuarios = [
+        {'userId': str(i), 'documento': f'{10_000_000 + i}', 'nombre': f'Usuario {i}'}
+        for i in range(3)
+    ]
+    with EstadoTemporal() as estado:
+        reemplazar_usuarios(usuarios)
+        version = aplicacion.padron_usuarios.version
+
+        proceso = multiprocessing.get_context('fork').Process(target=_worker_administrador, args=(estado.directorio,))
+        proceso.start()
+        proceso.join()
+        assert proceso.exitcode == 0
+
+        # Nada cambia hasta la siguiente petición
+        assert aplicacion.padron_usuarios.version == version
+        with app.test_client() as client:
+            configuracion = client.get('/api/configuracion').get_json()
+
+        assert configuracion['radioPermitido'] == 300
+        padron = aplicacion.padron_usuarios
+        assert sorted(u['userId'] for u in padron.usuarios) == ['0', '1', '9']
+        assert padron.buscar_por_documento('777')['nombre'] == 'Editado'
+        assert aplicacion.generaciones_vistas == {'usuarios': 3, 'configuracion': 1, 'asistencias': 0}
+
+        # Sin cambios nuevos, otra petición no publica versiones
+        version = padron.version
+        with app.test_client() as client:
+            client.get('/api/configuracion')
+        assert aplicacion.padron_usuarios.version == version
+        print("  ✓ Edición, baja, alta y configuración aplicadas sin releer el padrón")
+
+
+def test_generaciones_registro_circular():
+    """Test: Un worker atrasado más que el registro, o un cambio masivo, pide releer el padrón"""
+    print("✓ Test: Registro circular de cambios...")
+    directorio = tempfile.mkdtemp()
+    try:
+        generaciones = GeneracionesCompartidas(os.path.join(directorio, 'generaciones.bin'))
+        capacidad = GeneracionesCompartidas.CAPACIDAD_CAMBIOS
+        for i in range(capacidad + 1):
+            generaciones.publicar('usuarios', {'op': 'quitar', 'userId': str(i)})
+
+        ultimo = generaciones.leer()[0]
+        assert ultimo == capacidad + 1
+        assert generaciones.cambios_usuarios(0, ultimo) is None
+        cambios = generaciones.cambios_usuarios(1, ultimo)
+        assert [c['userId'] for c in cambios] == [str(i) for i in range(1, capacidad + 1)]
+
+        generaciones.publicar('usuarios', {'op': 'agregar', 'usuarios': [{'userId': '1', 'documento': '1', 'nombre': 'x' * 10_000}]})
+        generaciones.publicar('usuarios')
+        assert generaciones.cambios_usuarios(ultimo, ultimo + 1) is None
+        assert generaciones.cambios_usuarios(ultimo + 1, ultimo + 2) is None
+
+        # Otro proceso que abre el archivo ve las mismas generaciones
+        assert GeneracionesCompartidas(generaciones.ruta_archivo).leer() == (ultimo + 2, 0, 0)
+        print("  ✓ Cambios recientes disponibles; atrasos y cambios masivos piden relectura")
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+def test_cambios_aplicados_en_una_version():
+    """Test: Las altas de una petición son un cambio y los pendientes se publican en una sola versión"""
+    print("✓ Test: Cambios del registro en una sola versión del padrón...")
+    usuarios = [
+        {'userId': str(i), 'documento': f'{10_000_000 + i}', 'nombre': f'Usuario {i}'}
+        for i in range(3)
+    ]
+    altas = [
+        {'userId': str(i), 'documento': f'{20_000_000 + i}', 'nombre': f'Alta {i}'}
+        for i in range(100, 160)
+    ]
+    with EstadoTemporal():
+        reemplazar_usuarios(usuarios)
+        version = aplicacion.padron_usuarios.version
+
+        aplicacion.publicar_altas(altas)
+        assert aplicacion.generaciones.leer()[0] == 1
+        aplicacion.publicar_cambio('usuarios', {'op': 'editar', 'usuario': {'userId': '100', 'documento': '777', 'nombre': 'Editado'}})
+        aplicacion.publicar_cambio('usuarios', {'op': 'quitar', 'userId': '0'})
+        aplicacion.sincronizar_entre_workers()
+
+        padron = aplicacion.padron_usuarios
+        assert padron.version == version + 1
+        assert len(padron.usuarios) == 2 + len(altas)
+        assert padron.buscar_por_documento('777')['userId'] == '100'
+        assert padron.buscar_por_id('0') is None
+        assert aplicacion.generaciones_vistas['usuarios'] == 3
+
+        # Un vaciado en medio: lo anterior se descarta, lo posterior se aplica
+        aplicacion.publicar_cambio('usuarios', {'op': 'vaciar'})
+        aplicacion.publicar_altas(altas[:2])
+        aplicacion.sincronizar_entre_workers()
+        assert [u['userId'] for u in aplicacion.padron_usuarios.usuarios] == ['100', '101']
+
+        # Aplicarlos de nuevo (el worker que los publicó) no publica versiones
+        version = aplicacion.padron_usuarios.version
+        aplicacion.aplicar_cambios_al_padron(aplicacion.generaciones.cambios_usuarios(4, 5))
+        assert aplicacion.padron_usuarios.version == version
+    print(f"  ✓ {len(altas)} altas, edición y baja en 1 versión; vaciado intermedio respetado")
+
+
+def test_reinicio_fallido_conserva_asistencias():
+    """Test: Si no se puede archivar, el worker conserva las asistencias y los pendientes"""
+    print("✓ Test: Reinicio de asistencias que falla al persistir...")
+    usuarios = [
+        {'userId': str(i), 'documento': f'{10_000_000 + i}', 'nombre': f'Usuario {i}'}
+        for i in range(3)
+    ]
+    with EstadoTemporal() as estado:
+        reemplazar_usuarios(usuarios)
+        almacenamiento = aplicacion.almacenamiento
+
+        def fallar(*argumentos):
+            raise OSError('disco lleno')
+
+        with app.test_client() as client:
+            respuesta = client.post('/api/confirmar-asistencia', json={'userId': '1', **UBICACION})
+            assert respuesta.get_json()['confirmado'] is True
+
+            almacenamiento.archivar_asistencias = fallar
+            respuesta = client.post('/api/asistencias/reiniciar', headers=estado.encabezados, json={})
+            assert respuesta.status_code == 500
+
+            assert [a['userId'] for a in client.get('/api/asistencias').get_json()] == ['1']
+        assert listar_pendientes(0, 10) == ([usuarios[0], usuarios[2]], 2)
+        print("  ✓ Caché y pendientes iguales a lo que quedó en disco")
+
+
+def test_relectura_con_reescritura_pendiente():
+    """Test: Una relectura pedida por otro worker escribe antes lo pendiente y se reintenta si falla"""
+    print("✓ Test: Relectura del padrón con cambios propios pendientes...")
+    usuarios = [
+        {'userId': str(i), 'documento': f'{10_000_000 + i}', 'nombre': f'Usuario {i}'}
+        for i in range(3)
+    ]
+    with EstadoTemporal() as estado:
+        almacenamiento = aplicacion.almacenamiento
+        almacenamiento.demora_reescritura_usuarios = 60
+        guardar_usuarios_csv(usuarios, almacenamiento.ruta_usuarios)
+        reemplazar_usuarios(almacenamiento.cargar_usuarios())
+
+        # Edición propia aún sin escribir; otro worker agrega y pide releer
+        with app.test_client() as client:
+            respuesta = client.put('/api/usuarios/1', headers=estado.encabezados,
+                                   json={'documento': '777', 'nombre': 'Editado'})
+            assert respuesta.status_code == 200, respuesta.get_json()
+        assert almacenamiento.tiene_cambios_pendientes()
+        aplicacion.generaciones_vistas['usuarios'] = aplicacion.generaciones.leer()[0]
+        AlmacenamientoArchivos(estado.directorio).agregar_usuarios(
+            [{'userId': '9', 'documento': '999', 'nombre': 'Nuevo'}]
+        )
+        aplicacion.generaciones.publicar('usuarios')
+
+        aplicacion.sincronizar_entre_workers()
+        assert not almacenamiento.tiene_cambios_pendientes()
+        padron = aplicacion.padron_usuarios
+        assert [u['userId'] for u in padron.usuarios] == ['0', '1', '2', '9']
+        assert padron.buscar_por_id('1')['documento'] == '777'
+        assert aplicacion.generaciones_vistas['usuarios'] == aplicacion.generaciones.leer()[0]
+
+        # Si la relectura falla, la generación no se marca como incorporada
+        with open(almacenamiento.ruta_usuarios, 'w', encoding='utf-8') as archivo:
+            archivo.write('sin,columnas\n1,2\n')
+        generacion = aplicacion.generaciones.publicar('usuarios')
+        aplicacion.sincronizar_entre_workers()
+        assert aplicacion.generaciones_vistas['usuarios'] == generacion - 1
+
+        guardar_usuarios_csv(usuarios[:1], almacenamiento.ruta_usuarios)
+        aplicacion.sincronizar_entre_workers()
+        assert aplicacion.generaciones_vistas['usuarios'] == generacion
+        assert [u['userId'] for u in aplicacion.padron_usuarios.usuarios] == ['0']
+        print("  ✓ Cambio propio y alta ajena en el padrón; relectura fallida reintentada")
+
+
+def test_un_solo_lider():
+    """Test: Entre varios candidatos solo uno ejecuta los servicios, y otro asume si se detiene"""
+    print("✓ Test: Elección de líder...")
+    directorio = tempfile.mkdtemp()
+    try:
+        # flock excluye descriptores distintos también dentro de un proceso
+        asumidos = []
+        mantenimientos = Counter()
+        candidatos = []
+        for numero in range(4):
+            candidatos.append(ServiciosLider(
+                os.path.join(directorio, 'lider.lock'),
+                al_asumir=lambda numero=numero: asumidos.append(numero),
+                mantenimiento=lambda numero=numero: mantenimientos.update([numero]),
+                intervalo=0.02
+            ))
+        for candidato in candidatos:
+            candidato.iniciar()
+        time.sleep(0.3)
+
+        assert len(asumidos) == 1, asumidos
+        lider = asumidos[0]
+        assert [c.es_lider for c in candidatos].count(True) == 1
+        assert set(mantenimientos) == {lider}
+        with open(os.path.join(directorio, 'lider.lock')) as archivo:
+            assert archivo.read().strip() == str(os.getpid())
+
+        candidatos[lider].detener()
+        time.sleep(0.3)
+        assert len(asumidos) == 2 and asumidos[1] != lider, asumidos
+        assert [c.es_lider for c in candidatos].count(True) == 1
+        print(f"  ✓ Líder {lider}, reemplazado por {asumidos[1]} al detenerse")
+    finally:
+        for candidato in candidatos:
+            candidato.detener()
+        shutil.rmtree(directorio, ignore_errors=True)
+
+
+def test_recarga_publica_solo_cambios_nuevos():
+    """Test: El líder avisa a los workers solo si usuarios.csv trae algo que no tenían"""
+    print("✓ Test: Recarga de usuarios.csv en el líder...")
+    usuarios = [
+        {'userId': str(i), 'documento': f'{10_000_000 + i}', 'nombre': f'Usuario {i}'}
+        for i in range(3)
+    ]
+    with EstadoTemporal() as estado:
+        almacenamiento = aplicacion.almacenamiento
+        guardar_usuarios_csv(usuarios, almacenamiento.ruta_usuarios)
+        reemplazar_usuarios(almacenamiento.cargar_usuarios())
+
+        # Reescritura con el mismo contenido (un cambio del panel ya replicado)
+        guardar_usuarios_csv(usuarios, almacenamiento.ruta_usuarios)
+        recargar_y_publicar_usuarios()
+        assert aplicacion.generaciones.leer()[0] == 0
+
+        # Edición manual del archivo
+        usuarios[1]['nombre'] = 'Editado a mano'
+        guardar_usuarios_csv(usuarios, almacenamiento.ruta_usuarios)
+        recargar_y_publicar_usuarios()
+        assert aplicacion.generaciones.leer()[0] == 1
+        assert aplicacion.generaciones.cambios_usuarios(0, 1) is None  # Los demás releen
+        assert aplicacion.padron_usuarios.buscar_por_id('1')['nombre'] == 'Editado a mano'
+        print("  ✓ Solo la edición manual genera una nueva generación del padrón")
+
+
+def run_all_tests():
+    """Ejecutar todos los tests"""
+    print("\n" + "="*60)
+    print("PRUEBAS DE CONCURRENCIA")
+    print("="*60 + "\n")
+
+    tests = [
+        test_confirmaciones_concurrentes_sin_duplicados,
+        test_configuracion_concurrente_consistente,
+        test_tokens_concurrentes,
+        test_escrituras_atomicas_concurrentes,
+        test_worker_precargado_incorpora_cambios,
+        test_invalidacion_entre_workers,
+        test_generaciones_registro_circular,
+        test_cambios_aplicados_en_una_version,
+        test_reinicio_fallido_conserva_asistencias,
+        test_relectura_con_reescritura_pendiente,
+        test_un_solo_lider,
+        test_recarga_publica_solo_cambios_nuevos
+    ]
+
+    fallidos = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            fallidos += 1
+            print(f"  ✗ Falló: {e}")
+        print()
+
+    print("="*60)
+    print(f"Resultados: {len(tests) - fallidos}/{len(tests)} tests pasaron")
+    print("="*60 + "\n")
+    return fallidos == 0
+
+
+if __name__ == '__main__':
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -13,6 +13,7 @@ from app import (
     cargar_usuarios_csv,
     parsear_csv,
     calcular_distancia_haversine,
+    distancia_haversine_desde,
     cargar_configuracion,
     cargar_asistencias,
     guardar_asistencias
@@ -93,6 +94,29 @@ def test_calcular_distancia_haversine():
         return False
 
 
+def test_distancia_haversine_desde():
+    """Test: Distancias hasta un punto fijo iguales a calcular_distancia_haversine"""
+    print("✓ Test 4b: Distancia Haversine con punto fijo...")
+    try:
+        distancia = distancia_haversine_desde(4.3229422, -74.3693629)
+        for lat, lon in [(4.3229422, -74.3693629), (4.33, -74.37), (-12.0464, -77.0428), (89.9, 179.9)]:
+            esperada = calcular_distancia_haversine(lat, lon, 4.3229422, -74.3693629)
+            assert distancia(lat, lon) == esperada, f"Distinta para ({lat}, {lon})"
+        
+        for lat, lon in [(91, 0), (0, -181)]:
+            try:
+                distancia(lat, lon)
+                assert False, "Debería rechazar coordenadas fuera de rango"
+            except ValueError:
+                pass
+        
+        print("  ✓ Mismo resultado que el cálculo directo")
+        return True
+    except Exception as e:
+        print(f"  ✗ Error: {e}")
+        return False
+
+
 def test_validar_coordenadas_invalidas():
     """Test: Validar que coordenadas inválidas lancen error"""
     print("✓ Test 5: Validar coordenadas inválidas...")
@@ -198,6 +222,7 @@ def run_all_tests():
         test_parsear_csv,
         test_parsear_csv_invalido,
         test_calcular_distancia_haversine,
+        test_distancia_haversine_desde,
         test_validar_coordenadas_invalidas,
         test_cargar_configuracion,
         test_cargar_asistencias,
@@ -0,0 +1,720 @@
+"""
+Pruebas de los índices en memoria de usuarios
+"""
+
+import sys
+import os
+import csv
+import pickle
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from io import StringIO
+
+# Agregar el directorio backend al path
+sys.path.insert(0, os.path.dirname(__file__))
+
+import app as aplicacion
+from app import (
+    app,
+    reemplazar_usuarios,
+    agregar_al_padron,
+    editar_en_padron,
+    quitar_del_padron,
+    vaciar_padron,
+    buscar_usuario_por_documento,
+    buscar_usuario_por_id,
+    buscar_usuario_por_documento_normalizado,
+    normalizar_documento,
+    distancia_edicion,
+    enmascarar_nombre,
+    IndiceSugerencias,
+    buscar_usuarios,
+    PadronUsuarios,
+    AsistenciasIndexadas,
+    Usuario,
+    Asistencia,
+    TablaUsuarios,
+    FilaUsuario
+)
+
+
+def _usuario(user_id, documento=None):
+    """Construye un usuario de prueba."""
+    return {'userId': user_id, 'documento': documento or f'DOC{user_id}', 'nombre': f'Usuario {user_id}'}
+
+
+def test_indice_documento_reemplazo():
+    """Test: El índice se reconstruye al reemplazar la lista de usuarios"""
+    print("✓ Test: Índice por documento al reemplazar usuarios...")
+    usuarios_anteriores = aplicacion.usuarios_cache
+    try:
+        reemplazar_usuarios([_usuario('1'), _usuario('2')])
+        assert buscar_usuario_por_documento('DOC2')['userId'] == '2'
+
+        reemplazar_usuarios([_usuario('3')])
+        assert buscar_usuario_por_documento('DOC2') is None
+        assert buscar_usuario_por_documento('DOC3') is aplicacion.usuarios_cache[0]
+
+        # Con documentos repetidos gana el primero, como la búsqueda lineal
+        reemplazar_usuarios([_usuario('4', 'X'), _usuario('5', 'X')])
+        assert buscar_usuario_por_documento('X')['userId'] == '4'
+        print("  ✓ Índice reconstruido con la lista nueva")
+    finally:
+        reemplazar_usuarios(usuarios_anteriores)
+
+
+def test_indice_documento_incremental():
+    """Test: Altas, ediciones y bajas mantienen el índice sin reconstruirlo"""
+    print("✓ Test: Índice por documento incremental...")
+    usuarios_anteriores = aplicacion.usuarios_cache
+    try:
+        reemplazar_usuarios([_usuario('1', 'X'), _usuario('2', 'X')])
+
+        nuevo, = agregar_al_padron([_usuario('3')])
+        assert buscar_usuario_por_documento('DOC3') is nuevo
+
+        # Edición: un registro nuevo sale del documento anterior y entra en el nuevo
+        editado = editar_en_padron('3', 'DOC3B', 'Usuario 3')
+        assert editado['documento'] == 'DOC3B' and nuevo['documento'] == 'DOC3'
+        assert buscar_usuario_por_documento('DOC3') is None
+        assert buscar_usuario_por_documento('DOC3B') is editado
+        assert buscar_usuario_por_id('3') is editado
+        assert aplicacion.usuarios_cache[-1] is editado
+
+        # Baja del primero con documento repetido: el otro ocupa la entrada
+        assert quitar_del_padron('1')['documento'] == 'X'
+        assert buscar_usuario_por_documento('X')['userId'] == '2'
+        quitar_del_padron('2')
+        assert buscar_usuario_por_documento('X') is None
+        assert quitar_del_padron('2') is None and editar_en_padron('2', 'Y', 'Y') is None
+        assert buscar_usuario_por_id('1') is None and buscar_usuario_por_id('2') is None
+        print("  ✓ Índice actualizado en altas, ediciones y bajas")
+    finally:
+        reemplazar_usuarios(usuarios_anteriores)
+
+
+def test_indice_user_id():
+    """Test: El índice por userId sigue a la lista en reemplazos, altas y bajas"""
+    print("✓ Test: Índice por userId...")
+    usuarios_anteriores = aplicacion.usuarios_cache
+    try:
+        reemplazar_usuarios([_usuario('1'), _usuario('1', 'OTRO'), _usuario('2')])
+        assert buscar_usuario_por_id('1')['documento'] == 'DOC1'
+
+        # Baja del primero con userId repetido: el otro ocupa la entrada
+        quitar_del_padron('1')
+        assert buscar_usuario_por_id('1')['documento'] == 'OTRO'
+
+        nuevo, = agregar_al_padron([_usuario('9'), _usuario('9', 'REPETIDO')])
+        assert buscar_usuario_por_id('9') is nuevo
+        assert agregar_al_padron([_usuario('2', 'REPETIDO')]) == []
+
+        reemplazar_usuarios([])
+        assert buscar_usuario_por_id('2') is None
+        print("  ✓ Búsquedas por userId sin recorrer la lista")
+    finally:
+        reemplazar_usuarios(usuarios_anteriores)
+
+
+def test_padron_versiones_inmutables():
+    """Test: Una versión del padrón no cambia con altas, ediciones, bajas ni recargas posteriores"""
+    print("✓ Test: Versiones inmutables del padrón...")
+    usuarios_anteriores = aplicacion.usuarios_cache
+    try:
+        for formato in [list, TablaUsuarios]:
+            reemplazar_usuarios(formato([_usuario('1'), _usuario('2')]))
+            padron = aplicacion.padron_usuarios
+            assert isinstance(padron, PadronUsuarios)
+            contenido = [dict(usuario) for usuario in padron.usuarios]
+
+            agregar_al_padron([_usuario('3')])
+            editar_en_padron('1', 'NUEVO', 'Otro Nombre')
+            quitar_del_padron('2')
+            assert [dict(usuario) for usuario in padron.usuarios] == contenido
+            assert padron.buscar_por_documento('DOC1')['nombre'] == 'Usuario 1'
+            assert padron.buscar_por_documento('NUEVO') is None
+            assert padron.buscar_por_id('2')['documento'] == 'DOC2' and padron.buscar_por_id('3') is None
+
+            vigente = aplicacion.padron_usuarios
+            assert vigente.version == padron.version + 3 and vigente.origen == padron.origen
+            assert [usuario['userId'] for usuario in vigente.usuarios] == ['1', '3']
+            assert vigente.buscar_por_documento('NUEVO')['nombre'] == 'Otro Nombre'
+
+            # Vaciado y recarga publican versiones de otro origen
+            assert vaciar_padron() == 2 and len(vigente.usuarios) == 2
+            reemplazar_usuarios([_usuario('9')])
+            assert aplicacion.padron_usuarios.origen > vigente.origen
+            assert len(vigente.usuarios) == 2 and vigente.buscar_por_id('9') is None
+        print("  ✓ Cada versión conserva sus usuarios e índices")
+    finally:
+        reemplazar_usuarios(usuarios_anteriores)
+
+
+def test_padron_claves_repetidas():
+    """Test: Ediciones y bajas sin recorrer el padrón respetan el orden y las claves repetidas"""
+    print("✓ Test: Padrón con claves repetidas...")
+    aleatorio = random.Random(7)
+    referencia = [
+        {'userId': str(aleatorio.randrange(8)), 'documento': f'D{aleatorio.randrange(8)}', 'nombre': f'N{i}'}
+        for i in range(30)
+    ]
+    padron = PadronUsuarios(referencia)
+    # Índices esperados (clave → usuario de referencia), con las reglas de la
+    # búsqueda lineal: alta o cambio de documento no desplaza al indexado, y
+    # al quitarlo la entrada pasa al primero de la lista con esa clave
+    esperados = {campo: {} for campo in ('userId', 'documento')}
+    for usuario in referencia:
+        for campo, indice in esperados.items():
+            indice.setdefault(usuario[campo], usuario)
+
+    def desindexar(campo, usuario):
+        indice = esperados[campo]
+        if indice.get(usuario[campo]) is usuario:
+            del indice[usuario[campo]]
+            siguiente = next((u for u in referencia if u[campo] == usuario[campo] and u is not usuario), None)
+            if siguiente is not None:
+                indice[usuario[campo]] = siguiente
+
+    for paso in range(600):
+        padron = padron.copiar()
+        user_id = str(aleatorio.randrange(10))
+        operacion = aleatorio.choice(['agregar', 'editar', 'quitar'])
+        actual = esperados['userId'].get(user_id)
+        if operacion == 'agregar':
+            usuario = {'userId': user_id, 'documento': f'D{aleatorio.randrange(8)}', 'nombre': f'A{paso}'}
+            referencia.append(usuario)
+            for campo, indice in esperados.items():
+                indice.setdefault(usuario[campo], usuario)
+            padron._agregar(usuario)
+        elif operacion == 'editar' and actual is not None:
+            nuevo = {'userId': user_id, 'documento': f'D{aleatorio.randrange(8)}', 'nombre': f'E{paso}'}
+            referencia[next(i for i, u in enumerate(referencia) if u is actual)] = nuevo
+            esperados['userId'][user_id] = nuevo
+            if esperados['documento'].get(actual['documento']) is actual and nuevo['documento'] == actual['documento']:
+                esperados['documento'][actual['documento']] = nuevo
+            elif nuevo['documento'] != actual['documento']:
+                desindexar('documento', actual)
+                esperados['documento'].setdefault(nuevo['documento'], nuevo)
+            padron._editar(padron.buscar_por_id(user_id), nuevo['documento'], nuevo['nombre'])
+        elif operacion == 'quitar' and actual is not None:
+            referencia.remove(actual)
+            desindexar('userId', actual)
+            desindexar('documento', actual)
+            padron._quitar(padron.buscar_por_id(user_id))
+
+        assert [dict(usuario) for usuario in padron.usuarios] == referencia, paso
+        posiciones = {id(usuario): i for i, usuario in enumerate(padron.usuarios)}
+        for campo, indice in (('userId', padron.por_id), ('documento', padron.por_documento)):
+            assert set(indice) == set(esperados[campo]), paso
+            for clave, usuario in esperados[campo].items():
+                posicion = next(i for i, u in enumerate(referencia) if u is usuario)
+                assert posiciones[id(indice[clave])] == posicion, (paso, campo, clave)
+
+    # Bajas sobre un padrón grande sin recorrerlo en cada una
+    padron = PadronUsuarios([_usuario(str(i)) for i in range(50000)])
+    inicio = time.perf_counter()
+    for i in range(0, 50000, 25):
+        padron._quitar(padron.buscar_por_id(str(i)))
+        padron._editar(padron.buscar_por_id(str(i + 1)), f'NUEVO{i}', 'Editado')
+    demora = time.perf_counter() - inicio
+    assert len(padron.usuarios) == 48000 and padron.usuarios[0]['documento'] == 'NUEVO0'
+    assert demora < 1.0, demora
+    print(f"  ✓ 600 cambios con repetidos iguales a la lista; 4000 cambios en {demora * 1000:.0f} ms")
+
+
+def test_padron_lecturas_concurrentes():
+    """Test: Las lecturas ven versiones completas mientras otros threads publican cambios"""
+    print("✓ Test: Lecturas concurrentes del padrón...")
+    usuarios_anteriores = aplicacion.usuarios_cache
+    errores = []
+    terminar = threading.Event()
+
+    def leer():
+        while not terminar.is_set():
+            padron = aplicacion.padron_usuarios
+            ids = [usuario['userId'] for usuario in padron.usuarios]
+            if len(ids) != len(padron.por_id) or any(padron.buscar_por_id(i) is None for i in ids):
+                errores.append(padron)
+
+    try:
+        reemplazar_usuarios([_usuario(str(i)) for i in range(200)])
+        lectores = [threading.Thread(target=leer) for _ in range(4)]
+        for lector in lectores:
+            lector.start()
+        for i in range(200, 300):
+            agregar_al_padron([_usuario(str(i))])
+            editar_en_padron(str(i - 200), f'E{i}', 'Editado')
+            quitar_del_padron(str(i - 100))
+            if i % 25 == 0:
+                reemplazar_usuarios([_usuario(str(j)) for j in range(200)])
+        terminar.set()
+        for lector in lectores:
+            lector.join()
+        assert not errores
+        print("  ✓ Ningún lector vio un padrón a medio modificar")
+    finally:
+        terminar.set()
+        reemplazar_usuarios(usuarios_anteriores)
+
+
+def test_asistentes_pendientes():
+    """Test: Los pendientes siguen a confirmaciones, altas, bajas y reemplazos del padrón"""
+    print("✓ Test: Asistentes pendientes...")
+    usuarios_anteriores = aplicacion.usuarios_cache
+    asistencias_anteriores = aplicacion.asistencias_cache
+    token = aplicacion.generar_token()
+    aplicacion.admin_tokens[token] = datetime.now() + timedelta(hours=1)
+    encabezados = {'Authorization': f'Bearer {token}'}
+
+    def pendientes(desde=0, limite=100):
+        usuarios, total = aplicacion.listar_pendientes(desde, limite)
+        return [u['userId'] for u in usuarios], total
+
+    try:
+        aplicacion.asistencias_cache = AsistenciasIndexadas([
+            {'userId': '2', 'nombre': 'Usuario 2', 'fechaHora': '2026-01-14T10:00:00Z',
+             'ubicacion': {'latitud': 4.3229422, 'longitud': -74.3693629}}
+        ])
+        reemplazar_usuarios([_usuario(str(i)) for i in range(1, 6)])
+        assert pendientes() == (['1', '3', '4', '5'], 4)
+
+        # Confirmación y confirmación retirada
+        asistencia = {'userId': '3', 'nombre': 'Usuario 3', 'fechaHora': '2026-01-14T10:01:00Z',
+                      'ubicacion': {'latitud': 4.3229422, 'longitud': -74.3693629}}
+        aplicacion.asistencias_cache.append(asistencia)
+        aplicacion.confirmar_pendiente('3')
+        assert pendientes() == (['1', '4', '5'], 3)
+        aplicacion.retirar_asistencia_cache(asistencia)
+        assert pendientes() == (['1', '4', '5', '3'], 4)
+
+        # Altas (pendientes salvo que ya hayan confirmado) y bajas
+        agregar_al_padron([_usuario('6')])
+        quitar_del_padron('1')
+        quitar_del_padron('2')
+        assert pendientes() == (['4', '5', '3', '6'], 4)
+        assert pendientes(desde=1, limite=2) == (['5', '3'], 4)
+
+        with app.test_client() as client:
+            assert client.get('/api/asistencias/pendientes').status_code == 401
+            assert client.get('/api/asistencias/pendientes?desde=x', headers=encabezados).status_code == 400
+            datos = client.get('/api/asistencias/pendientes?desde=3&limite=5', headers=encabezados).get_json()
+            assert datos['pendientes'] == [_usuario('6')] and datos['total'] == 4
+            assert datos['totalUsuarios'] == 4 and datos['desde'] == 3
+            datos = client.get('/api/asistencias/pendientes?limite=0', headers=encabezados).get_json()
+            assert datos['pendientes'] == [] and datos['total'] == 4
+
+        vaciar_padron()
+        assert pendientes() == ([], 0)
+        print("  ✓ Pendientes actualizados sin recorrer el padrón")
+    finally:
+        del aplicacion.admin_tokens[token]
+        aplicacion.asistencias_cache = asistencias_anteriores
+        reemplazar_usuarios(usuarios_anteriores)
+
+
+def test_conjunto_confirmados():
+    """Test: Los confirmados siguen a las altas, retiros y reinicios del caché"""
+    print("✓ Test: Conjunto de confirmados...")
+    asistencias = AsistenciasIndexadas()
+    asistencia = {'userId': '1', 'nombre': 'Uno', 'fechaHora': '2026-01-14T10:00:00Z'}
+    assert not asistencias.contiene_usuario('1')
+    asistencias.append(asistencia)
+    assert asistencias.contiene_usuario('1')
+
+    # Retiro de un agregado optimista que no se pudo persistir
+    asistencias.remove(asistencia)
+    assert not asistencias.contiene_usuario('1')
+
+    asistencias.append(asistencia)
+    asistencias.clear()
+    assert not asistencias.contiene_usuario('1') and len(asistencias) == 0
+    print("  ✓ Confirmados consistentes con el caché")
+
+
+def test_registros_compactos():
+    """Test: Usuario y Asistencia equivalen al diccionario que reemplazan"""
+    print("✓ Test: Registros compactos...")
+    usuario = Usuario.desde_dict(_usuario('1'))
+    assert usuario == _usuario('1') and dict(usuario) == _usuario('1')
+    assert usuario.a_dict() == _usuario('1') and usuario.get('correo') is None
+    usuario['nombre'] = 'Otro'
+    assert usuario['nombre'] == 'Otro'
+    try:
+        usuario['correo'] = 'x'
+        assert False, "Se aceptó un campo inexistente"
+    except KeyError:
+        pass
+
+    datos = {'userId': '1', 'nombre': 'Uno', 'fechaHora': '2026-01-14T10:00:00.123456Z',
+             'ubicacion': {'latitud': 4.3229422, 'longitud': -74.3693629}}
+    asistencia = Asistencia.desde_dict(datos)
+    assert isinstance(asistencia, Asistencia) and isinstance(asistencia.fecha, int)
+    assert asistencia == datos and asistencia.a_dict() == datos
+    assert list(asistencia.a_dict()) == list(datos)
+
+    # Fechas que no se reconstruyen igual se conservan como texto
+    for fecha in ['2026-01-14T10:00:00.000000Z', '2026-01-14 10:00:00', '']:
+        assert Asistencia.desde_dict({**datos, 'fechaHora': fecha})['fechaHora'] == fecha
+
+    # Formas distintas (campos extra, coordenadas enteras) no se convierten
+    for otra in [{**datos, 'extra': 1}, {**datos, 'ubicacion': {'latitud': 4, 'longitud': -74.0}}]:
+        assert Asistencia.desde_dict(otra) is otra
+
+    # El caché guarda registros compactos y entrega diccionarios
+    asistencias = AsistenciasIndexadas()
+    asistencias.append(datos)
+    assert isinstance(asistencias._recientes[0], Asistencia)
+    assert list(asistencias) == [datos] and datos in asistencias
+    asistencias.remove(datos)
+    assert len(asistencias) == 0
+    print("  ✓ Registros equivalentes en lectura, edición y serialización")
+
+
+def test_tabla_columnar_usuarios():
+    """Test: TablaUsuarios se comporta como la lista de usuarios con sus índices"""
+    print("✓ Test: Tabla columnar de usuarios...")
+    tabla = TablaUsuarios([_usuario('1', 'X'), _usuario('2', 'X'), _usuario('3', 'Ñandú')])
+    assert len(tabla) == 3
+    assert [dict(u) for u in tabla] == [_usuario('1', 'X'), _usuario('2', 'X'), _usuario('3', 'Ñandú')]
+    por_id, por_documento = tabla.indice('userId'), tabla.indice('documento')
+    assert por_documento.get('Ñandú')['userId'] == '3'
+    assert por_documento.get('X')['userId'] == '1'  # El primero con documento repetido
+    assert por_id.get('4') is None
+
+    # Altas con crecimiento del índice
+    for i in range(4, 200):
+        tabla.append(Usuario(str(i), f'DOC{i}', f'Usuario {i}'))
+    assert len(tabla) == 199 and por_id.get('150')['documento'] == 'DOC150'
+
+    # Ediciones: en el lugar y más largas que el texto anterior
+    usuario = por_id.get('150')
+    usuario['documento'] = 'D150'
+    usuario['nombre'] = 'Un nombre bastante más largo que el anterior'
+    assert por_documento.get('DOC150') is None and por_documento.get('D150') == usuario
+    assert por_id.get('150')['nombre'] == 'Un nombre bastante más largo que el anterior'
+
+    # Bajas: el otro usuario con la clave ocupa la entrada
+    tabla.remove(por_id.get('1'))
+    assert por_documento.get('X')['userId'] == '2' and por_id.get('1') is None
+    tabla.remove(_usuario('2', 'X'))
+    assert por_documento.get('X') is None and len(tabla) == 197
+    try:
+        tabla.remove(_usuario('2', 'X'))
+        assert False, "Se eliminó un usuario inexistente"
+    except ValueError:
+        pass
+
+    # El snapshot binario conserva columnas e índices
+    copia = pickle.loads(pickle.dumps(tabla, protocol=pickle.HIGHEST_PROTOCOL))
+    assert [dict(u) for u in copia] == [dict(u) for u in tabla]
+    assert copia.indice('documento').get('D150')['userId'] == '150'
+
+    tabla.clear()
+    assert len(tabla) == 0 and list(tabla) == [] and por_id.get('3') is None
+    print("  ✓ Altas, ediciones, bajas y búsquedas sobre la arena")
+
+
+def test_endpoints_con_tabla_columnar():
+    """Test: Las búsquedas de los endpoints funcionan con el padrón columnar"""
+    print("✓ Test: Endpoints con padrón columnar...")
+    usuarios_anteriores = aplicacion.usuarios_cache
+    try:
+        reemplazar_usuarios(TablaUsuarios(_usuario(str(i)) for i in range(1000)))
+        assert isinstance(aplicacion.usuarios_cache, TablaUsuarios)
+
+        nuevo = Usuario('n', 'DOCN', 'Nuevo')
+        agregar_al_padron([nuevo])
+        encontrado = buscar_usuario_por_id('n')
+        assert isinstance(encontrado, FilaUsuario) and encontrado == nuevo
+        editar_en_padron('n', 'DOCN2', 'Nuevo')
+        assert buscar_usuario_por_documento('DOCN2')['userId'] == 'n'
+        assert encontrado['documento'] == 'DOCN'  # La versión anterior no cambia
+
+        with app.test_client() as client:
+            respuesta = client.post('/api/validar-identidad', json={'documento': 'DOCN2'})
+            assert respuesta.get_json() == {'valido': True, 'nombre': 'Nuevo', 'userId': 'n'}
+
+        quitar_del_padron('n')
+        assert buscar_usuario_por_id('n') is None and len(aplicacion.usuarios_cache) == 1000
+        print("  ✓ Altas, ediciones, bajas y validación sobre la tabla")
+    finally:
+        reemplazar_usuarios(usuarios_anteriores)
+
+
+def test_normalizar_documento():
+    """Test: La normalización quita separadores, espacios y ceros a la izquierda"""
+    print("✓ Test: Normalización de documentos...")
+    casos = {
+        '1234567': '1234567',
+        '1.234.567': '1234567',
+        ' 01234567 ': '1234567',
+        '12-345 678': '12345678',
+        'ab.123-k': 'AB123K',
+        '000': '',
+    }
+    for documento, esperado in casos.items():
+        assert normalizar_documento(documento) == esperado, documento
+    print("  ✓ Formas normalizadas correctas")
+
+
+def test_indice_documento_normalizado():
+    """Test: validar-identidad acepta el documento escrito de otra forma, salvo si es ambiguo"""
+    print("✓ Test: Índice de documentos normalizados...")
+    usuarios_anteriores = aplicacion.usuarios_cache
+    try:
+        for formato in [list, TablaUsuarios]:
+            reemplazar_usuarios(formato([
+                _usuario('1', '1234567'), _usuario('2', '0.765.432'), _usuario('3', 'ab-99'),
+                _usuario('4', '555'), _usuario('5', '0555'),  # Ambiguos al normalizar
+            ]))
+            buscar = buscar_usuario_por_documento_normalizado
+            assert buscar('1.234.567')['userId'] == '1'
+            assert buscar('765432')['userId'] == '2' and buscar('0765432')['userId'] == '2'
+            assert buscar('AB99')['userId'] == '3'
+            assert buscar('0555')['userId'] == '5' and buscar('555')['userId'] == '4'
+            assert buscar('5.55') is None  # Ambiguo: solo vale el exacto
+            assert aplicacion.padron_usuarios.documentos_ambiguos == {'555': ['0555', '555']}
+
+            # Alta, edición y baja mantienen el índice
+            agregar_al_padron([_usuario('6', '98.765')])
+            assert buscar('98765')['userId'] == '6'
+            editar_en_padron('6', '11.111', 'Usuario 6')
+            assert buscar('98765') is None and buscar('011111')['userId'] == '6'
+
+            # Al quitar uno de los ambiguos el otro vuelve a aceptarse normalizado
+            quitar_del_padron('4')
+            assert buscar('5.55')['userId'] == '5' and not aplicacion.padron_usuarios.documentos_ambiguos
+        print("  ✓ Documentos normalizados y ambigüedades detectadas")
+    finally:
+        reemplazar_usuarios(usuarios_anteriores)
+
+
+def test_indice_sugerencias():
+    """Test: El índice de borrado simétrico sugiere documentos a distancia 1-2"""
+    print("✓ Test: Índice de sugerencias...")
+    assert distancia_edicion('1234567', '1234567', 2) == 0
+    assert distancia_edicion('1234567', '1243567', 2) == 1  # Transposición
+    assert distancia_edicion('1234567', '123456', 2) == 1
+    assert distancia_edicion('1234567', '1299567', 2) == 2
+    assert distancia_edicion('1234567', '9999567', 2) == 3
+    assert enmascarar_nombre('Juan  Pérez') == 'J*** P****'
+
+    indice = IndiceSugerencias(2, ['1234567', '7654321', '1234500', ''])
+    assert indice.sugerir('1243567', 3) == ['1234567']
+    assert indice.sugerir('123456', 3) == ['1234567']  # Solo los más cercanos
+    assert indice.sugerir('12345', 3) == ['1234500', '1234567']
+    assert indice.sugerir('5555555', 3) == []
+
+    indice.quitar('1234567')
+    assert indice.sugerir('1243567', 3) == []
+    assert indice.sugerir('12345', 3) == ['1234500']
+    print("  ✓ Sugerencias por distancia sin recorrer el padrón")
+
+
+def test_validar_identidad_sugerencias():
+    """Test: Un documento inválido recibe nombres enmascarados de documentos parecidos"""
+    print("✓ Test: Sugerencias en validar-identidad...")
+    usuarios_anteriores = aplicacion.usuarios_cache
+    distancia_anterior = aplicacion.DISTANCIA_SUGERENCIAS
+    aplicacion.DISTANCIA_SUGERENCIAS = 2
+    try:
+        reemplazar_usuarios([
+            {'userId': '1', 'documento': '1.234.567', 'nombre': 'Ana María Soto'},
+            {'userId': '2', 'documento': '89012345', 'nombre': 'Luis Rojas'},
+        ])
+        with app.test_client() as client:
+            respuesta = client.post('/api/validar-identidad', json={'documento': '1243567'})
+            assert respuesta.get_json() == {'valido': False, 'sugerencias': ['A** M**** S***']}
+            respuesta = client.post('/api/validar-identidad', json={'documento': '555'})
+            assert respuesta.get_json() == {'valido': False}
+
+            # Las altas entran al índice
+            agregar_al_padron([_usuario('3', '89012354')])
+            respuesta = client.post('/api/validar-identidad', json={'documento': '8901235'})
+            assert respuesta.get_json()['sugerencias'] == ['L*** R****', 'U****** 3']
+        print("  ✓ Nombres enmascarados sin documentos ni userId")
+    finally:
+        aplicacion.DISTANCIA_SUGERENCIAS = distancia_anterior
+        reemplazar_usuarios(usuarios_anteriores)
+
+
+def test_busqueda_usuarios():
+    """Test: La búsqueda por trigramas ordena por relevancia y sigue las mutaciones"""
+    print("✓ Test: Búsqueda de usuarios...")
+    usuarios_anteriores = aplicacion.usuarios_cache
+    try:
+        for formato in [list, TablaUsuarios]:
+            reemplazar_usuarios(formato([
+                {'userId': '1', 'documento': '1.234.567', 'nombre': 'José Pérez'},
+                {'userId': '2', 'documento': '7654321', 'nombre': 'María Josefina Ruiz'},
+                {'userId': '123', 'documento': '999', 'nombre': 'Ana Gómez'},
+                {'userId': '4', 'documento': '4123', 'nombre': 'Pedro Alvarez'},
+            ]))
+
+            def ids(consulta, limite=50):
+                usuarios, total = buscar_usuarios(consulta, limite)
+                return [u['userId'] for u in usuarios], total
+
+            assert ids('jose') == (['1', '2'], 2)  # Sin tildes; palabra exacta antes
+            assert ids('JOSÉ pér') == (['1'], 1)
+            assert ids('123') == (['123', '1', '4'], 3)  # userId exacto, prefijo, resto
+            assert ids('1234567') == (['1'], 1)  # Documento sin separadores
+            assert ids('a') == (['123', '4'], 2)  # Inicio de palabra
+            assert ids('rez') == (['1', '4'], 2)
+            assert ids('ezp') == ([], 0)
+            assert ids('jose', limite=1) == (['1'], 2)
+
+            # Altas, ediciones y bajas actualizan el índice ya construido
+            agregar_al_padron([Usuario('5', '555', 'Josué Ramírez')])
+            assert ids('josu') == (['5'], 1)
+            editar_en_padron('5', '555', 'Luis Ramírez')
+            editar_en_padron('5', '888', 'Luis Ramírez')
+            assert ids('josu') == ([], 0) and ids('luis') == (['5'], 1) and ids('888') == (['5'], 1)
+            quitar_del_padron('5')
+            assert ids('luis') == ([], 0)
+        print("  ✓ Coincidencias ordenadas e índice incremental")
+    finally:
+        reemplazar_usuarios(usuarios_anteriores)
+
+
+def test_buscar_usuarios_endpoint():
+    """Test: GET /api/usuarios/buscar exige sesión y valida los parámetros"""
+    print("✓ Test: Endpoint de búsqueda de usuarios...")
+    usuarios_anteriores = aplicacion.usuarios_cache
+    token = aplicacion.generar_token()
+    aplicacion.admin_tokens[token] = datetime.now() + timedelta(hours=1)
+    encabezados = {'Authorization': f'Bearer {token}'}
+    try:
+        reemplazar_usuarios([_usuario(str(i)) for i in range(300)])
+        with app.test_client() as client:
+            assert client.get('/api/usuarios/buscar?q=usuario').status_code == 401
+            assert client.get('/api/usuarios/buscar?q=', headers=encabezados).status_code == 400
+            assert client.get('/api/usuarios/buscar?q=x&limite=abc', headers=encabezados).status_code == 400
+
+            datos = client.get('/api/usuarios/buscar?q=usuario', headers=encabezados).get_json()
+            assert datos['total'] == 300 and len(datos['usuarios']) == 50
+            datos = client.get('/api/usuarios/buscar?q=DOC29&limite=500', headers=encabezados).get_json()
+            assert datos['total'] == 11 and datos['usuarios'][0] == _usuario('29')
+        print("  ✓ Resultados limitados con el total de coincidencias")
+    finally:
+        del aplicacion.admin_tokens[token]
+        reemplazar_usuarios(usuarios_anteriores)
+
+
+def test_pagina_usuarios_endpoint():
+    """Test: GET /api/usuarios/pagina retorna una página del padrón y el total"""
+    print("✓ Test: Endpoint de página de usuarios...")
+    usuarios_anteriores = aplicacion.usuarios_cache
+    token = aplicacion.generar_token()
+    aplicacion.admin_tokens[token] = datetime.now() + timedelta(hours=1)
+    encabezados = {'Authorization': f'Bearer {token}'}
+    try:
+        reemplazar_usuarios([_usuario(str(i)) for i in range(300)])
+        with app.test_client() as client:
+            assert client.get('/api/usuarios/pagina').status_code == 401
+            assert client.get('/api/usuarios/pagina?desde=x', headers=encabezados).status_code == 400
+
+            datos = client.get('/api/usuarios/pagina', headers=encabezados).get_json()
+            assert datos['total'] == 300 and datos['usuarios'] == [_usuario(str(i)) for i in range(50)]
+            datos = client.get('/api/usuarios/pagina?desde=290&limite=500', headers=encabezados).get_json()
+            assert datos['limite'] == 200 and [u['userId'] for u in datos['usuarios']] == [str(i) for i in range(290, 300)]
+        print("  ✓ Página en el orden del padrón sin descargarlo completo")
+    finally:
+        del aplicacion.admin_tokens[token]
+        reemplazar_usuarios(usuarios_anteriores)
+
+
+def test_validar_identidad_usa_indice():
+    """Test: /api/validar-identidad responde desde el índice"""
+    print("✓ Test: validar-identidad con índice...")
+    usuarios_anteriores = aplicacion.usuarios_cache
+    try:
+        reemplazar_usuarios([_usuario(str(i)) for i in range(1000)])
+        with app.test_client() as client:
+            respuesta = client.post('/api/validar-identidad', json={'documento': ' DOC999 '})
+            assert respuesta.get_json() == {'valido': True, 'nombre': 'Usuario 999', 'userId': '999'}
+            respuesta = client.post('/api/validar-identidad', json={'documento': 'DOC1000'})
+            assert respuesta.get_json() == {'valido': False}
+            respuesta = client.post('/api/validar-identidad', json={'documento': 'doc-999'})
+            assert respuesta.get_json() == {'valido': True, 'nombre': 'Usuario 999', 'userId': '999'}
+        print("  ✓ Documento encontrado y ausente")
+    finally:
+        reemplazar_usuarios(usuarios_anteriores)
+
+
+def test_exportar_csv_join_por_user_id():
+    """Test: La exportación CSV obtiene el documento a través del índice por userId"""
+    print("✓ Test: Exportación CSV con join por userId...")
+    usuarios_anteriores = aplicacion.usuarios_cache
+    asistencias_anteriores = aplicacion.asistencias_cache
+    token = aplicacion.generar_token()
+    aplicacion.admin_tokens[token] = datetime.now() + timedelta(hours=1)
+    try:
+        reemplazar_usuarios([_usuario('1'), _usuario('2', 'Pérez, "J"')])
+        aplicacion.asistencias_cache = AsistenciasIndexadas([
+            {'userId': uid, 'nombre': f'Usuario {uid}', 'fechaHora': '2026-01-14T10:00:00Z',
+             'ubicacion': {'latitud': 4.3229422, 'longitud': -74.3693629}}
+            for uid in ['2', '1', 'sin-usuario']
+        ])
+        with app.test_client() as client:
+            respuesta = client.get('/api/asistencias/exportar-csv', headers={'Authorization': f'Bearer {token}'})
+        assert respuesta.status_code == 200
+        filas = list(csv.reader(StringIO(respuesta.get_data(as_text=True))))
+        assert [fila[2] for fila in filas[1:]] == ['Pérez, "J"', 'DOC1', '']
+        assert all(fila[6] != 'N/A' for fila in filas[1:])
+        print("  ✓ Documentos unidos por userId y distancias calculadas")
+    finally:
+        del aplicacion.admin_tokens[token]
+        reemplazar_usuarios(usuarios_anteriores)
+        aplicacion.asistencias_cache = asistencias_anteriores
+
+
+def run_all_tests():
+    """Ejecutar todos los tests"""
+    print("\n" + "="*60)
+    print("PRUEBAS DE ÍNDICES EN MEMORIA")
+    print("="*60 + "\n")
+
+    tests = [
+        test_indice_documento_reemplazo,
+        test_indice_documento_incremental,
+        test_indice_user_id,
+        test_padron_versiones_inmutables,
+        test_padron_claves_repetidas,
+        test_padron_lecturas_concurrentes,
+        test_asistentes_pendientes,
+        test_conjunto_confirmados,
+        test_registros_compactos,
+        test_tabla_columnar_usuarios,
+        test_endpoints_con_tabla_columnar,
+        test_normalizar_documento,
+        test_indice_documento_normalizado,
+        test_indice_sugerencias,
+        test_validar_identidad_sugerencias,
+        test_busqueda_usuarios,
+        test_buscar_usuarios_endpoint,
+        test_pagina_usuarios_endpoint,
+        test_validar_identidad_usa_indice,
+        test_exportar_csv_join_por_user_id
+    ]
+
+    fallidos = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            fallidos += 1
+            print(f"  ✗ Falló: {e}")
+        print()
+
+    print("="*60)
+    print(f"Resultados: {len(tests) - fallidos}/{len(tests)} tests pasaron")
+    print("="*60 + "\n")
+    return fallidos == 0
+
+
+if __name__ == '__main__':
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,1188 @@
+"""
+Pruebas de persistencia de asistencias y usuarios
+Sistema de Confirmación de Asistencia a Asambleas
+"""
+
+import sys
+import os
+import gzip
+import json
+import multiprocessing
+import pickle
+import shutil
+import tempfile
+import threading
+import time
+
+# Agregar el directorio backend al path
+sys.path.insert(0, os.path.dirname(__file__))
+
+from app import (
+    cargar_asistencias,
+    guardar_asistencias,
+    reproducir_journal_asistencias,
+    agregar_asistencia_journal,
+    registrar_reinicio_journal,
+    escribir_journal_asistencias,
+    AlmacenamientoArchivos,
+    AlmacenamientoSQLite,
+    AsistenciasIndexadas,
+    JournalAsistencias,
+    escribir_archivo_atomico,
+    guardar_usuarios_csv,
+    cargar_usuarios_csv,
+    aplicar_cambios_usuarios,
+    cargar_usuarios_con_snapshot,
+    TablaUsuarios,
+    recuperar_datos,
+    Almacenamiento,
+    ArchivoEventos,
+    PersistidorDiferido
+)
+
+
+def _asistencia(user_id):
+    """Construye una asistencia de prueba."""
+    return {
+        'userId': user_id,
+        'nombre': f'Usuario {user_id}',
+        'fechaHora': '2026-01-14T10:00:00Z',
+        'ubicacion': {'latitud': -12.0464, 'longitud': -77.0428}
+    }
+
+
+def test_journal_agregar_y_reproducir():
+    """Test: Agregar registros al journal y reproducirlos"""
+    print("✓ Test: Journal agregar y reproducir...")
+    directorio = tempfile.mkdtemp()
+    try:
+        ruta = os.path.join(directorio, 'asistencias.jsonl')
+        agregar_asistencia_journal(_asistencia('1'), ruta)
+        agregar_asistencia_journal(_asistencia('2'), ruta)
+
+        with open(ruta, 'r', encoding='utf-8') as archivo:
+            assert len(archivo.read().splitlines()) == 2, "Cada asistencia debe ser una línea"
+
+        asistencias = cargar_asistencias(ruta)
+        assert [a['userId'] for a in asistencias] == ['1', '2']
+        print("  ✓ Journal reproducido correctamente")
+    finally:
+        shutil.rmtree(directorio)
+
+
+def test_journal_reinicio():
+    """Test: Un registro de reinicio descarta las asistencias previas"""
+    print("✓ Test: Journal con reinicio...")
+    directorio = tempfile.mkdtemp()
+    try:
+        ruta = os.path.join(directorio, 'asistencias.jsonl')
+        escribir_journal_asistencias([_asistencia('1'), _asistencia('2')], ruta)
+        registrar_reinicio_journal(ruta)
+        agregar_asistencia_journal(_asistencia('3'), ruta)
+
+        asistencias = reproducir_journal_asistencias(ruta)
+        assert [a['userId'] for a in asistencias] == ['3']
+        print("  ✓ Reinicio aplicado correctamente")
+    finally:
+        shutil.rmtree(directorio)
+
+
+def test_journal_linea_incompleta():
+    """Test: Una última línea truncada se ignora al reproducir"""
+    print("✓ Test: Journal con escritura interrumpida...")
+    directorio = tempfile.mkdtemp()
+    try:
+        ruta = os.path.join(directorio, 'asistencias.jsonl')
+        agregar_asistencia_journal(_asistencia('1'), ruta)
+        with open(ruta, 'a', encoding='utf-8') as archivo:
+            archivo.write('{"op": "agregar", "asistencia": {"userId"')
+
+        asistencias = reproducir_journal_asistencias(ruta)
+        assert [a['userId'] for a in asistencias] == ['1']
+        print("  ✓ Registro incompleto ignorado")
+    finally:
+        shutil.rmtree(directorio)
+
+
+def test_journal_exportar_json():
+    """Test: El contenido del journal se puede exportar a formato asistencias.json"""
+    print("✓ Test: Exportar journal a JSON...")
+    directorio = tempfile.mkdtemp()
+    try:
+        ruta_journal = os.path.join(directorio, 'asistencias.jsonl')
+        ruta_json = os.path.join(directorio, 'asistencias.json')
+        escribir_journal_asistencias([_asistencia('1')], ruta_journal)
+
+        guardar_asistencias(cargar_asistencias(ruta_journal), ruta_json)
+
+        with open(ruta_json, 'r', encoding='utf-8') as archivo:
+            assert json.load(archivo) == [_asistencia('1')]
+        print("  ✓ Exportación a JSON correcta")
+    finally:
+        shutil.rmtree(directorio)
+
+
+def _configuracion():
+    """Construye una configuración de prueba."""
+    return {
+        'ubicacionAsamblea': {'latitud': -12.0464, 'longitud': -77.0428},
+        'radioPermitido': 100
+    }
+
+
+def test_sqlite_usuarios():
+    """Test: Operaciones puntuales de usuarios en SQLite"""
+    print("✓ Test: SQLite usuarios...")
+    directorio = tempfile.mkdtemp()
+    try:
+        bd = AlmacenamientoSQLite(os.path.join(directorio, 'asistencia.db'))
+        modo = bd._conexion().execute('PRAGMA journal_mode').fetchone()[0]
+        assert modo == 'wal', f"Esperaba modo WAL, obtuvo {modo}"
+
+        bd.agregar_usuarios([
+            {'userId': '1', 'documento': '111', 'nombre': 'Uno'},
+            {'userId': '2', 'documento': '222', 'nombre': 'Dos'}
+        ])
+        bd.actualizar_usuario({'userId': '1', 'documento': '999', 'nombre': 'Uno Editado'})
+        bd.eliminar_usuario('2')
+
+        assert bd.cargar_usuarios() == [{'userId': '1', 'documento': '999', 'nombre': 'Uno Editado'}]
+
+        bd.eliminar_todos_usuarios()
+        assert bd.cargar_usuarios() == []
+        bd.cerrar()
+        print("  ✓ Usuarios persistidos fila por fila")
+    finally:
+        shutil.rmtree(directorio)
+
+
+def test_sqlite_asistencias_unicas():
+    """Test: SQLite rechaza una segunda asistencia del mismo userId"""
+    print("✓ Test: SQLite asistencias únicas...")
+    directorio = tempfile.mkdtemp()
+    try:
+        bd = AlmacenamientoSQLite(os.path.join(directorio, 'asistencia.db'))
+        assert bd.registrar_asistencia(_asistencia('1')) == True
+        assert bd.registrar_asistencia(_asistencia('1')) == False
+        assert bd.cargar_asistencias() == [_asistencia('1')]
+
+        bd.reiniciar_asistencias()
+        assert bd.cargar_asistencias() == []
+        bd.cerrar()
+        print("  ✓ Duplicado rechazado por restricción UNIQUE")
+    finally:
+        shutil.rmtree(directorio)
+
+
+def test_sqlite_conexion_por_thread():
+    """Test: Cada thread usa su propia conexión SQLite"""
+    print("✓ Test: SQLite conexión por thread...")
+    directorio = tempfile.mkdtemp()
+    try:
+        bd = AlmacenamientoSQLite(os.path.join(directorio, 'asistencia.db'))
+        conexiones = []
+
+        def registrar(indice):
+            conexiones.append(id(bd._conexion()))
+            bd.registrar_asistencia(_asistencia(str(indice)))
+            bd.cerrar()
+
+        hilos = [threading.Thread(target=registrar, args=(i,)) for i in range(8)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+
+        assert len(bd.cargar_asistencias()) == 8
+        assert len(conexiones) == 8
+        bd.cerrar()
+        print("  ✓ Registros concurrentes persistidos")
+    finally:
+        shutil.rmtree(directorio)
+
+
+def test_sqlite_importar_desde_archivos():
+    """Test: Una base SQLite vacía importa los archivos existentes"""
+    print("✓ Test: Importación de archivos a SQLite...")
+    directorio = tempfile.mkdtemp()
+    try:
+        usuarios = [{'userId': '1', 'documento': '111', 'nombre': 'Uno'}]
+        asistencias = [_asistencia('1')]
+        archivos = AlmacenamientoArchivos(
+            directorio,
+            fuente_usuarios=lambda: usuarios,
+            fuente_asistencias=lambda: asistencias
+        )
+        archivos.agregar_usuarios(usuarios)
+        archivos.registrar_asistencia(asistencias[0])
+        archivos.guardar_configuracion(_configuracion())
+
+        bd = AlmacenamientoSQLite(os.path.join(directorio, 'asistencia.db'))
+        assert bd.esta_vacio()
+        bd.importar_desde(archivos)
+
+        assert bd.cargar_usuarios() == usuarios
+        assert bd.cargar_asistencias() == [_asistencia('1')]
+        assert bd.cargar_configuracion() == _configuracion()
+        assert bd.cargar_credenciales()['username'] == 'admin'
+        bd.cerrar()
+        print("  ✓ Datos importados correctamente")
+    finally:
+        shutil.rmtree(directorio)
+
+
+def test_escritura_atomica_conserva_generacion_anterior():
+    """Test: La escritura atómica deja la versión anterior en .bak"""
+    print("✓ Test: Escritura atómica...")
+    directorio = tempfile.mkdtemp()
+    try:
+        ruta = os.path.join(directorio, 'configuracion.json')
+        escribir_archivo_atomico(ruta, 'uno')
+        escribir_archivo_atomico(ruta, 'dos')
+
+        with open(ruta, 'r', encoding='utf-8') as archivo:
+            assert archivo.read() == 'dos'
+        with open(ruta + '.bak', 'r', encoding='utf-8') as archivo:
+            assert archivo.read() == 'uno'
+        assert not os.path.exists(ruta + '.tmp')
+        print("  ✓ Generación anterior conservada")
+    finally:
+        shutil.rmtree(directorio)
+
+
+def test_recuperacion_archivo_truncado():
+    """Test: Un usuarios.csv truncado se restaura desde la generación anterior"""
+    print("✓ Test: Recuperación de archivo truncado...")
+    directorio = tempfile.mkdtemp()
+    try:
+        ruta = os.path.join(directorio, 'usuarios.csv')
+        usuarios = [{'userId': '1', 'documento': '111', 'nombre': 'Uno'}]
+        guardar_usuarios_csv(usuarios, ruta)
+        guardar_usuarios_csv(usuarios, ruta)
+
+        # Simular un proceso que murió a mitad de una escritura en sitio
+        open(ruta, 'w').close()
+
+        reportes = recuperar_datos(directorio)
+        assert len(reportes) == 1 and 'usuarios.csv' in reportes[0], reportes
+        with open(ruta, 'r', encoding='utf-8') as archivo:
+            assert 'Uno' in archivo.read()
+        assert recuperar_datos(directorio) == []
+        print(f"  ✓ {reportes[0]}")
+    finally:
+        shutil.rmtree(directorio)
+
+
+def test_journal_secuencia_y_crc():
+    """Test: Los registros del journal llevan secuencia y CRC verificables"""
+    print("✓ Test: Journal con secuencia y CRC...")
+    directorio = tempfile.mkdtemp()
+    try:
+        ruta = os.path.join(directorio, 'asistencias.jsonl')
+        agregar_asistencia_journal(_asistencia('1'), ruta)
+        agregar_asistencia_journal(_asistencia('2'), ruta)
+
+        with open(ruta, 'r', encoding='utf-8') as archivo:
+            registros = [JournalAsistencias.deserializar(l) for l in archivo.read().splitlines()]
+        assert [r['seq'] for r in registros] == [1, 2]
+
+        # Alterar un registro intermedio debe detectarse
+        with open(ruta, 'r', encoding='utf-8') as archivo:
+            contenido = archivo.read()
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            archivo.write(contenido.replace('Usuario 1', 'Usuario X', 1))
+        try:
+            reproducir_journal_asistencias(ruta)
+            assert False, "Debería detectar el CRC inválido"
+        except ValueError as e:
+            assert 'CRC' in str(e)
+        print("  ✓ Secuencia y CRC verificados")
+    finally:
+        shutil.rmtree(directorio)
+
+
+def test_journal_reparar_final_incompleto():
+    """Test: La recuperación recorta el registro final incompleto del journal"""
+    print("✓ Test: Reparación de journal...")
+    directorio = tempfile.mkdtemp()
+    try:
+        ruta = os.path.join(directorio, 'asistencias.jsonl')
+        agregar_asistencia_journal(_asistencia('1'), ruta)
+        with open(ruta, 'a', encoding='utf-8') as archivo:
+            archivo.write('{"seq":2,"op":"agregar","asistencia":{"userId"')
+
+        reportes = recuperar_datos(directorio)
+        assert len(reportes) == 1 and 'asistencias.jsonl' in reportes[0], reportes
+
+        # Tras la reparación, nuevos registros continúan la secuencia
+        agregar_asistencia_journal(_asistencia('2'), ruta)
+        journal = JournalAsistencias(ruta)
+        assert [a['userId'] for a in journal.reproducir()] == ['1', '2']
+        assert journal.secuencia == 2
+        print(f"  ✓ {reportes[0]}")
+    finally:
+        shutil.rmtree(directorio)
+
+
+def test_journal_reparar_registro_intermedio_danado():
+    """Test: Un registro dañado en medio del journal se aparta sin perder los siguientes"""
+    print("✓ Test: Reparación de registro intermedio...")
+    directorio = tempfile.mkdtemp()
+    try:
+        ruta = os.path.join(directorio, 'asistencias.jsonl')
+        for user_id in ('1', '2', '3'):
+            agregar_asistencia_journal(_asistencia(user_id), ruta)
+        with open(ruta, 'r', encoding='utf-8') as archivo:
+            lineas = archivo.read().splitlines(keepends=True)
+        lineas[1] = lineas[1].replace('Usuario 2', 'Usuario X')
+        with open(ruta, 'w', encoding='utf-8') as archivo:
+            archivo.write(''.join(lineas) + '{"seq":4,"op":"agregar"')
+
+        reportes = recuperar_datos(directorio)
+        assert len(reportes) == 1 and 'apartados' in reportes[0] and 'al final' in reportes[0], reportes
+
+        # El registro válido posterior al dañado se conserva
+        journal = JournalAsistencias(ruta)
+        assert [a['userId'] for a in journal.reproducir()] == ['1', '3']
+        danados = [n for n in os.listdir(directorio) if n.startswith('asistencias.jsonl.danado-')]
+        assert len(danados) == 1
+        with open(os.path.join(directorio, danados[0]), 'r', encoding='utf-8') as archivo:
+            assert archivo.read() == lineas[1]
+
+        agregar_asistencia_journal(_asistencia('4'), ruta)
+        assert [a['userId'] for a in JournalAsistencias(ruta).reproducir()] == ['1', '3', '4']
+        assert recuperar_datos(directorio) == []
+        print(f"  ✓ {reportes[0]}")
+    finally:
+        shutil.rmtree(directorio)
+
+
+def test_journal_compactacion_snapshot():
+    """Test: La compactación escribe un snapshot y conserva los registros posteriores"""
+    print("✓ Test: Compactación del journal...")
+    directorio = tempfile.mkdtemp()
+    try:
+        ruta = os.path.join(directorio, 'asistencias.jsonl')
+        journal = JournalAsistencias(ruta)
+        journal.agregar([{'op': 'agregar', 'asistencia': _asistencia(str(i))} for i in range(50)])
+        journal.agregar([{'op': 'reiniciar'}])
+        journal.agregar([{'op': 'agregar', 'asistencia': _asistencia(str(i))} for i in range(10)])
+
+        assert journal.compactar()
+        assert os.path.exists(journal.ruta_snapshot)
+        assert os.path.getsize(ruta) == 0 and journal.segmentos() == []
+
+        # El snapshot contiene solo el estado vigente
+        with open(journal.ruta_snapshot, 'r', encoding='utf-8') as archivo:
+            assert len(archivo.read().splitlines()) == 1 + 10
+
+        # Los registros posteriores continúan la secuencia en un journal nuevo
+        journal.agregar([{'op': 'agregar', 'asistencia': _asistencia('nuevo')}])
+        reiniciado = JournalAsistencias(ruta)
+        asistencias = reiniciado.reproducir()
+        assert len(asistencias) == 11 and asistencias[-1]['userId'] == 'nuevo'
+        assert reiniciado.secuencia == 62 and reiniciado.secuencia_snapshot == 61
+        assert reiniciado.registros == 1
+        print("  ✓ Snapshot de 10 asistencias + 1 registro posterior")
+    finally:
+        shutil.rmtree(directorio)
+
+
+def test_journal_compactacion_por_umbral_concurrente():
+    """Test: El umbral dispara la compactación en segundo plano sin perder escrituras"""
+    print("✓ Test: Compactación por umbral con escrituras concurrentes...")
+    directorio = tempfile.mkdtemp()
+    try:
+        ruta = os.path.join(directorio, 'asistencias.jsonl')
+        journal = JournalAsistencias(ruta, umbral_registros=20)
+
+        def escribir(inicio):
+            for i in range(inicio, inicio + 50):
+                journal.agregar([{'op': 'agregar', 'asistencia': _asistencia(str(i))}])
+
+        threads = [threading.Thread(target=escribir, args=(n * 50,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if journal._thread_compactacion is not None:
+            journal._thread_compactacion.join()
+
+        assert journal.compactaciones >= 1
+        asistencias = JournalAsistencias(ruta).reproducir()
+        assert sorted(int(a['userId']) for a in asistencias) == list(range(200))
+        print(f"  ✓ 200 asistencias intactas tras {journal.compactaciones} compactaciones")
+    finally:
+        shutil.rmtree(directorio)
+
+
+def test_journal_compactacion_interrumpida():
+    """Test: Un segmento rotado sin snapshot nuevo se reproduce al arrancar"""
+    print("✓ Test: Compactación interrumpida...")
+    directorio = tempfile.mkdtemp()
+    try:
+        ruta = os.path.join(directorio, 'asistencias.jsonl')
+        journal = JournalAsistencias(ruta)
+        journal.agregar([{'op': 'agregar', 'asistencia': _asistencia('1')}])
+        journal.compactar()
+        journal.agregar([{'op': 'agregar', 'asistencia': _asistencia('2')}])
+
+        # Simula una caída justo después de rotar el journal a un segmento
+        os.replace(ruta, f"{ruta}.{2:012d}")
+        journal = JournalAsistencias(ruta)
+        journal.agregar([{'op': 'agregar', 'asistencia': _asistencia('3')}])
+
+        reiniciado = JournalAsistencias(ruta)
+        assert [a['userId'] for a in reiniciado.reproducir()] == ['1', '2', '3']
+        assert reiniciado.compactar()
+        assert [a['userId'] for a in JournalAsistencias(ruta).reproducir()] == ['1', '2', '3']
+        print("  ✓ Segmento pendiente aplicado y compactado")
+    finally:
+        shutil.rmtree(directorio)
+
+
+def test_journal_carga_indexada():
+    """Test: La carga indexada retiene offsets y lee los registros bajo demanda"""
+    print("✓ Test: Carga indexada del snapshot...")
+    directorio = tempfile.mkdtemp()
+    try:
+        ruta = os.path.join(directorio, 'asistencias.jsonl')
+        journal = JournalAsistencias(ruta)
+        journal.escribir_completo([_asistencia(str(i)) for i in range(5)])
+        journal.agregar([{'op': 'agregar', 'asistencia': _asistencia('ñ')}])
+        assert journal.compactar()
+        journal.agregar([{'op': 'agregar', 'asistencia': _asistencia('6')}])
+        assert os.path.exists(journal.ruta_indice)
+
+        esperadas = JournalAsistencias(ruta).reproducir()
+        asistencias = JournalAsistencias(ruta).reproducir_indexado()
+        assert isinstance(asistencias, AsistenciasIndexadas)
+        assert len(asistencias) == 7 and list(asistencias) == esperadas
+        assert list(asistencias.usuarios()) == [a['userId'] for a in esperadas]
+        assert asistencias.contiene_usuario('ñ') and not asistencias.contiene_usuario('7')
+        assert _asistencia('3') in asistencias and _asistencia('7') not in asistencias
+
+        asistencias.remove(_asistencia('3'))
+        asistencias.remove(_asistencia('6'))
+        assert [a['userId'] for a in asistencias] == ['0', '1', '2', '4', 'ñ']
+
+        # Sin índice (o con uno de otro snapshot) se reconstruye recorriendo el snapshot
+        os.remove(journal.ruta_indice)
+        assert list(JournalAsistencias(ruta).reproducir_indexado()) == esperadas
+        assert os.path.exists(journal.ruta_indice)
+        with open(journal.ruta_indice, 'r+b') as archivo:
+            archivo.write(b'x')
+        assert list(JournalAsistencias(ruta).reproducir_indexado()) == esperadas
+
+        # Un reinicio posterior al snapshot lo descarta
+        journal.agregar([{'op': 'reiniciar'}, {'op': 'agregar', 'asistencia': _asistencia('8')}])
+        assert list(JournalAsistencias(ruta).reproducir_indexado()) == [_asistencia('8')]
+        print("  ✓ Índice escrito, reconstruido y registros leídos bajo demanda")
+    finally:
+        shutil.rmtree(directorio)
+
+
+def test_journal_asistencias_duplicadas():
+    """Test: Un historial con userId repetidos se importa, compacta y carga conservando la primera"""
+    print("✓ Test: Asistencias duplicadas en el historial...")
+    directorio = tempfile.mkdtemp()
+    try:
+        ruta = os.path.join(directorio, 'asistencias.jsonl')
+        primera = _asistencia('1')
+        repetida = dict(_asistencia('1'), fechaHora='2026-01-14T11:00:00Z')
+        journal = JournalAsistencias(ruta)
+        journal.escribir_completo([primera, repetida, _asistencia('2')])
+        assert journal.secuencia == 2
+        assert journal.compactar()
+        asistencias = JournalAsistencias(ruta).reproducir_indexado()
+        assert list(asistencias) == [primera, _asistencia('2')]
+
+        # Snapshot de una versión anterior con el userId repetido y sin índice:
+        # se valida por cantidad de líneas y vale la primera asistencia
+        lineas = [
+            JournalAsistencias.serializar({'tipo': 'snapshot', 'seq': 3, 'total': 3, 'creado': '2026-01-14T12:00:00Z'})
+        ] + [JournalAsistencias.serializar({'asistencia': a}) for a in (primera, repetida, _asistencia('2'))]
+        escribir_archivo_atomico(journal.ruta_snapshot, ''.join(lineas))
+        os.remove(journal.ruta_indice)
+        journal = JournalAsistencias(ruta)
+        asistencias = journal.reproducir_indexado()
+        assert list(asistencias) == [primera, _asistencia('2')]
+        assert journal.confirmados == {'1', '2'}
+        assert list(JournalAsistencias(ruta).reproducir()) == [primera, _asistencia('2')]
+
+        # La siguiente compactación lo reescribe sin el duplicado
+        journal.agregar([{'op': 'agregar', 'asistencia': _asistencia('3')}])
+        assert journal.compactar()
+        with open(journal.ruta_snapshot, 'r', encoding='utf-8') as archivo:
+            assert JournalAsistencias.deserializar(archivo.readline())['total'] == 3
+        assert [a['userId'] for a in JournalAsistencias(ruta).reproducir_indexado()] == ['1', '2', '3']
+        print("  ✓ Importación, compactación y carga indexada sin duplicados")
+    finally:
+        shutil.rmtree(directorio)
+
+
+def test_journal_continua_tras_compactacion_de_otro_proceso():
+    """Test: Tras la compactación de otro worker solo se entregan los registros nuevos"""
+    print("✓ Test: Continuar tras compactación de otro worker...")
+    directorio = tempfile.mkdtemp()
+    try:
+        ruta = os.path.join(directorio, 'asistencias.jsonl')
+        worker_a = JournalAsistencias(ruta)
+        worker_a.escribir_completo([_asistencia('1')])
+        worker_b = JournalAsistencias(ruta)
+        worker_b.reproducir_indexado()
+
+        # Compactación en curso: journal rotado a segmento con un registro sin
+        # leer y snapshot aún sin publicar
+        worker_a.agregar([{'op': 'agregar', 'asistencia': _asistencia('2')}])
+        os.replace(ruta, f"{ruta}.{2:012d}")
+        open(ruta, 'a').close()
+        worker_a.agregar([{'op': 'agregar', 'asistencia': _asistencia('3')}])
+        assert [c['asistencia']['userId'] for c in worker_b.leer_cambios()] == ['2', '3']
+        assert worker_b.recargas == 0
+
+        # Al día justo antes de la compactación: el snapshot cubre lo ya leído
+        worker_a.agregar([{'op': 'agregar', 'asistencia': _asistencia('4')}])
+        assert [c['asistencia']['userId'] for c in worker_b.leer_cambios()] == ['4']
+        worker_a.compactar()
+        worker_a.agregar([{'op': 'agregar', 'asistencia': _asistencia('5')}])
+        assert [c['asistencia']['userId'] for c in worker_b.leer_cambios()] == ['5']
+        assert worker_b.agregar([{'op': 'agregar', 'asistencia': _asistencia('5')}]) == [False]
+        assert worker_b.recargas == 0
+
+        # Registros ya plegados en el snapshot: se recarga completo
+        worker_a.agregar([{'op': 'agregar', 'asistencia': _asistencia('6')}])
+        worker_a.compactar()
+        worker_a.agregar([{'op': 'agregar', 'asistencia': _asistencia('7')}])
+        worker_a.compactar()
+        cambios = worker_b.leer_cambios()
+        assert cambios[0] == {'op': 'reiniciar'} and len(cambios) == 8
+        assert worker_b.recargas == 1
+        print("  ✓ Sin recarga completa mientras el historial continúa")
+    finally:
+        shutil.rmtree(directorio)
+
+
+def test_usuarios_altas_se_agregan_al_final():
+    """Test: Las altas agregan filas a usuarios.csv sin reescribir las existentes"""
+    print("✓ Test: Altas de usuarios por agregado...")
+    directorio = tempfile.mkdtemp()
+    try:
+        ruta = os.path.join(directorio, 'usuarios.csv')
+        with open(ruta, 'w', encoding='utf-8', newline='') as archivo:
+            archivo.write('nombre,userId,documento,email\r\nUno,1,111,uno@example.com')
+        inodo = os.stat(ruta).st_ino
+
+        usuarios = cargar_usuarios_csv(ruta)
+        archivos = AlmacenamientoArchivos(directorio, fuente_usuarios=lambda: usuarios)
+        archivos.cargar_usuarios()
+        nuevos = [{'userId': '2', 'documento': '222', 'nombre': 'Dos, Segundo'}]
+        usuarios.extend(nuevos)
+        archivos.aplicar_lote([('agregar_usuarios', (nuevos,))])
+
+        # Mismo archivo (sin rename), columnas en el orden del encabezado
+        assert os.stat(ruta).st_ino == inodo
+        assert archivos.reescrituras_usuarios == 0
+        assert cargar_usuarios_csv(ruta) == usuarios
+        assert not archivos.usuarios_modificados_externamente()
+        print("  ✓ Fila agregada respetando el encabezado existente")
+    finally:
+        shutil.rmtree(directorio)
+
+
+def test_usuarios_ediciones_agrupadas_en_segundo_plano():
+    """Test: Ediciones y bajas se agrupan en una sola reescritura diferida"""
+    print("✓ Test: Reescritura diferida de usuarios...")
+    directorio = tempfile.mkdtemp()
+    try:
+        ruta = os.path.join(directorio, 'usuarios.csv')
+        usuarios = [
+            {'userId': str(i), 'documento': str(i) * 3, 'nombre': f'Usuario {i}'}
+            for i in range(5)
+        ]
+        guardar_usuarios_csv(usuarios, ruta)
+        archivos = AlmacenamientoArchivos(
+            directorio, fuente_usuarios=lambda: usuarios, demora_reescritura_usuarios=0.05
+        )
+
+        usuarios[0]['nombre'] = 'Editado'
+        archivos.actualizar_usuario(usuarios[0])
+        del usuarios[1]
+        archivos.eliminar_usuario('1')
+        assert archivos.tiene_cambios_pendientes()
+        assert len(cargar_usuarios_csv(ruta)) == 5  # Aún sin escribir
+
+        time.sleep(0.2)
+        assert not archivos.tiene_cambios_pendientes()
+        assert archivos.reescrituras_usuarios == 1
+        assert cargar_usuarios_csv(ruta) == usuarios
+
+        # Una alta con una reescritura pendiente reescribe en el momento
+        usuarios[0]['nombre'] = 'Editado otra vez'
+        archivos.actualizar_usuario(usuarios[0])
+        nuevo = {'userId': '9', 'documento': '999', 'nombre': 'Nueve'}
+        usuarios.append(nuevo)
+        archivos.agregar_usuarios([nuevo])
+        assert not archivos.tiene_cambios_pendientes()
+        assert cargar_usuarios_csv(ruta) == usuarios
+        print("  ✓ 2 cambios en 1 reescritura; alta posterior incorporada")
+    finally:
+        shutil.rmtree(directorio)
+
+
+def test_usuarios_reescritura_conserva_altas_de_otro_worker():
+    """Test: La reescritura diferida de un worker no pisa las altas de otro"""
+    print("✓ Test: Reescritura diferida con dos workers...")
+    directorio = tempfile.mkdtemp()
+    try:
+        ruta = os.path.join(directorio, 'usuarios.csv')
+        usuarios = [
+            {'userId': str(i), 'documento': str(i) * 3, 'nombre': f'Usuario {i}'}
+            for i in range(3)
+        ]
+        guardar_usuarios_csv(usuarios, ruta)
+        # Cada worker con su propio caché, sobre el mismo directorio
+        cache_a = [dict(usuario) for usuario in usuarios]
+        cache_b = [dict(usuario) for usuario in usuarios]
+        worker_a = AlmacenamientoArchivos(
+            directorio, fuente_usuarios=lambda: cache_a, demora_reescritura_usuarios=0.2
+        )
+        worker_b = AlmacenamientoArchivos(directorio, fuente_usuarios=lambda: cache_b)
+
+        # A edita y borra (reescritura diferida); B agrega mientras tanto
+        cache_a[0] = {'userId': '0', 'documento': '000', 'nombre': 'Editado por A'}
+        worker_a.actualizar_usuario(cache_a[0])
+        del cache_a[1]
+        worker_a.eliminar_usuario('1')
+        nuevo = {'userId': '9', 'documento': '999', 'nombre': 'Alta de B'}
+        cache_b.append(nuevo)
+        worker_b.agregar_usuarios([nuevo])
+        assert worker_a.tiene_cambios_pendientes()
+
+        time.sleep(0.5)
+        assert not worker_a.tiene_cambios_pendientes()
+        assert cargar_usuarios_csv(ruta) == [cache_a[0], usuarios[2], nuevo]
+
+        # Un cambio sobre un usuario que otro worker ya borró se omite
+        worker_b.eliminar_usuario('2')
+        worker_a.actualizar_usuario({'userId': '2', 'documento': '222', 'nombre': 'Ya no existe'})
+        worker_a.vaciar_pendientes()
+        assert cargar_usuarios_csv(ruta) == [cache_a[0], nuevo]
+        print("  ✓ Ediciones de A aplicadas sobre el CSV vigente; alta de B conservada")
+    finally:
+        shutil.rmtree(directorio)
+
+
+def test_aplicar_cambios_usuarios():
+    """Test: Los cambios diferidos se aplican en orden sobre el primer usuario de cada userId"""
+    print("✓ Test: Aplicar cambios de usuarios...")
+
+    def usuario(user_id, nombre):
+        return {'userId': user_id, 'documento': user_id * 3, 'nombre': nombre}
+
+    usuarios = [usuario('1', 'A'), usuario('2', 'B'), usuario('1', 'C'), usuario('3', 'D')]
+    cambios = [
+        ('quitar', '1'),                  # Quita el primer '1'...
+        ('editar', usuario('1', 'C2')),   # ...y la edición alcanza al segundo
+        ('agregar', [usuario('4', 'E')]),
+        ('editar', usuario('4', 'E2')),   # Edición de un alta del mismo lote
+        ('quitar', '9'),                  # Ya no existe: se omite
+        ('editar', usuario('9', 'X')),
+        ('quitar', '3'),
+    ]
+    resultado = aplicar_cambios_usuarios(usuarios, cambios)
+    assert resultado is usuarios
+    assert [u['nombre'] for u in usuarios] == ['B', 'C2', 'E2']
+
+    usuarios = [usuario('1', 'A')]
+    aplicar_cambios_usuarios(usuarios, [('quitar', '1'), ('vaciar',), ('agregar', [usuario('1', 'B')]),
+                                        ('editar', usuario('1', 'B2'))])
+    assert usuarios == [usuario('1', 'B2')]
+
+    # Miles de ediciones y bajas sin recorrer la lista por cada una
+    usuarios = [usuario(str(i), f'Usuario {i}') for i in range(20000)]
+    cambios = [('quitar', str(i)) for i in range(0, 20000, 2)]
+    cambios += [('editar', usuario(str(i), 'Editado')) for i in range(1, 20000, 2)]
+    inicio = time.perf_counter()
+    aplicar_cambios_usuarios(usuarios, cambios)
+    demora = time.perf_counter() - inicio
+    assert len(usuarios) == 10000 and all(u['nombre'] == 'Editado' for u in usuarios)
+    assert demora < 1.0, demora
+    print(f"  ✓ Orden y duplicados respetados; 20000 cambios en {demora * 1000:.0f} ms")
+
+
+def test_snapshot_usuarios():
+    """Test: El snapshot binario se reutiliza solo si el CSV no cambió"""
+    print("✓ Test: Snapshot binario de usuarios...")
+    directorio = tempfile.mkdtemp()
+    try:
+        ruta = os.path.join(directorio, 'usuarios.csv')
+        ruta_snapshot = ruta + '.pickle'
+        usuarios = [{'userId': '1', 'documento': '111', 'nombre': 'Uno'}]
+        guardar_usuarios_csv(usuarios, ruta)
+
+        assert cargar_usuarios_con_snapshot(ruta) == usuarios
+        assert os.path.exists(ruta_snapshot)
+
+        # Con el CSV sin cambios se usa el snapshot (se marca para distinguirlo)
+        with open(ruta_snapshot, 'rb') as archivo:
+            snapshot = pickle.load(archivo)
+        snapshot['usuarios'] = [{'userId': 'snapshot', 'documento': '0', 'nombre': 'Snapshot'}]
+        with open(ruta_snapshot, 'wb') as archivo:
+            pickle.dump(snapshot, archivo)
+        assert cargar_usuarios_con_snapshot(ruta)[0]['userId'] == 'snapshot'
+
+        # Un cambio en el CSV obliga a parsear y reconstruir
+        usuarios.append({'userId': '2', 'documento': '222', 'nombre': 'Dos'})
+        guardar_usuarios_csv(usuarios, ruta)
+        assert cargar_usuarios_con_snapshot(ruta) == usuarios
+
+        # Un snapshot dañado se ignora en silencio
+        with open(ruta_snapshot, 'wb') as archivo:
+            archivo.write(b'no es un pickle')
+        assert cargar_usuarios_con_snapshot(ruta) == usuarios
+        with open(ruta_snapshot, 'rb') as archivo:
+            assert pickle.load(archivo)['usuarios'] == usuarios
+        print("  ✓ Snapshot reutilizado, invalidado y reconstruido")
+    finally:
+        shutil.rmtree(directorio)
+
+
+def test_snapshot_usuarios_columnar():
+    """Test: El padrón columnar se carga del CSV y de su snapshot binario"""
+    print("✓ Test: Snapshot de la tabla columnar de usuarios...")
+    directorio = tempfile.mkdtemp()
+    try:
+        ruta = os.path.join(directorio, 'usuarios.csv')
+        usuarios = [{'userId': str(i), 'documento': f'{i:08d}', 'nombre': f'Usuario {i}'} for i in range(50)]
+        guardar_usuarios_csv(usuarios, ruta)
+
+        tabla = cargar_usuarios_con_snapshot(ruta, columnar=True)
+        assert isinstance(tabla, TablaUsuarios)
+        assert [dict(u) for u in tabla] == usuarios
+
+        # Con el CSV sin cambios la tabla sale del snapshot, con sus índices
+        with open(ruta + '.pickle', 'rb') as archivo:
+            assert isinstance(pickle.load(archivo)['usuarios'], TablaUsuarios)
+        tabla = cargar_usuarios_con_snapshot(ruta, columnar=True)
+        assert tabla.indice('documento').get('00000042')['userId'] == '42'
+
+        # Cambiar de formato reconstruye el snapshot
+        assert cargar_usuarios_con_snapshot(ruta) == usuarios
+        print("  ✓ Tabla cargada del CSV y del snapshot")
+    finally:
+        shutil.rmtree(directorio)
+
+
+def _leer_archivo_evento(archivo, nombre):
+    """Lee un archivo de evento: (encabezado, asistencias)."""
+    with gzip.open(archivo.ruta(nombre), 'rt', encoding='utf-8') as f:
+        lineas = [json.loads(linea) for linea in f]
+    return lineas[0], lineas[1:]
+
+
+def test_archivo_eventos_archivos():
+    """Test: Reiniciar archiva las asistencias del journal en un .jsonl.gz"""
+    print("✓ Test: Archivo de asistencias (archivos)...")
+    directorio = tempfile.mkdtemp()
+    try:
+        asistencias = [_asistencia(str(i)) for i in range(3)]
+        almacenamiento = AlmacenamientoArchivos(directorio, fuente_asistencias=lambda: asistencias[:1])
+        for asistencia in asistencias:
+            assert almacenamiento.registrar_asistencia(asistencia) == True
+
+        nombre = almacenamiento.archivo.nuevo_nombre('Asamblea Ordinaria')
+        almacenamiento.archivar_asistencias(nombre, 'Asamblea Ordinaria', 3)
+        assert almacenamiento.cargar_asistencias() == []
+        assert almacenamiento.archivo.esperar(10)
+
+        # El journal vigente arranca vacío y acepta de nuevo los mismos userId
+        assert reproducir_journal_asistencias(almacenamiento.ruta_journal) == []
+        assert almacenamiento.registrar_asistencia(_asistencia('0')) == True
+
+        encabezado, archivadas = _leer_archivo_evento(almacenamiento.archivo, nombre)
+        assert encabezado['tipo'] == 'archivo_asistencias'
+        assert encabezado['evento'] == 'Asamblea Ordinaria'
+        assert encabezado['total'] == 3
+        assert archivadas == asistencias
+
+        listado = almacenamiento.archivo.listar()
+        assert [(a['nombre'], a['estado'], a['total']) for a in listado] == [(nombre, 'listo', 3)]
+        assert almacenamiento.archivo.pendientes() == []
+
+        # El siguiente nombre para el mismo evento no pisa al anterior
+        assert almacenamiento.archivo.nuevo_nombre('Asamblea Ordinaria') != nombre
+        print("  ✓ Journal rotado y comprimido con encabezado")
+    finally:
+        shutil.rmtree(directorio)
+
+
+def test_archivo_eventos_sqlite():
+    """Test: SQLite renombra la tabla y la comprime en segundo plano"""
+    print("✓ Test: Archivo de asistencias (SQLite)...")
+    directorio = tempfile.mkdtemp()
+    try:
+        bd = AlmacenamientoSQLite(os.path.join(directorio, 'asistencia.db'))
+        asistencias = [_asistencia(str(i)) for i in range(3)]
+        for asistencia in asistencias:
+            assert bd.registrar_asistencia(asistencia) == True
+
+        nombre = bd.archivo.nuevo_nombre('asamblea')
+        bd.archivar_asistencias(nombre, 'asamblea', 3)
+        assert bd.cargar_asistencias() == []
+        assert bd.registrar_asistencia(_asistencia('0')) == True
+        assert bd.archivo.esperar(10)
+
+        encabezado, archivadas = _leer_archivo_evento(bd.archivo, nombre)
+        assert encabezado['total'] == 3
+        assert archivadas == asistencias
+
+        tablas = [fila[0] for fila in bd._conexion().execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE 'asistencias_archivo_%'"
+        )]
+        assert tablas == []
+        bd.cerrar()
+        print("  ✓ Tabla apartada, comprimida y eliminada")
+    finally:
+        shutil.rmtree(directorio)
+
+
+def test_archivo_eventos_reanudar():
+    """Test: Un archivado interrumpido se completa al reanudar"""
+    print("✓ Test: Reanudar archivado interrumpido...")
+    directorio = tempfile.mkdtemp()
+    try:
+        almacenamiento = AlmacenamientoArchivos(directorio, fuente_asistencias=lambda: [_asistencia('0')])
+        for i in range(2):
+            almacenamiento.registrar_asistencia(_asistencia(str(i)))
+
+        # Simular una caída entre apartar el journal y comprimirlo
+        original = ArchivoEventos.comprimir_en_segundo_plano
+        ArchivoEventos.comprimir_en_segundo_plano = lambda *args, **kwargs: None
+        try:
+            nombre = almacenamiento.archivo.nuevo_nombre('asamblea')
+            almacenamiento.archivar_asistencias(nombre, 'asamblea', 2)
+        finally:
+            ArchivoEventos.comprimir_en_segundo_plano = original
+        assert almacenamiento.archivo.pendientes() == [nombre]
+        assert almacenamiento.archivo.listar()[0]['estado'] == 'comprimiendo'
+
+        reiniciado = AlmacenamientoArchivos(directorio)
+        reiniciado.reanudar_archivado()
+        assert reiniciado.archivo.esperar(10)
+        assert reiniciado.archivo.pendientes() == []
+        encabezado, archivadas = _leer_archivo_evento(reiniciado.archivo, nombre)
+        assert encabezado['total'] == 2 and len(archivadas) == 2
+        print("  ✓ Archivo pendiente comprimido al reiniciar")
+    finally:
+        shutil.rmtree(directorio)
+
+
+def _worker_confirmaciones(directorio, numero_worker, resultados):
+    """Proceso de prueba: confirma los mismos 100 userId que los demás workers."""
+    almacenamiento = AlmacenamientoArchivos(directorio, compactacion_registros=40)
+    confirmadas = 0
+    for inicio in range(0, 100, 5):
+        lote = [
+            ('registrar_asistencia', (_asistencia(str(i)),))
+            for i in range(inicio, inicio + 5)
+        ]
+        confirmadas += sum(1 for r in almacenamiento.aplicar_lote(lote) if r)
+    if almacenamiento.journal._thread_compactacion is not None:
+        almacenamiento.journal._thread_compactacion.join()
+    resultados.put((numero_worker, confirmadas))
+
+
+def test_journal_varios_procesos_sin_duplicados():
+    """Test: Varios workers confirmando los mismos userId no pierden ni duplican asistencias"""
+    print("✓ Test: Journal compartido entre procesos...")
+    directorio = tempfile.mkdtemp()
+    try:
+        ruta = os.path.join(directorio, 'asistencias.jsonl')
+        JournalAsistencias(ruta).escribir_completo([])
+
+        contexto = multiprocessing.get_context('fork')
+        resultados = contexto.Queue()
+        procesos = [
+            contexto.Process(target=_worker_confirmaciones, args=(directorio, n, resultados))
+            for n in range(4)
+        ]
+        for proceso in procesos:
+            proceso.start()
+        confirmadas = dict(resultados.get(timeout=60) for _ in procesos)
+        for proceso in procesos:
+            proceso.join()
+
+        # Cada userId se confirmó exactamente una vez entre todos los workers
+        assert sum(confirmadas.values()) == 100, confirmadas
+        asistencias = JournalAsistencias(ruta).reproducir()
+        assert sorted(int(a['userId']) for a in asistencias) == list(range(100))
+        print(f"  ✓ 4 workers, 100 asistencias únicas (por worker: {confirmadas})")
+    finally:
+        shutil.rmtree(directorio)
+
+
+def test_journal_leer_cambios_de_otro_proceso():
+    """Test: Un worker incorpora lo que otro escribió y rechaza sus duplicados"""
+    print("✓ Test: Cambios de otros workers...")
+    directorio = tempfile.mkdtemp()
+    try:
+        ruta = os.path.join(directorio, 'asistencias.jsonl')
+        worker_a = JournalAsistencias(ruta)
+        worker_a.escribir_completo([_asistencia('1')])
+        worker_b = JournalAsistencias(ruta)
+        assert [a['userId'] for a in worker_b.reproducir()] == ['1']
+        assert worker_b.leer_cambios() == []
+
+        worker_a.agregar([{'op': 'agregar', 'asistencia': _asistencia('2')}])
+        cambios = worker_b.leer_cambios()
+        assert [c['asistencia']['userId'] for c in cambios] == ['2']
+
+        # El duplicado se detecta aunque el worker aún no haya leído los cambios
+        worker_a.agregar([{'op': 'agregar', 'asistencia': _asistencia('3')}])
+        assert worker_b.agregar([{'op': 'agregar', 'asistencia': _asistencia('3')}]) == [False]
+        assert [c['asistencia']['userId'] for c in worker_b.leer_cambios()] == ['3']
+
+        # Tras una compactación del otro worker, se entrega el estado completo
+        worker_a.agregar([{'op': 'reiniciar'}, {'op': 'agregar', 'asistencia': _asistencia('4')}])
+        worker_a.compactar()
+        cambios = worker_b.leer_cambios()
+        assert cambios[0] == {'op': 'reiniciar'}
+        assert [c['asistencia']['userId'] for c in cambios[1:]] == ['4']
+        print("  ✓ Cambios incrementales, duplicado rechazado y recarga tras rotación")
+    finally:
+        shutil.rmtree(directorio)
+
+
+def test_sqlite_leer_cambios_de_otro_proceso():
+    """Test: SQLite entrega solo las filas nuevas de otros workers y recarga ante un reinicio"""
+    print("✓ Test: Cambios de otros workers en SQLite...")
+    directorio = tempfile.mkdtemp()
+    try:
+        ruta = os.path.join(directorio, 'asistencia.db')
+        worker_a = AlmacenamientoSQLite(ruta)
+        worker_b = AlmacenamientoSQLite(ruta)
+        worker_a.cargar_asistencias()
+        worker_b.cargar_asistencias()
+
+        assert worker_b.registrar_asistencia(_asistencia('1'))
+        assert worker_b.leer_cambios_asistencias() == []
+
+        cambios = worker_a.leer_cambios_asistencias()
+        assert cambios == [{'op': 'agregar', 'asistencia': _asistencia('1')}]
+        assert worker_a.leer_cambios_asistencias() == []
+
+        # Inserciones intercaladas: cada worker recibe solo las del otro
+        for user_id in ('2', '3', '4', '5'):
+            worker = worker_a if int(user_id) % 2 else worker_b
+            assert worker.registrar_asistencia(_asistencia(user_id))
+        assert [c['asistencia']['userId'] for c in worker_a.leer_cambios_asistencias()] == ['2', '4']
+        assert [c['asistencia']['userId'] for c in worker_b.leer_cambios_asistencias()] == ['3', '5']
+        assert worker_a.leer_cambios_asistencias() == worker_b.leer_cambios_asistencias() == []
+
+        # Un reinicio de otro worker, aunque lo sigan inserciones, recarga todo
+        worker_b.reiniciar_asistencias()
+        assert worker_b.registrar_asistencia(_asistencia('6'))
+        assert worker_b.registrar_asistencia(_asistencia('7'))
+        cambios = worker_a.leer_cambios_asistencias()
+        assert cambios[0] == {'op': 'reiniciar'}
+        assert [c['asistencia']['userId'] for c in cambios[1:]] == ['6', '7']
+        assert worker_a.leer_cambios_asistencias() == []
+
+        # También si solo se perdieron filas propias posteriores a la última lectura
+        worker_a.reiniciar_asistencias()
+        worker_b.leer_cambios_asistencias()
+        assert worker_a.registrar_asistencia(_asistencia('8'))
+        worker_b.reiniciar_asistencias()
+        assert worker_b.registrar_asistencia(_asistencia('9'))
+        assert worker_a.leer_cambios_asistencias() == [
+            {'op': 'reiniciar'}, {'op': 'agregar', 'asistencia': _asistencia('9')}
+        ]
+        worker_a.cerrar()
+        worker_b.cerrar()
+        print("  ✓ Filas nuevas incrementales; recarga completa solo ante reinicios")
+    finally:
+        shutil.rmtree(directorio)
+
+
+class _AlmacenamientoLento(Almacenamiento):
+    """Almacenamiento de prueba que registra el tamaño de cada lote."""
+
+    def __init__(self):
+        self.lotes = []
+
+    def aplicar_lote(self, operaciones):
+        time.sleep(0.005)  # Simula un fsync
+        self.lotes.append(len(operaciones))
+        return [True] * len(operaciones)
+
+
+def test_persistidor_agrupa_operaciones():
+    """Test: Las operaciones concurrentes se agrupan en pocos lotes"""
+    print("✓ Test: Persistidor con commit agrupado...")
+    almacen = _AlmacenamientoLento()
+    persistidor = PersistidorDiferido(almacen, modo='durable', ventana_ms=20)
+    resultados = []
+
+    def confirmar(indice):
+        resultados.append(persistidor.enviar('registrar_asistencia', _asistencia(str(indice))))
+
+    hilos = [threading.Thread(target=confirmar, args=(i,)) for i in range(100)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    persistidor.detener()
+
+    assert resultados == [True] * 100
+    assert sum(almacen.lotes) == 100
+    assert len(almacen.lotes) < 20, f"Se esperaban pocos lotes, hubo {len(almacen.lotes)}"
+    print(f"  ✓ 100 operaciones persistidas en {len(almacen.lotes)} lote(s)")
+
+
+def test_persistidor_modo_encolado():
+    """Test: En modo encolado se responde sin esperar y detener persiste lo pendiente"""
+    print("✓ Test: Persistidor en modo encolado...")
+    directorio = tempfile.mkdtemp()
+    try:
+        asistencias = []
+        archivos = AlmacenamientoArchivos(directorio, fuente_asistencias=lambda: asistencias)
+        archivos.journal.escribir_completo([])
+        persistidor = PersistidorDiferido(archivos, modo='encolado', ventana_ms=50)
+
+        for indice in range(20):
+            asistencias.append(_asistencia(str(indice)))
+            assert persistidor.enviar('registrar_asistencia', asistencias[-1]) == True
+        persistidor.detener()
+
+        journal = JournalAsistencias(archivos.ruta_journal)
+        assert [a['userId'] for a in journal.reproducir()] == [str(i) for i in range(20)]
+        assert journal.secuencia == 20
+        assert persistidor.estadisticas()['lotes'] < 20
+        print(f"  ✓ 20 asistencias persistidas en {persistidor.lotes} lote(s)")
+    finally:
+        shutil.rmtree(directorio)
+
+
+class _AlmacenamientoConRechazos(Almacenamiento):
+    """Almacenamiento de prueba que rechaza userId repetidos y falla con 'falla'."""
+
+    def __init__(self):
+        self.registrados = set()
+
+    def aplicar_lote(self, operaciones):
+        if any(argumentos[0]['userId'] == 'falla' for _, argumentos in operaciones):
+            raise OSError('disco lleno')
+        resultados = []
+        for _, (asistencia,) in operaciones:
+            resultados.append(asistencia['userId'] not in self.registrados)
+            self.registrados.add(asistencia['userId'])
+        return resultados
+
+
+def test_persistidor_encolado_avisa_resultado():
+    """Test: En modo encolado el resultado real de cada operación llega a su aviso"""
+    print("✓ Test: Aviso de resultado en modo encolado...")
+    persistidor = PersistidorDiferido(_AlmacenamientoConRechazos(), modo='encolado', ventana_ms=5)
+    avisos = {}
+
+    def enviar(user_id):
+        def al_completar(resultado, error):
+            avisos[user_id] = (resultado, type(error).__name__ if error else None)
+        return persistidor.enviar('registrar_asistencia', _asistencia(user_id), al_completar=al_completar)
+
+    assert enviar('1') == True
+    persistidor.detener()
+    persistidor = PersistidorDiferido(persistidor.almacenamiento, modo='encolado', ventana_ms=5)
+    assert enviar('1') == True  # Repetido: el almacenamiento lo rechaza después
+    persistidor.detener()
+    persistidor = PersistidorDiferido(persistidor.almacenamiento, modo='encolado', ventana_ms=5)
+    assert enviar('falla') == True
+    persistidor.detener()
+
+    assert avisos == {'1': (False, None), 'falla': (None, 'OSError')}
+    print("  ✓ Rechazo por duplicado y error de escritura notificados")
+
+
+def test_sqlite_lote_en_una_transaccion():
+    """Test: SQLite aplica un lote en una transacción y reporta duplicados por operación"""
+    print("✓ Test: Lote SQLite...")
+    directorio = tempfile.mkdtemp()
+    try:
+        bd = AlmacenamientoSQLite(os.path.join(directorio, 'asistencia.db'))
+        resultados = bd.aplicar_lote([
+            ('registrar_asistencia', (_asistencia('1'),)),
+            ('registrar_asistencia', (_asistencia('1'),)),
+            ('agregar_usuarios', ([{'userId': '1', 'documento': '111', 'nombre': 'Uno'}],))
+        ])
+        assert resultados == [True, False, None]
+        assert len(bd.cargar_asistencias()) == 1
+        assert len(bd.cargar_usuarios()) == 1
+        bd.cerrar()
+        print("  ✓ Lote aplicado con duplicado rechazado")
+    finally:
+        shutil.rmtree(directorio)
+
+
+def run_all_tests():
+    """Ejecutar todos los tests"""
+    print("\n" + "="*60)
+    print("PRUEBAS DE PERSISTENCIA")
+    print("="*60 + "\n")
+
+    tests = [
+        test_journal_agregar_y_reproducir,
+        test_journal_reinicio,
+        test_journal_linea_incompleta,
+        test_journal_exportar_json,
+        test_sqlite_usuarios,
+        test_sqlite_asistencias_unicas,
+        test_sqlite_conexion_por_thread,
+        test_sqlite_importar_desde_archivos,
+        test_escritura_atomica_conserva_generacion_anterior,
+        test_recuperacion_archivo_truncado,
+        test_journal_secuencia_y_crc,
+        test_journal_reparar_final_incompleto,
+        test_journal_reparar_registro_intermedio_danado,
+        test_journal_compactacion_snapshot,
+        test_journal_compactacion_por_umbral_concurrente,
+        test_journal_compactacion_interrumpida,
+        test_journal_carga_indexada,
+        test_journal_asistencias_duplicadas,
+        test_journal_continua_tras_compactacion_de_otro_proceso,
+        test_usuarios_altas_se_agregan_al_final,
+        test_usuarios_ediciones_agrupadas_en_segundo_plano,
+        test_usuarios_reescritura_conserva_altas_de_otro_worker,
+        test_aplicar_cambios_usuarios,
+        test_snapshot_usuarios,
+        test_snapshot_usuarios_columnar,
+        test_archivo_eventos_archivos,
+        test_archivo_eventos_sqlite,
+        test_archivo_eventos_reanudar,
+        test_journal_varios_procesos_sin_duplicados,
+        test_journal_leer_cambios_de_otro_proceso,
+        test_sqlite_leer_cambios_de_otro_proceso,
+        test_persistidor_agrupa_operaciones,
+        test_persistidor_modo_encolado,
+        test_persistidor_encolado_avisa_resultado,
+        test_sqlite_lote_en_una_transaccion
+    ]
+
+    fallidos = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            fallidos += 1
+            print(f"  ✗ Falló: {e}")
+        print()
+
+    print("="*60)
+    print(f"Resultados: {len(tests) - fallidos}/{len(tests)} tests pasaron")
+    print("="*60 + "\n")
+    return fallidos == 0
+
+
+if __name__ == '__main__':
+    success = run_all_tests()
+    sys.exit(0 if success else 1)
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Benchmark WSGI vs ASGI de los endpoints públicos
+Arranca la aplicación con gunicorn (WSGI, gunicorn.conf.py: workers sync como
+en producción, y con threads) y con uvicorn (ASGI, backend/asgi.py) sobre un
+padrón de 50.000 usuarios, con la misma cantidad de procesos, y la somete a
+500 y 5.000 clientes concurrentes.
+
+Cada cliente simula a un asistente: consulta la configuración, valida su
+documento y confirma su asistencia en la ubicación de la asamblea, en bucle
+durante los segundos indicados, sobre una conexión keep-alive que se reabre
+si el servidor la cierra (los workers sync de gunicorn cierran cada una).
+Mide peticiones por segundo, latencia p50/p99 (incluye el tiempo de conectar
+cuando hay que reabrir la conexión) y errores: timeouts, conexiones
+rechazadas o respuestas distintas de 200.
+
+Los clientes corren en varios procesos para que el generador de carga no
+sea el cuello de botella; en una máquina con pocos núcleos compiten con el
+servidor y los resultados son solo comparativos.
+
+uvicorn no forma parte de requirements.txt: si no está instalado se mide
+solo WSGI.
+
+Uso:
+    python benchmark_asgi.py [workers] [segundos]
+"""
+
+import asyncio
+import csv
+import importlib.util
+import json
+import multiprocessing
+import os
+import resource
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+WORKERS = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+DURACION = float(sys.argv[2]) if len(sys.argv) > 2 else 15.0
+CANTIDAD = 50_000
+CLIENTES = (500, 5_000)
+GENERADORES = max(2, (os.cpu_count() or 2) // 2)  # Procesos que generan la carga
+TIMEOUT = 30.0
+BACKLOG = 8192  # Conexiones pendientes de aceptar: 5.000 llegan a la vez
+
+# {puerto} se reemplaza al arrancar cada servidor
+GUNICORN = [sys.executable, '-m', 'gunicorn', '-c', os.path.join(RAIZ, 'gunicorn.conf.py'),
+            '--pythonpath', RAIZ, '--bind', '127.0.0.1:{puerto}', '--backlog', str(BACKLOG)]
+SERVIDORES = [
+    ('WSGI gunicorn sync', GUNICORN + ['backend.app:app']),
+    # Con el límite por defecto (1.000 conexiones por worker) gthread deja de
+    # atender también las conexiones keep-alive que ya tiene abiertas
+    ('WSGI gunicorn gthread', GUNICORN + ['--threads', '16', '--worker-connections', '10000',
+                                          'backend.app:app']),
+    ('ASGI uvicorn', [sys.executable, '-m', 'uvicorn', 'backend.asgi:app', '--app-dir', RAIZ,
+                      '--port', '{puerto}', '--workers', str(WORKERS), '--backlog', str(BACKLOG),
+                      '--no-access-log', '--log-level', 'warning']),
+]
+
+
+def generar_datos(directorio):
+    os.makedirs(os.path.join(directorio, 'data'))
+    with open(os.path.join(directorio, 'data', 'configuracion.json'), 'w', encoding='utf-8') as archivo:
+        json.dump({'ubicacionAsamblea': {'latitud': 4.3229422, 'longitud': -74.3693629}, 'radioPermitido': 100}, archivo)
+    with open(os.path.join(directorio, 'data', 'usuarios.csv'), 'w', newline='', encoding='utf-8') as archivo:
+        writer = csv.writer(archivo)
+        writer.writerow(['userId', 'documento', 'nombre'])
+        for i in range(CANTIDAD):
+            writer.writerow([str(i), f'{10_000_000 + i}', f'Usuario de prueba número {i}'])
+
+
+def puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def esperar_servidor(puerto, proceso):
+    """Espera a que /health responda; da tiempo a que arranquen todos los workers."""
+    limite = time.monotonic() + 300
+    while time.monotonic() < limite:
+        if proceso.poll() is not None:
+            raise RuntimeError(f"El servidor terminó al arrancar:\n{proceso.stdout.read()}")
+        try:
+            with urllib.request.urlopen(f'http://127.0.0.1:{puerto}/health', timeout=2):
+                time.sleep(3)
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("El servidor no terminó de arrancar")
+
+
+# ============================================================================
+# GENERADOR DE CARGA
+# ============================================================================
+
+async def peticion(conexion, metodo, ruta, datos=None):
+    """Envía una petición HTTP/1.1 y lee la respuesta. Retorna (código, JSON, mantener conexión)."""
+    lector, escritor = conexion
+    cuerpo = json.dumps(datos).encode() if datos is not None else b''
+    escritor.write(
+        f'{metodo} {ruta} HTTP/1.1\r\nHost: 127.0.0.1\r\nConnection: keep-alive\r\n'
+        f'Content-Type: application/json\r\nContent-Length: {len(cuerpo)}\r\n\r\n'.encode() + cuerpo
+    )
+    await escritor.drain()
+
+    codigo = int((await lector.readline()).split()[1])
+    encabezados = {}
+    while (linea := await lector.readline()) not in (b'\r\n', b''):
+        nombre, _, valor = linea.decode('latin-1').partition(':')
+        encabezados[nombre.strip().lower()] = valor.strip().lower()
+    contenido = await lector.readexactly(int(encabezados.get('content-length', 0)))
+    return codigo, json.loads(contenido), encabezados.get('connection') != 'close'
+
+
+async def cliente(puerto, fin, usuarios, latencias, errores):
+    """Asistente que consulta la configuración, valida su documento y confirma, en bucle."""
+    conexion = None
+
+    async def medir(metodo, ruta, datos=None):
+        nonlocal conexion
+        inicio = time.perf_counter()
+        try:
+            if conexion is None:
+                conexion = await asyncio.wait_for(asyncio.open_connection('127.0.0.1', puerto), TIMEOUT)
+            codigo, respuesta, mantener = await asyncio.wait_for(peticion(conexion, metodo, ruta, datos), TIMEOUT)
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, IndexError):
+            errores[0] += 1
+            if conexion is not None:
+                conexion[1].close()
+                conexion = None
+            return None
+        latencias.append(time.perf_counter() - inicio)
+        if not mantener:
+            conexion[1].close()
+            conexion = None
+        if codigo != 200:
+            errores[0] += 1
+            return None
+        return respuesta
+
+    while time.perf_counter() < fin:
+        configuracion = await medir('GET', '/api/configuracion')
+        usuario = next(usuarios)
+        identidad = await medir('POST', '/api/validar-identidad', {'documento': str(10_000_000 + usuario)})
+        if configuracion is None or identidad is None:
+            continue
+        await medir('POST', '/api/confirmar-asistencia', {
+            'userId': identidad['userId'], **configuracion['ubicacionAsamblea']
+        })
+    if conexion is not None:
+        conexion[1].close()
+
+
+def generar_carga(puerto, clientes, numero, inicio):
+    """Ejecuta clientes concurrentes en un proceso. Retorna (latencias, errores, fin de la última)."""
+    blando, duro = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (max(blando, min(duro, clientes + 1024)), duro))
+    # Cada proceso confirma usuarios distintos; al agotarlos, repetidos ("ya confirmó")
+    usuarios = (i % CANTIDAD for i in range(numero, 1 << 62, GENERADORES))
+    latencias, errores = [], [0]
+
+    async def ejecutar():
+        await asyncio.sleep(max(0.0, inicio - time.time()))
+        fin = time.perf_counter() + DURACION
+        await asyncio.gather(*(cliente(puerto, fin, usuarios, latencias, errores) for _ in range(clientes)))
+
+    asyncio.run(ejecutar())
+    return latencias, errores[0], time.time()
+
+
+def medir(puerto, clientes):
+    """Reparte los clientes entre los generadores. Retorna (peticiones/s, p50 ms, p99 ms, errores)."""
+    inicio = time.time() + 1  # Todos los generadores empiezan a la vez
+    repartidos = [clientes // GENERADORES + (i < clientes % GENERADORES) for i in range(GENERADORES)]
+    with multiprocessing.Pool(GENERADORES) as pool:
+        resultados = pool.starmap(generar_carga, [(puerto, n, i, inicio) for i, n in enumerate(repartidos)])
+
+    latencias = sorted(l for parcial, _, _ in resultados for l in parcial)
+    errores = sum(e for _, e, _ in resultados)
+    segundos = max(fin for _, _, fin in resultados) - inicio
+    if not latencias:
+        return 0.0, float('nan'), float('nan'), errores
+    percentil = lambda p: latencias[min(len(latencias) - 1, int(len(latencias) * p))] * 1000
+    return len(latencias) / segundos, percentil(0.50), percentil(0.99), errores
+
+
+def ejecutar(directorio, comando, clientes):
+    """Arranca el servidor sobre una copia limpia de los datos, mide y lo detiene."""
+    copia = tempfile.mkdtemp(dir=directorio)
+    shutil.copytree(os.path.join(directorio, 'data'), os.path.join(copia, 'data'))
+    puerto = puerto_libre()
+    entorno = dict(os.environ, PORT=str(puerto), WEB_CONCURRENCY=str(WORKERS), PYTHONPATH=RAIZ)
+    servidor = subprocess.Popen(
+        [parte.format(puerto=puerto) for parte in comando],
+        cwd=copia, env=entorno, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+    )
+    try:
+        esperar_servidor(puerto, servidor)
+        return medir(puerto, clientes)
+    finally:
+        servidor.terminate()
+        try:
+            servidor.wait(timeout=60)
+        except subprocess.TimeoutExpired:
+            servidor.kill()
+        shutil.rmtree(copia, ignore_errors=True)
+
+
+def main():
+    print("\n" + "="*90)
+    print(f"BENCHMARK: WSGI vs ASGI, {WORKERS} workers, {DURACION:.0f} s por medición, "
+          f"{GENERADORES} procesos de carga")
+    print("="*90)
+
+    servidores = SERVIDORES
+    if importlib.util.find_spec('uvicorn') is None:
+        print("\n⚠️  uvicorn no está instalado (pip install uvicorn): se omite ASGI")
+        servidores = [(nombre, comando) for nombre, comando in SERVIDORES if not nombre.startswith('ASGI')]
+
+    directorio = tempfile.mkdtemp()
+    try:
+        generar_datos(directorio)
+        print(f"\n{'Servidor':<24}{'Clientes':>10}{'Peticiones/s':>15}{'p50':>12}{'p99':>12}{'Errores':>10}")
+        print("-"*90)
+        for clientes in CLIENTES:
+            for nombre, comando in servidores:
+                rendimiento, p50, p99, errores = ejecutar(directorio, comando, clientes)
+                print(f"{nombre:<24}{clientes:>10,}{rendimiento:>15,.0f}{p50:>9.1f} ms{p99:>9.1f} ms{errores:>10,}")
+            print()
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+    print("="*90)
+    print("Cada cliente repite: GET /api/configuracion, POST /api/validar-identidad,")
+    print("POST /api/confirmar-asistencia. Errores: timeouts, conexiones rechazadas o código != 200.")
+    print("="*90 + "\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark de /api/asistencias/exportar-csv
+Mide el tiempo de CPU de la exportación con 100.000 asistencias, tanto en
+memoria como leídas bajo demanda desde el snapshot indexado, y lo compara
+con el join anidado anterior en un tamaño reducido.
+
+Uso:
+    python benchmark_exportacion.py
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(RAIZ, 'backend'))
+
+# Datos de la aplicación en un directorio temporal: no se toca data/
+DIRECTORIO = tempfile.mkdtemp()
+os.chdir(DIRECTORIO)
+
+import app as aplicacion
+
+USUARIOS = 120_000
+ASISTENCIAS = 100_000
+ASISTENCIAS_ANIDADO = 3_000  # El join anidado es O(usuarios × asistencias)
+
+
+def generar_asistencias(cantidad):
+    return [
+        {
+            'userId': str(i),
+            'nombre': f'Usuario {i}',
+            'fechaHora': '2026-01-14T10:00:00Z',
+            'ubicacion': {'latitud': 4.3229 + (i % 100) * 1e-5, 'longitud': -74.3693 - (i % 50) * 1e-5}
+        }
+        for i in range(cantidad)
+    ]
+
+
+def exportar_anidado(asistencias, usuarios):
+    """Join previo: recorre usuarios_cache por cada asistencia."""
+    for asistencia in asistencias:
+        for usuario in usuarios:
+            if usuario['userId'] == asistencia['userId']:
+                break
+
+
+def medir_exportacion(client, token):
+    inicio_cpu = time.process_time()
+    inicio = time.perf_counter()
+    respuesta = client.get('/api/asistencias/exportar-csv', headers={'Authorization': f'Bearer {token}'})
+    pared = time.perf_counter() - inicio
+    cpu = time.process_time() - inicio_cpu
+    assert respuesta.status_code == 200
+    return cpu, pared, respuesta.data.count(b'\n') - 1
+
+
+def main():
+    print("\n" + "="*70)
+    print("BENCHMARK: /api/asistencias/exportar-csv")
+    print("="*70)
+
+    token = aplicacion.generar_token()
+    aplicacion.admin_tokens[token] = datetime.now() + timedelta(hours=1)
+    usuarios = [
+        {'userId': str(i), 'documento': f'{10_000_000 + i}', 'nombre': f'Usuario {i}'}
+        for i in range(USUARIOS)
+    ]
+    aplicacion.reemplazar_usuarios(usuarios)
+    asistencias = generar_asistencias(ASISTENCIAS)
+
+    try:
+        with aplicacion.app.test_client() as client:
+            # Asistencias en memoria
+            aplicacion.asistencias_cache = aplicacion.AsistenciasIndexadas(asistencias)
+            cpu, pared, filas = medir_exportacion(client, token)
+            print(f"En memoria:          {filas:,} filas | CPU {cpu:.3f} s | total {pared:.3f} s")
+
+            # Asistencias leídas bajo demanda desde el snapshot
+            journal = aplicacion.JournalAsistencias(os.path.join(DIRECTORIO, 'bench', 'asistencias.jsonl'))
+            journal.escribir_completo(asistencias)
+            journal.compactar()
+            aplicacion.asistencias_cache = journal.reproducir_indexado()
+            cpu, pared, filas = medir_exportacion(client, token)
+            print(f"Snapshot indexado:   {filas:,} filas | CPU {cpu:.3f} s | total {pared:.3f} s")
+
+        # Referencia: join anidado con pocas asistencias
+        inicio = time.process_time()
+        exportar_anidado(asistencias[-ASISTENCIAS_ANIDADO:], usuarios)
+        cpu = time.process_time() - inicio
+        print(f"Join anidado previo: {ASISTENCIAS_ANIDADO:,} filas | CPU {cpu:.3f} s (solo el join)")
+    finally:
+        aplicacion.detener_persistidor()
+        shutil.rmtree(DIRECTORIO, ignore_errors=True)
+
+    print("="*70 + "\n")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Benchmark de memoria de los registros en caché
+Mide con tracemalloc el heap de 100.000 usuarios y 100.000 asistencias
+guardados como diccionarios, como registros compactos (Usuario, Asistencia)
+y, para los usuarios, en la tabla columnar (TablaUsuarios, con sus índices).
+
+Uso:
+    python benchmark_memoria_registros.py
+"""
+
+import gc
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+import app as aplicacion
+
+CANTIDAD = 100_000
+
+
+def generar_usuarios():
+    return [
+        {'userId': str(i), 'documento': f'{10_000_000 + i}', 'nombre': f'Usuario {i}'}
+        for i in range(CANTIDAD)
+    ]
+
+
+def generar_asistencias():
+    return [
+        {
+            'userId': str(i),
+            'nombre': f'Usuario {i}',
+            'fechaHora': f'2026-01-14T10:{i // 60 % 60:02d}:{i % 60:02d}.{i:06d}Z',
+            'ubicacion': {'latitud': 4.3229 + (i % 100) * 1e-5, 'longitud': -74.3693 - (i % 50) * 1e-5}
+        }
+        for i in range(CANTIDAD)
+    ]
+
+
+def medir(construir):
+    """Retorna los bytes que quedan vivos tras construir la estructura."""
+    gc.collect()
+    tracemalloc.start()
+    estructura = construir()
+    actual, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del estructura
+    return actual
+
+
+def main():
+    print("\n" + "="*96)
+    print(f"BENCHMARK: memoria de {CANTIDAD:,} registros")
+    print("="*96)
+
+    casos = [
+        ('Usuarios', generar_usuarios,
+         lambda: [aplicacion.Usuario.desde_dict(u) for u in generar_usuarios()]),
+        ('Usuarios (tabla columnar)', generar_usuarios,
+         lambda: aplicacion.TablaUsuarios(generar_usuarios())),
+        ('Asistencias', generar_asistencias,
+         lambda: aplicacion.AsistenciasIndexadas(generar_asistencias())),
+    ]
+    for nombre, como_diccionarios, como_registros in casos:
+        antes = medir(como_diccionarios)
+        despues = medir(como_registros)
+        print(
+            f"{nombre:<26} dict: {antes / 2**20:7.1f} MB ({antes / CANTIDAD:5.0f} B/registro) | "
+            f"compacto: {despues / 2**20:7.1f} MB ({despues / CANTIDAD:5.0f} B/registro) | "
+            f"-{(1 - despues / antes) * 100:.0f}%"
+        )
+
+    print("="*96 + "\n")
+
+
+if __name__ == '__main__':
+    main()
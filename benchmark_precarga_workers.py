@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Benchmark de memoria y arranque de gunicorn según la cantidad de workers
+Arranca gunicorn con gunicorn.conf.py sobre un padrón de 200.000 usuarios,
+sin precarga y con precarga (padrón en registros y columnar), y mide para
+1, 2, 4 y 8 workers:
+- el tiempo hasta que todos los workers están listos para atender
+- la memoria propia de cada worker (USS: páginas que no comparte) y el PSS
+  total (maestro + workers), al arrancar y tras 2.000 validaciones de
+  identidad repartidas entre los workers
+
+Requiere Linux (/proc/<pid>/smaps_rollup).
+
+Uso:
+    python benchmark_precarga_workers.py [usuarios]
+"""
+
+import csv
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+RAIZ = os.path.dirname(os.path.abspath(__file__))
+CANTIDAD = int(sys.argv[1]) if len(sys.argv) > 1 else 200_000
+WORKERS = (1, 2, 4, 8)
+CONSULTAS = 2000
+
+MODOS = [
+    ('Sin precarga', {'GUNICORN_PRELOAD': 'false'}),
+    ('Precarga, registros', {'GUNICORN_PRELOAD': 'true', 'USUARIOS_FORMATO': 'registros'}),
+    ('Precarga, columnar', {'GUNICORN_PRELOAD': 'true', 'USUARIOS_FORMATO': 'columnar'}),
+]
+
+# Línea que imprime cada worker cuando terminó de cargar o de heredar los datos
+LISTO = {
+    'false': 'Aplicación Flask inicializada correctamente',
+    'true': 'listo con los datos precargados',
+}
+
+
+def generar_datos(directorio):
+    os.makedirs(os.path.join(directorio, 'data'))
+    with open(os.path.join(directorio, 'data', 'usuarios.csv'), 'w', newline='', encoding='utf-8') as archivo:
+        writer = csv.writer(archivo)
+        writer.writerow(['userId', 'documento', 'nombre'])
+        for i in range(CANTIDAD):
+            writer.writerow([str(i), f'{10_000_000 + i}', f'Usuario de prueba número {i}'])
+
+
+def puerto_libre():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def memoria(pid):
+    """Retorna (rss, pss, uss) del proceso en kB."""
+    campos = {}
+    with open(f'/proc/{pid}/smaps_rollup') as archivo:
+        for linea in archivo:
+            partes = linea.split()
+            if len(partes) == 3 and partes[2] == 'kB':
+                campos[partes[0].rstrip(':')] = int(partes[1])
+    return campos['Rss'], campos['Pss'], campos['Private_Clean'] + campos['Private_Dirty']
+
+
+def hijos(pid):
+    resultado = []
+    for entrada in os.listdir('/proc'):
+        if entrada.isdigit():
+            try:
+                with open(f'/proc/{entrada}/stat') as archivo:
+                    # El nombre del comando va entre paréntesis y puede tener espacios
+                    if int(archivo.read().rsplit(')', 1)[1].split()[1]) == pid:
+                        resultado.append(int(entrada))
+            except (OSError, IndexError):
+                pass
+    return resultado
+
+
+def medir_memoria(maestro):
+    workers = [memoria(pid) for pid in hijos(maestro.pid)]
+    pss_total = memoria(maestro.pid)[1] + sum(pss for _, pss, _ in workers)
+    uss_promedio = sum(uss for _, _, uss in workers) / len(workers)
+    return uss_promedio / 1024, pss_total / 1024
+
+
+def consultar(puerto):
+    url = f'http://127.0.0.1:{puerto}/api/validar-identidad'
+    generador = random.Random(0)
+    for _ in range(CONSULTAS):
+        cuerpo = json.dumps({'documento': str(10_000_000 + generador.randrange(CANTIDAD))}).encode()
+        peticion = urllib.request.Request(url, cuerpo, {'Content-Type': 'application/json'})
+        with urllib.request.urlopen(peticion) as respuesta:
+            assert json.load(respuesta)['valido']
+
+
+def ejecutar(directorio, entorno_modo, workers):
+    """Arranca gunicorn, mide y lo detiene. Retorna (segundos, mediciones al arrancar, tras consultas)."""
+    puerto = puerto_libre()
+    entorno = dict(os.environ, PORT=str(puerto), WEB_CONCURRENCY=str(workers), **entorno_modo)
+    inicio = time.perf_counter()
+    maestro = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', os.path.join(RAIZ, 'gunicorn.conf.py'),
+         '--pythonpath', RAIZ, 'backend.app:app'],
+        cwd=directorio, env=entorno, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
+    )
+    listos = threading.Semaphore(0)
+    marca = LISTO[entorno_modo['GUNICORN_PRELOAD']]
+
+    def leer_salida():
+        for linea in maestro.stdout:
+            if marca in linea:
+                listos.release()
+
+    threading.Thread(target=leer_salida, daemon=True).start()
+    try:
+        for _ in range(workers):
+            if not listos.acquire(timeout=300):
+                raise RuntimeError("gunicorn no terminó de arrancar")
+        segundos = time.perf_counter() - inicio
+        time.sleep(0.5)  # Que los threads de cada worker terminen de iniciar
+        al_arrancar = medir_memoria(maestro)
+        consultar(puerto)
+        return segundos, al_arrancar, medir_memoria(maestro)
+    finally:
+        maestro.terminate()
+        maestro.wait(timeout=60)
+
+
+def main():
+    print("\n" + "="*100)
+    print(f"BENCHMARK: gunicorn con {CANTIDAD:,} usuarios según cantidad de workers")
+    print("="*100)
+
+    directorio = tempfile.mkdtemp()
+    try:
+        generar_datos(directorio)
+        # Primer arranque: genera el snapshot del padrón que usan los siguientes
+        ejecutar(directorio, MODOS[0][1], 1)
+
+        print(f"\n{'Modo':<22}{'Workers':>8}{'Arranque':>11}{'USS/worker':>13}{'PSS total':>12}"
+              f"{'USS/worker':>13}{'PSS total':>12}")
+        print(f"{'':<22}{'':>8}{'':>11}{'(al arrancar)':>25}{'(tras ' + str(CONSULTAS) + ' consultas)':>25}")
+        print("-"*100)
+        for nombre, entorno_modo in MODOS:
+            for workers in WORKERS:
+                segundos, (uss, pss), (uss_final, pss_final) = ejecutar(directorio, entorno_modo, workers)
+                print(f"{nombre:<22}{workers:>8}{segundos:>10.2f}s{uss:>10.1f} MB{pss:>9.1f} MB"
+                      f"{uss_final:>10.1f} MB{pss_final:>9.1f} MB")
+            print()
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+    print("="*100)
+    print("USS: memoria propia de cada worker (promedio). PSS total: maestro y workers,")
+    print("repartiendo cada página compartida entre los procesos que la comparten.")
+    print("="*100 + "\n")
+
+
+if __name__ == '__main__':
+    main()
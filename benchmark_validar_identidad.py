@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Benchmark de /api/validar-identidad
+Compara la búsqueda lineal anterior con el índice documento → usuario
+para listas de 10 a 1.000.000 de usuarios.
+
+Uso:
+    python benchmark_validar_identidad.py
+"""
+
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), 'backend'))
+
+import app as aplicacion
+
+TAMANOS = [10, 1_000, 100_000, 1_000_000]
+CONSULTAS = 2_000  # Búsquedas por tamaño
+CONSULTAS_LINEALES = 50  # La búsqueda lineal es lenta con listas grandes
+PETICIONES = 300  # Peticiones HTTP (cliente de prueba de Flask) por tamaño
+
+
+def busqueda_lineal(usuarios, documento):
+    """Búsqueda previa al índice: recorre la lista completa."""
+    for usuario in usuarios:
+        if usuario['documento'] == documento:
+            return usuario
+    return None
+
+
+def medir(funcion, documentos):
+    """Retorna la latencia promedio en microsegundos."""
+    inicio = time.perf_counter()
+    for documento in documentos:
+        funcion(documento)
+    return (time.perf_counter() - inicio) / len(documentos) * 1e6
+
+
+def main():
+    print("\n" + "="*78)
+    print("BENCHMARK: /api/validar-identidad")
+    print("="*78)
+    print(f"{'Usuarios':>10} | {'Lineal (µs)':>12} | {'Índice (µs)':>12} | {'Endpoint p50 (µs)':>18} | {'p99 (µs)':>10}")
+    print("-"*78)
+
+    usuarios_anteriores = aplicacion.usuarios_cache
+    try:
+        for tamano in TAMANOS:
+            usuarios = [
+                {'userId': str(i), 'documento': f'{10_000_000 + i}', 'nombre': f'Usuario {i}'}
+                for i in range(tamano)
+            ]
+            aplicacion.reemplazar_usuarios(usuarios)
+            documentos = [random.choice(usuarios)['documento'] for _ in range(CONSULTAS)]
+
+            lineal = medir(lambda d: busqueda_lineal(usuarios, d), documentos[:CONSULTAS_LINEALES])
+            indice = medir(aplicacion.buscar_usuario_por_documento, documentos)
+
+            latencias = []
+            with aplicacion.app.test_client() as client:
+                for documento in documentos[:PETICIONES]:
+                    inicio = time.perf_counter()
+                    respuesta = client.post('/api/validar-identidad', json={'documento': documento})
+                    latencias.append((time.perf_counter() - inicio) * 1e6)
+                    assert respuesta.get_json()['valido']
+            latencias.sort()
+            p50 = statistics.median(latencias)
+            p99 = latencias[int(len(latencias) * 0.99) - 1]
+
+            print(f"{tamano:>10,} | {lineal:>12.2f} | {indice:>12.3f} | {p50:>18.1f} | {p99:>10.1f}")
+    finally:
+        aplicacion.reemplazar_usuarios(usuarios_anteriores)
+
+    print("="*78 + "\n")
+
+
+if __name__ == '__main__':
+    main()
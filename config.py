@@ -27,6 +27,33 @@ class Config:
     USUARIOS_CSV = os.path.join(DATA_DIR, 'usuarios.csv')
     CONFIGURACION_JSON = os.path.join(DATA_DIR, 'configuracion.json')
     ASISTENCIAS_JSON = os.path.join(DATA_DIR, 'asistencias.json')
+    ASISTENCIAS_JOURNAL = os.path.join(DATA_DIR, 'asistencias.jsonl')
+    
+    # Persistencia de asistencias: 'journal' (append-only) o 'json'
+    ASISTENCIAS_MODO = os.environ.get('ASISTENCIAS_MODO', 'journal').lower()
+    
+    # Compactación del journal en snapshot (0 = desactivado)
+    COMPACTACION_REGISTROS = int(os.environ.get('COMPACTACION_REGISTROS', '5000'))
+    COMPACTACION_BYTES = int(os.environ.get('COMPACTACION_BYTES', str(4 * 1024 * 1024)))
+    
+    # Altas se agregan al final de usuarios.csv; ediciones y bajas se agrupan
+    # durante esta demora antes de reescribir el archivo (0 = inmediato)
+    USUARIOS_REESCRITURA_MS = float(os.environ.get('USUARIOS_REESCRITURA_MS', '500'))
+    
+    # Backend de almacenamiento: 'archivos' (CSV/JSON) o 'sqlite'
+    ALMACENAMIENTO = os.environ.get('ALMACENAMIENTO', 'archivos').lower()
+    BASE_DATOS_SQLITE = os.path.join(DATA_DIR, 'asistencia.db')
+    
+    # Persistencia diferida con commit agrupado:
+    # 'durable' (responder tras escribir), 'encolado' (responder al encolar)
+    # o 'sincrono' (escribir dentro de cada petición)
+    PERSISTENCIA_MODO = os.environ.get('PERSISTENCIA_MODO', 'durable').lower()
+    PERSISTENCIA_VENTANA_MS = float(os.environ.get('PERSISTENCIA_VENTANA_MS', '10'))
+    PERSISTENCIA_COLA = int(os.environ.get('PERSISTENCIA_COLA', '10000'))
+    
+    # Un único worker (el líder) observa usuarios.csv y ejecuta el
+    # mantenimiento; segundos entre intentos de tomar el liderazgo y tareas
+    MANTENIMIENTO_INTERVALO_S = float(os.environ.get('MANTENIMIENTO_INTERVALO_S', '5'))
 
 
 class DevelopmentConfig(Config):
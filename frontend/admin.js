@@ -120,10 +120,19 @@ const API_BASE_URL = window.location.origin;
 // Estado de la aplicación
 const appState = {
     usuarios: [],
+    totalUsuarios: 0,
     usuarioEditando: null,
-    asistencias: []
+    asistencias: [],
+    desdePendientes: 0
 };
 
+// Pendientes de confirmar: tamaño de página y frecuencia de actualización
+const POR_PAGINA_PENDIENTES = 50;
+const INTERVALO_PENDIENTES_MS = 15000;
+
+// Usuarios mostrados sin búsqueda (el resto se encuentra buscando)
+const POR_PAGINA_USUARIOS = 50;
+
 // ============================================================================
 // ELEMENTOS DEL DOM
 // ============================================================================
@@ -137,12 +146,21 @@ const btnAgregar = document.getElementById('btn-agregar');
 
 // Tabla de usuarios
 const tbodyUsuarios = document.getElementById('tbody-usuarios');
+const inputBuscarUsuarios = document.getElementById('buscar-usuarios');
+const resultadoBusquedaUsuarios = document.getElementById('resultado-busqueda-usuarios');
 const loadingIndicator = document.getElementById('loading');
 
 // Tabla de asistencias
 const tbodyAsistencias = document.getElementById('tbody-asistencias');
 const loadingAsistencias = document.getElementById('loading-asistencias');
 
+// Tabla de pendientes de confirmar
+const tbodyPendientes = document.getElementById('tbody-pendientes');
+const resumenPendientes = document.getElementById('resumen-pendientes');
+const paginaPendientes = document.getElementById('pagina-pendientes');
+const btnPendientesAnterior = document.getElementById('btn-pendientes-anterior');
+const btnPendientesSiguiente = document.getElementById('btn-pendientes-siguiente');
+
 // Modal de edición
 const modalEditar = document.getElementById('modal-editar');
 const formEditar = document.getElementById('form-editar');
@@ -306,6 +324,72 @@ async function cargarListaUsuarios() {
     }
 }
 
+/**
+ * Busca usuarios en el backend (nombre, documento o userId)
+ * 
+ * @param {string} consulta - Texto a buscar
+ * @returns {Promise<{usuarios: Array, total: number}>}
+ */
+async function buscarUsuariosServidor(consulta) {
+    const parametros = new URLSearchParams({ q: consulta });
+    const response = await fetchAutenticado(`${API_BASE_URL}/api/usuarios/buscar?${parametros}`, {
+        method: 'GET',
+        headers: {
+            'Content-Type': 'application/json'
+        }
+    });
+    
+    if (!response.ok) {
+        let mensajeError = 'Error al buscar usuarios';
+        try {
+            const errorData = await response.json();
+            mensajeError = errorData.error || errorData.mensaje || mensajeError;
+        } catch (e) {
+            // Usar mensaje genérico
+        }
+        throw new Error(mensajeError);
+    }
+    
+    return await response.json();
+}
+
+/**
+ * Carga la primera página del padrón (vista sin búsqueda)
+ * 
+ * @returns {Promise<{usuarios: Array, total: number}>}
+ */
+async function cargarPaginaUsuarios() {
+    const parametros = new URLSearchParams({ desde: 0, limite: POR_PAGINA_USUARIOS });
+    const response = await fetchAutenticado(`${API_BASE_URL}/api/usuarios/pagina?${parametros}`, {
+        method: 'GET',
+        headers: {
+            'Content-Type': 'application/json'
+        }
+    });
+    
+    if (!response.ok) {
+        let mensajeError = 'Error al cargar usuarios';
+        try {
+            const errorData = await response.json();
+            mensajeError = errorData.error || errorData.mensaje || mensajeError;
+        } catch (e) {
+            // Usar mensaje genérico
+        }
+        throw new Error(mensajeError);
+    }
+    
+    return await response.json();
+}
+
+/**
+ * Texto de búsqueda activo en la lista de usuarios ('' si se muestra la lista completa)
+ * 
+ * @returns {string}
+ */
+function obtenerBusquedaUsuarios() {
+    return inputBuscarUsuarios ? inputBuscarUsuarios.value.trim() : '';
+}
+
 /**
  * Carga la lista de asistencias desde el backend
  * Requirement: 4.7, 6.2
@@ -354,6 +438,35 @@ async function cargarListaAsistencias() {
     }
 }
 
+/**
+ * Carga una página de usuarios que todavía no confirmaron asistencia
+ * 
+ * @param {number} desde - Posición del primer pendiente de la página
+ * @returns {Promise<{pendientes: Array, total: number, totalUsuarios: number}>}
+ */
+async function cargarPendientes(desde) {
+    const parametros = new URLSearchParams({ desde, limite: POR_PAGINA_PENDIENTES });
+    const response = await fetchAutenticado(`${API_BASE_URL}/api/asistencias/pendientes?${parametros}`, {
+        method: 'GET',
+        headers: {
+            'Content-Type': 'application/json'
+        }
+    });
+    
+    if (!response.ok) {
+        let mensajeError = 'Error al cargar pendientes';
+        try {
+            const errorData = await response.json();
+            mensajeError = errorData.error || errorData.mensaje || mensajeError;
+        } catch (e) {
+            // Usar mensaje genérico
+        }
+        throw new Error(mensajeError);
+    }
+    
+    return await response.json();
+}
+
 /**
  * Agrega un nuevo usuario
  * Requirement: 4.4, 6.2
@@ -486,9 +599,12 @@ function renderizarTablaUsuarios() {
     // Si no hay usuarios, mostrar mensaje
     if (appState.usuarios.length === 0) {
         const tr = document.createElement('tr');
+        const mensajeVacio = obtenerBusquedaUsuarios()
+            ? 'Ningún usuario coincide con la búsqueda.'
+            : 'No hay usuarios registrados. Agrega el primer usuario usando el formulario arriba.';
         tr.innerHTML = `
             <td colspan="4" class="tabla-vacia">
-                No hay usuarios registrados. Agrega el primer usuario usando el formulario arriba.
+                ${mensajeVacio}
             </td>
         `;
         tbodyUsuarios.appendChild(tr);
@@ -574,6 +690,44 @@ function renderizarTablaAsistencias() {
     });
 }
 
+/**
+ * Renderiza la página de pendientes de confirmar y su paginación
+ * 
+ * @param {Object} datos - Respuesta de /api/asistencias/pendientes
+ */
+function renderizarTablaPendientes(datos) {
+    tbodyPendientes.innerHTML = '';
+    
+    const confirmados = datos.totalUsuarios - datos.total;
+    resumenPendientes.textContent =
+        `${datos.total} pendiente(s) de ${datos.totalUsuarios} usuarios (${confirmados} confirmados)`;
+    
+    if (datos.pendientes.length === 0) {
+        const tr = document.createElement('tr');
+        tr.innerHTML = `
+            <td colspan="3" class="tabla-vacia">
+                No hay usuarios pendientes de confirmar.
+            </td>
+        `;
+        tbodyPendientes.appendChild(tr);
+    }
+    
+    datos.pendientes.forEach(usuario => {
+        const tr = document.createElement('tr');
+        tr.innerHTML = `
+            <td>${escapeHtml(usuario.userId)}</td>
+            <td>${escapeHtml(usuario.documento)}</td>
+            <td>${escapeHtml(usuario.nombre)}</td>
+        `;
+        tbodyPendientes.appendChild(tr);
+    });
+    
+    const hasta = datos.desde + datos.pendientes.length;
+    paginaPendientes.textContent = datos.total > 0 ? `${datos.desde + 1}-${hasta} de ${datos.total}` : '';
+    btnPendientesAnterior.disabled = datos.desde === 0;
+    btnPendientesSiguiente.disabled = hasta >= datos.total;
+}
+
 /**
  * Escapa HTML para prevenir XSS
  * 
@@ -599,8 +753,31 @@ async function cargarYMostrarUsuarios() {
     limpiarMensajes();
     
     try {
-        const usuarios = await cargarListaUsuarios();
-        appState.usuarios = usuarios;
+        const consulta = obtenerBusquedaUsuarios();
+        
+        if (consulta) {
+            // Con búsqueda activa solo se descargan las coincidencias
+            const resultado = await buscarUsuariosServidor(consulta);
+            appState.usuarios = resultado.usuarios;
+            resultadoBusquedaUsuarios.textContent = resultado.total > resultado.usuarios.length
+                ? `Mostrando ${resultado.usuarios.length} de ${resultado.total} coincidencias. Refina la búsqueda para ver más.`
+                : `${resultado.total} coincidencia(s)`;
+            resultadoBusquedaUsuarios.classList.remove('oculto');
+        } else {
+            // Sin búsqueda solo se descarga la primera página del padrón
+            const resultado = await cargarPaginaUsuarios();
+            appState.usuarios = resultado.usuarios;
+            appState.totalUsuarios = resultado.total;
+            if (resultadoBusquedaUsuarios) {
+                if (resultado.total > resultado.usuarios.length) {
+                    resultadoBusquedaUsuarios.textContent =
+                        `Mostrando ${resultado.usuarios.length} de ${resultado.total} usuarios. Usa la búsqueda para encontrar a los demás.`;
+                    resultadoBusquedaUsuarios.classList.remove('oculto');
+                } else {
+                    resultadoBusquedaUsuarios.classList.add('oculto');
+                }
+            }
+        }
         renderizarTablaUsuarios();
         ocultarLoading();
         
@@ -637,6 +814,34 @@ async function cargarYMostrarAsistencias() {
     }
 }
 
+/**
+ * Carga y muestra la página actual de pendientes de confirmar
+ * 
+ * @param {number} desde - Posición del primer pendiente (por defecto, la página actual)
+ */
+async function cargarYMostrarPendientes(desde = appState.desdePendientes) {
+    if (!tbodyPendientes) {
+        return;
+    }
+    
+    try {
+        let datos = await cargarPendientes(desde);
+        
+        // Si la página quedó vacía (confirmaron los últimos), volver a la última con datos
+        if (datos.pendientes.length === 0 && datos.desde > 0 && datos.total > 0) {
+            const ultima = Math.floor((datos.total - 1) / POR_PAGINA_PENDIENTES) * POR_PAGINA_PENDIENTES;
+            datos = await cargarPendientes(ultima);
+        }
+        
+        appState.desdePendientes = datos.desde;
+        renderizarTablaPendientes(datos);
+        
+    } catch (error) {
+        console.error('Error al cargar pendientes:', error);
+        // No mostrar mensaje de error para pendientes, solo log
+    }
+}
+
 // ============================================================================
 // MANEJADORES DE EVENTOS - AGREGAR USUARIO
 // ============================================================================
@@ -687,6 +892,7 @@ formAgregar.addEventListener('submit', async (event) => {
         
         // Recargar lista de usuarios
         await cargarYMostrarUsuarios();
+        cargarYMostrarPendientes();
         
     } catch (error) {
         mostrarMensaje('error', error.message || 'No se pudo agregar el usuario', 'Error');
@@ -760,6 +966,7 @@ formEditar.addEventListener('submit', async (event) => {
         
         // Recargar lista de usuarios
         await cargarYMostrarUsuarios();
+        cargarYMostrarPendientes();
         
     } catch (error) {
         mostrarMensaje('error', error.message || 'No se pudo actualizar el usuario', 'Error');
@@ -812,6 +1019,7 @@ async function eliminarUsuarioConfirmado(userId, nombre) {
         
         // Recargar lista de usuarios
         await cargarYMostrarUsuarios();
+        cargarYMostrarPendientes();
         
     } catch (error) {
         mostrarMensaje('error', error.message || 'No se pudo eliminar el usuario', 'Error');
@@ -843,14 +1051,25 @@ modalEditar.addEventListener('click', (event) => {
  * Exporta la lista de usuarios a CSV
  * Requirement: 4.3
  */
-btnExportar.addEventListener('click', () => {
-    if (appState.usuarios.length === 0) {
+btnExportar.addEventListener('click', async () => {
+    // La tabla muestra solo coincidencias o la primera página: exportar la lista completa
+    let usuarios = appState.usuarios;
+    if (obtenerBusquedaUsuarios() || appState.usuarios.length < appState.totalUsuarios) {
+        try {
+            usuarios = await cargarListaUsuarios();
+        } catch (error) {
+            mostrarMensaje('error', error.message || 'No se pudo cargar la lista de usuarios', 'Error');
+            return;
+        }
+    }
+    
+    if (usuarios.length === 0) {
         mostrarMensaje('warning', 'No hay usuarios para exportar', 'Lista vacía');
         return;
     }
     
     // Generar CSV
-    const csv = generarCSV(appState.usuarios);
+    const csv = generarCSV(usuarios);
     
     // Crear blob y descargar
     const blob = new Blob([csv], { type: 'text/csv;charset=utf-8;' });
@@ -1064,6 +1283,7 @@ btnImportarCsv.addEventListener('click', async () => {
             
             // Recargar lista de usuarios
             await cargarYMostrarUsuarios();
+            cargarYMostrarPendientes();
             
             // Ocultar resultado después de 10 segundos
             setTimeout(() => {
@@ -1162,6 +1382,7 @@ btnConfirmarReinicio.addEventListener('click', async () => {
             
             // Recargar lista de asistencias
             await cargarYMostrarAsistencias();
+            cargarYMostrarPendientes(0);
         } else {
             mostrarMensaje('error', resultado.mensaje, 'Error al reiniciar');
         }
@@ -1218,7 +1439,9 @@ btnEliminarTodosUsuarios.addEventListener('click', async () => {
     // Confirmar acción
     const confirmacion = confirm(
         `⚠️ ¿Estás seguro que deseas eliminar TODOS los usuarios autorizados?\n\n` +
-        `Esta acción eliminará ${appState.usuarios.length} usuarios de forma permanente.\n\n` +
+        (obtenerBusquedaUsuarios()
+            ? `Esta acción eliminará todos los usuarios (no solo los de la búsqueda) de forma permanente.\n\n`
+            : `Esta acción eliminará ${appState.totalUsuarios} usuarios de forma permanente.\n\n`) +
         `Se recomienda exportar el CSV antes de continuar.`
     );
     
@@ -1257,6 +1480,7 @@ btnEliminarTodosUsuarios.addEventListener('click', async () => {
             
             // Recargar lista de usuarios
             await cargarYMostrarUsuarios();
+            cargarYMostrarPendientes();
         } else {
             mostrarMensaje('error', resultado.mensaje, 'Error al eliminar');
         }
@@ -1529,12 +1753,37 @@ document.addEventListener('DOMContentLoaded', async () => {
         formConfiguracion.addEventListener('submit', guardarConfiguracionUbicacion);
     }
     
+    // Búsqueda de usuarios: se consulta al servidor al dejar de escribir
+    if (inputBuscarUsuarios) {
+        let temporizadorBusqueda = null;
+        inputBuscarUsuarios.addEventListener('input', () => {
+            clearTimeout(temporizadorBusqueda);
+            temporizadorBusqueda = setTimeout(cargarYMostrarUsuarios, 300);
+        });
+    }
+    
     // Cargar usuarios al inicio
     cargarYMostrarUsuarios();
     
     // Cargar asistencias al inicio
     cargarYMostrarAsistencias();
     
+    // Pendientes de confirmar: paginación y actualización periódica
+    if (btnPendientesAnterior && btnPendientesSiguiente) {
+        btnPendientesAnterior.addEventListener('click', () => {
+            cargarYMostrarPendientes(Math.max(0, appState.desdePendientes - POR_PAGINA_PENDIENTES));
+        });
+        btnPendientesSiguiente.addEventListener('click', () => {
+            cargarYMostrarPendientes(appState.desdePendientes + POR_PAGINA_PENDIENTES);
+        });
+    }
+    const btnActualizarPendientes = document.getElementById('btn-actualizar-pendientes');
+    if (btnActualizarPendientes) {
+        btnActualizarPendientes.addEventListener('click', () => cargarYMostrarPendientes());
+    }
+    cargarYMostrarPendientes();
+    setInterval(() => cargarYMostrarPendientes(), INTERVALO_PENDIENTES_MS);
+    
     // Cargar configuración de ubicación
     cargarConfiguracionUbicacion();
     
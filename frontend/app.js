@@ -138,7 +138,7 @@ function habilitarBoton(boton) {
  * Requirements: 1.1, 1.2, 1.3, 6.2
  * 
  * @param {string} documento - Número de documento
- * @returns {Promise<{valido: boolean, nombre?: string, userId?: string}>}
+ * @returns {Promise<{valido: boolean, nombre?: string, userId?: string, sugerencias?: string[]}>}
  */
 async function validarIdentidad(documento) {
     try {
@@ -298,7 +298,14 @@ formIdentificacion.addEventListener('submit', async (event) => {
             
         } else {
             // Credenciales inválidas - mostrar error (Requirement 1.3, 6.2)
-            mostrarMensaje('error', 'El número de documento ingresado no es válido. Por favor verifica tu documento.', 'Documento inválido');
+            let mensaje = 'El número de documento ingresado no es válido. Por favor verifica tu documento.';
+            
+            // Documentos parecidos registrados: solo se reciben nombres enmascarados
+            if (resultado.sugerencias && resultado.sugerencias.length > 0) {
+                mensaje += ` ¿Eres ${resultado.sugerencias.join(' o ')}? Revisa los dígitos de tu documento.`;
+            }
+            
+            mostrarMensaje('error', mensaje, 'Documento inválido');
             habilitarBoton(btnValidar);
         }
         
@@ -0,0 +1,39 @@
+"""
+Configuración de Gunicorn
+Sistema de Confirmación de Asistencia a Asambleas
+
+Sin precarga (por defecto) cada worker importa la aplicación y carga sus
+propios datos, como con gunicorn sin archivo de configuración. Con
+GUNICORN_PRELOAD=true el proceso maestro importa la aplicación y carga
+padrón, configuración y asistencias una sola vez; los workers los heredan
+por fork y comparten esas páginas de memoria mientras no las modifiquen.
+Solo conviene con varios workers. Los threads de cada worker (persistencia
+diferida, file watcher) se inician en post_fork.
+
+Variables de entorno:
+    PORT              Puerto de escucha (5000)
+    WEB_CONCURRENCY   Cantidad de workers (1); --workers en la línea de comandos tiene prioridad
+    GUNICORN_PRELOAD  'true' para cargar los datos una vez en el maestro (false)
+
+Uso:
+    gunicorn -c gunicorn.conf.py backend.app:app
+"""
+
+import os
+import sys
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '5000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', '1'))
+timeout = 120
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'false').lower() == 'true'
+
+# La aplicación lo lee al importarse: con precarga, en el maestro no inicia threads
+os.environ['PRECARGA_WORKERS'] = 'true' if preload_app else 'false'
+
+
+def post_fork(server, worker):
+    """Inicia los threads del worker sobre los datos heredados del maestro."""
+    # Sin precarga el módulo aún no está importado: el worker lo carga completo
+    modulo = sys.modules.get(server.app.app_uri.split(':')[0])
+    if modulo is not None:
+        modulo.iniciar_worker()